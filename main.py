@@ -1,15 +1,21 @@
 """Точка входа CLI приложения."""
 
+import csv
+import functools
+import html
 import json
 import sqlite3
-import subprocess
 import sys
 import io
+import threading
 import time
-from datetime import datetime, timezone
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path, PurePath
+from queue import Empty, SimpleQueue
 import logging
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import click
 
@@ -21,41 +27,81 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-from src.storage.database import VideoStorage, VideoRecord
+from src.storage.canonical_backfill import BackfillCheckpoint
+from src.storage.content_hub_outbox import ContentHubOutbox
+from src.storage.database import VideoStorage, VideoRecord, description_hash
 from src.storage.job_queue import JobQueue, JobRecord
+from src.storage.remote_catalog import RemoteCatalog, remote_video_url
+from src.storage.upload_intents import UploadIntent, UploadIntents
+from src.storage.upload_quota import UploadQuota, upload_quota_key
+from src.storage.upload_runs import UploadRuns
 from src.storage.scanner import VideoScanner
-from src.title_generators.factory import TitleGeneratorFactory
-from src.publisher.vk_publisher import VKPublisher, VKApi1051Error
+from src.title_generators.factory import TitleGeneratorFactory, generate_titles_by_name
+from src.publisher.bandwidth import format_size, parse_size
+from src.publisher.vk_publisher import (
+    EXECUTE_BATCH_SIZE,
+    VIDEO_TITLE_MAX_LENGTH,
+    VKApi1051Error,
+    VKPublisher,
+    VKPublisherError,
+)
 from src.utils.env_utils import get_env_var
-from src.models.video import VideoData
-from src.models.content import ContentItem
-from src.app_context import get_vk_publisher, FatalUploadError
-from src.adapters import VKDestinationAdapter
-from src.config.registry import COURSE_TYPES, CHANNEL_TO_TITLE_GENERATOR
+from src.models.content import ContentItem, PublicationResult
+from src.app_context import get_upload_shaper, get_vk_publisher, get_vk_token_manager, FatalUploadError
+from src.adapters import UploadEngine, VKDestinationAdapter
+from src.adapters.upload_engine import EVENT_START
+from src.adapters.upload_schedule import (
+    ORDER_BALANCED,
+    ORDER_ID,
+    SCHEDULE_ORDERS,
+    estimate_plan,
+    order_by_size,
+    pack_window,
+)
+from src.adapters.destinations.vk import ERROR_FILE_CHANGED
+from src.adapters.quota_schedule import QuotaSchedule, parse_upload_window
+from src.config.settings import get_settings
+from src.config.registry import COURSE_TYPES, title_generator_name
+from src.config.vk_destinations import VkDestination, resolve_vk_destination
 from src.config.source_registry import get_export_paths
-from src.integrations.content_hub import write_canonical_if_enabled
+from src.integrations.content_hub import (
+    client_available as content_hub_client_available,
+    create_client as create_content_hub_client,
+    get_flusher,
+    run_backfill,
+    write_canonical_if_enabled,
+)
+from src.integrations.content_hub.backfill import BACKFILL_BATCH_SIZE, BACKFILL_DESTINATION
+from src.integrations.content_hub.outbox import OUTBOX_BATCH_SIZE
 
 # Настройка логирования (файл в папке logs, папка в .gitignore)
-# Уровень из переменной окружения LOG_LEVEL (DEBUG, INFO, WARNING, ERROR) для пайплайнов
+# Уровень LOG_LEVEL (DEBUG, INFO, WARNING, ERROR) и файл LOG_FILE — из .env / config.yaml / окружения пайплайна
 Path("logs").mkdir(exist_ok=True)
-_log_level_name = (get_env_var("LOG_LEVEL") or "INFO").upper()
-_log_level = getattr(logging, _log_level_name, logging.INFO)
+_log_settings = get_settings().logging
+_log_level = getattr(logging, _log_settings.level, logging.INFO)
+_log_handlers: list[logging.Handler] = [logging.StreamHandler()]
+if _log_settings.file:
+    Path(_log_settings.file).parent.mkdir(parents=True, exist_ok=True)
+    _log_handlers.append(logging.FileHandler(_log_settings.file, encoding="utf-8"))
 logging.basicConfig(
     level=_log_level,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("logs/publisher.log", encoding="utf-8"),
-    ],
+    handlers=_log_handlers,
 )
 logger = logging.getLogger(__name__)
 
-# Корень проекта (для вызова scripts/refresh_vk_token.py)
-_PROJECT_ROOT = Path(__file__).resolve().parent
-
 # Рекомендуемая задержка между загрузками (VK API: лимит частоты, антибот). См. docs/USAGE.md
 DEFAULT_UPLOAD_DELAY = 15.0
 
+# Для скольких следующих видео пакета заранее вызывается video.save (пока идёт текущая загрузка)
+UPLOAD_PREFETCH_DEPTH = 1
+
+# Скорость одного слота загрузки (байт/с) для --plan и --window, пока нет измерений (таблица upload_runs)
+DEFAULT_SLOT_THROUGHPUT = 2 * 1024 * 1024
+
+# Запас (сек) к дате намерения загрузки при поиске уже загруженного видео в группе (расхождение часов)
+UPLOAD_INTENT_DATE_MARGIN = 3600
+
 # Коды выхода (docs/EXIT-CODES-AND-SUMMARY-SPEC.md)
 EXIT_SUCCESS = 0
 EXIT_FATAL = 1
@@ -100,24 +146,9 @@ def write_summary(
         logger.warning("Не удалось записать summary: %s", e)
 
 
-def _refresh_vk_token_callback() -> Optional[str]:
-    """Запуск обновления VK токена по refresh_token и возврат нового access_token из .env."""
-    script = _PROJECT_ROOT / "scripts" / "refresh_vk_token.py"
-    if not script.exists():
-        logger.warning("Скрипт scripts/refresh_vk_token.py не найден")
-        return None
-    try:
-        subprocess.run(
-            [sys.executable, str(script), "--force"],
-            cwd=str(_PROJECT_ROOT),
-            check=False,
-            capture_output=True,
-            timeout=30,
-        )
-    except Exception as e:
-        logger.warning("Ошибка при обновлении токена: %s", e)
-        return None
-    return get_env_var("VK_ACCESS_TOKEN")
+def _refresh_vk_token_callback(stale_token: str) -> Optional[str]:
+    """Обновление VK_ACCESS_TOKEN по refresh_token после ошибки 5 (одно на все потоки и процессы)."""
+    return get_vk_token_manager().refresh(stale_token)
 
 
 def get_storage() -> VideoStorage:
@@ -450,18 +481,22 @@ def _delete_from_vk_by_urls(
         click.echo(f"Всего к удалению в VK: {len(parsed)}. Запустите без --dry-run.")
         return (len(parsed), 0, 0)
     ok = 0
-    for idx, (owner_id, video_id, url) in enumerate(parsed):
-        if publisher.delete_video(owner_id, video_id):
-            rec = storage.get_record_by_video_url(url)
-            if rec:
-                storage.clear_upload_state(rec.id)
-                click.echo(f"  {url} — удалено в VK, данные в БД (ID {rec.id}) сброшены")
+    # video.delete пачками через execute; пауза — между пачками
+    for start in range(0, len(parsed), EXECUTE_BATCH_SIZE):
+        chunk = parsed[start:start + EXECUTE_BATCH_SIZE]
+        results = publisher.delete_batch([(owner_id, video_id) for owner_id, video_id, _ in chunk])
+        for (owner_id, video_id, url), deleted in zip(chunk, results):
+            if deleted:
+                rec = storage.get_record_by_video_url(url)
+                if rec:
+                    storage.clear_upload_state(rec.id)
+                    click.echo(f"  {url} — удалено в VK, данные в БД (ID {rec.id}) сброшены")
+                else:
+                    click.echo(f"  {url} — удалено в VK")
+                ok += 1
             else:
-                click.echo(f"  {url} — удалено в VK")
-            ok += 1
-        else:
-            click.echo(f"  {url} — ошибка удаления в VK")
-        if idx < len(parsed) - 1 and delay > 0:
+                click.echo(f"  {url} — ошибка удаления в VK")
+        if start + EXECUTE_BATCH_SIZE < len(parsed) and delay > 0:
             time.sleep(delay)
     failed = len(parsed) - ok
     click.echo(f"Готово: удалено в VK — {ok} из {len(parsed)}.")
@@ -502,6 +537,176 @@ def delete_from_vk(urls: tuple, urls_file: Optional[Path], delay: float, dry_run
         sys.exit(EXIT_PARTIAL)
 
 
+def _size_option(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[int]:
+    """Разбор размера в опции CLI (50G, 500M)."""
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def _duration_option(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[float]:
+    """Разбор длительности в опции CLI (8h, 90m, 3600s; число — секунды)."""
+    if value is None:
+        return None
+    units = {"h": 3600, "m": 60, "s": 1}
+    text = value.strip().lower()
+    try:
+        seconds = float(text[:-1]) * units[text[-1]] if text and text[-1] in units else float(text)
+    except ValueError:
+        raise click.BadParameter(f"Неверная длительность: {value!r} (пример: 8h, 90m)")
+    if seconds <= 0:
+        raise click.BadParameter("Длительность должна быть больше 0")
+    return seconds
+
+
+def _record_size(record: VideoRecord) -> int:
+    """Размер файла записи: из scan, для записей без него — с диска (нет файла — 0)."""
+    if record.file_size is not None:
+        return record.file_size
+    try:
+        return Path(record.file_path).stat().st_size
+    except OSError:
+        return 0
+
+
+def _slot_throughput(slots: int) -> tuple[float, bool]:
+    """Оценка скорости одного слота (байт/с) и признак, что она измерена (upload_runs).
+
+    При ограничении VK_UPLOAD_BANDWIDTH скорость слота не выше текущего лимита, делённого на слоты.
+    """
+    measured = UploadRuns().slot_throughput()
+    rate = measured or DEFAULT_SLOT_THROUGHPUT
+    limit = get_upload_shaper().rate()
+    if limit:
+        rate = min(rate, limit / slots)
+    return rate, measured is not None
+
+
+def _schedule_upload(
+    records: list[VideoRecord], order: str, window_sec: Optional[float], slots: int, delay: float
+) -> tuple[list[VideoRecord], int]:
+    """Порядок загрузки по политике и отбор записей, укладывающихся в окно (--window).
+
+    Returns:
+        (записи в порядке загрузки, число отложенных до следующего запуска).
+    """
+    records = order_by_size(records, _record_size, order)
+    if window_sec is None:
+        return records, 0
+    slot_rate, _ = _slot_throughput(slots)
+    packed, deferred = pack_window(records, lambda r: _record_size(r) / slot_rate + delay, slots, window_sec)
+    if order != ORDER_BALANCED:
+        # Поместившиеся — в порядке выбранной политики
+        packed_ids = {id(r) for r in packed}
+        packed = [r for r in records if id(r) in packed_ids]
+    if deferred:
+        click.echo(f"В окно {window_sec / 3600:.1f} ч не помещаются: {len(deferred)} видео — отложены до следующего запуска")
+    return packed, len(deferred)
+
+
+def _echo_upload_plan(
+    command: str, records: list[VideoRecord], slots: int, delay: float, deferred: int, oversize: int = 0
+) -> None:
+    """Вывести план загрузки с оценкой времени завершения (--plan) и записать summary."""
+    slot_rate, measured = _slot_throughput(slots)
+    plan = estimate_plan(records, _record_size, slots, slot_rate, delay)
+    started = datetime.now()
+    click.echo(
+        f"Скорость слота: {format_size(slot_rate)}/с "
+        f"({'по прошлым загрузкам' if measured else 'оценка по умолчанию, измерений ещё нет'}), слотов: {slots}"
+    )
+    for position, entry in enumerate(plan, 1):
+        record = entry.item
+        finish_at = started.timestamp() + entry.finish
+        click.echo(
+            f"{position:>4}. ID {record.id:<6} {format_size(_record_size(record)):>10}  слот {entry.slot}  "
+            f"готово ~{datetime.fromtimestamp(finish_at).strftime('%d.%m %H:%M')}  {Path(record.file_path).name}"
+        )
+    total_bytes = sum(_record_size(r) for r in records)
+    estimated = max((entry.finish for entry in plan), default=0.0)
+    click.echo(
+        f"Итого: {len(records)} видео, {format_size(total_bytes)}; оценка: {estimated / 3600:.1f} ч, "
+        f"завершение ~{datetime.fromtimestamp(started.timestamp() + estimated).strftime('%d.%m %H:%M')}"
+    )
+    if deferred:
+        click.echo(f"Отложено до следующего запуска: {deferred}")
+    write_summary(command, EXIT_SUCCESS, {
+        "plan": True,
+        "total": len(records),
+        "deferred": deferred,
+        "oversize": oversize,
+        "bytes": total_bytes,
+        "estimated_sec": round(estimated, 1),
+        "slot_throughput_bytes_per_sec": int(slot_rate),
+        "throughput_measured": measured,
+    }, [], [])
+
+
+def _apply_upload_budget(
+    records: list[VideoRecord], max_bytes: Optional[int], max_files: Optional[int]
+) -> tuple[list[VideoRecord], int, int]:
+    """Записи в пределах бюджета запуска (по порядку, до первой не помещающейся), число отложенных и больших.
+
+    Записи с пометкой skip в бюджет не входят и остаются в списке. Файл больше --max-bytes
+    не поместится ни в один запуск: такие записи пропускаются (не загружаются и не задерживают
+    следующие) и считаются отдельно.
+    """
+    if max_bytes is None and max_files is None:
+        return records, 0, 0
+    selected: list[VideoRecord] = []
+    oversize: list[VideoRecord] = []
+    used_bytes = 0
+    files = 0
+    deferred = 0
+    for record in records:
+        if getattr(record, "skip_upload", False):
+            if not deferred:
+                selected.append(record)
+            continue
+        size = _record_size(record)
+        if max_bytes is not None and size > max_bytes:
+            oversize.append(record)
+        elif (
+            deferred
+            or (max_files is not None and files >= max_files)
+            or (max_bytes is not None and used_bytes + size > max_bytes)
+        ):
+            deferred += 1
+        else:
+            selected.append(record)
+            used_bytes += size
+            files += 1
+    if deferred:
+        click.echo(f"Бюджет запуска: {files} файлов, {format_size(used_bytes)}; отложено до следующего запуска: {deferred}")
+    if oversize:
+        click.echo(
+            f"Больше бюджета --max-bytes {format_size(max_bytes)} (не загружаются, увеличьте бюджет): {len(oversize)} — "
+            + ", ".join(f"ID {r.id} ({format_size(_record_size(r))})" for r in oversize[:10])
+            + (" ..." if len(oversize) > 10 else "")
+        )
+    return selected, deferred, len(oversize)
+
+
+def _upload_transfer_stats(command: str, concurrency: int = 1) -> dict:
+    """Отправлено байт и достигнутая скорость загрузки за процесс (для вывода и last_summary.json).
+
+    Итог сохраняется в upload_runs — по нему --plan оценивает скорость следующих запусков.
+    Вызывается после _upload_batch / _upload_batch_concurrent: профиль VK_UPLOAD_BANDWIDTH
+    к этому моменту проверен (get_upload_shaper закэширован).
+    """
+    stats = get_upload_shaper().stats()
+    if stats["bytes_sent"]:
+        click.echo(
+            f"Отправлено: {format_size(stats['bytes_sent'])} за {stats['transfer_sec']} сек "
+            f"({format_size(stats['throughput_bytes_per_sec'])}/с)"
+        )
+        UploadRuns().record(command, stats["bytes_sent"], stats["transfer_sec"], concurrency)
+    return stats
+
+
 @cli.command()
 @click.argument("video_id", type=int)
 @click.option("--delay", "-d", type=float, default=DEFAULT_UPLOAD_DELAY, help="Задержка между загрузками (сек); по умолчанию с учётом лимитов VK API")
@@ -561,7 +766,7 @@ def upload_next(channel: Optional[str], source: Optional[str], delay: float, max
     except FatalUploadError as e:
         write_summary("upload-next", EXIT_FATAL, {}, [], [e.message])
         sys.exit(EXIT_FATAL)
-    write_summary("upload-next", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": 1, "successful": successful, "failed": failed, "skipped": skipped}, [], [])
+    write_summary("upload-next", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": 1, "successful": successful, "failed": failed, "skipped": skipped, **_upload_transfer_stats("upload-next")}, [], [])
     if failed:
         sys.exit(EXIT_PARTIAL)
 
@@ -590,7 +795,7 @@ def upload_range(start_id: int, count: Optional[int], channel: Optional[str], so
     except FatalUploadError as e:
         write_summary("upload-range", EXIT_FATAL, {}, [], [e.message])
         sys.exit(EXIT_FATAL)
-    write_summary("upload-range", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": len(records), "successful": successful, "failed": failed, "skipped": skipped}, [], [])
+    write_summary("upload-range", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": len(records), "successful": successful, "failed": failed, "skipped": skipped, **_upload_transfer_stats("upload-range")}, [], [])
     if failed:
         sys.exit(EXIT_PARTIAL)
 
@@ -601,8 +806,14 @@ def upload_range(start_id: int, count: Optional[int], channel: Optional[str], so
 @click.option("--source", "-s", help="Фильтр по папке источника")
 @click.option("--delay", "-d", type=float, default=DEFAULT_UPLOAD_DELAY, help="Задержка между загрузками (сек); по умолчанию с учётом лимитов VK API")
 @click.option("--max-retries", "-r", type=int, default=3, help="Максимальное количество повторных попыток")
+@click.option("--max-bytes", callback=_size_option, help="Бюджет запуска по объёму файлов (50G, 500M); остальные видео — в следующий запуск")
+@click.option("--order", type=click.Choice(SCHEDULE_ORDERS), default=ORDER_ID, show_default=True,
+              help="Порядок загрузки: по id, сначала маленькие, сначала большие, balanced (по слотам)")
+@click.option("--window", "window_sec", callback=_duration_option, help="Окно загрузки (8h, 90m): загрузить только то, что успеет")
+@click.option("--plan", is_flag=True, help="Показать план и оценку времени завершения без загрузки")
 def upload_many(count: Optional[int], channel: Optional[str], source: Optional[str], 
-                delay: float, max_retries: int):
+                delay: float, max_retries: int, max_bytes: Optional[int], order: str,
+                window_sec: Optional[float], plan: bool):
     """Загрузить несколько не загруженных видео."""
     storage = get_storage()
     all_records = storage.get_all_unuploaded(channel=channel, source_folder=source)
@@ -613,6 +824,16 @@ def upload_many(count: Optional[int], channel: Optional[str], source: Optional[s
         return
 
     records = all_records[:count] if count else all_records
+    try:
+        records, deferred = _schedule_upload(records, order, window_sec, 1, delay)
+        records, over_budget, oversize = _apply_upload_budget(records, max_bytes, None)
+        deferred += over_budget
+        if plan:
+            _echo_upload_plan("upload-many", records, 1, delay, deferred, oversize)
+            return
+    except FatalUploadError as e:
+        write_summary("upload-many", EXIT_FATAL, {}, [], [e.message])
+        sys.exit(EXIT_FATAL)
 
     click.echo(f"Будет загружено видео: {len(records)}")
     try:
@@ -620,7 +841,11 @@ def upload_many(count: Optional[int], channel: Optional[str], source: Optional[s
     except FatalUploadError as e:
         write_summary("upload-many", EXIT_FATAL, {}, [], [e.message])
         sys.exit(EXIT_FATAL)
-    write_summary("upload-many", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": len(records), "successful": successful, "failed": failed, "skipped": skipped}, [], [])
+    stats = {
+        "total": len(records), "successful": successful, "failed": failed, "skipped": skipped,
+        "deferred": deferred, "oversize": oversize,
+    }
+    write_summary("upload-many", EXIT_PARTIAL if failed else EXIT_SUCCESS, {**stats, **_upload_transfer_stats("upload-many")}, [], [])
     if failed:
         sys.exit(EXIT_PARTIAL)
 
@@ -630,7 +855,16 @@ def upload_many(count: Optional[int], channel: Optional[str], source: Optional[s
 @click.option("--source", "-s", help="Фильтр по папке источника")
 @click.option("--delay", "-d", type=float, default=DEFAULT_UPLOAD_DELAY, help="Задержка между загрузками (сек); по умолчанию с учётом лимитов VK API")
 @click.option("--max-retries", "-r", type=int, default=3, help="Максимальное количество повторных попыток")
-def upload_all(channel: Optional[str], source: Optional[str], delay: float, max_retries: int):
+@click.option("--concurrency", "-j", type=int, default=1, show_default=True,
+              help="Одновременных загрузок; при N > 1 --delay — интервал между стартами загрузок")
+@click.option("--max-bytes", callback=_size_option, help="Бюджет запуска по объёму файлов (50G, 500M); остальные видео — в следующий запуск")
+@click.option("--max-files", type=click.IntRange(min=1), default=None, help="Бюджет запуска по числу файлов")
+@click.option("--order", type=click.Choice(SCHEDULE_ORDERS), default=ORDER_ID, show_default=True,
+              help="Порядок загрузки: по id, сначала маленькие, сначала большие, balanced (по слотам)")
+@click.option("--window", "window_sec", callback=_duration_option, help="Окно загрузки (8h, 90m): загрузить только то, что успеет")
+@click.option("--plan", is_flag=True, help="Показать план и оценку времени завершения без загрузки")
+def upload_all(channel: Optional[str], source: Optional[str], delay: float, max_retries: int, concurrency: int,
+               max_bytes: Optional[int], max_files: Optional[int], order: str, window_sec: Optional[float], plan: bool):
     """Загрузить все не загруженные видео с самого начала."""
     storage = get_storage()
     records = storage.get_all_unuploaded(channel=channel, source_folder=source)
@@ -640,57 +874,157 @@ def upload_all(channel: Optional[str], source: Optional[str], delay: float, max_
         write_summary("upload-all", EXIT_SUCCESS, {"total": 0, "successful": 0, "failed": 0, "skipped": 0}, [], [])
         return
 
+    if concurrency < 1:
+        raise click.BadParameter("--concurrency должно быть >= 1")
+    try:
+        records, deferred = _schedule_upload(records, order, window_sec, concurrency, delay)
+        records, over_budget, oversize = _apply_upload_budget(records, max_bytes, max_files)
+        deferred += over_budget
+        if plan:
+            _echo_upload_plan("upload-all", records, concurrency, delay, deferred, oversize)
+            return
+    except FatalUploadError as e:
+        write_summary("upload-all", EXIT_FATAL, {}, [], [e.message])
+        sys.exit(EXIT_FATAL)
     click.echo(f"Будет загружено видео: {len(records)}")
     try:
-        successful, failed, skipped = _upload_batch(records, storage, delay, max_retries)
+        # Разные назначения VK (VK_DESTINATIONS) загружаются параллельными полосами и при --concurrency 1
+        if concurrency > 1 or len(_split_by_destination(records)) > 1:
+            successful, failed, skipped, cancelled = _upload_batch_concurrent(records, storage, delay, max_retries, concurrency)
+        else:
+            successful, failed, skipped = _upload_batch(records, storage, delay, max_retries)
+            cancelled = False
     except FatalUploadError as e:
         write_summary("upload-all", EXIT_FATAL, {}, [], [e.message])
         sys.exit(EXIT_FATAL)
-    write_summary("upload-all", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": len(records), "successful": successful, "failed": failed, "skipped": skipped}, [], [])
+    counts = {
+        "total": len(records), "successful": successful, "failed": failed, "skipped": skipped, "deferred": deferred,
+        "oversize": oversize, **_upload_transfer_stats("upload-all", concurrency),
+    }
+    if cancelled:
+        write_summary("upload-all", EXIT_INTERRUPTED, counts, [], ["Прервано пользователем (Ctrl+C)"])
+        sys.exit(EXIT_INTERRUPTED)
+    write_summary("upload-all", EXIT_PARTIAL if failed else EXIT_SUCCESS, counts, [], [])
     if failed:
         sys.exit(EXIT_PARTIAL)
 
 
+def _title_generator_name_for_channel(channel: Optional[str]) -> str:
+    """Имя генератора заголовков в фабрике по каналу (маппинг из config.registry, иначе simple)."""
+    return title_generator_name(channel)
+
+
+@functools.lru_cache(maxsize=None)
 def _get_title_generator_for_channel(channel: Optional[str]):
-    """Генератор заголовков по каналу (маппинг из config.registry)."""
-    name = CHANNEL_TO_TITLE_GENERATOR.get((channel or "").strip()) if channel else None
-    return TitleGeneratorFactory.create(name) if name else TitleGeneratorFactory.create("simple")
+    """Генератор заголовков по каналу (маппинг из config.registry); один экземпляр на канал."""
+    return TitleGeneratorFactory.create(_title_generator_name_for_channel(channel))
+
+
+def _iter_stale_title_batches(storage: VideoStorage, channel: Optional[str], force: bool, batch_size: int):
+    """Пакеты устаревших записей по генераторам: (имя в фабрике, генератор, записи), записи по возрастанию id."""
+    channels = [channel] if channel else storage.get_distinct_channels()
+    groups: dict = {}
+    for ch in channels:
+        groups.setdefault(_title_generator_name_for_channel(ch), []).append(ch)
+    for factory_name, group_channels in groups.items():
+        gen = _get_title_generator_for_channel(group_channels[0])
+        after_id = 0
+        while True:
+            records = storage.get_stale_titles(
+                group_channels, gen.get_name(), gen.get_version(),
+                force=force, after_id=after_id, limit=batch_size,
+            )
+            if not records:
+                break
+            yield factory_name, gen, records
+            after_id = records[-1].id
+            if len(records) < batch_size:
+                break
+
+
+def _write_titles_diff(path: Path, rows: list) -> None:
+    """Сохранить изменения заголовков: .jsonl — JSON Lines, иначе CSV (id, channel, old_title, new_title)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = sorted(rows, key=lambda r: r["id"])
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".jsonl":
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=["id", "channel", "old_title", "new_title"])
+            writer.writeheader()
+            writer.writerows(rows)
 
 
 @cli.command("recalc-titles")
 @click.option("--channel", "-c", help="Пересчитать только для канала (например Excel, Комлев, Аналитика данных)")
-def recalc_titles(channel: Optional[str]):
-    """Пересчитать заголовки по правилам курса и обновить БД."""
+@click.option("--force", is_flag=True, help="Пересчитать все записи, игнорируя мемоизацию (версия генератора и хеш описания)")
+@click.option("--jobs", "-j", type=int, default=1, show_default=True, help="Число процессов для генерации заголовков")
+@click.option("--batch-size", type=int, default=2000, show_default=True, help="Записей в пакете (выборка по id и одна транзакция записи)")
+@click.option("--diff-out", type=click.Path(dir_okay=False), default=None,
+              help="Сохранить изменения заголовков (.csv или .jsonl): id, channel, old_title, new_title")
+def recalc_titles(channel: Optional[str], force: bool, jobs: int, batch_size: int, diff_out: Optional[str]):
+    """Пересчитать заголовки по правилам курса и обновить БД.
+
+    Пересчитываются только записи, у которых изменилось описание или версия
+    правил генератора канала. Записи выбираются пакетами по id; с --jobs N
+    пакеты считаются в N процессах, каждый результат пишется одной транзакцией.
+    """
+    if jobs < 1 or batch_size < 1:
+        raise click.BadParameter("--jobs и --batch-size должны быть >= 1")
     storage = get_storage()
-    records = storage.get_videos_range(0, 500000, channel=channel)
-    if not records:
+    processed = updated = skipped = 0
+    diff_rows = []
+
+    def apply(gen, records, titles) -> None:
+        nonlocal updated
+        updates = []
+        for rec, new_title in zip(records, titles):
+            old_title = rec.title or ""
+            if new_title != old_title:
+                updated += 1
+                diff_rows.append({"id": rec.id, "channel": rec.channel, "old_title": old_title, "new_title": new_title})
+            # Пишем и неизменившиеся заголовки: у них обновляются версия генератора и хеш описания
+            updates.append((rec.id, new_title, gen.get_name(), gen.get_version(), rec.description))
+        storage.update_titles_bulk(updates)
+
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    pending: dict = {}
+    try:
+        for factory_name, gen, records in _iter_stale_title_batches(storage, channel, force, batch_size):
+            with_path = [rec for rec in records if rec.file_path]
+            processed += len(records)
+            skipped += len(records) - len(with_path)
+            # Без пути заголовок не считается, но версия генератора пишется: иначе запись выбиралась бы каждым запуском
+            storage.update_titles_bulk([
+                (rec.id, rec.title or "", gen.get_name(), gen.get_version(), rec.description)
+                for rec in records if not rec.file_path
+            ])
+            items = [(rec.description, PurePath(rec.file_path).stem, rec.date, rec.channel) for rec in with_path]
+            if executor is None:
+                apply(gen, with_path, gen.generate_batch(items))
+                continue
+            pending[executor.submit(generate_titles_by_name, factory_name, items)] = (gen, with_path)
+            # Не держим в памяти больше 2 пакетов на процесс
+            if len(pending) >= jobs * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    apply(*pending.pop(future), future.result())
+        for future in as_completed(list(pending)):
+            apply(*pending.pop(future), future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if diff_out:
+        _write_titles_diff(Path(diff_out), diff_rows)
+    if not processed:
         click.echo("Нет записей для пересчёта.")
-        write_summary("recalc-titles", EXIT_SUCCESS, {"processed": 0, "updated": 0, "skipped": 0}, [], [])
-        return
-    updated = 0
-    skipped = 0
-    for rec in records:
-        gen = _get_title_generator_for_channel(rec.channel)
-        if not gen:
-            continue
-        try:
-            v = VideoData(
-                file_path=Path(rec.file_path),
-                title=rec.title or "",
-                description=rec.description or "",
-                date=rec.date,
-                channel=rec.channel,
-            )
-        except ValueError:
-            skipped += 1
-            continue
-        new_title = gen.generate(v)
-        if new_title != (rec.title or ""):
-            rec.title = new_title
-            storage.add_video(rec)
-            updated += 1
-    click.echo(f"Обработано: {len(records)}, обновлено заголовков: {updated}, пропущено (файл не найден): {skipped}")
-    write_summary("recalc-titles", EXIT_SUCCESS, {"processed": len(records), "updated": updated, "skipped": skipped}, [], [])
+    else:
+        click.echo(f"Обработано: {processed}, обновлено заголовков: {updated}, пропущено (нет пути к файлу): {skipped}")
+    if diff_out:
+        click.echo(f"Изменения заголовков: {diff_out}")
+    write_summary("recalc-titles", EXIT_SUCCESS, {"processed": processed, "updated": updated, "skipped": skipped}, [], [])
 
 
 @cli.command("update-vk-titles")
@@ -732,28 +1066,168 @@ def update_vk_titles(ids_file: str, delay: float):
         click.echo(f"Ошибка инициализации VK API: {e.message}", err=True)
         write_summary("update-vk-titles", EXIT_FATAL, {}, [], [e.message])
         sys.exit(EXIT_FATAL)
-    click.echo(f"Будет обновлено заголовков в VK: {len(uploaded)} (пауза {delay} сек)")
-    ok = 0
+    candidates = []
     for i, rec in enumerate(uploaded, 1):
         parsed = VKPublisher.parse_video_url(rec.video_url or "")
         if not parsed:
             click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: не удалось разобрать URL {rec.video_url!r}")
             continue
-        owner_id, video_id = parsed
-        if publisher.edit_video_title(owner_id, video_id, rec.title or ""):
-            ok += 1
-            click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: OK — { (rec.title or '')[:50]}...")
+        candidates.append((i, rec, parsed))
+
+    # Текущие названия в VK (video.get по 200 за запрос): правим только отличающиеся
+    try:
+        remote = publisher.get_videos([parsed for _, _, parsed in candidates])
+    except VKPublisherError as e:
+        click.echo(f"Ошибка получения метаданных видео из VK: {e}", err=True)
+        write_summary("update-vk-titles", EXIT_FATAL, {}, [], [str(e)])
+        sys.exit(EXIT_FATAL)
+    edits = []
+    unchanged = 0
+    missing = 0
+    for i, rec, parsed in candidates:
+        video = remote.get(parsed)
+        if video is None:
+            missing += 1
+            click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: видео не найдено в VK ({rec.video_url})")
+        elif html.unescape(video.get("title") or "").strip() == (rec.title or "")[:VIDEO_TITLE_MAX_LENGTH].strip():
+            unchanged += 1
         else:
-            click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: ошибка")
-        if i < len(uploaded):
+            edits.append((i, rec, parsed))
+    click.echo(
+        f"Заголовков к обновлению в VK: {len(edits)} из {len(uploaded)} (совпадают: {unchanged}, нет в VK: {missing}); "
+        f"video.edit пачками по {EXECUTE_BATCH_SIZE}, пауза между пачками {delay} сек"
+    )
+    ok = 0
+    for start in range(0, len(edits), EXECUTE_BATCH_SIZE):
+        chunk = edits[start:start + EXECUTE_BATCH_SIZE]
+        results = publisher.edit_titles_batch([(oid, vid, rec.title or "") for _, rec, (oid, vid) in chunk])
+        for (i, rec, _), edited in zip(chunk, results):
+            if edited:
+                ok += 1
+                click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: OK — { (rec.title or '')[:50]}...")
+            else:
+                click.echo(f"  [{i}/{len(uploaded)}] ID {rec.id}: ошибка")
+        if start + EXECUTE_BATCH_SIZE < len(edits):
             time.sleep(delay)
-    failed = len(uploaded) - ok
-    click.echo(f"Готово: обновлено {ok} из {len(uploaded)}.")
-    write_summary("update-vk-titles", EXIT_PARTIAL if failed else EXIT_SUCCESS, {"total": len(uploaded), "updated": ok, "failed": failed}, [], [])
+    failed = len(uploaded) - ok - unchanged - missing
+    click.echo(f"Готово: обновлено {ok}, без изменений {unchanged}, нет в VK {missing}, ошибок {failed} (всего {len(uploaded)}).")
+    stats = {"total": len(uploaded), "updated": ok, "unchanged": unchanged, "missing": missing, "failed": failed}
+    write_summary("update-vk-titles", EXIT_PARTIAL if failed else EXIT_SUCCESS, stats, [], [])
     if failed:
         sys.exit(EXIT_PARTIAL)
 
 
+@cli.command("vk-sync")
+@click.option("--full", is_flag=True, help="Перечитать все видео группы и удалить из зеркала отсутствующие в VK")
+@click.option("--channel", "-c", help="Группа и токен назначения канала (VK_DESTINATIONS); по умолчанию VK_GROUP_ID")
+def vk_sync(full: bool, channel: Optional[str]):
+    """Синхронизировать локальное зеркало видео группы VK (таблица remote_videos) через video.get.
+
+    По умолчанию инкрементально: страницы от новых видео к старым, пока не встретится уже
+    известная дата. --full перечитывает всё (изменённые названия, удалённые в VK видео).
+    """
+    try:
+        publisher = get_vk_publisher(
+            0, 3, group_id_required=True, on_token_expired=_refresh_vk_token_callback, channel=channel
+        )
+    except FatalUploadError as e:
+        click.echo(f"ОШИБКА: {e.message}", err=True)
+        write_summary("vk-sync", EXIT_FATAL, {}, [], [e.message])
+        sys.exit(EXIT_FATAL)
+    get_storage()  # таблица videos нужна для запросов сверки
+    catalog = RemoteCatalog(Path("videos.db"))
+    owner_id = -publisher.group_id
+    known_until = None if full else catalog.last_date(owner_id)
+    started = datetime.now(timezone.utc).isoformat()
+    added = updated = offset = 0
+    total = None
+    try:
+        while True:
+            page = publisher.list_group_videos(offset=offset)
+            items = page.get("items", [])
+            total = page.get("count", 0)
+            if not items:
+                break
+            page_added, page_known = catalog.upsert(items)
+            added += page_added
+            updated += page_known
+            offset += len(items)
+            click.echo(f"  {offset}/{total}: новых {page_added}, уже были {page_known}")
+            if offset >= total:
+                break
+            # Инкрементально: дальше идут видео не новее уже известных
+            oldest = min((item.get("date") or 0) for item in items)
+            if known_until and datetime.fromtimestamp(oldest, timezone.utc).isoformat() <= known_until:
+                break
+    except VKPublisherError as e:
+        click.echo(f"Ошибка video.get: {e}", err=True)
+        write_summary("vk-sync", EXIT_FATAL, {"added": added, "updated": updated}, [], [str(e)])
+        sys.exit(EXIT_FATAL)
+    removed = catalog.prune(owner_id, started) if full else 0
+    mirrored = catalog.count(owner_id)
+    click.echo(
+        f"Зеркало группы {publisher.group_id}: видео {mirrored} (в VK {total}); "
+        f"добавлено {added}, обновлено {updated}" + (f", удалено {removed}" if full else "")
+    )
+    _echo_vk_audit_counts(catalog, owner_id)
+    write_summary("vk-sync", EXIT_SUCCESS, {
+        "full": full, "remote_total": total, "mirrored": mirrored,
+        "added": added, "updated": updated, "removed": removed,
+    }, [], [])
+
+
+def _echo_vk_audit_counts(catalog: RemoteCatalog, owner_id: int) -> None:
+    """Вывести счётчики сверки зеркала с таблицей videos."""
+    counts = {
+        "missing_remotely": len(catalog.missing_remotely(owner_id)),
+        "orphaned_remotely": len(catalog.orphaned_remotely(owner_id)),
+        "duplicated_titles": len(catalog.duplicated_titles(owner_id)),
+    }
+    click.echo(
+        f"Сверка: нет в VK — {counts['missing_remotely']}, нет в БД — {counts['orphaned_remotely']}, "
+        f"повторяющихся названий — {counts['duplicated_titles']} (подробно: vk-audit)"
+    )
+
+
+@cli.command("vk-audit")
+@click.option("--limit", "-n", type=int, default=50, help="Сколько строк показывать в каждом разделе")
+@click.option("--channel", "-c", help="Группа назначения канала (VK_DESTINATIONS); по умолчанию VK_GROUP_ID")
+def vk_audit(limit: int, channel: Optional[str]):
+    """Сверка БД с зеркалом VK (после vk-sync), без запросов к API: нет в VK, нет в БД, повторы названий."""
+    try:
+        group_id_env = resolve_vk_destination(channel).group_id_env
+    except ValueError as e:
+        click.echo(f"ОШИБКА: {e}", err=True)
+        write_summary("vk-audit", EXIT_FATAL, {}, [], [str(e)])
+        sys.exit(EXIT_FATAL)
+    group_id_str = get_env_var(group_id_env)
+    try:
+        owner_id = -int(group_id_str or "")
+    except ValueError:
+        click.echo(f"Неверный или отсутствующий {group_id_env}: {group_id_str!r}", err=True)
+        write_summary("vk-audit", EXIT_FATAL, {}, [], [group_id_env])
+        sys.exit(EXIT_FATAL)
+    get_storage()
+    catalog = RemoteCatalog(Path("videos.db"))
+    if not catalog.count(owner_id):
+        click.echo("Зеркало пусто. Запустите: python main.py vk-sync" + (f" --channel {channel}" if channel else ""))
+    missing = catalog.missing_remotely(owner_id)
+    click.echo(f"\nЗаписи с video_url, которых нет в VK: {len(missing)}")
+    for video_id, title, url in missing[:limit]:
+        click.echo(f"  ID {video_id}: {url} — {(title or '')[:60]}")
+    orphaned = catalog.orphaned_remotely(owner_id)
+    click.echo(f"\nВидео в VK без записи в БД: {len(orphaned)}")
+    for video in orphaned[:limit]:
+        click.echo(f"  {video.video_url} — {video.title[:60]}")
+    duplicated = catalog.duplicated_titles(owner_id)
+    click.echo(f"\nПовторяющиеся названия в VK: {len(duplicated)}")
+    for title, videos in duplicated[:limit]:
+        click.echo(f"  {title[:60]!r}: " + ", ".join(v.video_url for v in videos))
+    write_summary("vk-audit", EXIT_SUCCESS, {
+        "missing_remotely": len(missing), "orphaned_remotely": len(orphaned), "duplicated_titles": len(duplicated),
+    }, [], [])
+
+
 @cli.command("vk-preflight")
 def vk_preflight():
     """Проверить, что токен и группа позволяют вызывать video API (перед batch upload). При 1051 — выход с ошибкой."""
@@ -772,18 +1246,202 @@ def vk_preflight():
     click.echo("VK video preflight OK.")
 
 
+@cli.command("content-hub-flush")
+@click.option("--batch-size", type=click.IntRange(min=1), default=OUTBOX_BATCH_SIZE, show_default=True,
+              help="Событий outbox за одну выборку")
+@click.option("--force", is_flag=True, help="Отправить и отложенные после ошибки события, не дожидаясь паузы")
+def content_hub_flush(batch_size: int, force: bool):
+    """Отправить накопленные события outbox canonical write в Content Hub (одно соединение на весь запуск)."""
+    config = get_settings().content_hub
+    outbox = ContentHubOutbox(Path("videos.db"))
+    if not config.pg_dsn:
+        click.echo("CONTENT_HUB_PG_DSN не задан", err=True)
+        write_summary("content-hub-flush", EXIT_FATAL, outbox.stats(), [], ["CONTENT_HUB_PG_DSN не задан"])
+        sys.exit(EXIT_FATAL)
+    flusher = get_flusher(outbox)
+    if flusher is None:
+        click.echo("content_hub_client недоступен: добавьте корень ContentBackbone в PYTHONPATH", err=True)
+        write_summary("content-hub-flush", EXIT_FATAL, outbox.stats(), [], ["content_hub_client недоступен"])
+        sys.exit(EXIT_FATAL)
+    flusher.batch_size = batch_size
+    counts = flusher.flush(ignore_backoff=force)
+    left = outbox.stats()
+    stats = {**counts, **left, "dry_run": config.write_dry_run}
+    click.echo(
+        f"Content Hub: записано {counts['written']}, ошибок {counts['failed']}, "
+        f"в outbox осталось {left['pending']} (отложено после ошибки: {left['retrying']})"
+    )
+    if counts["failed"]:
+        write_summary("content-hub-flush", EXIT_PARTIAL, stats, [], [f"Не отправлено событий: {counts['failed']}"])
+        sys.exit(EXIT_PARTIAL)
+    write_summary("content-hub-flush", EXIT_SUCCESS, stats, [], [])
+
+
+@cli.command("content-hub-backfill")
+@click.option("--batch-size", type=click.IntRange(min=1), default=BACKFILL_BATCH_SIZE, show_default=True,
+              help="Записей videos в одной пачке")
+@click.option("--dry-run", is_flag=True, help="Только посчитать, что будет записано (без Content Hub и checkpoint)")
+@click.option("--reset", is_flag=True, help="Начать сначала, а не с checkpoint прошлого запуска")
+def content_hub_backfill(batch_size: int, dry_run: bool, reset: bool):
+    """Записать в Content Hub publication и link_map уже загруженных записей (пачками, с checkpoint)."""
+    config = get_settings().content_hub
+    storage = get_storage()
+    checkpoint = BackfillCheckpoint(Path("videos.db"))
+    if reset and not dry_run:
+        checkpoint.reset(BACKFILL_DESTINATION)
+    client = None
+    if not dry_run:
+        if not content_hub_client_available():
+            click.echo("content_hub_client недоступен: добавьте корень ContentBackbone в PYTHONPATH", err=True)
+            write_summary("content-hub-backfill", EXIT_FATAL, {}, [], ["content_hub_client недоступен"])
+            sys.exit(EXIT_FATAL)
+        if not config.pg_dsn:
+            click.echo("CONTENT_HUB_PG_DSN не задан", err=True)
+            write_summary("content-hub-backfill", EXIT_FATAL, {}, [], ["CONTENT_HUB_PG_DSN не задан"])
+            sys.exit(EXIT_FATAL)
+        client = create_content_hub_client(config.pg_dsn, dry_run=config.write_dry_run)
+
+    def on_batch(stats: dict) -> None:
+        click.echo(f"  пачка {stats['batches']}: записей {stats['records']}, до id {stats['last_id']}")
+
+    resumed_from = 0 if reset else checkpoint.last_id(BACKFILL_DESTINATION)
+    if resumed_from:
+        click.echo(f"Продолжение с id > {resumed_from} (сначала: --reset)")
+    try:
+        stats = run_backfill(
+            storage,
+            checkpoint,
+            client=client,
+            batch_size=batch_size,
+            # Клиент в dry-run не коммитит: checkpoint не сдвигаем, иначе записи будут пропущены
+            save_checkpoint=not config.write_dry_run,
+            on_batch=on_batch,
+            after_id=resumed_from,
+        )
+    finally:
+        close = getattr(client, "close", None)
+        if close is not None:
+            close()
+    error = stats.pop("error")
+    stats["dry_run"] = dry_run or config.write_dry_run
+    verb = "Будет записано" if dry_run else "Записано"
+    click.echo(
+        f"{verb}: publication {stats['publications']}, link_map {stats['link_maps']} "
+        f"(записей {stats['records']}, пачек {stats['batches']}, без remote_id {stats['without_remote_id']})"
+    )
+    if error is not None:
+        click.echo(f"✗ Backfill остановлен после id {stats['last_id']}: {error}", err=True)
+        write_summary("content-hub-backfill", EXIT_PARTIAL, stats, [], [error])
+        sys.exit(EXIT_PARTIAL)
+    write_summary("content-hub-backfill", EXIT_SUCCESS, stats, [], [])
+
+
+def _echo_file_changed(record: VideoRecord, result: PublicationResult) -> None:
+    """Предупредить, что загруженный файл изменён после scan (режим сверки хеша flag)."""
+    if result.error_code == ERROR_FILE_CHANGED:
+        click.echo(f"⚠ ID {record.id}: хеш отправленного файла не совпал с file_hash (файл изменён после scan)", err=True)
+
+
+def _reconcile_upload_intents(
+    records: list[VideoRecord], storage: VideoStorage, publisher: VKPublisher, intents: UploadIntents
+) -> set[int]:
+    """Найти видео, отправленные прерванным запуском до mark_uploaded, и записать их URL.
+
+    Для записей с намерением загрузки sent (файл отправлен, результат не записан) видео,
+    созданное video.save (id сохранён в намерении), запрашивается через video.get. Если файл
+    в нём есть (ненулевая длительность или идёт обработка), оно записывается в videos
+    (mark_uploaded) без повторной отправки файла; иначе пустое видео удаляется и запись
+    загружается заново. Намерения без id (записанные до его сохранения) сверяются с видео
+    группы новее намерения по названию и хешу описания. Видео, URL которого уже принадлежит
+    другой записи, не используется.
+
+    Returns:
+        id записей, отмеченных загруженными.
+    """
+    pending = intents.pending([
+        record.id for record in records if record.id is not None and not getattr(record, "skip_upload", False)
+    ])
+    if not pending:
+        return set()
+    records_by_id = {record.id: record for record in records}
+    click.echo(f"Незавершённых загрузок прошлых запусков: {len(pending)}, поиск уже загруженных видео в группе...")
+    resolved: set[int] = set()
+
+    def resolve(intent: UploadIntent, owner_id: int, video_id: int) -> bool:
+        video_url = remote_video_url(owner_id, video_id)
+        if storage.get_record_by_video_url(video_url):
+            return False
+        storage.mark_uploaded(intent.video_id, video_url, post_url=None)
+        intents.clear(intent.video_id)
+        resolved.add(intent.video_id)
+        write_canonical_if_enabled(
+            records_by_id[intent.video_id],
+            PublicationResult(destination="vk", ok=True, remote_url=video_url),
+        )
+        click.echo(f"✓ ID {intent.video_id}: уже загружено прошлым запуском, повторная отправка пропущена: {video_url}")
+        return True
+
+    saved = [intent for intent in pending if intent.remote_video_id is not None]
+    try:
+        found = publisher.get_videos([(intent.owner_id, intent.remote_video_id) for intent in saved]) if saved else {}
+    except VKPublisherError as e:
+        click.echo(f"⚠ Не удалось проверить видео прошлых запусков ({e}), незавершённые загрузки будут отправлены заново", err=True)
+        return resolved
+    for intent in saved:
+        video = found.get((intent.owner_id, intent.remote_video_id))
+        if video is not None and VKPublisher.has_content(video):
+            resolve(intent, intent.owner_id, intent.remote_video_id)
+        elif video is not None and publisher.delete_video(intent.owner_id, intent.remote_video_id):
+            click.echo(f"ID {intent.video_id}: видео прошлого запуска без файла удалено, загрузка заново")
+
+    wanted = {
+        (intent.title[:VIDEO_TITLE_MAX_LENGTH].strip(), intent.description_hash): intent
+        for intent in pending if intent.remote_video_id is None
+    }
+    if not wanted:
+        return resolved
+    cutoff = min(intent.created_at for intent in wanted.values()).timestamp() - UPLOAD_INTENT_DATE_MARGIN
+    offset = 0
+    try:
+        while wanted:
+            page = publisher.list_group_videos(offset=offset)
+            videos = page.get("items", [])
+            for video in videos:
+                if (video.get("date") or 0) < cutoff:
+                    continue
+                key = (
+                    html.unescape(video.get("title") or "").strip(),
+                    description_hash(html.unescape(video.get("description") or "")),
+                )
+                intent = wanted.get(key)
+                if intent is not None and resolve(intent, video["owner_id"], video["id"]):
+                    del wanted[key]
+            offset += len(videos)
+            if not videos or offset >= page.get("count", 0) or (videos[-1].get("date") or 0) < cutoff:
+                break
+    except VKPublisherError as e:
+        click.echo(f"⚠ Не удалось проверить видео группы ({e}), незавершённые загрузки будут отправлены заново", err=True)
+    return resolved
+
+
 def _upload_video(record: VideoRecord, storage: VideoStorage, delay: float, max_retries: int) -> tuple[bool, Optional[str]]:
     """Загрузить одно видео через DestinationAdapter. Возвращает (успех, сообщение_об_ошибке или None). При skip_upload загрузка не выполняется — (False, None)."""
     if getattr(record, "skip_upload", False):
         click.echo("Пропуск: запись помечена для пропуска загрузки (skip).")
         return (False, None)
     try:
-        publisher = get_vk_publisher(delay, max_retries, group_id_required=True, on_token_expired=_refresh_vk_token_callback)
+        publisher = get_vk_publisher(
+            delay, max_retries, group_id_required=True, on_token_expired=_refresh_vk_token_callback, channel=record.channel
+        )
     except FatalUploadError as e:
         click.echo(f"ОШИБКА: {e.message}", err=True)
         return (False, e.message)
 
-    adapter = VKDestinationAdapter(publisher)
+    intents = UploadIntents()
+    if record.id in _reconcile_upload_intents([record], storage, publisher, intents):
+        return (True, None)
+
+    adapter = VKDestinationAdapter(publisher, intents=intents, quota=UploadQuota())
     item = ContentItem.from_video_record(
         file_path=record.file_path,
         title=record.title,
@@ -792,6 +1450,7 @@ def _upload_video(record: VideoRecord, storage: VideoStorage, delay: float, max_
         source_folder=record.source_folder,
         date=record.date,
         record_id=record.id,
+        file_hash=record.file_hash,
     )
     result = adapter.publish(item)
 
@@ -799,29 +1458,63 @@ def _upload_video(record: VideoRecord, storage: VideoStorage, delay: float, max_
 
     if result.ok and result.remote_url:
         storage.mark_uploaded(record.id, result.remote_url, post_url=None)
+        intents.clear(record.id)
         click.echo(f"✓ Видео {record.id} успешно загружено: {result.remote_url}")
+        _echo_file_changed(record, result)
         return (True, None)
     storage.mark_uploaded(record.id, "", error=result.error_code or UPLOAD_ERROR_PUBLISH_FAILED)
+    intents.clear(record.id, keep_sent=True)
     click.echo(f"✗ Ошибка загрузки видео {record.id}")
     return (False, result.error_code or UPLOAD_ERROR_PUBLISH_FAILED)
 
 
+def _split_by_destination(records: list[VideoRecord]) -> dict[VkDestination, list[VideoRecord]]:
+    """Записи по назначениям VK (VK_DESTINATIONS) в порядке первого появления; порядок записей сохраняется.
+
+    Raises:
+        FatalUploadError: Неверный формат VK_DESTINATIONS.
+    """
+    by_destination: dict[VkDestination, list[VideoRecord]] = {}
+    by_channel: dict[Optional[str], VkDestination] = {}
+    for record in records:
+        if record.channel not in by_channel:
+            try:
+                by_channel[record.channel] = resolve_vk_destination(record.channel)
+            except ValueError as e:
+                raise FatalUploadError(str(e))
+        by_destination.setdefault(by_channel[record.channel], []).append(record)
+    return by_destination
+
+
 def _upload_batch(records: list[VideoRecord], storage: VideoStorage, delay: float, max_retries: int) -> tuple[int, int, int]:
-    """Загрузить пакет видео через DestinationAdapter. Возвращает (successful, failed, skipped). При ошибке окружения выбрасывает FatalUploadError."""
-    publisher = get_vk_publisher(delay, max_retries, group_id_required=True, on_token_expired=_refresh_vk_token_callback)
-    adapter = VKDestinationAdapter(publisher)
-    successful = 0
+    """Загрузить пакет видео через DestinationAdapter. Возвращает (successful, failed, skipped). При ошибке окружения выбрасывает FatalUploadError.
+
+    Записи разных назначений (VK_DESTINATIONS) загружаются по порядку, каждая — публикатором своего назначения.
+    """
+    get_upload_shaper()  # неверный VK_UPLOAD_BANDWIDTH — FatalUploadError до загрузки, а не в итогах
+    intents = UploadIntents()
+    quota = UploadQuota()
+    adapters: dict[VkDestination, VKDestinationAdapter] = {}
+    destination_of: dict[int, VkDestination] = {}
+    already_uploaded: set[int] = set()
+    for destination, destination_records in _split_by_destination(records).items():
+        publisher = get_vk_publisher(
+            delay, max_retries, group_id_required=True, on_token_expired=_refresh_vk_token_callback,
+            channel=destination_records[0].channel,
+        )
+        publisher.discard_stale_uploads()
+        already_uploaded |= _reconcile_upload_intents(destination_records, storage, publisher, intents)
+        adapters[destination] = VKDestinationAdapter(
+            publisher, prefetch_depth=UPLOAD_PREFETCH_DEPTH, intents=intents, quota=quota
+        )
+        destination_of.update((id(record), destination) for record in destination_records)
+    records = [record for record in records if record.id not in already_uploaded]
+    successful = len(already_uploaded)
     failed = 0
     skipped = 0
 
-    for idx, record in enumerate(records, 1):
-        if getattr(record, "skip_upload", False):
-            click.echo(f"\n[{idx}/{len(records)}] Пропуск ID {record.id} (помечено для пропуска загрузки)")
-            skipped += 1
-            continue
-        click.echo(f"\n[{idx}/{len(records)}] Загрузка видео ID {record.id}: {Path(record.file_path).name}")
-
-        item = ContentItem.from_video_record(
+    items = [
+        None if getattr(record, "skip_upload", False) else ContentItem.from_video_record(
             file_path=record.file_path,
             title=record.title,
             description=record.description or "",
@@ -829,34 +1522,262 @@ def _upload_batch(records: list[VideoRecord], storage: VideoStorage, delay: floa
             source_folder=record.source_folder,
             date=record.date,
             record_id=record.id,
+            file_hash=record.file_hash,
         )
-        result = adapter.publish(item)
+        for record in records
+    ]
+    try:
+        for idx, (record, item) in enumerate(zip(records, items), 1):
+            if item is None:
+                click.echo(f"\n[{idx}/{len(records)}] Пропуск ID {record.id} (помечено для пропуска загрузки)")
+                skipped += 1
+                continue
+            click.echo(f"\n[{idx}/{len(records)}] Загрузка видео ID {record.id}: {Path(record.file_path).name}")
+
+            # upload_url следующих видео того же назначения запрашивается, пока отправляется текущее
+            destination = destination_of[id(record)]
+            adapter = adapters[destination]
+            adapter.prefetch([
+                next_item for next_record, next_item in zip(records[idx:], items[idx:])
+                if next_item is not None and destination_of[id(next_record)] == destination
+            ])
+            result = adapter.publish(item)
+
+            write_canonical_if_enabled(record, result)
+
+            if result.ok and result.remote_url:
+                storage.mark_uploaded(record.id, result.remote_url, post_url=None)
+                successful += 1
+                click.echo(f"✓ Успешно: {result.remote_url}")
+                _echo_file_changed(record, result)
+            else:
+                storage.mark_uploaded(record.id, "", error=result.error_code or UPLOAD_ERROR_PUBLISH_FAILED)
+                failed += 1
+                click.echo(f"✗ Ошибка загрузки")
+            # Файл отправлен, но результат не получен: намерение остаётся для сверки в следующем запуске
+            intents.clear(record.id, keep_sent=not result.ok)
+
+            # Задержка между загрузками (кроме последнего видео)
+            if idx < len(records):
+                click.echo(f"Ожидание {delay} сек перед следующей загрузкой...")
+                time.sleep(delay)
+    finally:
+        for adapter in adapters.values():
+            adapter.close()
+    
+    click.echo("\n" + "=" * 80)
+    click.echo("РЕЗУЛЬТАТЫ")
+    click.echo("=" * 80)
+    click.echo(f"Успешно: {successful}")
+    click.echo(f"Ошибок: {failed}")
+    if skipped:
+        click.echo(f"Пропущено (skip): {skipped}")
+    click.echo(f"Всего: {len(records) + len(already_uploaded)}")
+    return (successful, failed, skipped)
 
-        write_canonical_if_enabled(record, result)
 
+@dataclass
+class _UploadLane:
+    """Полоса загрузки одного назначения VK: свой движок (слоты, публикатор, лимитер токена) и счётчики."""
+    destination: VkDestination
+    engine: UploadEngine
+    items: list[ContentItem]
+    on_result: Callable[[int, ContentItem, PublicationResult], None]
+    on_ordered: Callable[[int, ContentItem, PublicationResult], None]
+    counts: dict
+    completed: bool = True
+    error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self.completed = self.engine.run(self.items, self.on_result, self.on_ordered)
+        except BaseException as e:
+            self.error = e
+            self.engine.cancel()
+            self.completed = False
+
+
+def _make_upload_lane(
+    destination: VkDestination,
+    records: list[VideoRecord],
+    storage: VideoStorage,
+    delay: float,
+    max_retries: int,
+    concurrency: int,
+    intents: UploadIntents,
+    label: str = "",
+) -> _UploadLane:
+    """Подготовить полосу: сверка намерений загрузки, адаптеры слотов, запись результатов.
+
+    Слоты полосы делят один публикатор назначения (VkApi и пул keep-alive соединений).
+
+    Raises:
+        FatalUploadError: Ошибка окружения (нет токена или группы назначения).
+    """
+    channel = records[0].channel
+    quota = UploadQuota()
+    publisher = get_vk_publisher(
+        delay, max_retries, group_id_required=True, on_token_expired=_refresh_vk_token_callback, channel=channel
+    )
+    publisher.reserve_connections(concurrency)
+    publisher.discard_stale_uploads()
+    already_uploaded = _reconcile_upload_intents(records, storage, publisher, intents)
+    to_upload = [r for r in records if r.id not in already_uploaded]
+    total = len(to_upload)
+    counts = {"successful": len(already_uploaded), "failed": 0, "vk_1051": 0}
+
+    def make_adapter() -> VKDestinationAdapter:
+        return VKDestinationAdapter(publisher, intents=intents, quota=quota)
+
+    def on_progress(slot: int, index: int, item: ContentItem, event: str, result) -> None:
+        if event == EVENT_START:
+            record = to_upload[index]
+            click.echo(f"{label}[слот {slot}] [{index + 1}/{total}] Загрузка видео ID {record.id}: {Path(record.file_path).name}")
+
+    def on_ordered(index: int, item: ContentItem, result) -> None:
+        record = to_upload[index]
+        if result.ok:
+            click.echo(f"{label}[{index + 1}/{total}] ✓ ID {record.id}: {result.remote_url}")
+            _echo_file_changed(record, result)
+        else:
+            click.echo(f"{label}[{index + 1}/{total}] ✗ ID {record.id}: {result.error_code}")
+
+    engine = UploadEngine(make_adapter, concurrency=concurrency, delay=delay, on_progress=on_progress)
+
+    def on_result(index: int, item: ContentItem, result) -> None:
+        record = to_upload[index]
+        write_canonical_if_enabled(record, result)
         if result.ok and result.remote_url:
             storage.mark_uploaded(record.id, result.remote_url, post_url=None)
-            successful += 1
-            click.echo(f"✓ Успешно: {result.remote_url}")
+            counts["successful"] += 1
         else:
             storage.mark_uploaded(record.id, "", error=result.error_code or UPLOAD_ERROR_PUBLISH_FAILED)
-            failed += 1
-            click.echo(f"✗ Ошибка загрузки")
+            counts["failed"] += 1
+            if result.error_code == "VK_API_1051":
+                counts["vk_1051"] += 1
+                engine.cancel()
+        intents.clear(record.id, keep_sent=not result.ok)
+
+    click.echo(f"{label}Параллельная загрузка: слотов {concurrency}, интервал между стартами {delay} сек, видео {total}")
+    items = [
+        ContentItem.from_video_record(
+            file_path=r.file_path,
+            title=r.title,
+            description=r.description or "",
+            channel=r.channel,
+            source_folder=r.source_folder,
+            date=r.date,
+            record_id=r.id,
+            file_hash=r.file_hash,
+        )
+        for r in to_upload
+    ]
+    return _UploadLane(
+        destination=destination, engine=engine, items=items, on_result=on_result, on_ordered=on_ordered, counts=counts
+    )
 
-        # Задержка между загрузками (кроме последнего видео)
-        if idx < len(records):
-            click.echo(f"Ожидание {delay} сек перед следующей загрузкой...")
-            time.sleep(delay)
-    
+
+def _run_upload_lanes(lanes: list[_UploadLane]) -> None:
+    """Запустить полосы одновременно (каждая в своём потоке). Ctrl+C останавливает новые загрузки во всех полосах.
+
+    Результаты полос (mark_uploaded, намерения, canonical write, счётчики, вывод) пишет один поток —
+    вызвавший: полосы кладут вызовы on_result/on_ordered в очередь, основной поток её разбирает.
+    """
+    writes: "SimpleQueue[tuple[Callable, tuple]]" = SimpleQueue()
+
+    def deferred(callback: Callable) -> Callable:
+        return lambda *args: writes.put((callback, args))
+
+    def drain(timeout: Optional[float]) -> None:
+        try:
+            callback, args = writes.get(timeout=timeout) if timeout else writes.get_nowait()
+        except Empty:
+            return
+        while True:
+            callback(*args)
+            try:
+                callback, args = writes.get_nowait()
+            except Empty:
+                return
+
+    for lane in lanes:
+        lane.on_result, lane.on_ordered = deferred(lane.on_result), deferred(lane.on_ordered)
+    threads = [
+        threading.Thread(target=lane.run, name=f"upload-lane-{lane.destination.key}", daemon=True) for lane in lanes
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            drain(0.5)
+    except KeyboardInterrupt:
+        logger.warning("Прерывание: новые загрузки не начинаются, ожидание текущих")
+        for lane in lanes:
+            lane.engine.cancel()
+        for thread in threads:
+            thread.join()
+    except BaseException:
+        for lane in lanes:
+            lane.engine.cancel()
+        raise
+    # Результаты, поставленные в очередь после последней проверки, и завершённые после прерывания
+    drain(None)
+    for lane in lanes:
+        if lane.error is not None and not isinstance(lane.error, KeyboardInterrupt):
+            raise lane.error
+
+
+def _upload_batch_concurrent(
+    records: list[VideoRecord], storage: VideoStorage, delay: float, max_retries: int, concurrency: int
+) -> tuple[int, int, int, bool]:
+    """Загрузить пакет в concurrency параллельных слотах (UploadEngine).
+
+    Слоты делят VKPublisher назначения; старты загрузок разнесены на delay сек; mark_uploaded
+    вызывается сразу по завершении загрузки, итоги в консоль — в порядке записей.
+    VK_API_1051 останавливает новые загрузки.
+    Записи разных назначений (VK_DESTINATIONS) загружаются одновременно в отдельных полосах:
+    у каждой свои токен, группа, лимитер и число слотов (VK_<KEY>_CONCURRENCY, иначе concurrency).
+
+    Returns:
+        (successful, failed, skipped, cancelled). При ошибке окружения выбрасывает FatalUploadError.
+    """
+    get_upload_shaper()  # неверный VK_UPLOAD_BANDWIDTH — FatalUploadError до загрузки, а не в итогах
+    to_upload = [r for r in records if not getattr(r, "skip_upload", False)]
+    skipped = len(records) - len(to_upload)
+    intents = UploadIntents()
+    by_destination = _split_by_destination(to_upload)
+    multiple = len(by_destination) > 1
+    lanes = [
+        _make_upload_lane(
+            destination, destination_records, storage, delay, max_retries,
+            destination.concurrency or concurrency, intents, f"[{destination.key}] " if multiple else "",
+        )
+        for destination, destination_records in by_destination.items()
+    ]
+    if multiple:
+        _run_upload_lanes(lanes)
+    else:
+        for lane in lanes:
+            lane.run()
+            if lane.error is not None:
+                raise lane.error
+
+    completed = all(lane.completed for lane in lanes)
     click.echo("\n" + "=" * 80)
-    click.echo("РЕЗУЛЬТАТЫ")
+    click.echo("РЕЗУЛЬТАТЫ" if completed else "РЕЗУЛЬТАТЫ (прервано)")
     click.echo("=" * 80)
+    if multiple:
+        for lane in lanes:
+            click.echo(f"[{lane.destination.key}] успешно: {lane.counts['successful']}, ошибок: {lane.counts['failed']}")
+    successful = sum(lane.counts["successful"] for lane in lanes)
+    failed = sum(lane.counts["failed"] for lane in lanes)
     click.echo(f"Успешно: {successful}")
     click.echo(f"Ошибок: {failed}")
     if skipped:
         click.echo(f"Пропущено (skip): {skipped}")
     click.echo(f"Всего: {len(records)}")
-    return (successful, failed, skipped)
+    cancelled = any(not lane.completed and not lane.counts["vk_1051"] for lane in lanes)
+    return successful, failed, skipped, cancelled
 
 
 # --- Phase 4: worker для очереди задач ---
@@ -884,7 +1805,6 @@ def _run_job(job: JobRecord, queue: JobQueue, storage: VideoStorage) -> None:
             if ok:
                 queue.complete(job.id, {"uploaded": True})
             elif err and err in PARTIAL_UPLOAD_ERROR_CODES:
-                from datetime import timedelta
                 run_after = datetime.now(timezone.utc) + timedelta(minutes=5)
                 queue.fail_retry(job.id, err or "publish failed", run_after=run_after)
             else:
@@ -895,38 +1815,155 @@ def _run_job(job: JobRecord, queue: JobQueue, storage: VideoStorage) -> None:
         queue.fail(job.id, f"Неизвестный тип задачи: {job.type}")
 
 
+def _destination_quota_key(destination: VkDestination) -> str:
+    """Ключ квоты группы назначения (как у VKDestinationAdapter: ID группы)."""
+    group_id_str = get_env_var(destination.group_id_env)
+    try:
+        return upload_quota_key(int(group_id_str)) if group_id_str else destination.key
+    except ValueError:
+        return destination.key
+
+
+def _local_time(moment: datetime) -> datetime:
+    """run_after задачи (UTC) в локальном времени без tzinfo — как окна и квота."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def _schedule_upload_jobs(
+    queue: JobQueue,
+    storage: VideoStorage,
+    quota: UploadQuota,
+    window: Optional[str],
+    daily_cap: Optional[int],
+) -> dict[str, tuple[QuotaSchedule, list[datetime]]]:
+    """Назначить run_after задачам upload_video по окну и дневной квоте группы записи.
+
+    Задачи каждой группы идут по порядку id: первая — не раньше последней учтённой загрузки
+    в группу плюс шаг расписания, следующие — через шаг; сутки с исчерпанной квотой
+    (включая загрузки других команд) пропускаются. Повтор после ошибки (fail_retry) не
+    берётся раньше своего run_after. Окно и квота — VK_<KEY>_UPLOAD_WINDOW / VK_<KEY>_DAILY_CAP
+    назначения, иначе window / daily_cap.
+
+    Returns:
+        Группа → (расписание, назначенные времена по порядку).
+
+    Raises:
+        FatalUploadError: Неверное окно или параметры назначений.
+    """
+    now = datetime.now()
+    plans: dict[str, tuple[QuotaSchedule, list[datetime]]] = {}
+    usage: dict[str, dict] = {}
+    cursors: dict[str, datetime] = {}
+    run_after: dict[int, Optional[datetime]] = {}
+    try:
+        for job in queue.pending(JOB_TYPE_UPLOAD_VIDEO):
+            video_id = job.payload().get("video_id")
+            record = storage.get_video(video_id) if video_id is not None else None
+            if not record or record.uploaded or record.skip_upload:
+                continue  # worker завершит задачу без загрузки
+            destination = resolve_vk_destination(record.channel)
+            key = _destination_quota_key(destination)
+            if key not in plans:
+                schedule = QuotaSchedule(
+                    parse_upload_window(destination.upload_window or window),
+                    destination.daily_cap or daily_cap,
+                )
+                plans[key] = (schedule, [])
+                usage[key] = quota.usage(key, now.date())
+                last = quota.last_upload(key)
+                cursors[key] = max(now, last + schedule.step) if last else now
+            schedule, planned = plans[key]
+            after = cursors[key]
+            if job.error and job.run_after:
+                after = max(after, _local_time(job.run_after))
+            slot = schedule.next_slot(after, usage[key])
+            usage[key][slot.date()] = usage[key].get(slot.date(), 0) + 1
+            cursors[key] = slot + schedule.step
+            planned.append(slot)
+            slot_utc = slot.astimezone(timezone.utc)
+            if job.run_after is None or abs((job.run_after - slot_utc).total_seconds()) >= 1:
+                run_after[job.id] = slot_utc
+    except ValueError as e:
+        raise FatalUploadError(str(e))
+    queue.reschedule(run_after)
+    return plans
+
+
+def _echo_upload_schedule(plans: dict[str, tuple[QuotaSchedule, list[datetime]]]) -> None:
+    """Вывести расписание по группам: число задач в очереди, окно, квота и время первой и последней загрузки."""
+    for key, (schedule, planned) in plans.items():
+        window = "круглые сутки"
+        if schedule.window is not None:
+            start, end = schedule.window
+            window = f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+        cap = f"{schedule.daily_cap}/сутки" if schedule.daily_cap else "без квоты"
+        click.echo(
+            f"Группа {key}: {len(planned)} в очереди, окно {window}, квота {cap}; "
+            f"первая {planned[0]:%d.%m %H:%M}, последняя {planned[-1]:%d.%m %H:%M}"
+        )
+
+
 @cli.command()
 @click.option("--once", is_flag=True, help="Взять одну задачу и выйти")
 @click.option("--loop", is_flag=True, help="Цикл: брать задачи с паузой до прерывания")
 @click.option("--interval", "-i", type=float, default=10.0, help="Пауза между опросами очереди (сек) в --loop")
 @click.option("--types", "-t", multiple=True, default=[JOB_TYPE_UPLOAD_VIDEO], help="Типы задач (можно несколько)")
-def worker(once: bool, loop: bool, interval: float, types: tuple):
+@click.option("--schedule", is_flag=True, help="Расписание upload_video: окно и дневная квота группы задают run_after")
+@click.option("--window", default=None, help="Окно загрузок для --schedule, например 01:00-07:00 (по умолчанию круглые сутки)")
+@click.option("--daily-cap", type=click.IntRange(min=1), default=None, help="Загрузок в группу за сутки для --schedule")
+def worker(once: bool, loop: bool, interval: float, types: tuple, schedule: bool, window: Optional[str], daily_cap: Optional[int]):
     """Воркер очереди задач: обрабатывает задачи из таблицы jobs (Phase 4)."""
     if not once and not loop:
         click.echo("Укажите --once или --loop.", err=True)
         write_summary("worker", EXIT_FATAL, {}, [], ["Укажите --once или --loop"])
         sys.exit(EXIT_FATAL)
     queue = JobQueue(Path("videos.db"))
+    # Хранилище и публикатор (get_vk_publisher) общие для всех задач процесса
+    storage = get_storage()
     types_list = list(types) if types else [JOB_TYPE_UPLOAD_VIDEO]
+    quota = UploadQuota() if schedule and JOB_TYPE_UPLOAD_VIDEO in types_list else None
+    try:
+        parse_upload_window(window)
+    except ValueError as e:
+        click.echo(f"ОШИБКА: {e}", err=True)
+        write_summary("worker", EXIT_FATAL, {}, [], [str(e)])
+        sys.exit(EXIT_FATAL)
     processed = 0
+    scheduled = 0
+    announced = False
     try:
         while True:
+            if quota is not None:
+                # Расписание пересчитывается перед каждым claim: учитывает загрузки других процессов
+                try:
+                    plans = _schedule_upload_jobs(queue, storage, quota, window, daily_cap)
+                except FatalUploadError as e:
+                    click.echo(f"ОШИБКА: {e.message}", err=True)
+                    write_summary("worker", EXIT_FATAL, {"processed": processed}, [], [e.message])
+                    sys.exit(EXIT_FATAL)
+                if plans and not announced:
+                    _echo_upload_schedule(plans)
+                    announced = True
+                scheduled = sum(len(planned) for _, planned in plans.values())
             job = queue.claim_next(job_types=types_list)
             if not job:
                 if once:
                     break
                 time.sleep(interval)
                 continue
-            storage = get_storage()
             _run_job(job, queue, storage)
             processed += 1
             if once:
                 break
     except (KeyboardInterrupt, click.Abort):
         click.echo("\nВоркер прерван.", err=True)
-        write_summary("worker", EXIT_INTERRUPTED, {"processed": processed}, [], [])
+        stats = {"processed": processed, "scheduled": scheduled} if quota is not None else {"processed": processed}
+        write_summary("worker", EXIT_INTERRUPTED, stats, [], [])
         sys.exit(EXIT_INTERRUPTED)
-    write_summary("worker", EXIT_SUCCESS, {"processed": processed}, [], [])
+    stats = {"processed": processed, "scheduled": scheduled} if quota is not None else {"processed": processed}
+    write_summary("worker", EXIT_SUCCESS, stats, [], [])
     click.echo(f"Обработано задач: {processed}")
 
 
@@ -12,13 +12,12 @@
 import csv
 import re
 import sys
-from pathlib import Path
+from pathlib import Path, PurePath
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.storage.database import VideoStorage, VideoRecord
 from src.title_generators.ege_generators import EGEAutoTitleGenerator
-from src.models.video import VideoData
 
 # Список ID из запроса пользователя (диапазоны раскрыты)
 IDS_RAW = [
@@ -43,15 +42,9 @@ def expand_ids(ids_raw) -> list:
     return out
 
 
-def record_to_video_data(r: VideoRecord) -> VideoData:
-    p = Path(r.file_path)
-    return VideoData(
-        file_path=p,
-        title=r.title or "",
-        description=r.description or "",
-        date=r.date,
-        channel=r.channel,
-    )
+def record_to_title_item(r: VideoRecord) -> tuple:
+    """(description, stem, date, channel) для пакетной генерации заголовков (без проверки файла)."""
+    return (r.description or "", PurePath(r.file_path).stem, r.date, r.channel)
 
 
 def classify_change(old_title: str, new_title: str, desc: str) -> str:
@@ -80,14 +73,8 @@ def main():
 
     rows = []
     by_type = {}
-    skipped = 0
-    for r in records:
-        try:
-            v = record_to_video_data(r)
-        except ValueError:
-            skipped += 1
-            continue
-        new_title = generator.generate(v)
+    new_titles = generator.generate_batch([record_to_title_item(r) for r in records])
+    for r, new_title in zip(records, new_titles):
         old_title = r.title or ""
         desc_preview = (r.description or "")[:200].replace("\n", " ")
         change_type = classify_change(old_title, new_title, r.description or "")
@@ -101,7 +88,7 @@ def main():
         })
 
     # Отчёт в консоль
-    print("Записей по списку ID (ЕГЭ):", len(rows), "(пропущено из-за отсутствия файла:", skipped, ")")
+    print("Записей по списку ID (ЕГЭ):", len(rows))
     print("По типам изменений:", by_type)
     print()
     # Детальный отчёт в файл (UTF-8)
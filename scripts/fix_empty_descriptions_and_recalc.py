@@ -11,7 +11,7 @@ ID: 436, 556, 594, 993 и 971–991, 994–1002 — пустое описани
 """
 
 import sys
-from pathlib import Path
+from pathlib import Path, PurePath
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -20,7 +20,6 @@ from src.title_generators.ege_generators import EGEAutoTitleGenerator
 from src.title_generators.python_generators import PythonAutoTitleGenerator
 from src.title_generators.oge_generators import OGEAutoTitleGenerator
 from src.title_generators.algorithms_generators import AlgorithmsAutoTitleGenerator
-from src.models.video import VideoData
 
 
 # Развернуть диапазоны в плоский список ID
@@ -28,14 +27,9 @@ IDS_RAW = [436, 556, 594, 993] + list(range(971, 992)) + list(range(994, 1003))
 TARGET_IDS = sorted(set(IDS_RAW))
 
 
-def record_to_video_data(r: VideoRecord) -> VideoData:
-    return VideoData(
-        file_path=Path(r.file_path),
-        title=r.title or "",
-        description=r.description or "",
-        date=r.date,
-        channel=r.channel,
-    )
+def record_to_title_item(r: VideoRecord) -> tuple:
+    """(description, stem, date, channel) для пакетной генерации заголовков (без проверки файла)."""
+    return (r.description or "", PurePath(r.file_path).stem, r.date, r.channel)
 
 
 def normalize_channel(ch: str) -> str:
@@ -102,11 +96,7 @@ def main():
         gen = generators.get(ch)
         if not gen:
             continue
-        try:
-            v = record_to_video_data(rec)
-        except ValueError:
-            continue
-        new_title = gen.generate(v)
+        new_title = gen.generate_batch([record_to_title_item(rec)])[0]
         if new_title != (rec.title or ""):
             rec.title = new_title
             storage.add_video(rec)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """Просмотр в БД title/description для указанных ID и пересчёт заголовков."""
 import sys
-from pathlib import Path
+from pathlib import Path, PurePath
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -10,17 +10,11 @@ from src.title_generators.ege_generators import EGEAutoTitleGenerator
 from src.title_generators.python_generators import PythonAutoTitleGenerator
 from src.title_generators.oge_generators import OGEAutoTitleGenerator
 from src.title_generators.algorithms_generators import AlgorithmsAutoTitleGenerator
-from src.models.video import VideoData
 
 
-def record_to_video_data(r: VideoRecord) -> VideoData:
-    return VideoData(
-        file_path=Path(r.file_path),
-        title=r.title or "",
-        description=r.description or "",
-        date=r.date,
-        channel=r.channel,
-    )
+def record_to_title_item(r: VideoRecord) -> tuple:
+    """(description, stem, date, channel) для пакетной генерации заголовков (без проверки файла)."""
+    return (r.description or "", PurePath(r.file_path).stem, r.date, r.channel)
 
 
 def normalize_channel(ch: str) -> str:
@@ -80,11 +74,7 @@ def main():
         if not gen:
             print(f"  ID {vid}: канал {ch!r} — генератор не найден")
             continue
-        try:
-            v = record_to_video_data(rec)
-        except ValueError:
-            continue
-        new_title = gen.generate(v)
+        new_title = gen.generate_batch([record_to_title_item(rec)])[0]
         old_title = rec.title or ""
         if new_title != old_title:
             rec.title = new_title
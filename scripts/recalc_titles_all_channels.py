@@ -9,7 +9,7 @@
 
 import csv
 import sys
-from pathlib import Path
+from pathlib import Path, PurePath
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -17,17 +17,12 @@ from src.storage.database import VideoStorage, VideoRecord
 from src.title_generators.ege_generators import EGEAutoTitleGenerator
 from src.title_generators.python_generators import PythonAutoTitleGenerator
 from src.title_generators.oge_generators import OGEAutoTitleGenerator
-from src.models.video import VideoData
+from src.title_generators.factory import generate_titles_by_channel
 
 
-def record_to_video_data(r: VideoRecord) -> VideoData:
-    return VideoData(
-        file_path=Path(r.file_path),
-        title=r.title or "",
-        description=r.description or "",
-        date=r.date,
-        channel=r.channel,
-    )
+def record_to_title_item(r: VideoRecord) -> tuple:
+    """(description, stem, date, channel) для пакетной генерации заголовков (без проверки файла)."""
+    return (r.description or "", PurePath(r.file_path).stem, r.date, r.channel)
 
 
 def main():
@@ -55,20 +50,15 @@ def main():
 
     all_records = storage.get_videos_range(0, 100000)
     changed = []
-    skipped = 0
     by_channel = {}
 
-    for r in all_records:
+    records = [r for r in all_records if normalize_channel(r.channel or "") in generators]
+    new_titles = generate_titles_by_channel(
+        [record_to_title_item(r) for r in records],
+        lambda channel: generators.get(normalize_channel(channel or "")),
+    )
+    for r, new_title in zip(records, new_titles):
         ch = normalize_channel(r.channel or "")
-        if ch not in generators:
-            continue
-        try:
-            v = record_to_video_data(r)
-        except ValueError:
-            skipped += 1
-            continue
-        gen = generators[ch]
-        new_title = gen.generate(v)
         old_title = r.title or ""
         if old_title != new_title:
             changed.append({
@@ -91,7 +81,6 @@ def main():
     print("Каналы: ЕГЭ, Python, ОГЭ")
     print("-" * 60)
     print(f"Обработано записей (с учётом канала): {total_processed}")
-    print(f"Пропущено (файл не найден): {skipped}")
     print(f"Изменено заголовков: {total_changed}")
     print("По каналам:", by_channel)
     print(f"Затронутые ID (всего {len(affected_ids)}):", affected_ids[:50], end="")
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Бенчмарк генераторов заголовков и проверка по эталонному корпусу (без videos.db).
+
+Использование:
+  python scripts/title_bench.py [--corpus PATH] [--repeat N]
+                                [--baseline PATH | --no-baseline] [--max-regression 0.2] [--save-baseline PATH]
+
+Корпус: tests/fixtures/title_golden.jsonl — строки {"channel", "description", "stem", "expected"}.
+Генератор выбирается по каналу, как в recalc-titles (config.registry, иначе simple).
+
+Отчёт: расхождения с эталоном, по генератору — заголовков/сек, p50/p99 задержки на заголовок,
+число срабатываний правил (trace). Код выхода 1 — есть расхождения или производительность
+генератора ниже baseline больше чем на --max-regression.
+
+Baseline по умолчанию — tests/fixtures/title_bench_baseline.json (его же проверяет pytest).
+Заг/с зависят от машины, поэтому сравнивается relative — заг/с относительно калибровочной
+нагрузки (casefold, split, regex), замеренной рядом с каждым повтором.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.registry import title_generator_name
+from src.title_generators.factory import TitleGeneratorFactory
+from src.title_generators.rules import TitleContext
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+DEFAULT_CORPUS = FIXTURES / "title_golden.jsonl"
+DEFAULT_BASELINE = FIXTURES / "title_bench_baseline.json"
+
+_CALIBRATION_TEXT = "Разбор задания 27 ЕГЭ по информатике. Решение задачи с помощью Python"
+# Калибровочных операций на один заголовок в замере bench (порядок времени генерации заголовка)
+CALIBRATION_ROUNDS_PER_TITLE = 20
+
+_CALIBRATION_RX = re.compile(r"задани[ея]\s+(\d+)", re.IGNORECASE)
+
+
+def load_corpus(path: Path) -> list[dict]:
+    """Прочитать эталонный корпус (JSON Lines)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def generator_name_for_channel(channel: str) -> str:
+    """Имя генератора в фабрике по каналу (как в recalc-titles)."""
+    return title_generator_name(channel)
+
+
+def _calibration_round() -> None:
+    folded = _CALIBRATION_TEXT.casefold()
+    folded.split(".", 1)[0].strip()
+    _CALIBRATION_RX.search(folded)
+
+
+def _timed(func, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return time.perf_counter() - started
+
+
+def calibrate(rounds: int = 20000, best_of: int = 3) -> float:
+    """Операций/сек фиксированной нагрузки (casefold, split, regex) — масштаб скорости машины."""
+    best = min(_timed(_calibration_round, rounds) for _ in range(best_of))
+    return round(rounds / best) if best else 0.0
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Перцентиль q (0..1) по отсортированному списку (ближайший ранг)."""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[idx]
+
+
+def check_golden(cases: list[dict]) -> list[dict]:
+    """Сравнить заголовки с эталоном.
+
+    Returns:
+        Расхождения: {"channel", "stem", "expected", "actual"}.
+    """
+    diffs = []
+    for case in cases:
+        gen = TitleGeneratorFactory.create(generator_name_for_channel(case["channel"]))
+        actual = gen.generate_context(TitleContext(case["description"], case["stem"], None, case["channel"] or None))
+        if actual != case["expected"]:
+            diffs.append({"channel": case["channel"], "stem": case["stem"], "expected": case["expected"], "actual": actual})
+    return diffs
+
+
+def bench(cases: list[dict], repeat: int) -> dict:
+    """Замерить производительность генераторов на корпусе.
+
+    Returns:
+        {имя генератора: {"count", "titles_per_sec", "relative", "p50_us", "p99_us", "rules": {правило: срабатываний}}}.
+    """
+    by_generator: dict[str, list[dict]] = {}
+    for case in cases:
+        by_generator.setdefault(generator_name_for_channel(case["channel"]), []).append(case)
+
+    report = {}
+    for name, group in sorted(by_generator.items()):
+        gen = TitleGeneratorFactory.create(name)
+        items = [(c["description"], c["stem"], None, c["channel"] or None) for c in group]
+
+        # Пропускная способность — пакетный путь (как recalc-titles), лучший из повторов: меньше шума.
+        # Рядом с каждым повтором — калибровочная нагрузка того же объёма: relative не зависит
+        # от скорости машины и её колебаний во время замера
+        calibration_rounds = CALIBRATION_ROUNDS_PER_TITLE * len(items)
+        elapsed = calibration = None
+        for _ in range(repeat):
+            took = _timed(lambda: gen.generate_batch(items), 1)
+            elapsed = took if elapsed is None else min(elapsed, took)
+            took = _timed(_calibration_round, calibration_rounds)
+            calibration = took if calibration is None else min(calibration, took)
+
+        # Задержка и срабатывания правил — по одному заголовку
+        latencies = []
+        rules: Counter = Counter()
+        for _ in range(repeat):
+            for description, stem, date, channel in items:
+                t0 = time.perf_counter_ns()
+                ctx = TitleContext(description, stem, date, channel)
+                gen.generate_context(ctx)
+                latencies.append(time.perf_counter_ns() - t0)
+                rules.update(ctx.trace)
+        latencies.sort()
+
+        report[name] = {
+            "count": len(items),
+            "titles_per_sec": round(len(items) / elapsed) if elapsed else 0,
+            "relative": round(calibration / elapsed / CALIBRATION_ROUNDS_PER_TITLE, 4) if elapsed else 0,
+            "p50_us": round(percentile(latencies, 0.50) / 1000, 1),
+            "p99_us": round(percentile(latencies, 0.99) / 1000, 1),
+            "rules": {rule: hits // repeat for rule, hits in rules.most_common()},
+        }
+    return report
+
+
+def baseline_document(report: dict, calibration: float) -> dict:
+    """JSON baseline: замер по генераторам и калибровка машины, на которой он сделан."""
+    return {"calibration_ops_per_sec": calibration, "generators": report}
+
+
+def load_baseline(path: Path) -> dict:
+    """Прочитать baseline (и старый формат без калибровки — словарь генераторов)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if "generators" in data else {"calibration_ops_per_sec": None, "generators": data}
+
+
+def find_regressions(
+    report: dict, baseline: dict, max_regression: float, calibration: Optional[float] = None
+) -> list[str]:
+    """Генераторы, чья пропускная способность упала ниже baseline * (1 - max_regression).
+
+    Сравнивается relative (заг/с относительно калибровочной нагрузки, замеренной рядом);
+    для baseline без relative — заг/с, масштабированные на calibration / калибровку baseline.
+    """
+    base_calibration = baseline.get("calibration_ops_per_sec")
+    scale = calibration / base_calibration if calibration and base_calibration else 1.0
+    problems = []
+    for name, stats in report.items():
+        base = baseline["generators"].get(name) or {}
+        if base.get("relative") and stats.get("relative"):
+            ratio = stats["relative"] / base["relative"]
+        elif base.get("titles_per_sec"):
+            ratio = stats["titles_per_sec"] / (base["titles_per_sec"] * scale)
+        else:
+            continue
+        if ratio < 1 - max_regression:
+            problems.append(f"{name}: {ratio:.0%} от baseline (допустимо падение на {max_regression:.0%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк генераторов заголовков по эталонному корпусу")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="Эталонный корпус (.jsonl)")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторов корпуса при замере")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="JSON прошлого замера (--save-baseline) для сравнения")
+    parser.add_argument("--no-baseline", action="store_true", help="Не сравнивать с baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Допустимое падение заг/с (доля)")
+    parser.add_argument("--save-baseline", type=Path, help="Сохранить замер в JSON")
+    parser.add_argument("--rules", action="store_true", help="Показать срабатывания правил")
+    args = parser.parse_args()
+
+    cases = load_corpus(args.corpus)
+    print(f"Корпус: {args.corpus} ({len(cases)} записей)")
+    print("-" * 60)
+
+    diffs = check_golden(cases)
+    for d in diffs[:20]:
+        print(f"РАСХОЖДЕНИЕ [{d['channel']}] {d['stem']}\n  ожидалось: {d['expected']}\n  получено:  {d['actual']}")
+    if len(diffs) > 20:
+        print(f"... и ещё {len(diffs) - 20}")
+    print(f"Расхождений с эталоном: {len(diffs)}")
+    print("-" * 60)
+
+    calibration = calibrate()
+    report = bench(cases, max(1, args.repeat))
+    print(f"{'генератор':<18}{'записей':>8}{'заг/с':>10}{'p50, мкс':>10}{'p99, мкс':>10}")
+    for name, stats in report.items():
+        print(f"{name:<18}{stats['count']:>8}{stats['titles_per_sec']:>10}{stats['p50_us']:>10}{stats['p99_us']:>10}")
+        if args.rules:
+            for rule, hits in stats["rules"].items():
+                print(f"    {rule:<50}{hits:>6}")
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline_document(report, calibration), f, ensure_ascii=False, indent=2)
+        print(f"\nЗамер сохранён: {args.save_baseline}")
+
+    regressions = []
+    if not args.no_baseline and args.baseline and args.baseline.exists():
+        regressions = find_regressions(report, load_baseline(args.baseline), args.max_regression, calibration)
+        for line in regressions:
+            print(f"РЕГРЕССИЯ {line}")
+
+    return 1 if diffs or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
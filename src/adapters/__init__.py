@@ -3,6 +3,7 @@
 from .base import SourceAdapter, DestinationAdapter
 from .sources import ExportFilesystemSourceAdapter
 from .destinations import VKDestinationAdapter, YouTubeDestinationAdapter
+from .upload_engine import UploadEngine
 
 __all__ = [
     "SourceAdapter",
@@ -10,4 +11,5 @@ __all__ = [
     "ExportFilesystemSourceAdapter",
     "VKDestinationAdapter",
     "YouTubeDestinationAdapter",
+    "UploadEngine",
 ]
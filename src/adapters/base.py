@@ -1,7 +1,7 @@
 """Интерфейсы адаптеров источников и направлений (Phase 3)."""
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
 
 from ..models.content import ContentItem, PublicationResult
 
@@ -42,3 +42,14 @@ class DestinationAdapter(ABC):
             PublicationResult с remote_url при успехе или error_code при ошибке.
         """
         pass
+
+    def prefetch(self, items: Sequence[ContentItem]) -> None:
+        """Подготовить следующие публикации пакета (вызывается перед publish текущего элемента).
+
+        По умолчанию ничего не делает; VK заранее получает upload_url.
+        """
+        pass
+
+    def close(self) -> None:
+        """Освободить ресурсы адаптера после пакета (по умолчанию ничего)."""
+        pass
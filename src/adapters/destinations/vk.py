@@ -1,23 +1,49 @@
 """Адаптер публикации в VK Video (обёртка над VKPublisher)."""
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Sequence
 
 from ..base import DestinationAdapter
 from ...models.content import ContentItem, PublicationResult
-from ...publisher.vk_publisher import VKApi1051Error
+from ...publisher.streaming_upload import ProgressCallback
+from ...publisher.vk_publisher import VKApi1051Error, VKFileChangedError, log_progress
+from ...storage.database import description_hash
+from ...storage.upload_quota import upload_quota_key
 
 if TYPE_CHECKING:
     from ...publisher.vk_publisher import VKPublisher
+    from ...storage.upload_intents import UploadIntents
+    from ...storage.upload_quota import UploadQuota
 
 logger = logging.getLogger(__name__)
 
+# Файл изменён после scan (хеш при отправке не совпал с videos.file_hash)
+ERROR_FILE_CHANGED = "FILE_CHANGED"
+
 
 class VKDestinationAdapter(DestinationAdapter):
     """Публикация в VK Video через существующий VKPublisher."""
 
-    def __init__(self, publisher: "VKPublisher"):
+    def __init__(
+        self,
+        publisher: "VKPublisher",
+        prefetch_depth: int = 0,
+        intents: Optional["UploadIntents"] = None,
+        quota: Optional["UploadQuota"] = None,
+    ):
+        """
+        Args:
+            publisher: Публикатор VK.
+            prefetch_depth: Для скольких следующих видео заранее вызывать video.save.
+            intents: Намерения загрузки: строка пишется перед публикацией записи БД
+                (external_id = videos.id), получает id видео из video.save и отмечается sent
+                после отправки файла.
+            quota: Дневная квота групп: успешная публикация учитывается в группе публикатора.
+        """
         self._publisher = publisher
+        self._prefetch_depth = prefetch_depth
+        self._intents = intents
+        self._quota = quota
 
     @property
     def destination_id(self) -> str:
@@ -31,8 +57,29 @@ class VKDestinationAdapter(DestinationAdapter):
                 ok=False,
                 error_code="NO_VIDEO",
             )
+        on_progress = options.get("on_progress")
+        on_saved = None
+        if self._intents is not None and item.external_id.isdigit():
+            record_id = int(item.external_id)
+            self._intents.record(record_id, video_data.title, description_hash(video_data.description))
+            on_progress = self._track_sent(record_id, on_progress or log_progress(video_data.file_path.name))
+            on_saved = lambda owner_id, video_id: self._intents.set_remote(record_id, owner_id, video_id)
         try:
-            url = self._publisher.publish(video_data)
+            url = self._publisher.publish(
+                video_data,
+                on_progress=on_progress,
+                expected_hash=item.metadata.get("file_hash"),
+                on_saved=on_saved,
+            )
+        except VKFileChangedError as e:
+            # flag: видео загружено, но файл изменён после scan; abort: загруженное видео удалено
+            self._consume_quota()
+            return PublicationResult(
+                destination=self.destination_id,
+                ok=e.video_url is not None,
+                remote_url=e.video_url,
+                error_code=ERROR_FILE_CHANGED,
+            )
         except VKApi1051Error:
             return PublicationResult(
                 destination=self.destination_id,
@@ -40,9 +87,44 @@ class VKDestinationAdapter(DestinationAdapter):
                 error_code="VK_API_1051",
             )
         if url:
+            self._consume_quota()
             return PublicationResult(destination=self.destination_id, ok=True, remote_url=url)
         return PublicationResult(
             destination=self.destination_id,
             ok=False,
             error_code="PUBLISH_FAILED",
         )
+
+    def _consume_quota(self) -> None:
+        if self._quota is not None:
+            self._quota.consume(upload_quota_key(self._publisher.group_id))
+
+    def _track_sent(self, record_id: int, on_progress: ProgressCallback) -> ProgressCallback:
+        """Прогресс загрузки, отмечающий намерение sent на последнем байте файла."""
+        marked = False
+
+        def track(sent: int, total: int) -> None:
+            nonlocal marked
+            on_progress(sent, total)
+            if not marked and sent >= total:
+                marked = True
+                self._intents.mark_sent(record_id)
+
+        return track
+
+    def prefetch(self, items: Sequence[ContentItem]) -> None:
+        if self._prefetch_depth < 1:
+            return
+        videos = []
+        for item in items[: self._prefetch_depth]:
+            try:
+                video_data = item.to_video_data()
+            except Exception as e:
+                logger.debug("prefetch: пропуск %s: %s", item.external_id, e)
+                continue
+            if video_data is not None:
+                videos.append(video_data)
+        self._publisher.prefetch(videos, depth=self._prefetch_depth)
+
+    def close(self) -> None:
+        self._publisher.close()
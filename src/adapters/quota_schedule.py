@@ -0,0 +1,91 @@
+"""Расписание загрузок из очереди по окну и дневной квоте группы (worker --schedule).
+
+Окно — интервал локального времени суток ("01:00-07:00", может переходить через полночь);
+без окна загрузки разрешены круглые сутки. Дневная квота — сколько видео загружать в
+группу за календарные сутки (локальные). С квотой загрузки идут с шагом
+длительность_окна / квота: полная квота равномерно заполняет окно, а очередь
+разбирается с максимальной разрешённой скоростью.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+
+_WINDOW_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$")
+
+DAY_SECONDS = 24 * 60 * 60
+
+# Окно загрузки: (начало, конец) в минутах от полуночи
+UploadWindow = Tuple[int, int]
+
+
+def parse_upload_window(spec: Optional[str]) -> Optional[UploadWindow]:
+    """Окно из строки "01:00-07:00"; пустая строка — без окна (круглые сутки).
+
+    Raises:
+        ValueError: Неверный формат.
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    m = _WINDOW_RE.match(spec)
+    if not m:
+        raise ValueError(f"Неверное окно загрузки: {spec!r} (пример: 01:00-07:00)")
+    h1, m1, h2, m2 = (int(g) for g in m.groups())
+    if h1 > 24 or h2 > 24 or m1 > 59 or m2 > 59 or (h1, m1) == (h2, m2):
+        raise ValueError(f"Неверное окно загрузки: {spec!r}")
+    return (h1 * 60 + m1) % (24 * 60), (h2 * 60 + m2) % (24 * 60)
+
+
+@dataclass(frozen=True)
+class QuotaSchedule:
+    """Окно и дневная квота одной группы."""
+    window: Optional[UploadWindow] = None
+    daily_cap: Optional[int] = None  # None — без квоты
+
+    @property
+    def window_seconds(self) -> int:
+        """Длительность окна (сек)."""
+        if self.window is None:
+            return DAY_SECONDS
+        start, end = self.window
+        return ((end - start) % (24 * 60)) * 60
+
+    @property
+    def step(self) -> timedelta:
+        """Интервал между загрузками: окно делится поровну на квоту (без квоты — без интервала)."""
+        if not self.daily_cap:
+            return timedelta(0)
+        return timedelta(seconds=self.window_seconds / self.daily_cap)
+
+    def in_window(self, moment: datetime) -> bool:
+        if self.window is None:
+            return True
+        start, end = self.window
+        minute = (moment - datetime.combine(moment.date(), time())).total_seconds() / 60
+        return start <= minute < end if start < end else (minute >= start or minute < end)
+
+    def _next_window_start(self, moment: datetime) -> datetime:
+        start = self.window[0]
+        candidate = datetime.combine(moment.date(), time()) + timedelta(minutes=start)
+        return candidate if candidate > moment else candidate + timedelta(days=1)
+
+    def next_slot(self, after: datetime, used: Dict[date, int]) -> datetime:
+        """Ближайшее время не раньше after: внутри окна и в сутки с неисчерпанной квотой.
+
+        Args:
+            after: Локальное время (naive).
+            used: Загрузок по дням (израсходованные и уже назначенные).
+        """
+        moment = after
+        # Окно не короче минуты, квота >= 1: свободный слот находится за несколько суток
+        for _ in range(4 * 366):
+            if not self.in_window(moment):
+                moment = self._next_window_start(moment)
+                continue
+            if self.daily_cap and used.get(moment.date(), 0) >= self.daily_cap:
+                moment = datetime.combine(moment.date() + timedelta(days=1), time())
+                continue
+            return moment
+        raise ValueError("Не найдено время загрузки в пределах окна и квоты")
@@ -13,8 +13,8 @@ from ...config.source_registry import get_export_paths
 from ...parsers.html_parser import HTMLParser
 from ...parsers.json_parser import JSONParser
 from ...parsers.custom_export_parser import CustomExportParser
-from ...title_generators.factory import TitleGeneratorFactory
-from ...config.registry import CHANNEL_TO_TITLE_GENERATOR
+from ...title_generators.factory import TitleGeneratorFactory, generate_titles_by_channel
+from ...config.registry import CHANNEL_TO_TITLE_GENERATOR, title_generator_name
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +37,9 @@ class ExportFilesystemSourceAdapter(SourceAdapter):
         **options: object,
     ) -> List[ContentItem]:
         paths = get_export_paths(source_filter=source_filter, input_dir=input_dir)
-        channel_generators = {
-            ch: TitleGeneratorFactory.create(gen_name)
-            for ch, gen_name in CHANNEL_TO_TITLE_GENERATOR.items()
+        generators = {
+            name: TitleGeneratorFactory.create(name)
+            for name in {*CHANNEL_TO_TITLE_GENERATOR.values(), "simple"}
         }
         items: List[ContentItem] = []
 
@@ -72,11 +72,12 @@ class ExportFilesystemSourceAdapter(SourceAdapter):
 
             for video in videos:
                 video.channel = channel or video.channel
-                gen = channel_generators.get(video.channel) or TitleGeneratorFactory.create("simple")
-                if gen:
-                    video.title = gen.generate(video)
-                else:
-                    video.title = video.file_path.stem
+            titles = generate_titles_by_channel(
+                [(v.description, v.file_path.stem, v.date, v.channel) for v in videos],
+                lambda ch: generators[title_generator_name(ch)],
+            )
+            for video, title in zip(videos, titles):
+                video.title = title if title is not None else video.file_path.stem
                 item = ContentItem.from_video_data(video, source_folder=str(export_path))
                 items.append(item)
 
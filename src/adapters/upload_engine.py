@@ -0,0 +1,165 @@
+"""Параллельная публикация: N слотов загрузки с общим интервалом старта; результаты пишутся по мере готовности."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Sequence
+
+from .base import DestinationAdapter
+from ..models.content import ContentItem, PublicationResult
+
+logger = logging.getLogger(__name__)
+
+# События прогресса слота: (слот, индекс элемента, элемент, событие, результат или None)
+EVENT_START = "start"
+EVENT_DONE = "done"
+ProgressCallback = Callable[[int, int, ContentItem, str, Optional[PublicationResult]], None]
+# Запись результата (вызывается в потоке run(): on_result — сразу по завершении, on_ordered — в порядке элементов)
+ResultCallback = Callable[[int, ContentItem, PublicationResult], None]
+
+
+class _StartSpacer:
+    """Общий для всех слотов интервал между стартами загрузок (не чаще одной в interval сек)."""
+
+    def __init__(self, interval: float, stop: threading.Event):
+        self._interval = max(0.0, interval)
+        self._stop = stop
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> bool:
+        """Дождаться своей очереди на старт. False — движок остановлен."""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self._interval
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            return not self._stop.wait(delay)
+        return not self._stop.is_set()
+
+
+class UploadEngine:
+    """Публикация элементов в N параллельных слотах.
+
+    Слоты берутся из общего пула, старты загрузок разнесены не менее чем на delay сек;
+    адаптеры слотов могут делить один публикатор (одну HTTP-сессию). Результат передаётся
+    в on_result сразу после завершения загрузки, в потоке, вызвавшем run() (слоты движка
+    в SQLite не пишут): долгая загрузка не задерживает запись уже готовых. Несколько движков,
+    запущенных в своих потоках, сводят запись в один поток сами (main._run_upload_lanes).
+    В порядке элементов вызывается только on_ordered (вывод в консоль). Ctrl+C: новые загрузки
+    не начинаются, идущие завершаются и их результаты записываются.
+    """
+
+    def __init__(
+        self,
+        adapter_factory: Callable[[], DestinationAdapter],
+        concurrency: int = 1,
+        delay: float = 0.0,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        """Создать движок и адаптеры слотов.
+
+        Args:
+            adapter_factory: Создание адаптера для слота (ошибки окружения пробрасываются сразу).
+            concurrency: Число одновременных загрузок.
+            delay: Минимальный интервал между стартами загрузок (сек).
+            on_progress: Прогресс слотов (вызывается из потоков слотов).
+
+        Raises:
+            ValueError: concurrency < 1.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency должно быть >= 1")
+        self.concurrency = concurrency
+        self.on_progress = on_progress
+        self._stop = threading.Event()
+        self._spacer = _StartSpacer(delay, self._stop)
+        self._slots: "queue.Queue[tuple[int, DestinationAdapter]]" = queue.Queue()
+        for slot in range(1, concurrency + 1):
+            self._slots.put((slot, adapter_factory()))
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Не начинать новые загрузки (идущие завершаются)."""
+        self._stop.set()
+
+    def _publish(self, index: int, item: ContentItem) -> Optional[PublicationResult]:
+        if not self._spacer.wait():
+            return None
+        slot, adapter = self._slots.get()
+        try:
+            if self._stop.is_set():
+                return None
+            if self.on_progress:
+                self.on_progress(slot, index, item, EVENT_START, None)
+            try:
+                result = adapter.publish(item)
+            except Exception as e:
+                logger.error("Слот %s: ошибка публикации %s: %s", slot, item.external_id, e, exc_info=True)
+                result = PublicationResult(destination=adapter.destination_id, ok=False, error_code="PUBLISH_FAILED")
+            if self.on_progress:
+                self.on_progress(slot, index, item, EVENT_DONE, result)
+            return result
+        finally:
+            self._slots.put((slot, adapter))
+
+    def run(
+        self,
+        items: Sequence[ContentItem],
+        on_result: ResultCallback,
+        on_ordered: Optional[ResultCallback] = None,
+    ) -> bool:
+        """Опубликовать элементы.
+
+        Args:
+            items: Элементы.
+            on_result: (индекс, элемент, результат) для каждого опубликованного элемента, по завершении.
+            on_ordered: То же в порядке элементов (после on_result); отменённые элементы пропускаются.
+
+        Returns:
+            True — обработаны все элементы; False — прервано (Ctrl+C или cancel()).
+        """
+        ordered: dict[int, Optional[PublicationResult]] = {}
+        finished: set[int] = set()
+        next_index = 0
+
+        def complete(index: int, result: Optional[PublicationResult]) -> None:
+            finished.add(index)
+            if result is not None:
+                on_result(index, items[index], result)
+            ordered[index] = result
+
+        def flush() -> None:
+            nonlocal next_index
+            while next_index in ordered:
+                result = ordered.pop(next_index)
+                if result is not None and on_ordered is not None:
+                    on_ordered(next_index, items[next_index], result)
+                next_index += 1
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="upload-slot")
+        futures: dict[Future, int] = {}
+        try:
+            futures = {executor.submit(self._publish, i, item): i for i, item in enumerate(items)}
+            pending = set(futures)
+            while pending:
+                # Короткий таймаут: Ctrl+C доходит до основного потока без ожидания загрузки
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    complete(futures[future], future.result())
+                flush()
+        except KeyboardInterrupt:
+            logger.warning("Прерывание: новые загрузки не начинаются, ожидание текущих")
+            self.cancel()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=self._stop.is_set())
+        # После прерывания: дописать завершённые загрузки, отменённые пропустить
+        for future, index in futures.items():
+            if index not in finished:
+                complete(index, None if future.cancelled() else future.result())
+        flush()
+        self.cancelled = self._stop.is_set()
+        return not self.cancelled
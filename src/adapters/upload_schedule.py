@@ -0,0 +1,97 @@
+"""Порядок загрузки пакета по размеру файлов и оценка времени завершения (upload-* --order/--window/--plan).
+
+Политики порядка:
+    id        — как выбраны записи (по возрастанию id);
+    smallest  — сначала маленькие файлы (больше видео готово раньше);
+    largest   — сначала большие;
+    balanced  — большие первыми (LPT): слоты UploadEngine берут следующий файл по мере
+                освобождения, к концу остаются мелкие файлы и слоты заканчивают почти
+                одновременно. С окном файлы раскладываются по слотам (first-fit decreasing,
+                ёмкость слота — длительность окна); не поместившиеся откладываются.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Sequence, Tuple, TypeVar
+
+ORDER_ID = "id"
+ORDER_SMALLEST = "smallest"
+ORDER_LARGEST = "largest"
+ORDER_BALANCED = "balanced"
+SCHEDULE_ORDERS = (ORDER_ID, ORDER_SMALLEST, ORDER_LARGEST, ORDER_BALANCED)
+
+T = TypeVar("T")
+
+
+def order_by_size(items: Sequence[T], size: Callable[[T], int], order: str) -> List[T]:
+    """Элементы в порядке политики (сортировка устойчивая: при равном размере — исходный порядок).
+
+    Raises:
+        ValueError: Неизвестная политика.
+    """
+    if order == ORDER_ID:
+        return list(items)
+    if order == ORDER_SMALLEST:
+        return sorted(items, key=size)
+    if order in (ORDER_LARGEST, ORDER_BALANCED):
+        return sorted(items, key=size, reverse=True)
+    raise ValueError(f"Неизвестный порядок загрузки: {order}")
+
+
+def pack_window(
+    items: Sequence[T], duration: Callable[[T], float], slots: int, window_sec: float
+) -> Tuple[List[T], List[T]]:
+    """Разложить элементы по слотам так, чтобы каждый слот уложился в окно (first-fit decreasing).
+
+    Args:
+        items: Элементы.
+        duration: Оценка длительности загрузки элемента в одном слоте (сек, с паузой между загрузками).
+        slots: Число слотов.
+        window_sec: Длительность окна (сек).
+
+    Returns:
+        (поместившиеся — от длинных к коротким, отложенные — в исходном порядке).
+    """
+    loads = [0.0] * slots
+    packed: List[T] = []
+    fitted = set()
+    for index in sorted(range(len(items)), key=lambda i: duration(items[i]), reverse=True):
+        cost = duration(items[index])
+        for slot in range(slots):
+            if loads[slot] + cost <= window_sec:
+                loads[slot] += cost
+                packed.append(items[index])
+                fitted.add(index)
+                break
+    return packed, [item for i, item in enumerate(items) if i not in fitted]
+
+
+@dataclass
+class PlannedUpload(Generic[T]):
+    """Оценка загрузки элемента: слот и время от начала пакета (сек)."""
+    item: T
+    slot: int
+    start: float
+    finish: float
+
+
+def estimate_plan(
+    items: Sequence[T], size: Callable[[T], int], slots: int, slot_throughput: float, delay: float
+) -> List[PlannedUpload[T]]:
+    """Смоделировать пакет: следующий элемент уходит в первый освободившийся слот.
+
+    При одном слоте пауза delay — между загрузками (_upload_batch); при нескольких —
+    минимальный интервал между стартами (UploadEngine).
+    """
+    free = [0.0] * slots
+    plan: List[PlannedUpload[T]] = []
+    last_start = None
+    for item in items:
+        slot = min(range(slots), key=lambda i: free[i])
+        start = free[slot]
+        if last_start is not None:
+            start = start + delay if slots == 1 else max(start, last_start + delay)
+        finish = start + size(item) / slot_throughput
+        free[slot] = finish
+        last_start = start
+        plan.append(PlannedUpload(item=item, slot=slot + 1, start=start, finish=finish))
+    return plan
@@ -1,13 +1,72 @@
 """Контекст приложения: единая точка инициализации VK publisher (Phase 2). Убирает дубли env/publisher в CLI."""
 
+import functools
 import logging
+import threading
+from pathlib import Path
 from typing import Callable, Optional
 
+from .config.settings import get_settings
+from .config.vk_destinations import DEFAULT_TOKEN_ENV, VkDestination, resolve_vk_destination
 from .utils.env_utils import get_env_var
+from .utils.vk_token_manager import VkTokenManager
+from .publisher.bandwidth import BandwidthShaper, parse_bandwidth_profile
+from .publisher.rate_limiter import AdaptiveRateLimiter
 from .publisher.vk_publisher import VKPublisher, VKPublisherError
+from .storage.rate_ledger import RateLedger, rate_ledger_key
+from .storage.upload_journal import UploadJournal
 
 logger = logging.getLogger(__name__)
 
+# Состояние лимитов VK API общее для всех процессов (воркеры, CLI), работающих с этой БД
+RATE_LEDGER_DB = Path("videos.db")
+
+# Журнал незавершённых загрузок: перезапущенная команда или воркер продолжает докачку
+UPLOAD_JOURNAL_DB = Path("videos.db")
+
+# Публикаторы процесса по (переменная токена, группа): сессия VK и keep-alive соединения живут между
+# загрузками и задачами воркера; после обновления токена публикатор остаётся тем же (update_token)
+_publishers: dict[tuple[str, Optional[int]], VKPublisher] = {}
+_publishers_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def get_rate_limiter(account: str, group_id: Optional[int]) -> AdaptiveRateLimiter:
+    """Лимитер вызовов VK API для аккаунта и группы: один на процесс, бюджет общий между процессами (RateLedger).
+
+    account — имя переменной токена (VkDestination.token_env), а не сам токен: после обновления
+    токена (update_token) публикаторы процесса остаются на том же лимитере. get/edit/delete
+    расходуют бюджет аккаунта (общий для всех его групп), upload — бюджет группы.
+    """
+    return AdaptiveRateLimiter(
+        ledger=RateLedger(RATE_LEDGER_DB),
+        key=rate_ledger_key(account),
+        group_key=rate_ledger_key(account, group_id),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_vk_token_manager() -> VkTokenManager:
+    """VK_ACCESS_TOKEN процесса: обновление заранее и одно обновление на все потоки и процессы."""
+    return VkTokenManager()
+
+
+@functools.lru_cache(maxsize=None)
+def get_upload_shaper() -> BandwidthShaper:
+    """Ограничение скорости отправки файлов (VK_UPLOAD_BANDWIDTH): одно на процесс, общее для всех слотов загрузки.
+
+    Raises:
+        FatalUploadError: Неверный профиль скорости.
+    """
+    spec = get_settings().vk.upload_bandwidth
+    try:
+        profile = parse_bandwidth_profile(spec)
+    except ValueError as e:
+        raise FatalUploadError(f"VK_UPLOAD_BANDWIDTH: {e}")
+    if profile:
+        logger.info("Ограничение скорости загрузки: %s", spec)
+    return BandwidthShaper(profile)
+
 
 class FatalUploadError(Exception):
     """Фатальная ошибка окружения/API при загрузке; вызывающий код должен записать summary и выйти с EXIT_FATAL."""
@@ -21,35 +80,71 @@ def get_vk_publisher(
     delay: float,
     max_retries: int = 3,
     group_id_required: bool = True,
-    on_token_expired: Optional[Callable[[], Optional[str]]] = None,
+    on_token_expired: Optional[Callable[[str], Optional[str]]] = None,
+    shared: bool = True,
+    channel: Optional[str] = None,
 ) -> VKPublisher:
-    """Создать VKPublisher из переменных окружения.
+    """VKPublisher из переменных окружения: общий для процесса (по токену и группе) или новый.
+
+    VK_ACCESS_TOKEN берётся через get_vk_token_manager(): если он скоро истекает, сначала обновляется.
 
     Args:
         delay: Задержка между запросами (сек).
         max_retries: Макс. повторов при ошибке.
         group_id_required: True для загрузки видео (нужен VK_GROUP_ID), False для delete/edit (только токен).
-        on_token_expired: Callback при истечении токена (обновление и возврат нового).
+        on_token_expired: Callback при истечении токена (получает истёкший токен, возвращает новый);
+            для назначения со своим токеном не используется — новый токен перечитывается из .env.
+        shared: True — вернуть публикатор процесса для токена и группы (создаётся при первом вызове);
+            False — отдельный публикатор со своей сессией.
+        channel: Канал записи: токен и группа берутся из его назначения (VK_DESTINATIONS);
+            None или канал без назначения — VK_ACCESS_TOKEN и VK_GROUP_ID.
 
     Returns:
         VKPublisher.
 
     Raises:
-        FatalUploadError: Нет токена, нет/неверный group_id (если group_id_required), VKPublisherError.
+        FatalUploadError: Нет токена, нет/неверный group_id (если group_id_required), неверный
+            VK_DESTINATIONS, VKPublisherError.
     """
-    access_token = get_env_var("VK_ACCESS_TOKEN")
+    try:
+        destination = resolve_vk_destination(channel)
+    except ValueError as e:
+        raise FatalUploadError(str(e))
+    if destination.token_env == DEFAULT_TOKEN_ENV:
+        access_token = get_vk_token_manager().token()
+    else:
+        access_token = get_env_var(destination.token_env)
     if not access_token:
-        raise FatalUploadError("VK_ACCESS_TOKEN не найден в .env файле")
+        raise FatalUploadError(f"{destination.token_env} не найден в .env файле")
+    if destination.own_token:
+        on_token_expired = _reread_token(destination)
 
     group_id: Optional[int] = None
     if group_id_required:
-        group_id_str = get_env_var("VK_GROUP_ID")
+        group_id_str = get_env_var(destination.group_id_env)
         if not group_id_str:
-            raise FatalUploadError("VK_GROUP_ID не найден в .env файле")
+            raise FatalUploadError(f"{destination.group_id_env} не найден в .env файле")
         try:
             group_id = int(group_id_str)
         except ValueError:
-            raise FatalUploadError(f"Неверный формат VK_GROUP_ID: {group_id_str}")
+            raise FatalUploadError(f"Неверный формат {destination.group_id_env}: {group_id_str}")
+
+    if shared:
+        with _publishers_lock:
+            publisher = _publishers.get((destination.token_env, group_id))
+            if publisher is not None:
+                publisher.delay_between_uploads = delay
+                publisher.max_retries = max_retries
+                publisher.on_token_expired = _bind_token_refresh(publisher, on_token_expired)
+        if publisher is not None:
+            # Токен обновили заранее или в другом процессе: сессия пересоздаётся, соединения остаются
+            if publisher.access_token != access_token:
+                publisher.update_token(access_token)
+            return publisher
+
+    # Докачка частями (VK_UPLOAD_RESUMABLE=0 — отправлять файл одним запросом);
+    # сверка хеша при отправке с videos.file_hash: off, flag (по умолчанию), abort
+    upload_settings = get_settings().vk
 
     if group_id is not None:
         logger.info(
@@ -57,12 +152,49 @@ def get_vk_publisher(
             group_id,
         )
     try:
-        return VKPublisher(
+        publisher = VKPublisher(
             access_token=access_token,
             group_id=group_id,
             delay_between_uploads=delay,
             max_retries=max_retries,
-            on_token_expired=on_token_expired,
+            rate_limiter=get_rate_limiter(destination.token_env, group_id),
+            upload_journal=UploadJournal(UPLOAD_JOURNAL_DB),
+            hash_check=upload_settings.upload_hash_check,
+            shaper=get_upload_shaper(),
+            account=destination.token_env,
+            resumable=upload_settings.upload_resumable,
+            token_source=get_vk_token_manager().token if destination.token_env == DEFAULT_TOKEN_ENV else None,
         )
     except VKPublisherError as e:
         raise FatalUploadError(str(e))
+    publisher.on_token_expired = _bind_token_refresh(publisher, on_token_expired)
+    if shared:
+        with _publishers_lock:
+            _publishers[(destination.token_env, group_id)] = publisher
+    return publisher
+
+
+def _reread_token(destination: VkDestination) -> Callable[[str], Optional[str]]:
+    """Callback истечения токена назначения: новый токен, если его уже обновили в .env."""
+
+    def refresh(stale_token: str) -> Optional[str]:
+        token = get_env_var(destination.token_env)
+        if token and token != stale_token:
+            return token
+        logger.warning("Токен %s истёк; обновите его в .env", destination.token_env)
+        return None
+
+    return refresh
+
+
+def _bind_token_refresh(
+    publisher: VKPublisher, on_token_expired: Optional[Callable[[str], Optional[str]]]
+) -> Optional[Callable[[], Optional[str]]]:
+    """Callback публикатора при ошибке 5: передаёт on_token_expired токен, с которым публикатор получил ошибку."""
+    if on_token_expired is None:
+        return None
+
+    def refresh() -> Optional[str]:
+        return on_token_expired(publisher.access_token)
+
+    return refresh
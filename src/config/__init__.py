@@ -1,6 +1,7 @@
 """Конфигурация и реестры (курсы, каналы, источники)."""
 
-from .registry import COURSE_TYPES, CHANNEL_TO_TITLE_GENERATOR
+from .registry import COURSE_TYPES, CHANNEL_TO_TITLE_GENERATOR, title_generator_name
+from .settings import Settings, get_settings, reload_settings
 from .source_registry import get_export_paths
 
-__all__ = ["COURSE_TYPES", "CHANNEL_TO_TITLE_GENERATOR", "get_export_paths"]
+__all__ = ["COURSE_TYPES", "CHANNEL_TO_TITLE_GENERATOR", "title_generator_name", "Settings", "get_settings", "reload_settings", "get_export_paths"]
@@ -14,3 +14,8 @@ CHANNEL_TO_TITLE_GENERATOR = {
     "Аналитика данных": "analytics",
     "Комлев": "komlev",
 }
+
+
+def title_generator_name(channel) -> str:
+    """Имя генератора по каналу записи (пробелы по краям не важны; без маппинга — simple)."""
+    return CHANNEL_TO_TITLE_GENERATOR.get((channel or "").strip()) or "simple"
@@ -0,0 +1,149 @@
+"""Типизированные настройки приложения: VK, Content Hub, выгрузки TG Parser, логирование.
+
+Значения берутся через get_env_var (окружение процесса → .env → config/config.yaml) и
+собираются в объект один раз. get_settings() возвращает тот же объект, пока не изменились
+.env и config.yaml (сверка mtime на каждом вызове — без чтения файлов); reload_settings()
+сбрасывает кеш явно.
+
+Токены и группы назначений VK (VK_ACCESS_TOKEN, VK_<KEY>_*) читаются в vk_destinations и
+app_context: имена переменных зависят от VK_DESTINATIONS.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..utils.env_utils import (
+    CONFIG_PATH_ENV,
+    DEFAULT_CONFIG_PATH,
+    PROJECT_ROOT,
+    get_env_var,
+    reload_env,
+)
+
+DEFAULT_LOG_LEVEL = "INFO"
+DEFAULT_LOG_FILE = "logs/publisher.log"
+
+
+@dataclass(frozen=True)
+class VkSettings:
+    """Загрузка в VK (общие для всех назначений)."""
+    upload_bandwidth: str = ""  # VK_UPLOAD_BANDWIDTH (профиль скорости, пусто — без ограничения)
+    upload_resumable: bool = True  # VK_UPLOAD_RESUMABLE
+    upload_hash_check: str = "flag"  # VK_UPLOAD_HASH_CHECK: off, flag, abort
+
+
+@dataclass(frozen=True)
+class ContentHubSettings:
+    """Canonical write в Content Hub."""
+    write_enabled: bool = False  # CONTENT_HUB_WRITE_ENABLED
+    write_dry_run: bool = False  # CONTENT_HUB_WRITE_DRY_RUN
+    write_strict: bool = False  # CONTENT_HUB_WRITE_STRICT
+    pg_dsn: Optional[str] = None  # CONTENT_HUB_PG_DSN или PGHOST/PGPORT/PGDATABASE/PGUSER/PGPASSWORD
+
+
+@dataclass(frozen=True)
+class TgParserSettings:
+    """Выгрузки TG Parser (scan -s tg_parser); None/пусто — значения по умолчанию source_registry."""
+    out_dir: Optional[Path] = None  # TG_PARSER_OUT_DIR (или TG_PARSER_OUT)
+    folders: tuple[str, ...] = ()  # TG_PARSER_FOLDERS, через запятую
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    level: str = DEFAULT_LOG_LEVEL  # LOG_LEVEL
+    file: Optional[str] = DEFAULT_LOG_FILE  # LOG_FILE; пусто — только консоль
+
+
+@dataclass(frozen=True)
+class Settings:
+    vk: VkSettings
+    content_hub: ContentHubSettings
+    tg_parser: TgParserSettings
+    logging: LoggingSettings
+
+
+def _flag(key: str, default: str = "0") -> bool:
+    return (get_env_var(key, default) or default).strip() == "1"
+
+
+def _pg_dsn() -> Optional[str]:
+    dsn = get_env_var("CONTENT_HUB_PG_DSN")
+    if dsn or not get_env_var("PGHOST"):
+        return dsn or None
+    host = get_env_var("PGHOST") or ""
+    port = get_env_var("PGPORT") or "5432"
+    dbname = get_env_var("PGDATABASE") or "Learn"
+    user = get_env_var("PGUSER") or ""
+    password = get_env_var("PGPASSWORD") or ""
+    if user and password:
+        return f"postgresql://{user}:{password}@{host}:{port}/{dbname}"
+    return f"postgresql://{host}:{port}/{dbname}"
+
+
+def load_settings() -> Settings:
+    """Собрать настройки из источников (без кеша объекта)."""
+    out_str = get_env_var("TG_PARSER_OUT_DIR") or get_env_var("TG_PARSER_OUT")
+    folders_str = get_env_var("TG_PARSER_FOLDERS") or ""
+    log_file = get_env_var("LOG_FILE", DEFAULT_LOG_FILE)
+    return Settings(
+        vk=VkSettings(
+            upload_bandwidth=(get_env_var("VK_UPLOAD_BANDWIDTH") or "").strip(),
+            upload_resumable=(get_env_var("VK_UPLOAD_RESUMABLE", "1") or "1").strip() != "0",
+            upload_hash_check=(get_env_var("VK_UPLOAD_HASH_CHECK", "flag") or "flag").strip().lower(),
+        ),
+        content_hub=ContentHubSettings(
+            write_enabled=_flag("CONTENT_HUB_WRITE_ENABLED"),
+            write_dry_run=_flag("CONTENT_HUB_WRITE_DRY_RUN"),
+            write_strict=_flag("CONTENT_HUB_WRITE_STRICT"),
+            pg_dsn=_pg_dsn(),
+        ),
+        tg_parser=TgParserSettings(
+            out_dir=Path(out_str) if out_str else None,
+            folders=tuple(s.strip() for s in folders_str.split(",") if s.strip()),
+        ),
+        logging=LoggingSettings(
+            level=(get_env_var("LOG_LEVEL") or DEFAULT_LOG_LEVEL).strip().upper(),
+            file=(log_file or "").strip() or None,
+        ),
+    )
+
+
+def _sources_signature() -> tuple:
+    """mtime и размер .env и config.yaml: изменение любого файла пересобирает настройки."""
+    config_path = Path(os.getenv(CONFIG_PATH_ENV) or DEFAULT_CONFIG_PATH)
+    signature = []
+    for path in (PROJECT_ROOT / ".env", config_path):
+        try:
+            st = path.stat()
+            signature.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+_settings: Optional[Settings] = None
+_settings_signature: Optional[tuple] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Настройки процесса (пересобираются при изменении .env или config.yaml)."""
+    global _settings, _settings_signature
+    signature = _sources_signature()
+    with _settings_lock:
+        if _settings is None or signature != _settings_signature:
+            _settings = load_settings()
+            _settings_signature = signature
+        return _settings
+
+
+def reload_settings() -> Settings:
+    """Перечитать .env и config.yaml и пересобрать настройки."""
+    global _settings
+    reload_env()
+    with _settings_lock:
+        _settings = None
+    return get_settings()
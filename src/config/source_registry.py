@@ -3,7 +3,7 @@
 from pathlib import Path
 from typing import List, Optional
 
-from ..utils.env_utils import get_env_var
+from .settings import get_settings
 
 # Базовый каталог источников и относительные пути алиасов (ege/python/oge)
 INPUT_DIR_DEFAULT = Path("input")
@@ -27,14 +27,10 @@ _DEFAULT_TG_PARSER_FOLDERS = [
 
 
 def _get_tg_parser_config() -> tuple[Path, List[str]]:
-    """Путь к out и список папок TG Parser из env или дефолты."""
-    out_str = get_env_var("TG_PARSER_OUT_DIR") or get_env_var("TG_PARSER_OUT")
-    out = Path(out_str) if out_str else _DEFAULT_TG_PARSER_OUT
-    folders_str = get_env_var("TG_PARSER_FOLDERS")
-    if folders_str:
-        folders = [s.strip() for s in folders_str.split(",") if s.strip()]
-    else:
-        folders = _DEFAULT_TG_PARSER_FOLDERS
+    """Путь к out и список папок TG Parser из настроек (TG_PARSER_OUT_DIR, TG_PARSER_FOLDERS) или дефолты."""
+    config = get_settings().tg_parser
+    out = config.out_dir or _DEFAULT_TG_PARSER_OUT
+    folders = list(config.folders) or _DEFAULT_TG_PARSER_FOLDERS
     return out, folders
 
 
@@ -0,0 +1,97 @@
+"""Реестр назначений загрузки VK: канал → токен, группа и число одновременных загрузок.
+
+Задаётся в .env:
+    VK_DESTINATIONS=ЕГЭ:EGE,ОГЭ:OGE,Python:PY
+    VK_EGE_GROUP_ID=111          # обязательно
+    VK_EGE_ACCESS_TOKEN=...      # по умолчанию VK_ACCESS_TOKEN
+    VK_EGE_CONCURRENCY=2         # загрузок одновременно в полосе назначения, по умолчанию --concurrency
+    VK_EGE_UPLOAD_WINDOW=01:00-07:00  # окно загрузок worker --schedule, по умолчанию --window
+    VK_EGE_DAILY_CAP=50          # загрузок в группу за сутки для worker --schedule, по умолчанию --daily-cap
+Несколько каналов могут ссылаться на один ключ (одна группа). Каналы без назначения
+загружаются в VK_GROUP_ID токеном VK_ACCESS_TOKEN (назначение default).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from ..utils.env_utils import get_env_var
+
+DEFAULT_DESTINATION = "default"
+DEFAULT_TOKEN_ENV = "VK_ACCESS_TOKEN"
+DEFAULT_GROUP_ID_ENV = "VK_GROUP_ID"
+
+_KEY_RE = re.compile(r"^[A-Z0-9_]+$")
+
+
+@dataclass(frozen=True)
+class VkDestination:
+    """Назначение загрузки: имена переменных .env с токеном и группой."""
+    key: str
+    token_env: str
+    group_id_env: str
+    concurrency: Optional[int] = None  # None — из опции --concurrency
+    upload_window: Optional[str] = None  # None — из опции worker --window
+    daily_cap: Optional[int] = None  # None — из опции worker --daily-cap
+
+    @property
+    def own_token(self) -> bool:
+        """Свой токен (не VK_ACCESS_TOKEN): scripts/refresh_vk_token.py его не обновляет."""
+        return self.token_env != DEFAULT_TOKEN_ENV
+
+
+DEFAULT_VK_DESTINATION = VkDestination(DEFAULT_DESTINATION, DEFAULT_TOKEN_ENV, DEFAULT_GROUP_ID_ENV)
+
+
+def _positive_int(name: str) -> Optional[int]:
+    value = get_env_var(name)
+    try:
+        number = int(value) if value else None
+    except ValueError:
+        raise ValueError(f"Неверный формат {name}: {value}")
+    if number is not None and number < 1:
+        raise ValueError(f"{name} должно быть >= 1")
+    return number
+
+
+def _destination(key: str) -> VkDestination:
+    token_env = f"VK_{key}_ACCESS_TOKEN"
+    return VkDestination(
+        key=key,
+        token_env=token_env if get_env_var(token_env) else DEFAULT_TOKEN_ENV,
+        group_id_env=f"VK_{key}_GROUP_ID",
+        concurrency=_positive_int(f"VK_{key}_CONCURRENCY"),
+        upload_window=get_env_var(f"VK_{key}_UPLOAD_WINDOW") or None,
+        daily_cap=_positive_int(f"VK_{key}_DAILY_CAP"),
+    )
+
+
+def load_vk_destinations() -> dict[str, VkDestination]:
+    """Назначения по каналам из VK_DESTINATIONS (пусто — все каналы в назначение default).
+
+    Raises:
+        ValueError: Неверный формат VK_DESTINATIONS или параметров назначения.
+    """
+    spec = (get_env_var("VK_DESTINATIONS") or "").strip()
+    destinations: dict[str, VkDestination] = {}
+    by_key: dict[str, VkDestination] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        channel, sep, key = part.rpartition(":")
+        channel, key = channel.strip(), key.strip().upper()
+        if not sep or not channel or not _KEY_RE.match(key):
+            raise ValueError(f"Неверный элемент VK_DESTINATIONS: {part!r} (пример: ЕГЭ:EGE)")
+        if key not in by_key:
+            by_key[key] = _destination(key)
+        destinations[channel] = by_key[key]
+    return destinations
+
+
+def resolve_vk_destination(channel: Optional[str]) -> VkDestination:
+    """Назначение для канала записи (без назначения в реестре — default).
+
+    Raises:
+        ValueError: Неверный формат VK_DESTINATIONS.
+    """
+    if not channel:
+        return DEFAULT_VK_DESTINATION
+    return load_vk_destinations().get(channel.strip(), DEFAULT_VK_DESTINATION)
@@ -1,5 +1,11 @@
-# Canonical write-path через content_hub_client (P2B). Локального SQL/DAO нет.
+# Canonical write-path через content_hub_client (P2B). Локального SQL/DAO нет; события ждут отправки в outbox.
 
-from .adapter import write_canonical_if_enabled
+from .adapter import publication_event, write_canonical_if_enabled
+from .backfill import run_backfill
+from .outbox import ContentHubFlusher, client_available, create_client, get_flusher, retry_delay
 
-__all__ = ["write_canonical_if_enabled"]
+__all__ = [
+    "write_canonical_if_enabled", "publication_event",
+    "ContentHubFlusher", "client_available", "create_client", "get_flusher", "retry_delay",
+    "run_backfill",
+]
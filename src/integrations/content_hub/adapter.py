@@ -1,51 +1,28 @@
-"""Доменный адаптер: маппинг PublicationResult + VideoRecord -> payload content_hub_client и вызов клиента.
+"""Доменный адаптер: маппинг PublicationResult + VideoRecord -> событие outbox canonical write.
 
-Весь canonical write выполняется только через content_hub_client (ContentBackbone).
-Прямого SQL и локального DAO в VK_Importer нет.
+Весь canonical write выполняется только через content_hub_client (ContentBackbone): путь
+загрузки добавляет событие в локальный outbox (videos.db), в Content Hub его отправляет
+ContentHubFlusher (outbox.py). Прямого SQL в Content Hub и локального DAO в VK_Importer нет.
 """
 
 import logging
-import os
-import uuid
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Optional
 
 from src.storage.database import VideoRecord
+from src.storage.content_hub_outbox import ContentHubOutbox
 from src.models.content import PublicationResult
-from src.utils.env_utils import get_env_var
+from src.config.settings import get_settings
+
+from .outbox import client_available, get_flusher
 
 logger = logging.getLogger(__name__)
 
-# Импорт клиента — опционален; при отсутствии модуля canonical write отключается
-try:
-    from content_hub_client.client import ContentHubClient
-    from content_hub_client.contracts import LinkMapPayload, PublicationPayload
-    _CLIENT_AVAILABLE = True
-except ImportError:
-    ContentHubClient = None  # type: ignore
-    LinkMapPayload = None  # type: ignore
-    PublicationPayload = None  # type: ignore
-    _CLIENT_AVAILABLE = False
-
-
-def _config_from_env(env_path: Optional[Path] = None) -> tuple[bool, bool, bool, Optional[str]]:
-    """(enabled, dry_run, strict, dsn)."""
-    enabled = (get_env_var("CONTENT_HUB_WRITE_ENABLED", "0", env_path) or "0").strip() == "1"
-    dry_run = (get_env_var("CONTENT_HUB_WRITE_DRY_RUN", "0", env_path) or "0").strip() == "1"
-    strict = (get_env_var("CONTENT_HUB_WRITE_STRICT", "0", env_path) or "0").strip() == "1"
-    dsn = get_env_var("CONTENT_HUB_PG_DSN", env_path=env_path)
-    if not dsn and (get_env_var("PGHOST", env_path=env_path) or os.getenv("PGHOST")):
-        host = get_env_var("PGHOST", env_path=env_path) or os.getenv("PGHOST", "")
-        port = get_env_var("PGPORT", env_path=env_path) or os.getenv("PGPORT", "5432")
-        dbname = get_env_var("PGDATABASE", env_path=env_path) or os.getenv("PGDATABASE", "Learn")
-        user = get_env_var("PGUSER", env_path=env_path) or os.getenv("PGUSER", "")
-        password = get_env_var("PGPASSWORD", env_path=env_path) or os.getenv("PGPASSWORD", "")
-        if user and password:
-            dsn = f"postgresql://{user}:{password}@{host}:{port}/{dbname}"
-        else:
-            dsn = f"postgresql://{host}:{port}/{dbname}" if host else None
-    return enabled, dry_run, strict, dsn
+
+def _config_from_env() -> tuple[bool, bool, bool, Optional[str]]:
+    """(enabled, dry_run, strict, dsn) из настроек процесса (get_settings: .env читается один раз)."""
+    config = get_settings().content_hub
+    return config.write_enabled, config.write_dry_run, config.write_strict, config.pg_dsn
 
 
 def _global_uid(record: VideoRecord) -> str:
@@ -70,115 +47,67 @@ def _remote_id_from_vk_url(remote_url: Optional[str]) -> Optional[str]:
     return f"{oid}_{vid}"
 
 
+def publication_event(
+    record: VideoRecord, result: PublicationResult, published_at: Optional[datetime] = None
+) -> tuple[str, str, dict]:
+    """(global_uid, destination, payload) события outbox для результата публикации.
+
+    published_at — время публикации (naive — локальное, как videos.upload_date); по умолчанию сейчас.
+    """
+    global_uid = _global_uid(record)
+    destination = result.destination or "vk"
+    remote_url = result.remote_url if result.ok else None
+    remote_id = _remote_id_from_vk_url(remote_url) if remote_url else None
+    publication = {
+        "global_uid": global_uid,
+        "destination": destination,
+        "remote_id": remote_id,
+        "remote_url": remote_url,
+        "published_at": (published_at or datetime.now()).astimezone(timezone.utc).isoformat() if result.ok else None,
+        "status": "published" if result.ok else "failed",
+        "error": result.error_code if not result.ok else None,
+    }
+    # link_map только при успешной публикации в VK, иначе связь перезапишется на NULL
+    payload = {"publication": publication, "link_map": bool(result.ok and (remote_url or remote_id))}
+    return global_uid, destination, payload
+
+
 def write_canonical_if_enabled(record: VideoRecord, result: PublicationResult) -> None:
-    """Post-publish: при CONTENT_HUB_WRITE_ENABLED=1 вызвать content_hub_client (upsert publication + link_map).
+    """Post-publish: при CONTENT_HUB_WRITE_ENABLED=1 добавить событие в outbox и разбудить flusher.
 
-    При сбое: лог и при CONTENT_HUB_WRITE_STRICT=1 — проброс исключения.
-    Если модуль content_hub_client недоступен — warning и выход без записи.
+    Загрузка не ждёт Postgres: upsert publication + link_map выполняет ContentHubFlusher в фоне
+    (или content-hub-flush). Без content_hub_client или DSN событие остаётся в outbox до
+    появления настроек; при CONTENT_HUB_WRITE_STRICT=1 — исключение, как раньше.
     """
     enabled, dry_run, strict, dsn = _config_from_env()
     if not enabled:
         return
 
-    if not _CLIENT_AVAILABLE:
+    if not client_available():
         logger.warning(
-            "content_hub_client недоступен (PYTHONPATH?): canonical write пропущен. "
+            "content_hub_client недоступен (PYTHONPATH?): canonical write остаётся в outbox. "
             "Добавьте корень ContentBackbone в PYTHONPATH."
         )
         if strict:
             raise RuntimeError("content_hub_client недоступен при CONTENT_HUB_WRITE_STRICT=1")
-        return
-
-    if not dsn:
-        logger.warning("CONTENT_HUB_PG_DSN не задан: canonical write пропущен.")
+    elif not dsn:
+        logger.warning("CONTENT_HUB_PG_DSN не задан: canonical write остаётся в outbox.")
         if strict:
             raise ValueError("CONTENT_HUB_PG_DSN не задан при CONTENT_HUB_WRITE_STRICT=1")
-        return
-
-    global_uid = _global_uid(record)
-    destination = result.destination or "vk"
-    status = "published" if result.ok else "failed"
-    error = result.error_code if not result.ok else None
-    remote_url = result.remote_url if result.ok else None
-    remote_id = _remote_id_from_vk_url(remote_url) if remote_url else None
-    published_at: Optional[str] = None
-    if result.ok:
-        published_at = datetime.now(timezone.utc).isoformat()
-
-    pub = PublicationPayload(
-        global_uid=global_uid,
-        destination=destination,
-        remote_id=remote_id,
-        remote_url=remote_url,
-        published_at=published_at,
-        status=status,
-        error=error,
-    )
-    run_id = str(uuid.uuid4())[:8]
-    client = ContentHubClient(dsn, dry_run=dry_run, logger=logger, run_id=run_id)
-
-    # Structured log до операций (run_id, global_uid, destination, status, dry_run)
-    logger.info(
-        "content_hub canonical write start",
-        extra={
-            "run_id": run_id,
-            "global_uid": global_uid,
-            "destination": destination,
-            "status": status,
-            "error_class": None,
-            "dry_run": dry_run,
-        },
-    )
 
+    global_uid, destination, payload = publication_event(record, result)
     try:
-        r1 = client.upsert_publication(pub)
-        logger.info(
-            "content_hub canonical write publication",
-            extra={
-                "run_id": run_id,
-                "global_uid": global_uid,
-                "destination": destination,
-                "status": r1.status,
-                "error_class": r1.error_class,
-                "dry_run": dry_run,
-                "ok": r1.ok,
-            },
-        )
-        if not r1.ok and strict:
-            raise RuntimeError(f"content_hub_client upsert_publication failed: {r1.error_message}")
-        if not r1.ok:
-            logger.warning("content_hub_client upsert_publication failed: %s", r1.error_message)
-
-        # link_map пишем только если publication записалась (r1.ok) и публикация в VK успешна (result.ok), иначе возможна частичная запись link_map при неуспешной publication
-        if r1.ok and result.ok and (remote_url or remote_id):
-            link = LinkMapPayload(
-                source_global_uid=global_uid,
-                destination=destination,
-                remote_id=remote_id,
-                remote_url=remote_url,
-            )
-            r2 = client.upsert_link_map(link)
-            logger.info(
-                "content_hub canonical write link_map",
-                extra={
-                    "run_id": run_id,
-                    "global_uid": global_uid,
-                    "destination": destination,
-                    "status": r2.status,
-                    "error_class": r2.error_class,
-                    "dry_run": dry_run,
-                    "ok": r2.ok,
-                },
-            )
-            if not r2.ok and strict:
-                raise RuntimeError(f"content_hub_client upsert_link_map failed: {r2.error_message}")
-            if not r2.ok:
-                logger.warning("content_hub_client upsert_link_map failed: %s", r2.error_message)
+        ContentHubOutbox().append(global_uid, destination, payload)
     except Exception as e:
         logger.warning(
-            "Content Hub canonical write failed (upload не отменён): %s", e,
+            "Content Hub canonical write: не удалось добавить событие в outbox (upload не отменён): %s", e,
             exc_info=True,
-            extra={"run_id": run_id, "global_uid": global_uid, "destination": destination, "dry_run": dry_run},
+            extra={"global_uid": global_uid, "destination": destination, "dry_run": dry_run},
         )
         if strict:
             raise
+        return
+
+    flusher = get_flusher()
+    if flusher is not None:
+        flusher.notify()
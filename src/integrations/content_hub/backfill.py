@@ -0,0 +1,137 @@
+"""Backfill Content Hub: загруженные до включения canonical write записи videos -> publication и link_map.
+
+Записи читаются из videos пачками по id (uploaded=1 и есть video_url) и переводятся в payload
+тем же маппингом, что и outbox (publication_event). Пачка пишется через один ContentHubClient:
+одним вызовом upsert_publications / upsert_link_maps, если клиент их поддерживает, иначе
+построчно в том же соединении. После записанной пачки сдвигается checkpoint
+(storage.canonical_backfill), повторный запуск продолжает с него; upsert идемпотентен, поэтому
+пачку, прерванную посередине, можно записать заново.
+"""
+
+import logging
+from typing import Callable, Iterator, Optional
+
+from src.models.content import PublicationResult
+from src.storage.canonical_backfill import BackfillCheckpoint
+from src.storage.database import VideoRecord, VideoStorage
+
+from .adapter import publication_event
+from .outbox import LinkMapPayload, PublicationPayload
+
+logger = logging.getLogger(__name__)
+
+# Записей videos в одной пачке backfill
+BACKFILL_BATCH_SIZE = 500
+
+BACKFILL_DESTINATION = "vk"
+
+
+def backfill_payloads(records: list[VideoRecord]) -> tuple[list[dict], list[dict]]:
+    """(publications, link_maps) — поля PublicationPayload и LinkMapPayload для загруженных записей."""
+    publications: list[dict] = []
+    link_maps: list[dict] = []
+    for record in records:
+        result = PublicationResult(destination=BACKFILL_DESTINATION, ok=True, remote_url=record.video_url)
+        _, _, payload = publication_event(record, result, published_at=record.upload_date)
+        publication = payload["publication"]
+        publications.append(publication)
+        if payload["link_map"]:
+            link_maps.append({
+                "source_global_uid": publication["global_uid"],
+                "destination": publication["destination"],
+                "remote_id": publication["remote_id"],
+                "remote_url": publication["remote_url"],
+            })
+    return publications, link_maps
+
+
+def iter_backfill_batches(
+    storage: VideoStorage, after_id: int, batch_size: int = BACKFILL_BATCH_SIZE
+) -> Iterator[list[VideoRecord]]:
+    """Пачки загруженных записей с id > after_id (в памяти — одна пачка)."""
+    while True:
+        records = storage.get_uploaded_after(after_id, batch_size)
+        if not records:
+            return
+        yield records
+        after_id = records[-1].id
+
+
+def _upsert_batch(client, many: str, one: str, payloads: list) -> Optional[str]:
+    """Записать пачку: client.<many>(payloads) или построчно client.<one>. None — успех, иначе текст ошибки."""
+    if not payloads:
+        return None
+    upsert_many = getattr(client, many, None)
+    if upsert_many is not None:
+        result = upsert_many(payloads)
+        return None if result.ok else f"{many} failed: {result.error_message}"
+    upsert_one = getattr(client, one)
+    for payload in payloads:
+        result = upsert_one(payload)
+        if not result.ok:
+            return f"{one} failed: {result.error_message}"
+    return None
+
+
+def run_backfill(
+    storage: VideoStorage,
+    checkpoint: BackfillCheckpoint,
+    client=None,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    save_checkpoint: bool = True,
+    on_batch: Optional[Callable[[dict], None]] = None,
+    after_id: Optional[int] = None,
+) -> dict:
+    """Записать загруженные записи после checkpoint в Content Hub.
+
+    Args:
+        client: ContentHubClient; None — dry-run: только счётчики, без записи и без сдвига checkpoint.
+        save_checkpoint: Сдвигать checkpoint после пачки (False — при dry-run клиента).
+        on_batch: Вызывается после каждой пачки с текущими счётчиками.
+        after_id: Начать с id > after_id (None — с checkpoint).
+
+    Returns:
+        {"resumed_from", "last_id", "batches", "records", "publications", "link_maps",
+         "without_remote_id", "error"} — error: None или текст ошибки пачки, на которой backfill остановлен.
+    """
+    resumed_from = checkpoint.last_id(BACKFILL_DESTINATION) if after_id is None else after_id
+    stats = {
+        "resumed_from": resumed_from,
+        "last_id": resumed_from,
+        "batches": 0,
+        "records": 0,
+        "publications": 0,
+        "link_maps": 0,
+        "without_remote_id": 0,
+        "error": None,
+    }
+    for records in iter_backfill_batches(storage, resumed_from, batch_size):
+        publications, link_maps = backfill_payloads(records)
+        if client is not None:
+            try:
+                error = _upsert_batch(
+                    client, "upsert_publications", "upsert_publication",
+                    [PublicationPayload(**p) for p in publications],
+                )
+                if error is None:
+                    error = _upsert_batch(
+                        client, "upsert_link_maps", "upsert_link_map",
+                        [LinkMapPayload(**link) for link in link_maps],
+                    )
+            except Exception as e:
+                logger.warning("Content Hub backfill: пачка после id %s: %s", stats["last_id"], e, exc_info=True)
+                error = f"{type(e).__name__}: {e}"
+            if error is not None:
+                stats["error"] = error
+                break
+            if save_checkpoint:
+                checkpoint.save(BACKFILL_DESTINATION, records[-1].id, len(records))
+        stats["last_id"] = records[-1].id
+        stats["batches"] += 1
+        stats["records"] += len(records)
+        stats["publications"] += len(publications)
+        stats["link_maps"] += len(link_maps)
+        stats["without_remote_id"] += sum(1 for p in publications if not p["remote_id"])
+        if on_batch is not None:
+            on_batch(stats)
+    return stats
@@ -0,0 +1,234 @@
+"""Отправка outbox canonical write в Content Hub: фоновый ContentHubFlusher и content-hub-flush.
+
+Событие outbox (storage.content_hub_outbox) — payload PublicationPayload и признак link_map.
+Flusher держит один ContentHubClient (одно соединение с Postgres) на все пачки; после
+исключения клиента flush прерывается, соединение пересоздаётся при следующем. Неудачное событие
+откладывается: 30 с, 1 мин, 2 мин … до 1 ч.
+"""
+
+import atexit
+import logging
+import threading
+import uuid
+from typing import Optional
+
+from src.config.settings import get_settings
+from src.storage.content_hub_outbox import ContentHubOutbox, OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Импорт клиента — опционален; при отсутствии модуля события остаются в outbox
+try:
+    from content_hub_client.client import ContentHubClient
+    from content_hub_client.contracts import LinkMapPayload, PublicationPayload
+    _CLIENT_AVAILABLE = True
+except ImportError:
+    ContentHubClient = None  # type: ignore
+    LinkMapPayload = None  # type: ignore
+    PublicationPayload = None  # type: ignore
+    _CLIENT_AVAILABLE = False
+
+# Событий за одну выборку из outbox
+OUTBOX_BATCH_SIZE = 50
+
+# Фоновый flusher просыпается при новом событии или раз в N секунд (отложенные повторы)
+FLUSH_INTERVAL_SEC = 30.0
+
+# Пауза перед повтором: BACKOFF_BASE_SEC * 2^(попытка), не больше BACKOFF_MAX_SEC
+BACKOFF_BASE_SEC = 30.0
+BACKOFF_MAX_SEC = 3600.0
+
+
+def client_available() -> bool:
+    """Модуль content_hub_client импортирован."""
+    return _CLIENT_AVAILABLE
+
+
+def create_client(dsn: str, dry_run: bool = False, run_id: Optional[str] = None):
+    """ContentHubClient (одно соединение с Postgres) с логгером модуля."""
+    return ContentHubClient(dsn, dry_run=dry_run, logger=logger, run_id=run_id or str(uuid.uuid4())[:8])
+
+
+def retry_delay(attempts: int) -> float:
+    """Пауза перед следующей попыткой после attempts неудачных."""
+    return min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** min(attempts, 16)))
+
+
+class ContentHubFlusher:
+    """Отправка событий outbox пачками через один клиент; фоновый поток запускается notify()."""
+
+    def __init__(
+        self,
+        outbox: ContentHubOutbox,
+        dsn: str,
+        dry_run: bool = False,
+        strict: bool = False,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        interval: float = FLUSH_INTERVAL_SEC,
+    ):
+        self.outbox = outbox
+        self.dsn = dsn
+        self.dry_run = dry_run
+        self.strict = strict
+        self.batch_size = batch_size
+        self.interval = interval
+        self.run_id = str(uuid.uuid4())[:8]
+        self._client = None
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = create_client(self.dsn, dry_run=self.dry_run, run_id=self.run_id)
+        return self._client
+
+    def _drop_client(self) -> None:
+        client, self._client = self._client, None
+        close = getattr(client, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.debug("content_hub client close: %s", e)
+
+    def _log(self, message: str, event: OutboxEvent, status: str, result=None) -> None:
+        logger.info(
+            message,
+            extra={
+                "run_id": self.run_id,
+                "global_uid": event.global_uid,
+                "destination": event.destination,
+                "status": result.status if result is not None else status,
+                "error_class": result.error_class if result is not None else None,
+                "dry_run": self.dry_run,
+                "ok": result.ok if result is not None else None,
+            },
+        )
+
+    def _apply(self, event: OutboxEvent) -> Optional[str]:
+        """Отправить событие. Возвращает None при успехе или текст ошибки."""
+        payload = event.payload()
+        publication = payload.get("publication") or {}
+        client = self._get_client()
+        self._log("content_hub canonical write start", event, publication.get("status", ""))
+        r1 = client.upsert_publication(PublicationPayload(**publication))
+        self._log("content_hub canonical write publication", event, "", r1)
+        if not r1.ok:
+            return f"upsert_publication failed: {r1.error_message}"
+        # link_map только при успешной публикации в VK (есть remote_url/remote_id), иначе связь перезапишется на NULL
+        if payload.get("link_map"):
+            link = LinkMapPayload(
+                source_global_uid=publication["global_uid"],
+                destination=publication["destination"],
+                remote_id=publication.get("remote_id"),
+                remote_url=publication.get("remote_url"),
+            )
+            r2 = client.upsert_link_map(link)
+            self._log("content_hub canonical write link_map", event, "", r2)
+            if not r2.ok:
+                return f"upsert_link_map failed: {r2.error_message}"
+        return None
+
+    def flush(self, ignore_backoff: bool = False) -> dict:
+        """Отправить все события, которые пора отправить (ignore_backoff — и отложенные).
+
+        Returns:
+            {"written": N, "failed": N}.
+        """
+        written = failed = 0
+        with self._flush_lock:
+            after_id = 0
+            while True:
+                events = self.outbox.due(self.batch_size, ignore_backoff=ignore_backoff, after_id=after_id)
+                if not events:
+                    break
+                done: list[int] = []
+                broken = False
+                for event in events:
+                    after_id = event.id
+                    try:
+                        error = self._apply(event)
+                    except Exception as e:
+                        # Соединение могло оборваться: остальные события ждут следующего flush с новым клиентом
+                        self._drop_client()
+                        error = f"{type(e).__name__}: {e}"
+                        broken = True
+                    if error is None:
+                        done.append(event.id)
+                        continue
+                    failed += 1
+                    self._retry_later(event, error)
+                    if broken:
+                        break
+                self.outbox.delete(done)
+                written += len(done)
+                if broken:
+                    break
+        return {"written": written, "failed": failed}
+
+    def _retry_later(self, event: OutboxEvent, error: str) -> None:
+        delay = retry_delay(event.attempts)
+        self.outbox.retry_later(event.id, error, delay)
+        log = logger.error if self.strict else logger.warning
+        log(
+            "Content Hub canonical write отложен на %.0f с (%s, попытка %s): %s",
+            delay, event.global_uid, event.attempts + 1, error,
+        )
+
+    def notify(self) -> None:
+        """Появилось событие: разбудить фоновый поток (при первом вызове — запустить)."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="content-hub-flusher", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Content Hub flusher: %s", e, exc_info=True)
+
+    def close(self) -> None:
+        """Остановить фоновый поток, отправить оставшиеся события и закрыть клиент."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning("Content Hub flusher: %s", e, exc_info=True)
+        self._drop_client()
+
+
+_flushers: dict[tuple[str, bool], ContentHubFlusher] = {}
+_flushers_lock = threading.Lock()
+
+
+def get_flusher(outbox: Optional[ContentHubOutbox] = None) -> Optional[ContentHubFlusher]:
+    """Flusher процесса для DSN из настроек (None — клиент недоступен или DSN не задан).
+
+    При выходе из процесса оставшиеся события отправляются (atexit).
+    """
+    config = get_settings().content_hub
+    if not _CLIENT_AVAILABLE or not config.pg_dsn:
+        return None
+    key = (config.pg_dsn, config.write_dry_run)
+    with _flushers_lock:
+        flusher = _flushers.get(key)
+        if flusher is None:
+            flusher = ContentHubFlusher(
+                outbox or ContentHubOutbox(), config.pg_dsn, dry_run=config.write_dry_run, strict=config.write_strict
+            )
+            _flushers[key] = flusher
+            atexit.register(flusher.close)
+    return flusher
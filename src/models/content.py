@@ -52,8 +52,9 @@ class ContentItem:
         source_folder: str = "",
         date: Optional[datetime] = None,
         record_id: Optional[int] = None,
+        file_hash: Optional[str] = None,
     ) -> "ContentItem":
-        """Собрать ContentItem из полей VideoRecord (для публикации из БД)."""
+        """Собрать ContentItem из полей VideoRecord (для публикации из БД). file_hash — для сверки при загрузке."""
         path = Path(file_path)
         return cls(
             source=source_folder or "unknown",
@@ -62,7 +63,7 @@ class ContentItem:
             text=description or "",
             published_at=date,
             media=[MediaRef(type="video", path=path)] if path.exists() else [],
-            metadata={"channel": channel, "source_folder": source_folder},
+            metadata={"channel": channel, "source_folder": source_folder, "file_hash": file_hash},
         )
 
     @classmethod
@@ -1,6 +1,6 @@
 """Модель данных для видео."""
 
-from dataclasses import dataclass
+from dataclasses import InitVar, dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -16,6 +16,7 @@ class VideoData:
         description: Описание видео (текст сообщения).
         date: Дата видео.
         channel: Название канала (опционально).
+        check_exists: Проверять существование файла (False — для данных из БД/пакетной генерации заголовков).
     """
     
     file_path: Path
@@ -23,11 +24,12 @@ class VideoData:
     description: str
     date: Optional[datetime] = None
     channel: Optional[str] = None
+    check_exists: InitVar[bool] = True
     
-    def __post_init__(self):
+    def __post_init__(self, check_exists: bool):
         """Валидация данных после инициализации."""
         if not isinstance(self.file_path, Path):
             self.file_path = Path(self.file_path)
         
-        if not self.file_path.exists():
+        if check_exists and not self.file_path.exists():
             raise ValueError(f"Видеофайл не существует: {self.file_path}")
@@ -0,0 +1,166 @@
+"""Ограничение скорости отправки файлов на upload-серверы VK (token bucket) и учёт пропускной способности.
+
+Один BandwidthShaper на процесс (app_context.get_upload_shaper): его получают все публикаторы,
+в т.ч. слоты параллельной загрузки, — ограничение действует на суммарную скорость. Потоки
+тела загрузки (streaming_upload) вызывают throttle() на каждый отданный блок файла.
+
+Профиль скорости — VK_UPLOAD_BANDWIDTH в .env:
+    "4M"                              — 4 МБ/с круглые сутки;
+    "08:00-20:00=2M,20:00-08:00=0"    — днём 2 МБ/с, ночью без ограничения (0).
+Время — локальное; интервал может переходить через полночь; вне интервалов скорость не ограничена.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Множители суффиксов размера (двоичные: 1K = 1024 байт)
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+# Объём «разгона» корзины: сколько секунд скорости можно отправить без ожидания
+BURST_SECONDS = 1.0
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+_WINDOW_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+?)\s*$")
+
+# Интервал профиля: (начало, конец) в минутах от полуночи, скорость (байт/с, 0 — без ограничения)
+BandwidthWindow = Tuple[int, int, int]
+
+
+def parse_size(value: str) -> int:
+    """Размер из строки: "50G", "1.5M", "800K", "1000", "2GB" (суффиксы двоичные).
+
+    Raises:
+        ValueError: Неверный формат.
+    """
+    m = _SIZE_RE.match(value or "")
+    if not m:
+        raise ValueError(f"Неверный размер: {value!r} (пример: 50G, 500M, 800K)")
+    return int(float(m.group(1)) * SIZE_UNITS[m.group(2).upper()])
+
+
+def parse_bandwidth_profile(spec: str) -> List[BandwidthWindow]:
+    """Профиль скорости из строки VK_UPLOAD_BANDWIDTH (см. описание модуля). Пустая строка — без ограничения.
+
+    Raises:
+        ValueError: Неверный формат.
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return []
+    if "=" not in spec:
+        return [(0, 24 * 60, parse_size(spec))]
+    windows = []
+    for part in spec.split(","):
+        m = _WINDOW_RE.match(part)
+        if not m:
+            raise ValueError(f"Неверный интервал профиля скорости: {part!r} (пример: 08:00-20:00=2M)")
+        h1, m1, h2, m2 = (int(g) for g in m.groups()[:4])
+        if h1 > 24 or h2 > 24 or m1 > 59 or m2 > 59:
+            raise ValueError(f"Неверное время в интервале: {part!r}")
+        windows.append((h1 * 60 + m1, h2 * 60 + m2, parse_size(m.group(5))))
+    return windows
+
+
+def format_size(value: float) -> str:
+    """Размер для вывода: 1.5 GB, 300.0 MB."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+class BandwidthShaper:
+    """Token bucket по байтам файла, общий для всех потоков загрузки процесса.
+
+    Также считает отправленные байты и время, когда шла хотя бы одна отправка
+    (для пропускной способности в last_summary.json).
+    """
+
+    def __init__(
+        self,
+        profile: Optional[List[BandwidthWindow]] = None,
+        burst_seconds: float = BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            profile: Интервалы скорости по времени суток (parse_bandwidth_profile); пусто — без ограничения.
+            burst_seconds: Объём корзины в секундах текущей скорости.
+            clock, now, sleep: Часы (монотонные и локальное время) и ожидание.
+        """
+        self.profile = profile or []
+        self.burst_seconds = burst_seconds
+        self._clock = clock
+        self._now = now
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._refilled_at = clock()
+        self._active = 0
+        self._active_since = 0.0
+        self._active_total = 0.0
+        self.bytes_sent = 0
+
+    def rate(self) -> int:
+        """Текущая скорость (байт/с) по профилю; 0 — без ограничения."""
+        if not self.profile:
+            return 0
+        now = self._now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.profile:
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return rate
+        return 0
+
+    def throttle(self, nbytes: int) -> None:
+        """Учесть nbytes отправленных байт; при ограничении скорости подождать."""
+        rate = self.rate()
+        with self._lock:
+            self.bytes_sent += nbytes
+            now = self._clock()
+            if not rate:
+                self._refilled_at = now
+                return
+            capacity = rate * self.burst_seconds
+            self._tokens = min(capacity, self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            # Долг корзины резервирует время: параллельные слоты ждут по очереди
+            self._tokens -= nbytes
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+
+    def begin(self) -> None:
+        """Началась отправка тела запроса."""
+        with self._lock:
+            if self._active == 0:
+                self._active_since = self._clock()
+            self._active += 1
+
+    def end(self) -> None:
+        """Отправка тела запроса завершена."""
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._active_total += self._clock() - self._active_since
+
+    def stats(self) -> dict:
+        """Отправлено байт, время отправки (сек) и средняя скорость (байт/с) с начала процесса."""
+        with self._lock:
+            active = self._active_total + (self._clock() - self._active_since if self._active else 0.0)
+            sent = self.bytes_sent
+        return {
+            "bytes_sent": sent,
+            "transfer_sec": round(active, 2),
+            "throughput_bytes_per_sec": int(sent / active) if active > 0 else 0,
+        }
@@ -0,0 +1,219 @@
+"""Адаптивный лимит частоты вызовов VK API: token bucket на семейство методов.
+
+Семейства: upload (загрузка видео), edit (video.edit), delete (video.delete), get (чтение).
+Ошибки VK 6/9/10 уменьшают скорость семейства в backoff раз (с jitter) и ставят паузу;
+после серии успешных вызовов скорость растёт на фиксированный шаг (AIMD). Выученные
+скорости сохраняются в JSON и подхватываются следующим запуском.
+
+С ledger (storage.rate_ledger.RateLedger) состояние ведер хранится в SQLite и общее
+для всех процессов с тем же аккаунтом (переменной токена): воркеры делят один бюджет запросов. Ведро upload
+(GROUP_FAMILIES) — своё у каждой группы токена.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+FAMILY_UPLOAD = "upload"
+FAMILY_EDIT = "edit"
+FAMILY_DELETE = "delete"
+FAMILY_GET = "get"
+
+# Семейства с бюджетом на группу (ключ group_key); остальные — общий бюджет аккаунта (key)
+GROUP_FAMILIES = frozenset({FAMILY_UPLOAD})
+
+# Коды VK API, означающие «слишком часто»: 6 — запросов в секунду, 9 — flood control, 10 — перегрузка сервера
+THROTTLE_ERROR_CODES = frozenset({6, 9, 10})
+
+
+@dataclass(frozen=True)
+class FamilyLimits:
+    """Параметры семейства методов (скорости — вызовов в секунду).
+
+    Attributes:
+        rate: Начальная скорость (если нет сохранённой).
+        min_rate: Нижняя граница при backoff.
+        max_rate: Верхняя граница при росте.
+        burst: Ёмкость ведра (сколько вызовов подряд без ожидания).
+        step: Прибавка скорости после success_streak успехов подряд.
+    """
+
+    rate: float
+    min_rate: float
+    max_rate: float
+    burst: float = 1.0
+    step: float = 0.0
+
+
+# Лимиты по умолчанию: VK допускает ~3 запроса/с на токен; загрузка и правка видео — заметно реже
+DEFAULT_LIMITS: Dict[str, FamilyLimits] = {
+    FAMILY_GET: FamilyLimits(rate=3.0, min_rate=0.2, max_rate=3.0, burst=3.0, step=0.25),
+    FAMILY_EDIT: FamilyLimits(rate=0.5, min_rate=1 / 60, max_rate=1.0, step=0.05),
+    FAMILY_DELETE: FamilyLimits(rate=0.5, min_rate=1 / 60, max_rate=1.0, step=0.05),
+    FAMILY_UPLOAD: FamilyLimits(rate=0.2, min_rate=1 / 300, max_rate=0.5, step=0.02),
+}
+
+
+class _Bucket:
+    def __init__(self, limits: FamilyLimits, rate: float, now: float):
+        self.limits = limits
+        self.rate = min(max(rate, limits.min_rate), limits.max_rate)
+        self.tokens = limits.burst
+        self.updated = now
+        self.blocked_until = 0.0
+        self.streak = 0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limits.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    """Token bucket на семейство методов VK с AIMD-подстройкой скорости (потокобезопасный).
+
+    Один экземпляр на аккаунт и группу разделяется всеми VKPublisher процесса
+    (см. app_context.get_rate_limiter); между процессами и группами одного токена —
+    через ledger.
+    """
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        limits: Optional[Dict[str, FamilyLimits]] = None,
+        backoff: float = 0.5,
+        success_streak: int = 10,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        ledger: Optional[Any] = None,
+        key: str = "",
+        group_key: str = "",
+    ):
+        """Создать лимитер.
+
+        Args:
+            state_path: JSON с выученными скоростями (None — не сохранять).
+            limits: Параметры семейств (по умолчанию DEFAULT_LIMITS).
+            backoff: Множитель скорости при ошибке 6/9/10.
+            success_streak: Успехов подряд до прибавки скорости.
+            clock: Часы (по умолчанию monotonic, с ledger — time.time: общие для процессов).
+            sleep: Функция ожидания (подменяется в тестах).
+            ledger: Общее хранилище ведер (RateLedger); state_path при этом не используется.
+            key: Ключ ведер в ledger (rate_ledger_key: аккаунт).
+            group_key: Ключ ведер GROUP_FAMILIES (rate_ledger_key: аккаунт + группа); пусто — key.
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self.backoff = backoff
+        self.success_streak = success_streak
+        self.ledger = ledger
+        self.key = key
+        self.group_key = group_key
+        if ledger is not None:
+            self.state_path = None
+        self._clock = clock or (time.time if ledger is not None else time.monotonic)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        saved = self._load_state()
+        self._buckets: Dict[str, _Bucket] = {
+            family: _Bucket(lim, saved.get(family, lim.rate), self._clock()) for family, lim in self.limits.items()
+        }
+
+    def _load_state(self) -> Dict[str, float]:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+            return {k: float(v) for k, v in data.get("rates", {}).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Не удалось прочитать состояние лимитера %s: %s", self.state_path, e)
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        rates = {family: round(bucket.rate, 6) for family, bucket in self._buckets.items()}
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+            tmp.write_text(json.dumps({"rates": rates}, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp.replace(self.state_path)
+        except OSError as e:
+            logger.warning("Не удалось сохранить состояние лимитера %s: %s", self.state_path, e)
+
+    @contextmanager
+    def _bucket(self, family: str) -> Iterator[_Bucket]:
+        """Ведро семейства под блокировкой (с ledger — в транзакции, изменения сохраняются)."""
+        limits = self.limits.get(family)
+        if limits is None:
+            raise ValueError(f"Неизвестное семейство методов VK: {family}")
+        with self._lock:
+            if self.ledger is None:
+                yield self._buckets[family]
+                return
+            create = lambda: _Bucket(limits, limits.rate, self._clock())
+            key = self.group_key if family in GROUP_FAMILIES and self.group_key else self.key
+            with self.ledger.transaction(key, family, create) as bucket:
+                bucket.rate = min(max(bucket.rate, limits.min_rate), limits.max_rate)
+                yield bucket
+
+    def rate(self, family: str) -> float:
+        """Текущая скорость семейства (вызовов в секунду)."""
+        with self._bucket(family) as bucket:
+            return bucket.rate
+
+    def acquire(self, family: str) -> float:
+        """Дождаться разрешения на вызов метода семейства.
+
+        Returns:
+            Сколько секунд пришлось ждать.
+        """
+        waited = 0.0
+        while True:
+            with self._bucket(family) as bucket:
+                now = self._clock()
+                bucket.refill(now)
+                if now >= bucket.blocked_until and bucket.tokens >= 1.0:
+                    bucket.tokens -= 1.0
+                    return waited
+                delay = max(bucket.blocked_until - now, (1.0 - bucket.tokens) / bucket.rate)
+            self._sleep(delay)
+            waited += delay
+
+    def on_success(self, family: str) -> None:
+        """Учесть успешный вызов: после серии успехов скорость растёт на step."""
+        with self._bucket(family) as bucket:
+            bucket.streak += 1
+            if bucket.streak < self.success_streak or bucket.rate >= bucket.limits.max_rate:
+                return
+            bucket.streak = 0
+            bucket.rate = min(bucket.limits.max_rate, bucket.rate + bucket.limits.step)
+            logger.debug("VK rate %s: рост до %.3f/с", family, bucket.rate)
+            self._save_state()
+
+    def on_throttle(self, family: str, error_code: Optional[int] = None) -> float:
+        """Учесть ошибку 6/9/10: скорость ×backoff (с jitter), пауза семейства на один новый интервал.
+
+        Returns:
+            Длительность паузы (сек).
+        """
+        with self._bucket(family) as bucket:
+            bucket.streak = 0
+            bucket.refill(self._clock())
+            bucket.tokens = 0.0
+            bucket.rate = max(bucket.limits.min_rate, bucket.rate * self.backoff * random.uniform(0.8, 1.0))
+            pause = random.uniform(1.0, 1.5) / bucket.rate
+            now = bucket.updated
+            bucket.blocked_until = max(bucket.blocked_until, now + pause)
+            logger.warning(
+                "VK API %s (%s): скорость снижена до %.3f/с, пауза %.1f сек", error_code, family, bucket.rate, pause
+            )
+            self._save_state()
+            return pause
@@ -0,0 +1,104 @@
+"""Упреждающий video.save для следующих видео пакета.
+
+Пока текущий файл отправляется на upload-сервер, в фоновом потоке для следующих
+depth видео вызывается video.save (name, description, группа) — к началу следующей
+загрузки upload_url уже получен. Число вызовов API не растёт: ответ используется
+вместо video.save при публикации. Ответ старше ttl не используется (upload_url мог
+протухнуть): пустое видео удаляется, при публикации вызывается свежий video.save.
+Сохранность между запусками обеспечивает save (VKPublisher пишет ответ в журнал загрузок).
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Sequence
+
+from ..models.video import VideoData
+
+logger = logging.getLogger(__name__)
+
+# Срок годности упреждённого upload_url (сек)
+PREFETCH_TTL = 3600.0
+
+
+def _video_key(video: VideoData) -> tuple:
+    return (str(video.file_path), video.title, video.description or "")
+
+
+class SavePrefetcher:
+    """Очередь упреждённых video.save (один фоновый поток, вызовы идут через лимитер публикатора)."""
+
+    def __init__(
+        self,
+        save: Callable[[VideoData], dict],
+        discard: Callable[[VideoData, dict], None],
+        depth: int = 1,
+        ttl: float = PREFETCH_TTL,
+    ):
+        """
+        Args:
+            save: video.save для видео; возвращает ответ с upload_url, owner_id, video_id.
+            discard: Удалить неиспользованное пустое видео (видео пакета, ответ save).
+            depth: Сколько следующих видео держать готовыми.
+            ttl: Срок годности ответа (сек).
+        """
+        self.save = save
+        self.discard = discard
+        self.depth = depth
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending: dict[tuple, tuple[Future, list, VideoData]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video-save-prefetch")
+
+    def _save_timed(self, video: VideoData, fetched_at: list) -> dict:
+        response = self.save(video)
+        fetched_at.append(time.monotonic())
+        return response
+
+    def schedule(self, videos: Sequence[VideoData]) -> None:
+        """Запросить video.save для первых depth видео (уже запрошенные пропускаются)."""
+        with self._lock:
+            for video in list(videos)[: self.depth]:
+                key = _video_key(video)
+                if key not in self._pending:
+                    fetched_at: list = []
+                    future = self._executor.submit(self._save_timed, video, fetched_at)
+                    self._pending[key] = (future, fetched_at, video)
+
+    def take(self, video: VideoData) -> Optional[dict]:
+        """Упреждённый ответ video.save для видео (ждёт, если запрос ещё идёт) или None."""
+        with self._lock:
+            pending = self._pending.pop(_video_key(video), None)
+        if pending is None:
+            return None
+        future, fetched_at, _ = pending
+        try:
+            response = future.result()
+        except Exception as e:
+            logger.warning(f"Упреждающий video.save для {video.file_path.name} не удался: {e}")
+            return None
+        if time.monotonic() - fetched_at[0] > self.ttl:
+            logger.info(f"Упреждённый upload_url для {video.file_path.name} устарел, запрашивается новый")
+            self._discard(video, response)
+            return None
+        return response
+
+    def _discard(self, video: VideoData, response: dict) -> None:
+        try:
+            self.discard(video, response)
+        except Exception as e:
+            logger.warning(f"Не удалось удалить неиспользованное видео {response.get('owner_id')}_{response.get('video_id')}: {e}")
+
+    def close(self) -> None:
+        """Остановить поток и удалить пустые видео, созданные для неопубликованных записей."""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future, _, _ in pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        for future, _, video in pending:
+            if future.cancelled() or future.exception() is not None:
+                continue
+            self._discard(video, future.result())
@@ -0,0 +1,355 @@
+"""Потоковая загрузка файла на upload-сервер VK (multipart/form-data без чтения файла в память).
+
+VkUpload.video() собирает multipart-тело через requests целиком в памяти; здесь тело
+отдаётся file-like объектом известной длины: заголовок части, файл блоками, хвост.
+requests выставляет Content-Length, http.client читает тело блоками — пиковая память
+на загрузку постоянна (порядка одного блока).
+
+post_file_resumable — докачка: файл уходит частями (Content-Range + Session-ID), после
+каждой подтверждённой части вызывается on_ack(смещение); прерванную загрузку можно
+продолжить с этого смещения тем же upload_url и Session-ID.
+
+StreamingHasher считает SHA-256 файла по мере отправки (без отдельного чтения файла)
+для сверки с videos.file_hash после загрузки. BandwidthShaper (bandwidth.py) ограничивает
+скорость: каждый отданный блок файла проходит через shaper.throttle().
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Optional
+
+import requests
+
+if TYPE_CHECKING:
+    from .bandwidth import BandwidthShaper
+
+logger = logging.getLogger(__name__)
+
+# Размер блока чтения с диска (байт)
+CHUNK_SIZE = 1024 * 1024
+
+# Размер части при загрузке с докачкой (байт)
+RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Прогресс загрузки: (отправлено байт файла, размер файла)
+ProgressCallback = Callable[[int, int], None]
+
+# Ответ upload-сервера на промежуточную часть: принятые диапазоны "0-1048575/5000000"
+_RANGE_RE = re.compile(r"(\d+)-(\d+)/(\d+)")
+
+
+class ChunkedUploadNotSupported(Exception):
+    """Upload-сервер не принял загрузку частями (нужна обычная multipart-загрузка)."""
+    pass
+
+
+class StreamingHasher:
+    """SHA-256 файла по блокам, отданным на отправку (как DuplicateDetector.calculate_file_hash).
+
+    Блоки учитываются по смещению в файле: повторно отправленные части (докачка)
+    не хешируются дважды.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Начать заново (файл отправляется повторно с начала)."""
+        self._hash = hashlib.sha256()
+        self.offset = 0  # до какого байта файла посчитан хеш
+
+    def update_at(self, position: int, data: bytes) -> None:
+        """Учесть блок файла, начинающийся с position."""
+        end = position + len(data)
+        if end <= self.offset:
+            return
+        if position > self.offset:
+            raise ValueError(f"Пропуск в хешируемых данных: {self.offset}..{position}")
+        self._hash.update(data[self.offset - position:])
+        self.offset = end
+
+    def prefill(self, path: Path, offset: int, chunk_size: int = CHUNK_SIZE) -> None:
+        """Дочитать хеш до offset (части, отправленные до перезапуска процесса)."""
+        with open(path, "rb") as f:
+            f.seek(self.offset)
+            while self.offset < offset:
+                data = f.read(min(chunk_size, offset - self.offset))
+                if not data:
+                    raise IOError(f"Файл укоротился: {path}")
+                self.update_at(self.offset, data)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class MultipartFileStream:
+    """Тело multipart/form-data с одним файлом, читаемое блоками с диска.
+
+    Attributes:
+        content_type: Значение заголовка Content-Type (с boundary).
+        file_size: Размер файла (байт).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        field: str = "video_file",
+        filename: Optional[str] = None,
+        chunk_size: int = CHUNK_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+        hasher: Optional[StreamingHasher] = None,
+        shaper: Optional["BandwidthShaper"] = None,
+    ):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.hasher = hasher
+        self.shaper = shaper
+        self.file_size = os.path.getsize(self.path)
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        name = (filename or self.path.name).replace('"', "%22")
+        mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self._head = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{name}"\r\n'
+            f"Content-Type: {mime}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+        self._file: Optional[BinaryIO] = None
+        self._pos = 0  # позиция в теле
+        self.bytes_sent = 0  # отдано байт файла
+
+    def __len__(self) -> int:
+        return len(self._head) + self.file_size + len(self._tail)
+
+    def __enter__(self) -> "MultipartFileStream":
+        if self.shaper:
+            self.shaper.begin()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        if self.shaper:
+            self.shaper.end()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, size: int = -1) -> bytes:
+        """Следующий фрагмент тела (не больше size байт; без size — не больше chunk_size)."""
+        if size is None or size < 0:
+            size = self.chunk_size
+        head_len = len(self._head)
+        body_end = head_len + self.file_size
+        if self._pos < head_len:
+            data = self._head[self._pos:self._pos + size]
+        elif self._pos < body_end:
+            if self._file is None:
+                self._file = open(self.path, "rb")
+            data = self._file.read(min(size, self.chunk_size, body_end - self._pos))
+            if not data:
+                raise IOError(f"Файл укоротился во время загрузки: {self.path}")
+            if self.hasher:
+                self.hasher.update_at(self.bytes_sent, data)
+            if self.shaper:
+                self.shaper.throttle(len(data))
+            self.bytes_sent += len(data)
+            if self.on_progress:
+                self.on_progress(self.bytes_sent, self.file_size)
+        else:
+            offset = self._pos - body_end
+            data = self._tail[offset:offset + size]
+            if not data:
+                self.close()
+        self._pos += len(data)
+        return data
+
+
+def post_file_streaming(
+    http: requests.Session,
+    url: str,
+    path: Path,
+    field: str = "video_file",
+    on_progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+    hasher: Optional[StreamingHasher] = None,
+    shaper: Optional["BandwidthShaper"] = None,
+) -> dict:
+    """POST файла на upload_url потоково.
+
+    Args:
+        http: HTTP-сессия (vk_session.http).
+        url: upload_url из video.save.
+        path: Путь к файлу.
+        field: Имя поля формы.
+        on_progress: Прогресс (отправлено байт файла, размер файла).
+        timeout: Таймаут чтения ответа (сек).
+        hasher: Хеш отправленных данных (сверка с file_hash после загрузки).
+        shaper: Ограничение скорости и учёт отправленных байт.
+
+    Returns:
+        JSON-ответ upload-сервера.
+
+    Raises:
+        requests.RequestException: Ошибка HTTP/сети.
+    """
+    with MultipartFileStream(path, field=field, on_progress=on_progress, hasher=hasher, shaper=shaper) as body:
+        logger.debug("Потоковая загрузка %s (%s байт)", path, body.file_size)
+        response = http.post(url, data=body, headers={"Content-Type": body.content_type}, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class FileRangeStream:
+    """Диапазон файла [start, start + length), читаемый блоками (тело одной части загрузки)."""
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        length: int,
+        file_size: int,
+        chunk_size: int = CHUNK_SIZE,
+        on_progress: Optional[ProgressCallback] = None,
+        hasher: Optional[StreamingHasher] = None,
+        shaper: Optional["BandwidthShaper"] = None,
+    ):
+        self.path = Path(path)
+        self.start = start
+        self.length = length
+        self.file_size = file_size
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.hasher = hasher
+        self.shaper = shaper
+        self._file: Optional[BinaryIO] = None
+        self._pos = 0  # позиция в диапазоне
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __enter__(self) -> "FileRangeStream":
+        if self.shaper:
+            self.shaper.begin()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        if self.shaper:
+            self.shaper.end()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.chunk_size
+        if self._pos >= self.length:
+            return b""
+        if self._file is None:
+            self._file = open(self.path, "rb")
+            self._file.seek(self.start)
+        data = self._file.read(min(size, self.chunk_size, self.length - self._pos))
+        if not data:
+            raise IOError(f"Файл укоротился во время загрузки: {self.path}")
+        if self.hasher:
+            self.hasher.update_at(self.start + self._pos, data)
+        if self.shaper:
+            self.shaper.throttle(len(data))
+        self._pos += len(data)
+        if self.on_progress:
+            self.on_progress(self.start + self._pos, self.file_size)
+        return data
+
+
+def _acknowledged_offset(body: str, fallback: int) -> int:
+    """Смещение, до которого сервер принял файл без пропусков (по первому диапазону от 0)."""
+    ranges = sorted((int(a), int(b)) for a, b, _ in _RANGE_RE.findall(body))
+    offset = 0
+    for first, last in ranges:
+        if first > offset:
+            break
+        offset = max(offset, last + 1)
+    return offset if ranges else fallback
+
+
+def post_file_resumable(
+    http: requests.Session,
+    url: str,
+    path: Path,
+    session_id: str,
+    offset: int = 0,
+    on_ack: Optional[Callable[[int], None]] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    chunk_size: int = RESUMABLE_CHUNK_SIZE,
+    timeout: Optional[float] = None,
+    hasher: Optional[StreamingHasher] = None,
+    shaper: Optional["BandwidthShaper"] = None,
+) -> dict:
+    """POST файла на upload_url частями с докачкой.
+
+    Промежуточная часть подтверждается ответом 201 с принятыми диапазонами, последняя —
+    ответом 200 с JSON, как у обычной загрузки.
+
+    Args:
+        http: HTTP-сессия (vk_session.http).
+        url: upload_url из video.save.
+        path: Путь к файлу.
+        session_id: Идентификатор сессии загрузки (один на весь файл, в т.ч. после перезапуска).
+        offset: С какого байта продолжать (подтверждённое смещение из журнала).
+        on_ack: Вызывается с новым подтверждённым смещением после каждой части.
+        on_progress: Прогресс (отправлено байт файла, размер файла).
+        chunk_size: Размер части (байт).
+        timeout: Таймаут чтения ответа (сек).
+        hasher: Хеш отправленных данных; при offset > 0 уже отправленная часть дочитывается (prefill).
+        shaper: Ограничение скорости и учёт отправленных байт.
+
+    Returns:
+        JSON-ответ upload-сервера на последнюю часть.
+
+    Raises:
+        ChunkedUploadNotSupported: Сервер не принимает части (ответ на первую часть не 200/201).
+        requests.RequestException: Ошибка HTTP/сети.
+    """
+    path = Path(path)
+    file_size = os.path.getsize(path)
+    name = path.name.replace('"', "%22")
+    if hasher and hasher.offset < offset:
+        hasher.prefill(path, offset)
+    first_request = True
+    while True:
+        length = min(chunk_size, file_size - offset)
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Disposition": f'attachment; filename="{name}"',
+            "Content-Range": f"bytes {offset}-{offset + length - 1}/{file_size}",
+            "Session-ID": session_id,
+        }
+        with FileRangeStream(
+            path, offset, length, file_size, on_progress=on_progress, hasher=hasher, shaper=shaper
+        ) as body:
+            response = http.post(url, data=body, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code != 201:
+            if first_request and offset == 0 and 400 <= response.status_code < 500:
+                raise ChunkedUploadNotSupported(f"HTTP {response.status_code}: {response.text[:200]}")
+            response.raise_for_status()
+            raise requests.HTTPError(f"Неожиданный ответ upload-сервера: HTTP {response.status_code}")
+        acknowledged = _acknowledged_offset(response.text, offset + length)
+        if acknowledged >= file_size:
+            raise requests.HTTPError("Upload-сервер принял файл целиком, но не вернул результат загрузки")
+        logger.debug("Докачка %s: подтверждено %s/%s байт", path, acknowledged, file_size)
+        offset = acknowledged
+        first_request = False
+        if on_ack:
+            on_ack(offset)
@@ -1,20 +1,88 @@
 """Публикатор видео в VK Video."""
 
+import os
 import re
 import time
+import uuid
 from pathlib import Path
-from typing import Optional, Tuple, Callable
+from typing import Any, Optional, Tuple, Callable
 import logging
 from datetime import datetime
 
+import requests
 import vk_api
-from vk_api.upload import VkUpload
-from vk_api.exceptions import VkApiError, ApiError
+from requests.adapters import HTTPAdapter
+from vk_api.exceptions import TOO_MANY_RPS_CODE, VkApiError, ApiError
+from vk_api.requests_pool import VkRequestsPool
+from vk_api.vk_api import DEFAULT_USERAGENT
 
 from ..models.video import VideoData
+from .rate_limiter import (
+    AdaptiveRateLimiter,
+    FAMILY_DELETE,
+    FAMILY_EDIT,
+    FAMILY_GET,
+    FAMILY_UPLOAD,
+    THROTTLE_ERROR_CODES,
+)
+from .streaming_upload import (
+    RESUMABLE_CHUNK_SIZE,
+    ChunkedUploadNotSupported,
+    ProgressCallback,
+    StreamingHasher,
+    post_file_resumable,
+    post_file_streaming,
+)
+from .save_prefetch import SavePrefetcher
+from .bandwidth import BandwidthShaper
+from ..storage.upload_journal import UploadJournal, UploadJournalEntry, file_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Сверка хеша файла, посчитанного при отправке, с file_hash из scan
+HASH_CHECK_OFF = "off"  # не считать
+HASH_CHECK_FLAG = "flag"  # при расхождении предупредить, загрузка остаётся
+HASH_CHECK_ABORT = "abort"  # при расхождении удалить загруженное видео, публикация неуспешна
+HASH_CHECK_MODES = (HASH_CHECK_OFF, HASH_CHECK_FLAG, HASH_CHECK_ABORT)
+
+# Ошибки VK API, при которых вызов стоит повторить: 6, 9, 10 — частота/перегрузка, 14 — капча
+RETRYABLE_ERROR_CODES = frozenset({6, 9, 10, 14})
+
+# Ошибки video.delete уже удалённого видео (15 — доступ запрещён, 100 — неверный параметр): при повторе
+# пакета, ответ на который потерян, означают, что удаление выполнено прошлой отправкой
+VIDEO_NOT_FOUND_CODES = frozenset({15, 100})
+
+# Сколько вызовов API VK выполняет за один запрос execute
+EXECUTE_BATCH_SIZE = 25
+
+# Сколько видео video.get отдаёт за один запрос по списку videos=
+VIDEO_GET_BATCH_SIZE = 200
+
+# Максимальная длина названия видео в VK (video.edit / video.save)
+VIDEO_TITLE_MAX_LENGTH = 128
+
+# Пул keep-alive соединений HTTP-сессии публикатора: api.vk.com и upload-серверы
+HTTP_POOL_CONNECTIONS = 4  # число хостов в пуле
+HTTP_POOL_MAXSIZE = 4  # соединений на хост (основной поток + упреждающий video.save)
+
+
+def _make_http_session(pool_maxsize: int = HTTP_POOL_MAXSIZE) -> requests.Session:
+    """HTTP-сессия публикатора: keep-alive пул, переживает пересоздание VkApi при обновлении токена."""
+    http = requests.Session()
+    http.headers["User-agent"] = DEFAULT_USERAGENT
+    _mount_pool(http, pool_maxsize)
+    return http
+
+
+def _mount_pool(http: requests.Session, pool_maxsize: int) -> None:
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+
+
+# Видео, созданное video.save для публикации: (owner_id, video_id)
+SavedCallback = Callable[[int, int], None]
+
 
 class VKPublisherError(Exception):
     """Исключение для ошибок публикации."""
@@ -26,6 +94,33 @@ class VKApi1051Error(VKPublisherError):
     pass
 
 
+class VKFileChangedError(VKPublisherError):
+    """Хеш отправленного файла не совпал с file_hash из scan (файл изменён после сканирования).
+
+    Attributes:
+        video_url: URL загруженного видео (режим flag) или None (режим abort — видео удалено).
+        actual_hash: Хеш отправленных данных.
+    """
+
+    def __init__(self, message: str, video_url: Optional[str], actual_hash: str):
+        super().__init__(message)
+        self.video_url = video_url
+        self.actual_hash = actual_hash
+
+
+def log_progress(name: str, step_percent: int = 10) -> ProgressCallback:
+    """Прогресс загрузки в лог (debug) с шагом step_percent процентов."""
+    state = {"next": step_percent}
+
+    def report(sent: int, total: int) -> None:
+        percent = sent * 100 // total if total else 100
+        if percent >= state["next"]:
+            logger.debug(f"{name}: отправлено {sent}/{total} байт ({percent}%)")
+            state["next"] = (percent // step_percent + 1) * step_percent
+
+    return report
+
+
 class VKPublisher:
     """Публикатор видео в VK Video через VK API."""
     
@@ -37,6 +132,13 @@ class VKPublisher:
         max_retries: int = 3,
         retry_delay: float = 10.0,
         on_token_expired: Optional[Callable[[], Optional[str]]] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        upload_journal: Optional[UploadJournal] = None,
+        hash_check: str = HASH_CHECK_FLAG,
+        shaper: Optional[BandwidthShaper] = None,
+        account: str = "",
+        resumable: bool = True,
+        token_source: Optional[Callable[[], Optional[str]]] = None,
     ):
         """Инициализировать публикатор.
         
@@ -47,6 +149,15 @@ class VKPublisher:
             max_retries: Максимальное количество повторных попыток при ошибке.
             retry_delay: Задержка перед повторной попыткой в секундах.
             on_token_expired: Callback () -> str | None при ошибке 5 (User authorization failed). Если вернёт новый токен — обновляем сессию и повторяем операцию.
+            rate_limiter: Лимит частоты вызовов VK API (общий для публикаторов процесса); None — свой, без сохранения состояния.
+            upload_journal: Журнал загрузок: ответы video.save до завершения отправки файла и докачка
+                больших файлов частями; None — без журнала, файл отправляется одним запросом.
+            hash_check: Сверка хеша при отправке с ожидаемым (off, flag, abort); см. publish(expected_hash=...).
+            shaper: Ограничение скорости отправки файлов (общее для публикаторов процесса); None — без ограничения.
+            account: Аккаунт токена (имя переменной окружения токена) — часть ключа журнала загрузок.
+            resumable: Отправлять файлы больше RESUMABLE_CHUNK_SIZE частями с докачкой (нужен upload_journal).
+            token_source: Действующий токен; вызывается перед каждой публикацией (обновление заранее,
+                до ошибки 5), другой токен подставляется через update_token. None — токен не перечитывается.
         """
         self.access_token = access_token
         self.group_id = group_id
@@ -57,14 +168,39 @@ class VKPublisher:
         self.delay_between_uploads = delay_between_uploads
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.upload_journal = upload_journal
+        self._prefetcher: Optional[SavePrefetcher] = None
+        if hash_check not in HASH_CHECK_MODES:
+            raise VKPublisherError(f"Неизвестный режим сверки хеша: {hash_check}")
+        self.hash_check = hash_check
+        self.shaper = shaper
+        self.account = account
+        self.resumable = resumable
+        self.token_source = token_source
 
+        self._pool_maxsize = HTTP_POOL_MAXSIZE
+        self._http = _make_http_session(self._pool_maxsize)
         self._init_session(access_token)
 
+    def reserve_connections(self, slots: int) -> None:
+        """Расширить пул соединений под slots одновременных загрузок через этот публикатор.
+
+        Вызывать до начала загрузок: слоты UploadEngine делят одну сессию (VkApi, keep-alive
+        соединения), а не создают по публикатору на слот.
+        """
+        pool_maxsize = slots + HTTP_POOL_MAXSIZE - 1
+        if pool_maxsize > self._pool_maxsize:
+            self._pool_maxsize = pool_maxsize
+            _mount_pool(self._http, pool_maxsize)
+
     def _init_session(self, token: str) -> None:
         try:
-            self.vk_session = vk_api.VkApi(token=token)
+            # Соединения (TLS) к api.vk.com и upload-серверам переиспользуются между загрузками и после смены токена
+            self.vk_session = vk_api.VkApi(token=token, session=self._http)
+            # Ошибку 6 vk_api по умолчанию повторяет сам (пауза 0.5 сек) — она должна дойти до _call и лимитера
+            self.vk_session.error_handlers.pop(TOO_MANY_RPS_CODE, None)
             self.vk = self.vk_session.get_api()
-            self.upload = VkUpload(self.vk_session)
             logger.info("VK API инициализирован успешно")
         except Exception as e:
             logger.error(f"Ошибка инициализации VK API: {e}")
@@ -76,6 +212,36 @@ class VKPublisher:
         self._init_session(new_token)
         logger.info("VK API: токен обновлён, сессия пересоздана")
 
+    def _sync_token(self) -> None:
+        """Подставить действующий токен из token_source, если он сменился (обновлён заранее или другим процессом)."""
+        if self.token_source is None:
+            return
+        token = self.token_source()
+        if token and token != self.access_token:
+            self.update_token(token)
+
+    def _call(self, family: str, method: Callable, **params):
+        """Вызвать метод VK API через лимитер семейства (upload/edit/delete/get).
+
+        Ошибки 6/9/10 снижают скорость семейства, успехи постепенно её повышают;
+        исключение пробрасывается дальше (повторы — в вызывающем методе).
+        """
+        self.rate_limiter.acquire(family)
+        try:
+            result = method(**params)
+        except ApiError as e:
+            if e.code in THROTTLE_ERROR_CODES:
+                self.rate_limiter.on_throttle(family, e.code)
+            raise
+        self.rate_limiter.on_success(family)
+        return result
+
+    def _retry_pause(self, error: Exception) -> None:
+        """Пауза перед повтором: для 6/9/10 её задаёт лимитер (в _call), иначе — retry_delay."""
+        if isinstance(error, ApiError) and error.code in THROTTLE_ERROR_CODES:
+            return
+        time.sleep(self.retry_delay)
+
     def check_video_access(self) -> None:
         """Проверить, что токен может вызывать video API в контексте группы (preflight перед batch).
         При 1051 бросает VKApi1051Error — не ретраить, прервать пайплайн."""
@@ -83,7 +249,7 @@ class VKPublisher:
             logger.warning("check_video_access: group_id не задан, пропуск проверки")
             return
         try:
-            self.vk.video.get(owner_id=-self.group_id, count=1)
+            self._call(FAMILY_GET, self.vk.video.get, owner_id=-self.group_id, count=1)
         except ApiError as e:
             if e.code == 1051:
                 logger.error(
@@ -106,19 +272,12 @@ class VKPublisher:
         if isinstance(error, ApiError):
             error_code = error.code
             
-            # Ошибки, при которых стоит повторить попытку
-            retryable_errors = {
-                6,   # Слишком много запросов в секунду
-                9,   # Flood control: слишком много однотипных действий
-                10,  # Внутренняя ошибка сервера
-                14,  # Требуется ввод капчи
-            }
-            
-            if error_code in retryable_errors:
+            if error_code in RETRYABLE_ERROR_CODES:
                 if attempt < self.max_retries:
                     logger.warning(
                         f"Ошибка API {error_code}: {error}. "
-                        f"Повторная попытка {attempt + 1}/{self.max_retries} через {self.retry_delay} сек"
+                        f"Повторная попытка {attempt + 1}/{self.max_retries}"
+                        + ("" if error_code in THROTTLE_ERROR_CODES else f" через {self.retry_delay} сек")
                     )
                     return True
                 else:
@@ -140,46 +299,350 @@ class VKPublisher:
             logger.error(f"Достигнуто максимальное количество попыток. Ошибка: {error}")
             return False
     
+    def prefetch(self, videos: list[VideoData], depth: int = 1) -> None:
+        """Заранее вызвать video.save для следующих depth видео пакета (в фоне, пока идёт текущая загрузка).
+
+        Видео с незавершённой загрузкой в журнале пропускаются: для них video.save уже был.
+        Ответ упреждающего video.save пишется в журнал: после сбоя видео используется
+        следующим запуском или удаляется (discard_stale_uploads). Неиспользованные пустые
+        видео удаляются в close().
+        """
+        if depth < 1:
+            return
+        if self._prefetcher is None:
+            self._prefetcher = SavePrefetcher(self._video_save, self._discard_save, depth=depth)
+        if self.upload_journal:
+            videos = [v for v in videos if not self.upload_journal.get(self._journal_key(v))]
+        self._prefetcher.schedule(videos)
+
+    def close(self) -> None:
+        """Завершить фоновые запросы публикатора (упреждающий video.save)."""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def _take_prefetched(self, video: VideoData) -> Optional[dict]:
+        """Упреждённый ответ video.save для видео или None."""
+        if self._prefetcher is None:
+            return None
+        response = self._prefetcher.take(video)
+        if response is not None:
+            logger.debug(f"Используется упреждённый upload_url для {video.file_path.name}")
+        return response
+
+    def _video_save(self, video: VideoData) -> dict:
+        """Новый video.save; ответ пишется в журнал (созданное видео найдётся после сбоя)."""
+        response = self._video_save_now(video)
+        self._journal_start(video, response)
+        return response
+
+    def _video_save_now(self, video: VideoData) -> dict:
+        """video.save: создать видео (name, description, группа) и получить upload_url."""
+        # Контракт: заголовок -> name, полное описание -> description
+        save_params = {
+            "name": video.title,
+            "description": video.description if video.description else "",
+        }
+        # Видео загружается в сообщество (группу), а не к пользователю
+        if self.group_id:
+            save_params["group_id"] = self.group_id
+            logger.debug(f"Загрузка видео в сообщество (group_id={self.group_id})")
+        else:
+            logger.warning("group_id не указан! Видео будет загружено к пользователю, а не в сообщество.")
+
+        logger.debug(f"Параметры загрузки: name='{video.title[:50]}...', description_length={len(save_params['description'])}")
+        response = self._call(FAMILY_UPLOAD, self.vk.video.save, **save_params)
+        if not response.get("upload_url"):
+            raise VKPublisherError(f"video.save не вернул upload_url: {response}")
+        return response
+
+    def _upload_video_file(
+        self,
+        video: VideoData,
+        on_progress: Optional[ProgressCallback],
+        hasher: Optional[StreamingHasher] = None,
+        on_saved: Optional[SavedCallback] = None,
+    ) -> dict:
+        """video.save + потоковый POST файла на upload_url (файл не читается в память целиком).
+
+        upload_url берётся из упреждённого ответа или из журнала (video.save прошлого запуска),
+        иначе вызывается video.save.
+
+        Returns:
+            Ответ video.save, дополненный ответом upload-сервера (video_id, owner_id, ...).
+        """
+        on_progress = on_progress or log_progress(video.file_path.name)
+        prefetched = self._take_prefetched(video)
+        entry = self._journal_entry(video)
+        if self.resumable and self.upload_journal and os.path.getsize(video.file_path) > RESUMABLE_CHUNK_SIZE:
+            return self._upload_resumable(video, on_progress, hasher, entry, prefetched, on_saved)
+
+        if entry is not None and entry.offset > 0:
+            # Докачка отключена: начатая частями загрузка не продолжается
+            self._discard_save(video, entry.save_response())
+            entry = None
+        if prefetched is not None:
+            response = prefetched
+        elif entry is not None:
+            logger.info(f"Используется upload_url из журнала для {video.file_path.name}")
+            response = entry.save_response()
+        else:
+            response = self._video_save(video)
+        if on_saved:
+            on_saved(response["owner_id"], response["video_id"])
+        try:
+            upload_response = post_file_streaming(
+                self.vk_session.http, response["upload_url"], video.file_path,
+                on_progress=on_progress, hasher=hasher, shaper=self.shaper,
+            )
+        except requests.HTTPError as e:
+            self._on_upload_rejected(video, response, e)
+            raise
+        self._journal_remove(video)
+        if "error" in upload_response:
+            raise VKPublisherError(f"Ошибка upload-сервера VK: {upload_response['error']}")
+        response.update(upload_response)
+        return response
+
+    def _journal_key(self, video: VideoData) -> str:
+        """Ключ журнала загрузок: файл, группа и аккаунт токена публикатора."""
+        return file_fingerprint(video.file_path, -self.group_id if self.group_id else None, self.account)
+
+    def _journal_prefix(self) -> str:
+        """Начало ключей журнала для группы и аккаунта публикатора (см. file_fingerprint)."""
+        return f"{self.account}:{-self.group_id if self.group_id else 'user'}:"
+
+    def _journal_start(self, video: VideoData, response: dict) -> str:
+        """Записать ответ video.save в журнал. Returns: Session-ID загрузки."""
+        session_id = uuid.uuid4().hex
+        if self.upload_journal:
+            self.upload_journal.start(
+                self._journal_key(video), video.file_path, os.path.getsize(video.file_path),
+                response["upload_url"], session_id, response,
+            )
+        return session_id
+
+    def _journal_remove(self, video: VideoData) -> None:
+        if self.upload_journal:
+            self.upload_journal.remove(self._journal_key(video))
+
+    def _journal_entry(self, video: VideoData) -> Optional[UploadJournalEntry]:
+        """Запись журнала для видео; протухшая разбирается (discard_stale_uploads) и не возвращается."""
+        if not self.upload_journal:
+            return None
+        entry = self.upload_journal.get(self._journal_key(video), include_stale=True)
+        if entry is not None and entry.is_stale():
+            self._discard_entry(entry)
+            return None
+        return entry
+
+    def _discard_save(self, video: VideoData, response: dict) -> None:
+        """Удалить созданное video.save пустое видео и его запись в журнале."""
+        if self.delete_video(response["owner_id"], response["video_id"]):
+            self._journal_remove(video)
+
+    def _on_upload_rejected(self, video: VideoData, response: dict, error: requests.HTTPError) -> None:
+        """upload_url или сессия больше не принимаются — следующая попытка начнёт с video.save."""
+        status = error.response.status_code if error.response is not None else None
+        if status is not None and 400 <= status < 500:
+            logger.warning(f"Upload-сервер отклонил загрузку (HTTP {status}), загрузка начнётся заново")
+            # Запись удаляется и без удаления видео (например, его уже удалили): upload_url не годится
+            self.delete_video(response["owner_id"], response["video_id"])
+            self._journal_remove(video)
+
+    def _discard_entry(self, entry: UploadJournalEntry) -> bool:
+        """Разобрать протухшую запись журнала: удалить пустое видео (видео с файлом остаётся) и запись.
+
+        Returns:
+            True — запись удалена; False — VK недоступен, запись остаётся до следующего запуска.
+        """
+        response = entry.save_response()
+        owner_id, video_id = response.get("owner_id"), response.get("video_id")
+        if owner_id and video_id:
+            try:
+                found = self.get_videos([(owner_id, video_id)]).get((owner_id, video_id))
+            except VKPublisherError as e:
+                logger.warning(f"Журнал загрузок: не удалось проверить видео {owner_id}_{video_id}: {e}")
+                return False
+            if found is not None and self.has_content(found):
+                logger.info(f"Журнал загрузок: видео {owner_id}_{video_id} загружено, запись удаляется")
+            elif found is not None and not self.delete_video(owner_id, video_id):
+                return False
+        self.upload_journal.remove(entry.fingerprint)
+        return True
+
+    def discard_stale_uploads(self) -> int:
+        """Удалить пустые видео протухших записей журнала группы и аккаунта публикатора (при старте загрузки).
+
+        Returns:
+            Сколько записей разобрано.
+        """
+        if not self.upload_journal:
+            return 0
+        discarded = sum(self._discard_entry(entry) for entry in self.upload_journal.stale(self._journal_prefix()))
+        if discarded:
+            logger.info(f"Журнал загрузок: разобрано протухших записей: {discarded}")
+        return discarded
+
+    def _sent_video_uploaded(self, video: VideoData, owner_id: int, video_id: int) -> bool:
+        """Видео попытки, отправившей файл без полученного ответа: True — файл в VK; иначе пустое видео удалено.
+
+        Запись журнала удаляется: upload_url уже использован.
+
+        Raises:
+            VKPublisherError: video.get не удался.
+        """
+        found = self.get_videos([(owner_id, video_id)]).get((owner_id, video_id))
+        self._journal_remove(video)
+        if found is not None and self.has_content(found):
+            return True
+        if found is not None:
+            self.delete_video(owner_id, video_id)
+        return False
+
+    @staticmethod
+    def has_content(video: dict) -> bool:
+        """Элемент video.get с загруженным файлом: ненулевая длительность или файл ещё обрабатывается."""
+        return bool(video.get("duration") or video.get("processing") or video.get("converting"))
+
+    def _upload_resumable(
+        self,
+        video: VideoData,
+        on_progress: ProgressCallback,
+        hasher: Optional[StreamingHasher] = None,
+        entry: Optional[UploadJournalEntry] = None,
+        prefetched: Optional[dict] = None,
+        on_saved: Optional[SavedCallback] = None,
+    ) -> dict:
+        """Загрузка частями с журналом: после сбоя (в т.ч. перезапуска процесса) продолжается с подтверждённого смещения."""
+        journal = self.upload_journal
+        fingerprint = self._journal_key(video)
+        if entry:
+            response = entry.save_response()
+            session_id, offset = entry.session_id, entry.offset
+            logger.info(f"Докачка {video.file_path.name}: продолжение с {offset}/{entry.file_size} байт")
+        else:
+            response = prefetched or self._video_save_now(video)
+            session_id, offset = self._journal_start(video, response), 0
+        if on_saved:
+            on_saved(response["owner_id"], response["video_id"])
+
+        try:
+            upload_response = post_file_resumable(
+                self.vk_session.http,
+                response["upload_url"],
+                video.file_path,
+                session_id,
+                offset=offset,
+                on_ack=lambda acknowledged: journal.advance(fingerprint, acknowledged),
+                on_progress=on_progress,
+                hasher=hasher,
+                shaper=self.shaper,
+            )
+        except ChunkedUploadNotSupported as e:
+            logger.info(f"Upload-сервер не принял загрузку частями ({e}), отправка одним запросом")
+            if hasher:
+                hasher.reset()
+            try:
+                upload_response = post_file_streaming(
+                    self.vk_session.http, response["upload_url"], video.file_path,
+                    on_progress=on_progress, hasher=hasher, shaper=self.shaper,
+                )
+            except requests.HTTPError as e:
+                self._on_upload_rejected(video, response, e)
+                raise
+        except requests.HTTPError as e:
+            self._on_upload_rejected(video, response, e)
+            raise
+        journal.remove(fingerprint)
+        if "error" in upload_response:
+            raise VKPublisherError(f"Ошибка upload-сервера VK: {upload_response['error']}")
+        response.update(upload_response)
+        return response
+
+    def _check_sent_hash(self, video: VideoData, video_url: str, hasher: StreamingHasher, expected_hash: str) -> None:
+        """Сверить хеш отправленного файла с ожидаемым; при расхождении — VKFileChangedError."""
+        actual_hash = hasher.hexdigest()
+        if actual_hash == expected_hash:
+            return
+        message = f"Файл изменён после сканирования (хеш не совпал): {video.file_path}"
+        if self.hash_check == HASH_CHECK_ABORT:
+            logger.error(f"{message}; загруженное видео удаляется")
+            ids = self.parse_video_url(video_url)
+            if ids:
+                self.delete_video(*ids)
+            raise VKFileChangedError(message, None, actual_hash)
+        logger.warning(message)
+        raise VKFileChangedError(message, video_url, actual_hash)
+
     def publish(
         self,
         video: VideoData,
+        on_progress: Optional[ProgressCallback] = None,
+        expected_hash: Optional[str] = None,
+        on_saved: Optional[SavedCallback] = None,
     ) -> Optional[str]:
         """Опубликовать видео в VK Video.
         
         Args:
             video: Данные видео для публикации.
+            on_progress: Прогресс загрузки файла (отправлено байт, размер файла); None — в лог (debug).
+            expected_hash: SHA-256 файла из scan (videos.file_hash); сверяется с хешем, посчитанным при отправке.
+            on_saved: (owner_id, video_id) видео, созданного video.save, — до отправки файла.
             
+        Повтор после сбоя, когда файл уже целиком отправлен (например, потерян ответ upload-сервера),
+        сначала проверяет созданное видео через video.get: видео с файлом возвращается без нового
+        video.save, пустое удаляется.
+
         Returns:
             URL опубликованного видео или None при ошибке.
+
+        Raises:
+            VKApi1051Error: Метод недоступен для профиля/токена.
+            VKFileChangedError: Хеш отправленного файла не совпал с expected_hash (режимы flag/abort).
         """
+        self._sync_token()
+        saved: Optional[tuple[int, int]] = None
+        sent_video: Optional[tuple[int, int]] = None  # Видео, файл которого отправлен целиком
+        hasher: Optional[StreamingHasher] = None
+        progress = on_progress or log_progress(video.file_path.name)
+
+        def track_saved(owner_id: int, video_id: int) -> None:
+            nonlocal saved
+            saved = (owner_id, video_id)
+            if on_saved:
+                on_saved(owner_id, video_id)
+
+        def track_progress(sent: int, total: int) -> None:
+            nonlocal sent_video
+            progress(sent, total)
+            if sent >= total:
+                sent_video = saved
+
         for attempt in range(self.max_retries):
+            if sent_video is not None:
+                owner_id, video_id = sent_video
+                sent_video = None
+                try:
+                    uploaded = self._sent_video_uploaded(video, owner_id, video_id)
+                except VKPublisherError as e:
+                    # Повторная отправка может создать дубль: сверка — в следующем запуске (upload_intents)
+                    logger.error(f"Не удалось проверить отправленное видео {owner_id}_{video_id}: {e}")
+                    return None
+                if uploaded:
+                    video_url = f"https://vk.com/video{owner_id}_{video_id}"
+                    logger.info(f"✓ Файл уже загружен прошлой попыткой: {video_url}")
+                    if hasher:
+                        self._check_sent_hash(video, video_url, hasher, expected_hash)
+                    video._post_url = None
+                    return video_url
             try:
                 logger.info(
                     f"Загрузка видео: {video.file_path.name} "
                     f"(попытка {attempt + 1}/{self.max_retries})"
                 )
-                
-                # Подготовка параметров загрузки
-                # Контракт: заголовок -> name, полное описание -> description
-                # Видео загружается в сообщество (группу), а не к пользователю
-                upload_params = {
-                    "video_file": str(video.file_path),
-                    "name": video.title,  # Заголовок в название видео
-                    "description": video.description if video.description else "",  # Полный текст сообщения
-                }
-                
-                # Загружаем видео в сообщество (группу)
-                if self.group_id:
-                    # VkUpload.video() принимает group_id как параметр
-                    # Передаем положительный ID группы, VK API сам преобразует его
-                    upload_params["group_id"] = self.group_id
-                    logger.debug(f"Загрузка видео в сообщество (group_id={self.group_id})")
-                else:
-                    logger.warning("group_id не указан! Видео будет загружено к пользователю, а не в сообщество.")
-                
-                # Загрузка видео
-                logger.debug(f"Параметры загрузки: name='{video.title[:50]}...', description_length={len(video.description) if video.description else 0}")
-                video_response = self.upload.video(**upload_params)
+                hasher = StreamingHasher() if expected_hash and self.hash_check != HASH_CHECK_OFF else None
+                video_response = self._upload_video_file(video, track_progress, hasher, track_saved)
                 
                 video_id = video_response.get("video_id")
                 owner_id = video_response.get("owner_id")
@@ -195,6 +658,9 @@ class VKPublisher:
                     logger.info(f"✓ Видео успешно загружено в сообщество: {video_url}")
                 else:
                     logger.warning(f"⚠ Видео загружено к пользователю (owner_id={owner_id}), а не в сообщество!")
+
+                if hasher:
+                    self._check_sent_hash(video, video_url, hasher, expected_hash)
                 
                 # Публикация на стене отключена
                 # Видео доступно в разделе "Видео" сообщества
@@ -202,6 +668,9 @@ class VKPublisher:
                 
                 return video_url
                     
+            except VKFileChangedError:
+                raise
+
             except (VkApiError, ApiError) as e:
                 # 1051: метод недоступен для профиля/токена — не ретраить, прервать batch
                 if isinstance(e, ApiError) and e.code == 1051:
@@ -218,7 +687,7 @@ class VKPublisher:
                 if not should_retry:
                     return None
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._retry_pause(e)
                     
             except Exception as e:
                 logger.error(f"Неожиданная ошибка при публикации видео {video.file_path}: {e}", exc_info=True)
@@ -245,10 +714,12 @@ class VKPublisher:
         """
         for attempt in range(self.max_retries):
             try:
-                self.vk.video.edit(
+                self._call(
+                    FAMILY_EDIT,
+                    self.vk.video.edit,
                     owner_id=owner_id,
                     video_id=video_id,
-                    name=name[:128] if name else "",  # VK ограничивает длину
+                    name=name[:VIDEO_TITLE_MAX_LENGTH] if name else "",  # VK ограничивает длину
                 )
                 logger.info(f"Заголовок обновлён: video {owner_id}_{video_id}")
                 return True
@@ -264,7 +735,7 @@ class VKPublisher:
                     logger.error(f"Ошибка video.edit {owner_id}_{video_id}: {e}")
                     return False
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._retry_pause(e)
             except Exception as e:
                 logger.error(f"Ошибка при обновлении заголовка {owner_id}_{video_id}: {e}", exc_info=True)
                 return False
@@ -273,13 +744,181 @@ class VKPublisher:
     def delete_video(self, owner_id: int, video_id: int) -> bool:
         """Удалить видео в VK (video.delete). owner_id — отрицательный для группы."""
         try:
-            self.vk.video.delete(owner_id=owner_id, video_id=video_id)
+            self._call(FAMILY_DELETE, self.vk.video.delete, owner_id=owner_id, video_id=video_id)
             logger.info(f"Видео удалено в VK: {owner_id}_{video_id}")
             return True
         except (VkApiError, ApiError) as e:
             logger.error(f"Ошибка video.delete {owner_id}_{video_id}: {e}")
             return False
 
+    def _execute_pool(self, family: str, method: str, params_list: list[dict]) -> list[tuple[bool, Any]]:
+        """Выполнить вызовы method через execute (до EXECUTE_BATCH_SIZE за запрос).
+
+        Returns:
+            По порядку params_list: (True, результат) или (False, ошибка {error_code, error_msg}).
+            Ошибка запроса execute целиком пробрасывается.
+        """
+        outcomes: list[tuple[bool, Any]] = []
+        for start in range(0, len(params_list), EXECUTE_BATCH_SIZE):
+            pool = VkRequestsPool(self.vk_session)
+            results = [pool.method(method, params) for params in params_list[start:start + EXECUTE_BATCH_SIZE]]
+            self._call(family, pool.execute)
+            outcomes.extend((True, r.result) if r.ok else (False, r.error) for r in results)
+        return outcomes
+
+    def _execute_batch(
+        self, family: str, method: str, params_list: list[dict], done_codes: frozenset = frozenset()
+    ) -> list[bool]:
+        """Пакетный вызов с повтором только неуспешных элементов (ошибки 6/9/10/14), до max_retries попыток.
+
+        Если запрос execute оборвался по сети (таймаут, разрыв соединения), элементы могли выполниться
+        на сервере: при их повторе ошибки done_codes считаются успехом.
+
+        Returns:
+            Успех каждого элемента по порядку params_list.
+        """
+        done = [False] * len(params_list)
+        pending = list(range(len(params_list)))
+        resent: set[int] = set()  # Элементы запроса execute, ответ на который потерян
+        attempt = 0
+        token_refreshed = False
+        while pending and attempt < self.max_retries:
+            try:
+                outcomes = self._execute_pool(family, method, [params_list[i] for i in pending])
+            except requests.RequestException as e:
+                resent.update(pending)
+                attempt += 1
+                logger.warning(f"{method}: запрос execute не выполнен ({e}), попытка {attempt}/{self.max_retries}")
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_delay)
+                continue
+            except (VkApiError, ApiError) as e:
+                if isinstance(e, ApiError) and e.code == 5 and self.on_token_expired and not token_refreshed:
+                    token_refreshed = True
+                    new_token = self.on_token_expired()
+                    if new_token:
+                        logger.info(f"Токен обновлён по ошибке 5, повтор пакета {method}")
+                        self.update_token(new_token)
+                        continue
+                if not self._handle_api_error(e, attempt):
+                    break
+                attempt += 1
+                if attempt < self.max_retries:
+                    self._retry_pause(e)
+                continue
+
+            retry = []
+            throttle_code = None
+            for index, (ok, payload) in zip(pending, outcomes):
+                if ok:
+                    done[index] = True
+                    continue
+                code = payload.get("error_code")
+                if index in resent and code in done_codes:
+                    logger.info(f"{method} {params_list[index]}: выполнено запросом с потерянным ответом ([{code}] при повторе)")
+                    done[index] = True
+                elif code in RETRYABLE_ERROR_CODES:
+                    retry.append(index)
+                    if code in THROTTLE_ERROR_CODES:
+                        throttle_code = code
+                else:
+                    logger.error(f"Ошибка {method} {params_list[index]}: [{code}] {payload.get('error_msg')}")
+            if throttle_code is not None:
+                # Лимит для вызовов внутри execute: пауза и снижение скорости перед повтором
+                self.rate_limiter.on_throttle(family, throttle_code)
+            pending = retry
+            attempt += 1
+            if pending and attempt < self.max_retries:
+                logger.warning(f"{method}: повтор {len(pending)} элементов ({attempt + 1}/{self.max_retries})")
+        for index in pending:
+            logger.error(f"{method} {params_list[index]}: не выполнено после {self.max_retries} попыток")
+        return done
+
+    def edit_titles_batch(self, items: list[tuple[int, int, str]]) -> list[bool]:
+        """Обновить названия нескольких видео пакетами video.edit через execute.
+
+        Args:
+            items: (owner_id, video_id, name) для каждого видео.
+
+        Returns:
+            Успех по каждому элементу items (повторяются только неуспешные).
+        """
+        return self._execute_batch(FAMILY_EDIT, "video.edit", [
+            {"owner_id": owner_id, "video_id": video_id, "name": name[:VIDEO_TITLE_MAX_LENGTH] if name else ""}
+            for owner_id, video_id, name in items
+        ])
+
+    def delete_batch(self, items: list[tuple[int, int]]) -> list[bool]:
+        """Удалить несколько видео пакетами video.delete через execute.
+
+        Args:
+            items: (owner_id, video_id) для каждого видео.
+
+        Returns:
+            Успех по каждому элементу items (повторяются только неуспешные; видео, удалённое
+            запросом с потерянным ответом, при повторе считается удалённым).
+        """
+        return self._execute_batch(FAMILY_DELETE, "video.delete", [
+            {"owner_id": owner_id, "video_id": video_id} for owner_id, video_id in items
+        ], done_codes=VIDEO_NOT_FOUND_CODES)
+
+    def _video_get(self, **params) -> dict:
+        """video.get с повторами (ошибки 6/9/10/14, сеть) и обновлением токена по ошибке 5.
+
+        Raises:
+            VKPublisherError: Не удалось после max_retries попыток или критическая ошибка API.
+        """
+        for attempt in range(self.max_retries):
+            try:
+                return self._call(FAMILY_GET, self.vk.video.get, **params)
+            except (VkApiError, ApiError) as e:
+                if isinstance(e, ApiError) and e.code == 5 and self.on_token_expired:
+                    new_token = self.on_token_expired()
+                    if new_token:
+                        logger.info("Токен обновлён по ошибке 5, повтор video.get")
+                        self.update_token(new_token)
+                        continue
+                if not self._handle_api_error(e, attempt):
+                    raise VKPublisherError(f"video.get: {e}") from e
+                if attempt < self.max_retries - 1:
+                    self._retry_pause(e)
+        raise VKPublisherError(f"video.get: не выполнено после {self.max_retries} попыток")
+
+    def get_videos(self, items: list[tuple[int, int]]) -> dict[tuple[int, int], dict]:
+        """Метаданные видео из VK пачками video.get(videos=...) по VIDEO_GET_BATCH_SIZE.
+
+        Args:
+            items: (owner_id, video_id) для каждого видео.
+
+        Returns:
+            {(owner_id, video_id): элемент video.get (title, description, ...)}; удалённых
+            и недоступных видео в словаре нет.
+
+        Raises:
+            VKPublisherError: Пачку не удалось получить после max_retries попыток.
+        """
+        found: dict[tuple[int, int], dict] = {}
+        for start in range(0, len(items), VIDEO_GET_BATCH_SIZE):
+            chunk = items[start:start + VIDEO_GET_BATCH_SIZE]
+            videos = ",".join(f"{owner_id}_{video_id}" for owner_id, video_id in chunk)
+            response = self._video_get(videos=videos, count=len(chunk))
+            for video in response.get("items", []):
+                found[(video.get("owner_id"), video.get("id"))] = video
+        return found
+
+    def list_group_videos(self, offset: int = 0, count: int = VIDEO_GET_BATCH_SIZE) -> dict:
+        """Страница видео группы (video.get по owner_id, новые первыми).
+
+        Returns:
+            Ответ video.get: count (всего видео в группе) и items.
+
+        Raises:
+            VKPublisherError: group_id не задан или запрос не удался.
+        """
+        if not self.group_id:
+            raise VKPublisherError("list_group_videos: group_id не задан")
+        return self._video_get(owner_id=-self.group_id, offset=offset, count=count)
+
     @staticmethod
     def parse_video_url(video_url: str) -> Optional[Tuple[int, int]]:
         """Извлечь owner_id и video_id из URL вида https://vk.com/video-12345_67890."""
@@ -3,8 +3,20 @@
 from .database import VideoStorage, VideoRecord
 from .duplicate_detector import DuplicateDetector
 from .job_queue import JobQueue, JobRecord, STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED
+from .upload_journal import UploadJournal, UploadJournalEntry
+from .upload_intents import UploadIntents, UploadIntent
+from .upload_runs import UploadRuns
+from .upload_quota import UploadQuota, upload_quota_key
+from .content_hub_outbox import ContentHubOutbox, OutboxEvent
+from .canonical_backfill import BackfillCheckpoint
 
 __all__ = [
     "VideoStorage", "VideoRecord", "DuplicateDetector",
     "JobQueue", "JobRecord", "STATUS_PENDING", "STATUS_RUNNING", "STATUS_DONE", "STATUS_FAILED",
+    "UploadJournal", "UploadJournalEntry",
+    "UploadIntents", "UploadIntent",
+    "UploadRuns",
+    "UploadQuota", "upload_quota_key",
+    "ContentHubOutbox", "OutboxEvent",
+    "BackfillCheckpoint",
 ]
@@ -0,0 +1,67 @@
+"""Checkpoint content-hub-backfill (таблица canonical_backfill в videos.db).
+
+Backfill идёт по videos в порядке id; после каждой записанной пачки сохраняется id последней
+записи, следующий запуск продолжает с него. Ключ — назначение (vk).
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillCheckpoint:
+    """Checkpoint backfill в SQLite. Контракт: last_id, save, reset."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS canonical_backfill (
+                destination TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                written INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def last_id(self, destination: str) -> int:
+        """id последней записанной записи (0 — backfill не запускался или сброшен)."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            "SELECT last_id FROM canonical_backfill WHERE destination = ?", (destination,)
+        ).fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def save(self, destination: str, last_id: int, written: int) -> None:
+        """Сдвинуть checkpoint после записанной пачки (written — записей в пачке)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            INSERT INTO canonical_backfill (destination, last_id, written, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(destination) DO UPDATE SET
+                last_id = excluded.last_id,
+                written = canonical_backfill.written + excluded.written,
+                updated_at = excluded.updated_at
+            """,
+            (destination, last_id, written, datetime.now(timezone.utc).isoformat()),
+        )
+        conn.commit()
+        conn.close()
+        logger.debug("canonical_backfill %s: last_id=%s", destination, last_id)
+
+    def reset(self, destination: str) -> None:
+        """Начать backfill сначала."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM canonical_backfill WHERE destination = ?", (destination,))
+        conn.commit()
+        conn.close()
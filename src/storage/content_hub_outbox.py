@@ -0,0 +1,144 @@
+"""Outbox canonical write в Content Hub (таблица canonical_outbox в videos.db).
+
+Путь загрузки только добавляет событие (publication + link_map одной записи); в Content Hub
+события отправляет ContentHubFlusher пачками через один клиент. Неудачная отправка
+откладывается с растущей паузой (next_attempt_at). Новое событие записи заменяет её ещё не
+отправленное: отложенная старая попытка не перезапишет в Content Hub более свежий результат.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutboxEvent:
+    """Событие outbox: payload — поля PublicationPayload (и признак записи link_map)."""
+    id: int
+    global_uid: str
+    destination: str
+    payload_json: str
+    attempts: int
+    next_attempt_at: Optional[str]
+    last_error: Optional[str]
+
+    def payload(self) -> dict:
+        return json.loads(self.payload_json) if self.payload_json else {}
+
+
+class ContentHubOutbox:
+    """Outbox в SQLite. Контракт: append, due, delete, retry_later, stats."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS canonical_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                global_uid TEXT NOT NULL,
+                destination TEXT NOT NULL,
+                payload_json TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TEXT,
+                last_error TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_canonical_outbox_next ON canonical_outbox(next_attempt_at)"
+        )
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _now_iso() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def append(self, global_uid: str, destination: str, payload: dict) -> int:
+        """Добавить событие вместо неотправленных событий той же записи и назначения. Возвращает id."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "DELETE FROM canonical_outbox WHERE global_uid = ? AND destination = ?", (global_uid, destination)
+        )
+        cursor = conn.execute(
+            "INSERT INTO canonical_outbox (global_uid, destination, payload_json, created_at) VALUES (?, ?, ?, ?)",
+            (global_uid, destination, json.dumps(payload, ensure_ascii=False), self._now_iso()),
+        )
+        event_id = cursor.lastrowid or 0
+        conn.commit()
+        conn.close()
+        logger.debug("canonical_outbox append id=%s global_uid=%s", event_id, global_uid)
+        return event_id
+
+    def due(self, limit: int, ignore_backoff: bool = False, after_id: int = 0) -> list[OutboxEvent]:
+        """События с id > after_id, которые пора отправить (по возрастанию id; ignore_backoff — и отложенные)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        if ignore_backoff:
+            rows = conn.execute(
+                "SELECT * FROM canonical_outbox WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                """
+                SELECT * FROM canonical_outbox
+                WHERE id > ? AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                ORDER BY id LIMIT ?
+                """,
+                (after_id, self._now_iso(), limit),
+            ).fetchall()
+        conn.close()
+        return [
+            OutboxEvent(
+                id=row["id"],
+                global_uid=row["global_uid"],
+                destination=row["destination"],
+                payload_json=row["payload_json"],
+                attempts=row["attempts"],
+                next_attempt_at=row["next_attempt_at"],
+                last_error=row["last_error"],
+            )
+            for row in rows
+        ]
+
+    def delete(self, event_ids: list[int]) -> None:
+        """Удалить отправленные события."""
+        if not event_ids:
+            return
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("DELETE FROM canonical_outbox WHERE id = ?", [(i,) for i in event_ids])
+        conn.commit()
+        conn.close()
+
+    def retry_later(self, event_id: int, error: str, delay_sec: float) -> None:
+        """Отложить событие после неудачной отправки."""
+        next_attempt = datetime.now(timezone.utc) + timedelta(seconds=delay_sec)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            UPDATE canonical_outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+            WHERE id = ?
+            """,
+            (next_attempt.isoformat(), (error or "")[:1024], event_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> dict:
+        """Всего событий, из них отложенных после ошибки."""
+        conn = sqlite3.connect(self.db_path)
+        total, failed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(attempts > 0), 0) FROM canonical_outbox"
+        ).fetchone()
+        conn.close()
+        return {"pending": total, "retrying": failed}
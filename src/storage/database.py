@@ -13,6 +13,11 @@ from ..config.registry import COURSE_TYPES
 logger = logging.getLogger(__name__)
 
 
+def description_hash(description: Optional[str]) -> str:
+    """Хеш описания для мемоизации заголовков (sha1 от UTF-8, пустое описание = "")."""
+    return hashlib.sha1((description or "").encode("utf-8")).hexdigest()
+
+
 @dataclass
 class VideoRecord:
     """Запись о видео в хранилище."""
@@ -31,6 +36,10 @@ class VideoRecord:
     post_url: Optional[str] = None  # URL поста на стене
     error_message: Optional[str] = None  # Сообщение об ошибке при загрузке
     skip_upload: bool = False  # Пропускать при загрузке (не загружать)
+    title_generator: Optional[str] = None  # Генератор, которым посчитан title
+    title_generator_version: Optional[str] = None  # Версия правил генератора (BaseTitleGenerator.get_version)
+    title_description_hash: Optional[str] = None  # description_hash описания, по которому посчитан title
+    file_size: Optional[int] = None  # Размер файла (байт) на момент scan — для порядка загрузки
     
     def to_dict(self) -> dict:
         """Преобразовать в словарь."""
@@ -83,6 +92,17 @@ class VideoStorage:
             cursor.execute("ALTER TABLE videos ADD COLUMN skip_upload INTEGER DEFAULT 0")
         except sqlite3.OperationalError:
             pass  # колонка уже есть
+        # Миграция: мемоизация заголовков (хеш описания, генератор и версия его правил)
+        for column in ("description_hash", "title_generator", "title_generator_version", "title_description_hash"):
+            try:
+                cursor.execute(f"ALTER TABLE videos ADD COLUMN {column} TEXT")
+            except sqlite3.OperationalError:
+                pass  # колонка уже есть
+        # Миграция: размер файла (планирование загрузки по размеру)
+        try:
+            cursor.execute("ALTER TABLE videos ADD COLUMN file_size INTEGER")
+        except sqlite3.OperationalError:
+            pass  # колонка уже есть
 
         # Индексы для быстрого поиска
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_path ON videos(file_path)")
@@ -91,6 +111,7 @@ class VideoStorage:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_channel ON videos(channel)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_source_folder ON videos(source_folder)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_skip_upload ON videos(skip_upload)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_video_url ON videos(video_url)")
         
         # Таблица маппинга: папка -> тип курса (Python, ЕГЭ, ОГЭ)
         cursor.execute("""
@@ -148,8 +169,10 @@ class VideoStorage:
                 INSERT INTO videos (
                     file_path, file_hash, title, description, channel,
                     source_folder, date, uploaded, upload_date,
-                    video_url, post_url, error_message, skip_upload
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    video_url, post_url, error_message, skip_upload,
+                    description_hash, title_generator, title_generator_version, title_description_hash,
+                    file_size
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 record.file_path,
                 record.file_hash,
@@ -164,6 +187,11 @@ class VideoStorage:
                 record.post_url,
                 record.error_message,
                 1 if record.skip_upload else 0,
+                description_hash(record.description),
+                record.title_generator,
+                record.title_generator_version,
+                record.title_description_hash,
+                record.file_size,
             ))
             
             record_id = cursor.lastrowid
@@ -181,7 +209,12 @@ class VideoStorage:
                     description = ?,
                     channel = ?,
                     source_folder = ?,
-                    date = ?
+                    date = ?,
+                    description_hash = ?,
+                    title_generator = ?,
+                    title_generator_version = ?,
+                    title_description_hash = ?,
+                    file_size = COALESCE(?, file_size)
                 WHERE file_path = ?
             """, (
                 record.file_hash,
@@ -190,6 +223,11 @@ class VideoStorage:
                 record.channel,
                 record.source_folder,
                 record.date.isoformat() if record.date else None,
+                description_hash(record.description),
+                record.title_generator,
+                record.title_generator_version,
+                record.title_description_hash,
+                record.file_size,
                 record.file_path,
             ))
             conn.commit()
@@ -243,7 +281,10 @@ class VideoStorage:
         """Обновить только описание записи по id."""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute("UPDATE videos SET description = ? WHERE id = ?", (description, video_id))
+        cursor.execute(
+            "UPDATE videos SET description = ?, description_hash = ? WHERE id = ?",
+            (description, description_hash(description), video_id),
+        )
         conn.commit()
         conn.close()
         logger.debug(f"Обновлено описание для видео id={video_id}")
@@ -419,6 +460,123 @@ class VideoStorage:
         
         return [self._row_to_record(row) for row in rows]
     
+    def get_distinct_channels(self) -> List[Optional[str]]:
+        """Получить список каналов, встречающихся в БД (включая None).
+
+        Returns:
+            Значения колонки channel как есть (без нормализации).
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT channel FROM videos")
+        channels = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return channels
+
+    def get_stale_titles(self, channels: List[Optional[str]], generator: str, version: str,
+                         force: bool = False, after_id: int = 0,
+                         limit: Optional[int] = None) -> List[VideoRecord]:
+        """Получить записи каналов, чей заголовок посчитан не текущей версией генератора.
+
+        Запись устарела, если заголовок посчитан другим генератором или другой версией
+        его правил, либо описание изменилось после расчёта (description_hash).
+        Фильтр по skip_upload такой же, как в get_videos_range.
+
+        Args:
+            channels: Значения колонки channel (None — записи без канала).
+            generator: Имя генератора (BaseTitleGenerator.get_name).
+            version: Версия генератора (BaseTitleGenerator.get_version).
+            force: Вернуть все записи каналов, не проверяя мемоизацию.
+            after_id: Только записи с id > after_id (постраничная выборка по id).
+            limit: Максимум записей (None = все).
+
+        Returns:
+            Список устаревших записей по возрастанию id.
+        """
+        named = [c for c in channels if c is not None]
+        conditions = []
+        params: list = []
+        if named:
+            conditions.append(f"channel IN ({','.join('?' * len(named))})")
+            params.extend(named)
+        if len(named) != len(channels):
+            conditions.append("channel IS NULL")
+        if not conditions:
+            return []
+        query = f"SELECT * FROM videos WHERE id > ? AND ({' OR '.join(conditions)}) AND (skip_upload IS NULL OR skip_upload = 0)"
+        params.insert(0, after_id)
+        if not force:
+            query += """
+              AND (title_generator IS NOT ? OR title_generator_version IS NOT ?
+                   OR description_hash IS NULL OR title_description_hash IS NOT description_hash)"""
+            params.extend([generator, version])
+        query += " ORDER BY id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_record(row) for row in rows]
+
+    def update_titles_bulk(self, updates: List[tuple]) -> int:
+        """Записать пересчитанные заголовки одной транзакцией.
+
+        Args:
+            updates: Кортежи (id, title, title_generator, title_generator_version, description).
+                Хеш описания сохраняется и как description_hash, и как title_description_hash.
+
+        Returns:
+            Количество обновлённых строк.
+        """
+        if not updates:
+            return 0
+        rows = []
+        for video_id, title, generator, version, description in updates:
+            desc_hash = description_hash(description)
+            rows.append((title, generator, version, desc_hash, desc_hash, video_id))
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            cursor = conn.executemany(
+                """
+                UPDATE videos SET
+                    title = ?,
+                    title_generator = ?,
+                    title_generator_version = ?,
+                    title_description_hash = ?,
+                    description_hash = ?
+                WHERE id = ?
+                """,
+                rows,
+            )
+            count = cursor.rowcount
+        conn.close()
+        return count
+
+    def get_uploaded_after(self, after_id: int, limit: int) -> List[VideoRecord]:
+        """Загруженные записи (uploaded=1 и есть video_url) с id > after_id, по возрастанию id.
+
+        Args:
+            after_id: Последний обработанный id (постраничная выборка по id).
+            limit: Максимум записей.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM videos
+            WHERE id > ? AND uploaded = 1 AND video_url IS NOT NULL AND video_url != ''
+            ORDER BY id LIMIT ?
+            """,
+            (after_id, limit),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_record(row) for row in rows]
+
     def get_videos_by_ids(self, video_ids: List[int]) -> List[VideoRecord]:
         """Получить записи по списку ID (сохраняя порядок ID).
         
@@ -684,4 +842,8 @@ class VideoStorage:
             post_url=row["post_url"],
             error_message=row["error_message"],
             skip_upload=bool(row["skip_upload"]) if "skip_upload" in row.keys() else False,
+            title_generator=row["title_generator"] if "title_generator" in row.keys() else None,
+            title_generator_version=row["title_generator_version"] if "title_generator_version" in row.keys() else None,
+            title_description_hash=row["title_description_hash"] if "title_description_hash" in row.keys() else None,
+            file_size=row["file_size"] if "file_size" in row.keys() else None,
         )
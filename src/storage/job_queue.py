@@ -218,6 +218,37 @@ class JobQueue:
         conn.close()
         logger.debug("fail job id=%s", job_id)
 
+    def pending(self, job_type: str) -> list[JobRecord]:
+        """Задачи типа job_type в статусе pending (по возрастанию id)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT id, type, payload_json, status, attempt, run_after, error, created_at, updated_at
+            FROM jobs WHERE status = ? AND type = ? ORDER BY id
+            """,
+            (STATUS_PENDING, job_type),
+        ).fetchall()
+        conn.close()
+        return [self._row_to_record(row) for row in rows]
+
+    def reschedule(self, run_after: dict[int, Optional[datetime]]) -> None:
+        """Задать run_after задачам (job_id → время; None — без ожидания). Задачи не в pending не меняются."""
+        if not run_after:
+            return
+        now = self._now_iso()
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            "UPDATE jobs SET run_after = ?, updated_at = ? WHERE id = ? AND status = ?",
+            [
+                (moment.isoformat() if moment else None, now, job_id, STATUS_PENDING)
+                for job_id, moment in run_after.items()
+            ],
+        )
+        conn.commit()
+        conn.close()
+        logger.debug("reschedule %s jobs", len(run_after))
+
     def get_job(self, job_id: int) -> Optional[JobRecord]:
         """Прочитать задачу по id (для тестов и отладки)."""
         conn = sqlite3.connect(self.db_path)
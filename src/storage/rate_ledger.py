@@ -0,0 +1,98 @@
+"""Общее для процессов состояние лимитов VK API (SQLite). Используется AdaptiveRateLimiter.
+
+Несколько `main.py worker --loop` и CLI-команд с одним аккаунтом (переменной токена)
+расходуют одни ведра (upload — ещё и с одной группой): состояние читается и пишется в транзакции BEGIN IMMEDIATE (как claim_next
+в JobQueue), поэтому изменения ведра из разных процессов сериализуются.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Поля ведра, хранимые в таблице (атрибуты объекта ведра лимитера)
+_BUCKET_FIELDS = ("rate", "tokens", "updated", "blocked_until", "streak")
+
+
+def rate_ledger_key(account: str, group_id: Optional[int] = None) -> str:
+    """Ключ ведра: аккаунт (имя переменной токена, VkDestination.token_env), для семейств с бюджетом группы — и группа.
+
+    Ключ не зависит от значения токена: после обновления токена бюджет и выученные скорости
+    остаются прежними. Лимиты VK на вызовы API считаются по аккаунту, поэтому get/edit/delete
+    ключуются без группы: назначения с общим токеном делят один бюджет.
+    """
+    return account if group_id is None else f"{account}:{group_id}"
+
+
+class RateLedger:
+    """Состояние ведер лимитера в таблице vk_rate_ledger (ключ rate_ledger_key, семейство методов)."""
+
+    def __init__(self, db_path: Path = Path("videos.db"), timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS vk_rate_ledger (
+                key TEXT NOT NULL,
+                family TEXT NOT NULL,
+                rate REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                streak INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (key, family)
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение на поток: transaction() вызывается на каждый запрос к VK
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, key: str, family: str, create: Callable[[], Any]) -> Iterator[Any]:
+        """Заблокировать ведро (BEGIN IMMEDIATE), отдать его для изменения и сохранить.
+
+        Args:
+            key: Ключ (rate_ledger_key).
+            family: Семейство методов (upload, edit, delete, get).
+            create: Новое ведро, если строки ещё нет.
+
+        Yields:
+            Ведро с атрибутами rate, tokens, updated, blocked_until, streak.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(_BUCKET_FIELDS)} FROM vk_rate_ledger WHERE key = ? AND family = ?",
+                (key, family),
+            ).fetchone()
+            bucket = create()
+            if row:
+                for name, value in zip(_BUCKET_FIELDS, row):
+                    setattr(bucket, name, value)
+            yield bucket
+            conn.execute(
+                f"INSERT OR REPLACE INTO vk_rate_ledger (key, family, {', '.join(_BUCKET_FIELDS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, family, *(getattr(bucket, name) for name in _BUCKET_FIELDS)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
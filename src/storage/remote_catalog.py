@@ -0,0 +1,202 @@
+"""Локальное зеркало видео группы VK (таблица remote_videos) и сверка с таблицей videos.
+
+Заполняется командой vk-sync (video.get по 200 видео за запрос). Сверка — запросы
+к SQLite по индексам, без обращений к API: записи с video_url, которых нет в VK;
+видео в VK, которых нет в БД; повторяющиеся названия в VK.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import logging
+
+from .database import description_hash
+
+logger = logging.getLogger(__name__)
+
+
+def remote_video_url(owner_id: int, video_id: int) -> str:
+    """URL видео в формате, который пишет VKPublisher (videos.video_url)."""
+    return f"https://vk.com/video{owner_id}_{video_id}"
+
+
+@dataclass
+class RemoteVideo:
+    """Видео группы VK в локальном зеркале."""
+    owner_id: int
+    video_id: int
+    video_url: str
+    title: str
+    description_hash: str
+    duration: Optional[int]
+    date: Optional[datetime]
+
+
+class RemoteCatalog:
+    """Зеркало video.get группы в таблице remote_videos. Контракт: upsert, prune, last_date, отчёты сверки."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS remote_videos (
+                owner_id INTEGER NOT NULL,
+                video_id INTEGER NOT NULL,
+                video_url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description_hash TEXT NOT NULL,
+                duration INTEGER,
+                date TEXT,
+                synced_at TEXT NOT NULL,
+                PRIMARY KEY (owner_id, video_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_remote_videos_url ON remote_videos(video_url)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_remote_videos_title ON remote_videos(title)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_remote_videos_desc ON remote_videos(description_hash)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_remote_videos_date ON remote_videos(owner_id, date)")
+        conn.commit()
+        conn.close()
+
+    def _now_iso(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def upsert(self, items: Iterable[dict]) -> tuple[int, int]:
+        """Сохранить элементы video.get (новые и изменённые).
+
+        Returns:
+            (добавлено, уже было).
+        """
+        rows = []
+        for item in items:
+            owner_id, video_id = item["owner_id"], item["id"]
+            date = datetime.fromtimestamp(item["date"], timezone.utc).isoformat() if item.get("date") else None
+            rows.append((
+                owner_id, video_id, remote_video_url(owner_id, video_id), item.get("title") or "",
+                description_hash(item.get("description")), item.get("duration"), date,
+            ))
+        if not rows:
+            return (0, 0)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        placeholders = ",".join("(?, ?)" for _ in rows)
+        cursor.execute(
+            f"SELECT COUNT(*) FROM remote_videos WHERE (owner_id, video_id) IN (VALUES {placeholders})",
+            [value for row in rows for value in row[:2]],
+        )
+        existing = cursor.fetchone()[0]
+        now = self._now_iso()
+        cursor.executemany(
+            """
+            INSERT INTO remote_videos (owner_id, video_id, video_url, title, description_hash, duration, date, synced_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(owner_id, video_id) DO UPDATE SET
+                title = excluded.title,
+                description_hash = excluded.description_hash,
+                duration = excluded.duration,
+                date = excluded.date,
+                synced_at = excluded.synced_at
+            """,
+            [row + (now,) for row in rows],
+        )
+        conn.commit()
+        conn.close()
+        return (len(rows) - existing, existing)
+
+    def prune(self, owner_id: int, synced_since: str) -> int:
+        """Удалить видео владельца, не встреченные в полной синхронизации (synced_at раньше synced_since)."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM remote_videos WHERE owner_id = ? AND synced_at < ?",
+            (owner_id, synced_since),
+        )
+        removed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return removed
+
+    def last_date(self, owner_id: int) -> Optional[str]:
+        """Дата самого нового видео владельца в зеркале (ISO) или None, если зеркало пусто."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT MAX(date) FROM remote_videos WHERE owner_id = ?", (owner_id,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def count(self, owner_id: int) -> int:
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT COUNT(*) FROM remote_videos WHERE owner_id = ?", (owner_id,)).fetchone()
+        conn.close()
+        return row[0]
+
+    def _row_to_remote(self, row: sqlite3.Row) -> RemoteVideo:
+        return RemoteVideo(
+            owner_id=row["owner_id"],
+            video_id=row["video_id"],
+            video_url=row["video_url"],
+            title=row["title"],
+            description_hash=row["description_hash"],
+            duration=row["duration"],
+            date=datetime.fromisoformat(row["date"]) if row["date"] else None,
+        )
+
+    def missing_remotely(self, owner_id: int) -> List[tuple[int, str, str]]:
+        """Записи videos с video_url этой группы, которых нет в зеркале: (id, title, video_url)."""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            """
+            SELECT v.id, v.title, v.video_url FROM videos v
+            WHERE v.video_url LIKE ? ESCAPE '\\' AND NOT EXISTS (
+                SELECT 1 FROM remote_videos r WHERE r.video_url = v.video_url
+            )
+            ORDER BY v.id
+            """,
+            (remote_video_url(owner_id, 0)[:-1].replace("_", "\\_") + "%",),
+        ).fetchall()
+        conn.close()
+        return rows
+
+    def orphaned_remotely(self, owner_id: int) -> List[RemoteVideo]:
+        """Видео группы в VK, на которые не ссылается ни одна запись videos."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT r.* FROM remote_videos r
+            WHERE r.owner_id = ? AND NOT EXISTS (
+                SELECT 1 FROM videos v WHERE v.video_url = r.video_url
+            )
+            ORDER BY r.date
+            """,
+            (owner_id,),
+        ).fetchall()
+        conn.close()
+        return [self._row_to_remote(row) for row in rows]
+
+    def duplicated_titles(self, owner_id: int) -> List[tuple[str, List[RemoteVideo]]]:
+        """Названия, встречающиеся в группе больше одного раза: [(название, видео)]."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """
+            SELECT r.* FROM remote_videos r
+            JOIN (
+                SELECT title FROM remote_videos WHERE owner_id = ? GROUP BY title HAVING COUNT(*) > 1
+            ) d ON d.title = r.title
+            WHERE r.owner_id = ?
+            ORDER BY r.title, r.date
+            """,
+            (owner_id, owner_id),
+        ).fetchall()
+        conn.close()
+        groups: dict[str, List[RemoteVideo]] = {}
+        for row in rows:
+            groups.setdefault(row["title"], []).append(self._row_to_remote(row))
+        return list(groups.items())
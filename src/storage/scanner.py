@@ -8,10 +8,10 @@ import logging
 from ..parsers.html_parser import HTMLParser
 from ..parsers.json_parser import JSONParser
 from ..parsers.custom_export_parser import CustomExportParser
-from ..title_generators.factory import TitleGeneratorFactory
+from ..title_generators.factory import TitleGeneratorFactory, generate_titles_by_channel
 from ..models.video import VideoData
-from ..config.registry import CHANNEL_TO_TITLE_GENERATOR
-from .database import VideoStorage, VideoRecord
+from ..config.registry import CHANNEL_TO_TITLE_GENERATOR, title_generator_name
+from .database import VideoStorage, VideoRecord, description_hash
 from .duplicate_detector import DuplicateDetector
 
 logger = logging.getLogger(__name__)
@@ -95,18 +95,20 @@ class VideoScanner:
                 except Exception as e:
                     logger.error(f"Ошибка при парсинге {export_path}: {e}", exc_info=True)
         
-        # Генерируем заголовки по маппингу из config.registry
-        channel_generators = {
-            ch: TitleGeneratorFactory.create(gen_name)
-            for ch, gen_name in CHANNEL_TO_TITLE_GENERATOR.items()
+        # Генерируем заголовки по маппингу из config.registry (пакетами по генератору)
+        generators = {
+            name: TitleGeneratorFactory.create(name)
+            for name in {*CHANNEL_TO_TITLE_GENERATOR.values(), "simple"}
         }
-        for video_data, source_folder in all_videos:
-            generator = channel_generators.get(video_data.channel) or TitleGeneratorFactory.create("simple")
-            
-            if generator:
-                video_data.title = generator.generate(video_data)
-            else:
-                video_data.title = video_data.file_path.stem
+        generator_for = lambda ch: generators[title_generator_name(ch)]
+        titles = generate_titles_by_channel(
+            [(v.description, v.file_path.stem, v.date, v.channel) for v, _ in all_videos],
+            generator_for,
+        )
+        for (video_data, source_folder), title in zip(all_videos, titles):
+            video_data.title = title if title is not None else video_data.file_path.stem
+            # Мемоизация для recalc-titles: каким генератором и по какому описанию посчитан заголовок
+            generator = generator_for(video_data.channel)
             
             # Вычисляем хеш файла
             try:
@@ -114,6 +116,10 @@ class VideoScanner:
             except Exception as e:
                 logger.warning(f"Не удалось вычислить хеш для {video_data.file_path}: {e}")
                 file_hash = None
+            try:
+                file_size = video_data.file_path.stat().st_size
+            except OSError:
+                file_size = None
             
             # Проверяем на дубликаты (но всё равно вызываем add_video для обновления заголовка/описания)
             is_duplicate = False
@@ -134,6 +140,10 @@ class VideoScanner:
                 source_folder=str(source_folder),
                 date=video_data.date,
                 uploaded=False,
+                title_generator=generator.get_name(),
+                title_generator_version=generator.get_version(),
+                title_description_hash=description_hash(video_data.description),
+                file_size=file_size,
             )
             
             # Добавляем в хранилище
@@ -0,0 +1,132 @@
+"""Намерения загрузки (таблица upload_intents): защита от повторной отправки видео в VK.
+
+Строка пишется перед публикацией записи, получает owner_id и id видео из ответа video.save,
+отмечается sent, когда файл целиком отправлен на upload-сервер, и удаляется после записи
+результата в videos (при ошибке публикации строка с sent=1 остаётся). Оставшаяся строка с sent=1
+значит, что процесс упал между отправкой и mark_uploaded или ответ о загрузке потерян: перед повторной загрузкой видео проверяется по сохранённому id (строки
+без id — поиском в группе по названию и хешу описания, см. main._reconcile_upload_intents).
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UploadIntent:
+    """Незавершённая (не записанная в videos) загрузка."""
+    video_id: int  # videos.id
+    title: str
+    description_hash: str
+    sent: bool  # Файл целиком отправлен на upload-сервер
+    created_at: datetime
+    owner_id: Optional[int] = None  # Из ответа video.save; None — video.save ещё не было
+    remote_video_id: Optional[int] = None
+
+
+class UploadIntents:
+    """Намерения загрузки в SQLite. Контракт: record, set_remote, mark_sent, clear, pending."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS upload_intents (
+                video_id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                description_hash TEXT NOT NULL,
+                sent INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+        """)
+        # Миграция: видео, созданное video.save для записи
+        for column in ("owner_id", "remote_video_id"):
+            try:
+                conn.execute(f"ALTER TABLE upload_intents ADD COLUMN {column} INTEGER")
+            except sqlite3.OperationalError:
+                pass  # колонка уже есть
+        conn.commit()
+        conn.close()
+
+    def _now_iso(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    def record(self, video_id: int, title: str, description_hash: str) -> None:
+        """Записать намерение перед публикацией (повторная запись сбрасывает sent и id видео)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO upload_intents (video_id, title, description_hash, sent, created_at) VALUES (?, ?, ?, 0, ?)",
+            (video_id, title, description_hash, self._now_iso()),
+        )
+        conn.commit()
+        conn.close()
+
+    def set_remote(self, video_id: int, owner_id: int, remote_video_id: int) -> None:
+        """Видео, созданное video.save для записи (по нему сверяется прерванная загрузка)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE upload_intents SET owner_id = ?, remote_video_id = ? WHERE video_id = ?",
+            (owner_id, remote_video_id, video_id),
+        )
+        conn.commit()
+        conn.close()
+
+    def mark_sent(self, video_id: int) -> None:
+        """Файл записи целиком отправлен на upload-сервер."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE upload_intents SET sent = 1 WHERE video_id = ?", (video_id,))
+        conn.commit()
+        conn.close()
+
+    def clear(self, video_id: int, keep_sent: bool = False) -> None:
+        """Результат публикации записан в videos — намерение больше не нужно.
+
+        Args:
+            keep_sent: Оставить намерение, если файл уже отправлен (публикация не удалась после
+                отправки, видео может быть в VK — его найдёт сверка следующего запуска).
+        """
+        conn = sqlite3.connect(self.db_path)
+        if keep_sent:
+            conn.execute("DELETE FROM upload_intents WHERE video_id = ? AND sent = 0", (video_id,))
+        else:
+            conn.execute("DELETE FROM upload_intents WHERE video_id = ?", (video_id,))
+        conn.commit()
+        conn.close()
+
+    def pending(self, video_ids: List[int]) -> List[UploadIntent]:
+        """Оставшиеся от прерванных запусков намерения с отправленным файлом для указанных записей."""
+        if not video_ids:
+            return []
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        intents = []
+        # Пачками: ограничение SQLite на число параметров
+        for start in range(0, len(video_ids), 500):
+            chunk = video_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT * FROM upload_intents WHERE sent = 1 AND video_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            intents.extend(
+                UploadIntent(
+                    video_id=row["video_id"],
+                    title=row["title"],
+                    description_hash=row["description_hash"],
+                    sent=bool(row["sent"]),
+                    created_at=datetime.fromisoformat(row["created_at"]),
+                    owner_id=row["owner_id"],
+                    remote_video_id=row["remote_video_id"],
+                )
+                for row in rows
+            )
+        conn.close()
+        return intents
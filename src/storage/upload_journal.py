@@ -0,0 +1,173 @@
+"""Журнал незавершённых загрузок видео (SQLite). Используется VKPublisher для докачки.
+
+Запись создаётся после video.save (upload_url, Session-ID, ответ video.save), в том числе
+упреждающего, и обновляется после каждого подтверждённого сервером блока. Перезапущенная
+команда upload-* или задача воркера находит запись по отпечатку файла и продолжает
+с подтверждённого смещения (или отправляет файл на уже полученный upload_url). Протухшие
+записи остаются до удаления созданного для них видео (VKPublisher.discard_stale_uploads).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Сколько хранится upload_url: более старые записи считаются протухшими
+UPLOAD_URL_TTL = timedelta(hours=12)
+
+
+def file_fingerprint(path: Path, owner_id: Optional[int] = None, account: str = "") -> str:
+    """Отпечаток загрузки для журнала: путь, размер и mtime файла (изменённый файл — новая загрузка)
+    и назначение — владелец видео и аккаунт токена: загрузка того же файла в другую группу
+    или другим токеном не подхватывает чужой upload_url.
+
+    Args:
+        path: Файл видео.
+        owner_id: Владелец загружаемого видео (-group_id для сообщества); None — страница владельца токена.
+        account: Аккаунт токена (имя переменной окружения токена, VkDestination.token_env).
+    """
+    path = Path(path)
+    stat = os.stat(path)
+    path_hash = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    owner = "user" if owner_id is None else str(owner_id)
+    return f"{account}:{owner}:{path_hash}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+@dataclass
+class UploadJournalEntry:
+    """Незавершённая загрузка."""
+    fingerprint: str
+    file_path: str
+    file_size: int
+    upload_url: str
+    session_id: str
+    offset: int  # Подтверждено сервером байт (с начала файла)
+    save_response_json: str
+    updated_at: datetime
+
+    def save_response(self) -> dict:
+        return json.loads(self.save_response_json) if self.save_response_json else {}
+
+    def is_stale(self) -> bool:
+        """upload_url старше UPLOAD_URL_TTL: загрузка начнётся заново, созданное видео нужно удалить."""
+        return datetime.now(timezone.utc) - self.updated_at > UPLOAD_URL_TTL
+
+
+class UploadJournal:
+    """Журнал загрузок в таблице upload_journal. Контракт: get, start, advance, remove."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS upload_journal (
+                fingerprint TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                upload_url TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                offset INTEGER NOT NULL DEFAULT 0,
+                save_response_json TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _now_iso(self) -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> UploadJournalEntry:
+        return UploadJournalEntry(
+            fingerprint=row["fingerprint"],
+            file_path=row["file_path"],
+            file_size=row["file_size"],
+            upload_url=row["upload_url"],
+            session_id=row["session_id"],
+            offset=row["offset"],
+            save_response_json=row["save_response_json"],
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+        )
+
+    def get(self, fingerprint: str, include_stale: bool = False) -> Optional[UploadJournalEntry]:
+        """Незавершённая загрузка по отпечатку файла.
+
+        Протухшая запись возвращается только с include_stale=True (чтобы удалить созданное для неё видео).
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM upload_journal WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+        entry = self._entry(row)
+        if entry.is_stale() and not include_stale:
+            logger.info("Журнал загрузок: запись для %s устарела, загрузка начнётся заново", entry.file_path)
+            return None
+        return entry
+
+    def stale(self, prefix: str = "") -> list[UploadJournalEntry]:
+        """Протухшие записи (старше UPLOAD_URL_TTL), отпечаток которых начинается с prefix."""
+        cutoff = (datetime.now(timezone.utc) - UPLOAD_URL_TTL).isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT * FROM upload_journal WHERE updated_at < ? AND substr(fingerprint, 1, ?) = ?",
+            (cutoff, len(prefix), prefix),
+        ).fetchall()
+        conn.close()
+        return [self._entry(row) for row in rows]
+
+    def start(
+        self,
+        fingerprint: str,
+        file_path: Path,
+        file_size: int,
+        upload_url: str,
+        session_id: str,
+        save_response: dict,
+    ) -> None:
+        """Записать новую загрузку (после video.save), смещение 0."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO upload_journal
+                (fingerprint, file_path, file_size, upload_url, session_id, offset, save_response_json, updated_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+            """,
+            (
+                fingerprint, str(file_path), file_size, upload_url, session_id,
+                json.dumps(save_response, ensure_ascii=False), self._now_iso(),
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    def advance(self, fingerprint: str, offset: int) -> None:
+        """Сохранить подтверждённое сервером смещение."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE upload_journal SET offset = ?, updated_at = ? WHERE fingerprint = ?",
+            (offset, self._now_iso(), fingerprint),
+        )
+        conn.commit()
+        conn.close()
+
+    def remove(self, fingerprint: str) -> None:
+        """Удалить запись (загрузка завершена или начинается заново)."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM upload_journal WHERE fingerprint = ?", (fingerprint,))
+        conn.commit()
+        conn.close()
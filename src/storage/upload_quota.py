@@ -0,0 +1,76 @@
+"""Израсходованная дневная квота загрузок по группам VK (таблица upload_quota).
+
+Строка (группа, день) увеличивается при каждой успешной публикации через VKDestinationAdapter —
+из worker и из команд upload-*, — поэтому расписание worker --schedule учитывает
+и ручные запуски. День — локальная календарная дата.
+"""
+
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def upload_quota_key(group_id: Optional[int]) -> str:
+    """Ключ квоты: ID группы (0 — загрузка к пользователю)."""
+    return str(abs(group_id or 0))
+
+
+class UploadQuota:
+    """Счётчики загрузок по (группа, день) в SQLite. Контракт: consume, usage, last_upload."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS upload_quota (
+                group_key TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL DEFAULT 0,
+                last_at TEXT NOT NULL,
+                PRIMARY KEY (group_key, day)
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def consume(self, group_key: str, at: Optional[datetime] = None) -> None:
+        """Учесть одну загрузку в группу (at — локальное время, по умолчанию сейчас)."""
+        at = at or datetime.now()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            INSERT INTO upload_quota (group_key, day, used, last_at) VALUES (?, ?, 1, ?)
+            ON CONFLICT(group_key, day) DO UPDATE SET used = used + 1, last_at = excluded.last_at
+            """,
+            (group_key, at.date().isoformat(), at.isoformat()),
+        )
+        conn.commit()
+        conn.close()
+        logger.debug("upload_quota: %s +1 (%s)", group_key, at.date())
+
+    def usage(self, group_key: str, since: date) -> Dict[date, int]:
+        """Загрузок по дням начиная с since."""
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT day, used FROM upload_quota WHERE group_key = ? AND day >= ?",
+            (group_key, since.isoformat()),
+        ).fetchall()
+        conn.close()
+        return {date.fromisoformat(day): used for day, used in rows}
+
+    def last_upload(self, group_key: str) -> Optional[datetime]:
+        """Время последней учтённой загрузки в группу."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            "SELECT MAX(last_at) FROM upload_quota WHERE group_key = ?", (group_key,)
+        ).fetchone()
+        conn.close()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
@@ -0,0 +1,72 @@
+"""Измеренная скорость загрузок (таблица upload_runs) для оценки времени пакета (--plan).
+
+Строка пишется в конце команды upload-* по счётчикам BandwidthShaper: отправлено байт,
+время отправки, число слотов. Оценка скорости одного слота — по последним запускам.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних запусков учитывать в оценке скорости
+THROUGHPUT_RECENT_RUNS = 20
+
+# Запуски с меньшим объёмом не показательны (время уходит на соединение и ответ сервера)
+THROUGHPUT_MIN_BYTES = 8 * 1024 * 1024
+
+
+class UploadRuns:
+    """Итоги запусков загрузки в SQLite. Контракт: record, slot_throughput."""
+
+    def __init__(self, db_path: Path = Path("videos.db")):
+        self.db_path = Path(db_path)
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS upload_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                command TEXT NOT NULL,
+                bytes_sent INTEGER NOT NULL,
+                transfer_sec REAL NOT NULL,
+                concurrency INTEGER NOT NULL DEFAULT 1,
+                finished_at TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def record(self, command: str, bytes_sent: int, transfer_sec: float, concurrency: int = 1) -> None:
+        """Сохранить итог запуска (без отправленных байт — не сохраняется)."""
+        if bytes_sent <= 0 or transfer_sec <= 0:
+            return
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO upload_runs (command, bytes_sent, transfer_sec, concurrency, finished_at) VALUES (?, ?, ?, ?, ?)",
+            (command, bytes_sent, transfer_sec, max(1, concurrency), datetime.now(timezone.utc).isoformat()),
+        )
+        conn.commit()
+        conn.close()
+
+    def slot_throughput(self, recent: int = THROUGHPUT_RECENT_RUNS) -> Optional[float]:
+        """Скорость одного слота (байт/с) по последним запускам или None, если измерений нет."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            """
+            SELECT SUM(bytes_sent), SUM(transfer_sec * concurrency) FROM (
+                SELECT bytes_sent, transfer_sec, concurrency FROM upload_runs
+                WHERE bytes_sent >= ? ORDER BY id DESC LIMIT ?
+            )
+            """,
+            (THROUGHPUT_MIN_BYTES, recent),
+        ).fetchone()
+        conn.close()
+        if not row or not row[0] or not row[1]:
+            return None
+        return row[0] / row[1]
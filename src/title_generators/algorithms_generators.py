@@ -3,63 +3,88 @@
 
 import re
 from .base import BaseTitleGenerator
-from ..models.video import VideoData
+from .rules import RuleSet, TitleContext, TitleRule
+
 
 PREFIX = "Алгоритмы и структуры данных. "
 MAX_TITLE_LEN = 100
 
 
+def _task_title(gen, ctx: TitleContext, m) -> str:
+    num, theme = m.group(1), (m.group(2) or "").strip()
+    if theme:
+        return f"{PREFIX}Задание {num} ({theme})"
+    return f"{PREFIX}Задание {num}"
+
+
+def _first_line_title(gen, ctx: TitleContext, m) -> str:
+    title = ctx.first_line
+    if len(title) > MAX_TITLE_LEN - len(PREFIX):
+        title = title[: MAX_TITLE_LEN - len(PREFIX) - 3].rsplit(" ", 1)[0] + "..."
+    return PREFIX + title
+
+
+def _numbered_stem(gen, ctx: TitleContext, m):
+    rest = m.group(1)
+    if "_" in rest and re.search(r"\d{2}_\d{2}_\d{2}", rest):
+        return f"{PREFIX}Урок (запись)"
+    if len(rest) <= 50:
+        return PREFIX + rest.replace("_", " ")
+    return None
+
+
+def _stem_default(gen, ctx: TitleContext) -> str:
+    if len(ctx.stem) > 50:
+        return f"{PREFIX}Урок (запись)"
+    return PREFIX + ctx.stem.replace("_", " ")
+
+
+# Первая строка описания: «Задание N[.M] [темы Z]» / «Задание N блока «Z»», иначе — сама строка
+FIRST_LINE_RULES = RuleSet(
+    "algorithms.first_line",
+    [
+        TitleRule(
+            "task_theme",
+            r"Задание\s+(\d+(?:\.\d+)?)(?:\s+темы\s+(.+?))?(?:\.|$)",
+            _task_title,
+            flags=re.IGNORECASE,
+            method="match",
+            keywords=("задание",),
+        ),
+        TitleRule(
+            "task_block",
+            r"Задание\s+(\d+(?:\.\d+)?)\s+блока\s+[«\"]?(.+?)[»\"]?(?:\.|$)",
+            _task_title,
+            flags=re.IGNORECASE,
+            method="match",
+            keywords=("задание", "блока"),
+        ),
+        TitleRule("first_line", None, _first_line_title, priority=100),
+    ],
+)
+
+# Нет описания — заголовок из stem
+STEM_RULES = RuleSet(
+    "algorithms.stem",
+    [
+        # Формат "2.4" или "2.4 a7edf3" (номер с хешем) — просто "Задание 2.4"
+        TitleRule("numbered_task", r"^(\d+\.\d+)\s*[a-fA-F0-9]*$", PREFIX + "Задание {0}", target="stem", method="match"),
+        TitleRule("numbered_lesson", r"^\d+_?(.+)$", _numbered_stem, target="stem", method="match"),
+    ],
+    default=_stem_default,
+)
+
+
 class AlgorithmsAutoTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для курса «Алгоритмы и структуры данных».
 
     Использует первую строку описания; для «Задание X.Y» — форматирует отдельно.
     """
 
-    def generate(self, video: VideoData) -> str:
-        description = (video.description or "").strip()
-        first_line = description.split("\n")[0].strip() if description else ""
-
-        if first_line:
-            # Задание N или Задание N.M (темы/блока Z)
-            m = re.match(
-                r"Задание\s+(\d+(?:\.\d+)?)(?:\s+темы\s+(.+?))?(?:\.|$)",
-                first_line,
-                re.IGNORECASE,
-            )
-            if not m:
-                m = re.match(
-                    r"Задание\s+(\d+(?:\.\d+)?)\s+блока\s+[«\"]?(.+?)[»\"]?(?:\.|$)",
-                    first_line,
-                    re.IGNORECASE,
-                )
-            if m:
-                num, theme = m.group(1), (m.group(2) or "").strip()
-                if theme:
-                    return f"{PREFIX}Задание {num} ({theme})"
-                return f"{PREFIX}Задание {num}"
-
-            # Обычная тема: первая строка как заголовок
-            title = first_line
-            if len(title) > MAX_TITLE_LEN - len(PREFIX):
-                title = title[: MAX_TITLE_LEN - len(PREFIX) - 3].rsplit(" ", 1)[0] + "..."
-            return PREFIX + title
-
-        # Нет описания — заголовок из stem
-        stem = video.file_path.stem
-        # Формат "2.4" или "2.4 a7edf3" (номер с хешем) — просто "Задание 2.4"
-        m = re.match(r"^(\d+\.\d+)\s*[a-fA-F0-9]*$", stem)
-        if m:
-            return f"{PREFIX}Задание {m.group(1)}"
-        m = re.match(r"^\d+_?(.+)$", stem)
-        if m:
-            rest = m.group(1)
-            if "_" in rest and re.search(r"\d{2}_\d{2}_\d{2}", rest):
-                return f"{PREFIX}Урок (запись)"
-            if len(rest) <= 50:
-                return PREFIX + rest.replace("_", " ")
-        if len(stem) > 50:
-            return f"{PREFIX}Урок (запись)"
-        return PREFIX + stem.replace("_", " ")
+    def generate_context(self, ctx: TitleContext) -> str:
+        if ctx.first_line:
+            return FIRST_LINE_RULES.apply(ctx, self)
+        return STEM_RULES.apply(ctx, self)
 
     def get_name(self) -> str:
         return "algorithms_auto"
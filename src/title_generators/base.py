@@ -1,33 +1,251 @@
 """Базовый класс для генераторов заголовков."""
 
+import functools
+import hashlib
+import re
+import sys
 from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
 
 from ..models.video import VideoData
+from .rules import RuleSet, TitleContext, function_key, lazy_attr
+
+
+class TitleItem(NamedTuple):
+    """Элемент пакета generate_batch; подходит и обычный кортеж (description, stem[, date[, channel]])."""
+    description: Optional[str]
+    stem: str
+    date: Optional[datetime] = None
+    channel: Optional[str] = None
+
+
+_PACKAGE = __name__.rsplit(".", 1)[0]
+
+
+def _constant_key(value: Any, module_name: Optional[str] = None) -> Any:
+    """Объект модуля для версии: таблица правил, regex, строка/число; функции и классы module_name — по коду.
+
+    Импортированные функции и классы (другой __module__) и прочие объекты — None: модули пакета
+    учитываются своими _module_digest.
+    """
+    if module_name is not None and getattr(value, "__module__", None) == module_name:
+        if isinstance(value, type):
+            return ("class", _class_key(value))
+        code = function_key(value)
+        if code is not None:
+            return ("code", code)
+    if isinstance(value, RuleSet):
+        return value.fingerprint()
+    if isinstance(value, re.Pattern):
+        return ("re", value.pattern, value.flags)
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple, frozenset, set)):
+        keys = [_constant_key(v) for v in value]
+        if all(k is not None for k in keys):
+            return (type(value).__name__, tuple(sorted(map(repr, keys)) if isinstance(value, (set, frozenset)) else keys))
+    if isinstance(value, dict):
+        keys = {repr(k): _constant_key(v) for k, v in value.items()}
+        if all(v is not None for v in keys.values()):
+            return ("dict", tuple(sorted(keys.items())))
+    return None
+
+
+def _class_key(cls: type) -> tuple:
+    """Код методов (в т.ч. static/class, property, lazy_attr) и константы атрибутов класса."""
+    keys = []
+    for name, value in sorted(vars(cls).items()):
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = (value.fget, value.fset, value.fdel)
+        elif isinstance(value, lazy_attr):
+            value = value.func
+        if isinstance(value, tuple):
+            key = tuple(function_key(f) for f in value)
+        else:
+            key = function_key(value)
+            if key is None and not name.startswith("__"):
+                key = _constant_key(value, cls.__module__)
+        if key is not None:
+            keys.append((name, key))
+    return tuple(keys)
+
+
+@functools.lru_cache(maxsize=None)
+def _module_digest(module_name: str) -> bytes:
+    """sha1 правил модуля: таблицы RuleSet, regex, константы и байткод его функций и методов классов.
+
+    Комментарии, docstring, пробелы и переводы строк версию не меняют (хешируется не исходник,
+    а code objects); правка шаблона, выражения или ветвления обработчика — меняет.
+    """
+    module = sys.modules[module_name]
+    h = hashlib.sha1(module_name.encode("utf-8"))
+    for name, value in sorted(vars(module).items()):
+        if name.startswith("__"):
+            continue
+        key = _constant_key(value, module_name)
+        if key is not None:
+            h.update(repr((name, key)).encode("utf-8"))
+    return h.digest()
+
+
+@functools.lru_cache(maxsize=None)
+def _rule_modules(module_name: str) -> frozenset:
+    """Модули пакета генераторов, от которых зависит модуль (транзитивно, по импортированным объектам)."""
+    seen = set()
+    stack = [module_name]
+    while stack:
+        name = stack.pop()
+        if name in seen or name not in sys.modules:
+            continue
+        seen.add(name)
+        for obj in vars(sys.modules[name]).values():
+            dep = obj.__name__ if isinstance(obj, type(sys)) else getattr(obj, "__module__", None)
+            if isinstance(dep, str) and dep.startswith(_PACKAGE + ".") and dep not in seen:
+                stack.append(dep)
+    return frozenset(seen)
 
 
 class BaseTitleGenerator(ABC):
     """Базовый класс для генераторов заголовков видео.
-    
+
     Позволяет создавать различные стратегии формирования заголовков
-    на основе данных видео.
+    на основе данных видео. Наследник переопределяет generate_context()
+    (работа с предобработанным TitleContext) или generate().
     """
-    
-    @abstractmethod
+
     def generate(self, video: VideoData) -> str:
         """Сгенерировать заголовок для видео.
-        
+
         Args:
             video: Данные видео.
-            
+
         Returns:
             Сгенерированный заголовок.
         """
-        pass
-    
+        return self.generate_context(TitleContext.from_video(video))
+
+    def generate_context(self, ctx: TitleContext) -> str:
+        """Сгенерировать заголовок по предобработанному контексту.
+
+        Генераторы, переопределившие только generate(), получают VideoData
+        без проверки существования файла.
+
+        Args:
+            ctx: Контекст (описание, первая строка, stem и т.д.).
+
+        Returns:
+            Сгенерированный заголовок.
+        """
+        if type(self).generate is BaseTitleGenerator.generate:
+            raise NotImplementedError(f"{type(self).__name__}: переопределите generate_context() или generate()")
+        # Расширение условное: генераторам нужен только stem/name пути
+        file_path = ctx.file_path or Path(f"{ctx.stem}.mp4")
+        video = VideoData(
+            file_path=file_path,
+            title="",
+            description=ctx.raw_description,
+            date=ctx.date,
+            channel=ctx.channel,
+            check_exists=False,
+        )
+        return self.generate(video)
+
+    def generate_batch(self, items: Iterable[TitleItem]) -> list[str]:
+        """Сгенерировать заголовки для пакета записей без VideoData и без обращений к диску.
+
+        Args:
+            items: TitleItem или кортежи (description, stem[, date[, channel]]).
+
+        Returns:
+            Заголовки в порядке items.
+        """
+        descriptions, stems, dates, channels = [], [], [], []
+        for item in items:
+            item = TitleItem(*item)
+            descriptions.append(item.description)
+            stems.append(item.stem)
+            dates.append(item.date)
+            channels.append(item.channel)
+        return self.generate_columns(descriptions, stems, dates, channels)
+
+    def generate_columns(
+        self,
+        descriptions: Sequence[Optional[str]],
+        stems: Sequence[str],
+        dates: Optional[Sequence[Optional[datetime]]] = None,
+        channels: Optional[Sequence[Optional[str]]] = None,
+    ) -> list[str]:
+        """Сгенерировать заголовки по колонкам одинаковой длины (см. generate_batch).
+
+        Args:
+            descriptions: Описания (None допускается).
+            stems: Имена файлов без расширения.
+            dates: Даты (опционально).
+            channels: Каналы (опционально).
+
+        Returns:
+            Заголовки в порядке входных колонок.
+        """
+        generate_context = self.generate_context
+        return [generate_context(ctx) for ctx in TitleContext.batch(descriptions, stems, dates, channels)]
+
+    def get_version(self) -> str:
+        """Версия правил генератора для мемоизации заголовков.
+
+        Хеш таблиц правил, regex, констант и кода функций и методов модуля генератора
+        и модулей правил, от которых он зависит, плюс параметры экземпляра (префикс, длины,
+        вложенные генераторы). Правка правил или обработчиков одного курса меняет версию
+        только его генераторов; правка комментариев и форматирования — не меняет.
+
+        Returns:
+            16 hex-символов.
+        """
+        version = self.__dict__.get("_version")
+        if version is None:
+            h = hashlib.sha1()
+            modules = set()
+            for cls in type(self).__mro__:
+                if cls.__module__.startswith(_PACKAGE + "."):
+                    modules |= _rule_modules(cls.__module__)
+            for name in sorted(modules):
+                h.update(_module_digest(name))
+            h.update(repr(sorted(self._version_params().items())).encode("utf-8"))
+            version = h.hexdigest()[:16]
+            self.__dict__["_version"] = version
+        return version
+
+    def _version_params(self) -> dict:
+        def value(v: Any) -> Any:
+            if isinstance(v, BaseTitleGenerator):
+                return v.get_version()
+            if isinstance(v, (list, tuple)):
+                return [value(x) for x in v]
+            if v is None or isinstance(v, (str, int, float, bool)):
+                return v
+            return type(v).__name__
+        return {k: value(v) for k, v in vars(self).items() if not k.startswith("_")}
+
+    def explain(self, video: VideoData) -> tuple[str, list[str]]:
+        """Сгенерировать заголовок и вернуть сработавшие правила («таблица:правило»).
+
+        Args:
+            video: Данные видео.
+
+        Returns:
+            (заголовок, список сработавших правил по порядку).
+        """
+        ctx = TitleContext.from_video(video)
+        title = self.generate_context(ctx)
+        return title, list(ctx.trace)
+
     @abstractmethod
     def get_name(self) -> str:
         """Получить имя генератора.
-        
+
         Returns:
             Имя генератора для использования в конфигурации.
         """
@@ -4,98 +4,155 @@ import re
 from typing import Optional
 
 from .base import BaseTitleGenerator
-from ..models.video import VideoData
-
-
-def _first_two_sentences(text: str, max_length: int = 120) -> str:
-    """Взять первые два предложения из текста (разделитель — точка с пробелом)."""
-    text = text.strip()
-    if not text:
-        return ""
-    parts = re.split(r'\.\s+', text)
-    if len(parts) == 1:
-        s = parts[0].strip()
-        return (s + ".") if not s.endswith(".") else s
-    two = (parts[0].strip() + ". " + parts[1].strip()).strip()
-    if not two.endswith("."):
-        two += "."
-    if len(two) > max_length:
-        two = two[: max_length - 3].rsplit(" ", 1)[0] + "..."
-    return two
+from .exam_rules import (
+    build_topic_rules,
+    example_in_file_rule,
+    explicit_task_rules,
+    heading_rule,
+    is_example_in_file,
+    lesson_rule,
+    razbor_po_teme_rule,
+    stem_task_rules,
+    terms_rule,
+    to_task,
+    to_topic,
+    topic_section_rules,
+    topic_title,
+    video_task_rules,
+)
+from .rules import RuleSet, TextView, TitleContext, TitleRule
+
+
+PREFIX = "Курс ЕГЭ по информатике"
+
+_I = re.IGNORECASE
+
+TOPIC_RULES = build_topic_rules("ege.topic", PREFIX)
+
+# Паттерны для номеров заданий (расширенные): (имя, паттерн, ключевые слова)
+_TASK_NUMBER_PATTERNS = [
+    ("tip", r'тип\s+(\d+)[_\d]', ("тип",)),  # "Тип 13_3784"
+    ("razbor_n", r'разбор\s+(\d+)[_\d]', ("разбор",)),  # "Разбор 8_40724"
+    ("reshenie_n", r'решение\s+(\d+)[_\d]', ("решение",)),  # "Решение 13_69921", "Решение 6_58245"
+    ("leading_n", r'^(\d+)[_\d]', ()),  # "26_27423" в начале строки
+    ("auxiliary_examples", r'вспомогательные\s+примеры\s+для\s+решения\s+(\d+)', ("вспомогательные",)),  # "Вспомогательные примеры для решения 17"
+    ("razbor_zadaniy_end", r'разбор\s+задани[ий]\s+(\d+)$', ("разбор", "задани")),  # "Разбор заданий 23" (в конце строки)
+    ("razbor_zadaniy_dot", r'разбор\s+задани[ий]\s+(\d+)\s*\.', ("разбор", "задани")),  # "Разбор заданий 23." (с точкой)
+    ("auxiliary_task", r'вспомогательного\s+задани[яе]\s*[№#]?\s*(\d+)', ("вспомогательного",)),  # "вспомогательного задания №8"
+    ("v_zadanii", r'в\s+задани[ии]\s+(\d+)', ("задани",)),  # "в задании 17"
+    ("tonkosti", r'тонкости\s+решений\s+задани[ий]\s+(\d+)', ("тонкости",)),  # "тонкости решений заданий 14"
+    ("teoriya", r'теори[ия]\s+по\s+задани[ям]\s+(\d+)', ("теори", "задани")),  # "теории по заданиям 5"
+    ("zadanie_no", r'задани[яе]\s*[№#]?\s*(\d+)', ("задани",)),  # "задание №25"
+    ("zadanie", r'задани[ея]\s+(\d+)', ("задани",)),  # "задание 3"
+    ("zadacha", r'задач[аи]\s+(\d+)', ("задач",)),  # "задача 16"
+    ("razbor_resheniy", r'разбор\s+решений\s+задани[ий]\s+(\d+)', ("разбор", "решений")),  # "разбор решений заданий 3"
+    ("razbor_nekotoryh", r'разбор\s+некоторых\s+задани[ий]\s+(\d+)', ("некоторых",)),  # "разбор некоторых заданий 5"
+    ("razbor_zadaniya", r'разбор\s+задани[ея]\s+(\d+)', ("разбор", "задани")),  # "разбор задания 5"
+    ("razbor_zadachi", r'разбор\s+задач[иа]\s+(\d+)', ("разбор", "задач")),  # "разбор задачи 16"
+    ("razbor_po_teme", r'разбор\s+задани[ий]\s+по\s+теме\s+(\d+)', ("разбор", "теме")),  # "разбор заданий по теме 3"
+    ("razbor_zadaniy_sep", r'разбор\s+задани[ий]\s+(\d+)[,\s]', ("разбор", "задани")),  # "разбор заданий 12," или "разбор заданий 12 "
+    ("razbor_zadaniy_range", r'разбор\s+задани[ий]\s+(\d+)[-_](\d+)', ("разбор", "задани")),  # "разбор заданий 19-21"
+    ("razbor_zadaniy_ege", r'разбор\s+задани[ий]\s+(\d+)\s+егэ', ("разбор", "егэ")),  # "разбор заданий 7 ЕГЭ"
+    ("reshenie_zadaniya_no", r'решение\s+задани[яе]\s*[№#]?\s*(\d+)', ("решение", "задани")),  # "решение задания №25"
+    ("reshenie_zadaniy_ege", r'решение\s+задани[ий]\s+егэ\s+(\d+)', ("решение", "егэ")),  # "решение заданий ЕГЭ 9"
+    ("reshenie_n_zadaniy", r'решение\s+(\d+)\s+задани[ий]', ("решение", "задани")),  # "решение 8 заданий", "решение 4 заданий"
+    ("resheniya_zadaniy", r'решения\s+задани[ий]\s+(\d+)', ("решения", "задани")),  # "решения заданий 13"
+    ("reshenie_zadaniya", r'решение\s+задани[ея]\s+(\d+)', ("решение", "задани")),
+    ("reshenie_zadaniy", r'решение\s+задани[ий]\s+(\d+)', ("решение", "задани")),  # "решение заданий 7"
+    ("reshenie_iz_bloka", r'решение\s+нескольких\s+задач\s+из\s+блока\s+(\d+)', ("нескольких", "блока")),  # "решение нескольких задач из блока 3"
+    ("pri_reshenii_zadaniy", r'при\s+решении\s+задани[ий]\s+(\d+)', ("решении", "задани")),  # "при решении заданий 3"
+    ("dlya_zadaniy", r'для\s+задани[ий]\s+(\d+)', ("для", "задани")),  # "для заданий 13"
+    ("zadaniya_nomer", r'задани[яе]\s+номер\s+(\d+)', ("номер",)),  # "заданий номер 9"
+    ("razbor_nomer", r'разбор\s+задани[ий]\s+номер\s+(\d+)', ("разбор", "номер")),  # "разбор заданий номер 9"
+    ("v_faile", r'в\s+файле\s+\w+\s+задани[яе]\s+(\d+)', ("файле", "задани")),  # "в файле B задания 27"
+    ("video_resheniya", r'видео\s+решения?\s+задани[ея]\s+(\d+)', ("видео", "задани")),  # "Видео решения задания 1"
+    ("videorazbor", r'видеоразбор\s+задани[яе]\s+(\d+)', ("видеоразбор",)),  # "Видеоразбор задания 1"
+    ("percent", r'для\s+решения\s+\d+%\s+задани[ий]\s+(\d+)', ("решения", "%")),  # "для решения 98% заданий 14"
+    ("pri_reshenii_n", r'при\s+решении\s+(\d+)\s+задани[ий]', ("решении", "задани")),  # "при решении 14 заданий"
+]
+
+
+def _task_number_rules(name: str, target: str) -> RuleSet:
+    return RuleSet(
+        name,
+        [
+            TitleRule(rule_name, pattern, lambda gen, ctx, m: int(m.group(1)),
+                      flags=_I, target=target, keywords=keywords)
+            for rule_name, pattern, keywords in _TASK_NUMBER_PATTERNS
+        ],
+    )
+
+
+TASK_NUMBER_RULES = _task_number_rules("ege.task_number", "first_line")
+# Если в первой строке не нашли — ищем по всему описанию (для 1057–1061 и подобных)
+TASK_NUMBER_TEXT_RULES = _task_number_rules("ege.task_number_text", "full_text")
+
+_RANGE_RX = re.compile(r'задани[ий]\s+(\d+)[-_](\d+)', re.IGNORECASE)
+_UNDERSCORE_NUMBER_RX = re.compile(r'\b(\d+)[_](\d+)\b')
+_SUBTYPE_DASH_RX = re.compile(r'(\d+)\s*-\s*(\d+)')
+_SUBTYPE_UNDERSCORE_RX = re.compile(r'(\d+)[_](\d+)')
+_RESHU_FIRST_LINE_RX = re.compile(r'решуегэ|рушу\s*егэ', re.IGNORECASE)
+
+
+def _bracket_resource(gen, text: TextView, m) -> str:
+    s = m.group(0).strip('()')
+    if re.search(r'яндекс', s, re.IGNORECASE):
+        return "Яндекс Учебник"
+    if re.search(r'крылов', s, re.IGNORECASE):
+        return "Крылов"
+    if re.search(r'комп|кегэ', s, re.IGNORECASE):
+        return "КЕГЭ"
+    return s
+
+
+# Источники заданий. Порядок важен: более специфичные паттерны первыми
+RESOURCE_RULES = RuleSet(
+    "ege.resource",
+    [
+        # Яндекс (ЕГЭ) / Яндекс Учебник
+        TitleRule("yandex", r'яндекс\s*\(?\s*егэ\s*\)?|яндекс\s+учебник', "Яндекс Учебник",
+                  target="lower", keywords=("яндекс",)),
+        TitleRule("yandex_word", r'\bяндекс\b', "Яндекс Учебник", target="lower", keywords=("яндекс",)),
+        # Сборник Крылова
+        TitleRule("krylov", r'\bкрылов\b', "Крылов", target="lower", keywords=("крылов",)),
+        # КомпЕГЭ = КЕГЭ (кириллица и латиница: CompEGE, KompEGE)
+        TitleRule("kege", r'компегэ|комп\s*егэ|кегэ|comp\s*ege|kompege', "КЕГЭ", target="lower"),
+        # РешуЕГЭ (и опечатка "Рушу ЕГЭ")
+        TitleRule("reshu", r'решуегэ|решу\s+егэ|рушу\s+егэ', "Решу ЕГЭ", target="lower", keywords=("егэ",)),
+        # Паттерны в скобках
+        TitleRule("bracket_reshu", r'\(Решу\s+ЕГЭ\)', _bracket_resource, flags=_I, target="text", keywords=("(решу",)),
+        TitleRule("bracket_reshuege", r'\(РешуЕГЭ\)', _bracket_resource, flags=_I, target="text", keywords=("(решуегэ)",)),
+        TitleRule("bracket_kege", r'\(КЕГЭ\)', _bracket_resource, flags=_I, target="text", keywords=("(кегэ)",)),
+        TitleRule("bracket_polyakov", r'\(Поляков\)', _bracket_resource, flags=_I, target="text", keywords=("(поляков)",)),
+        TitleRule("bracket_komp", r'\(Комп\s+ЕГЭ\)', _bracket_resource, flags=_I, target="text", keywords=("(комп",)),
+        TitleRule("bracket_kege_suffix", r'\(КЕГЭ\.\w+\)', _bracket_resource, flags=_I, target="text", keywords=("(кегэ.",)),
+        TitleRule("bracket_yandex", r'\(Яндекс[^)]*\)', _bracket_resource, flags=_I, target="text", keywords=("(яндекс",)),
+        TitleRule("bracket_krylov", r'\(Крылов[^)]*\)', _bracket_resource, flags=_I, target="text", keywords=("(крылов",)),
+        TitleRule("polyakov_tail", r'\s+Поляков\s*$', "Поляков", flags=_I, target="text", keywords=("поляков",)),
+    ],
+)
 
 
 class EGETopicTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для разбора тем ЕГЭ.
-    
+
     Формат: "Разбираем тему \"Название темы\"" или для коротких тем —
     "Курс ЕГЭ по информатике. Первые два предложения описания" (без "Разбираем тему").
     """
-    
-    def generate(self, video: VideoData) -> str:
+
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок для темы.
-        
+
         Args:
-            video: Данные видео.
-            
+            ctx: Контекст видео.
+
         Returns:
             Заголовок в формате "Разбираем тему "Название темы"" или имя файла.
         """
-        description = video.description.strip()
-        if not description:
-            return video.file_path.stem
-        
-        # Извлекаем первую строку
-        first_line = description.split('\n')[0].strip()
-        first_line_lower = first_line.lower()
-        
-        # Паттерны для тем
-        # Урок с подчеркиванием (23_1, 23_2)
-        lesson_match = re.search(r'урок\s+(\d+[._]\d+)\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if lesson_match:
-            lesson_num = lesson_match.group(1).replace('.', '_')
-            topic = lesson_match.group(2).strip()
-            if topic and len(topic) > 3:
-                return f'Курс ЕГЭ по информатике. Урок {lesson_num}. Разбираем тему "{topic}"'
-        
-        # Обычный урок (2, 11 и т.д.)
-        lesson_match = re.search(r'урок\s+(\d+)\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if lesson_match:
-            lesson_num = lesson_match.group(1)
-            topic = lesson_match.group(2).strip()
-            if topic and len(topic) > 3:
-                return f'Курс ЕГЭ по информатике. Урок {lesson_num}. Разбираем тему "{topic}"'
-        
-        # "Разбор заданий X. Название темы" - извлекаем тему
-        task_topic_match = re.search(r'разбор\s+задани[ий]\s+\d+\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if task_topic_match:
-            topic = task_topic_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Задание с темой
-        task_match = re.search(r'задание\s+\d+\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if task_match:
-            topic = task_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # "Термины и теория задания X. Тема" - извлекаем тему после точки
-        if 'термин' in first_line_lower and 'теори' in first_line_lower:
-            topic_match = re.search(r'термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                if topic and len(topic) > 3:
-                    return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Короткое название темы (одно слово, напр. "Лайфхак") — первые два предложения без "Разбираем тему"
-        topic_candidate = first_line.split('.')[0].strip()
-        if len(topic_candidate) < 25 and len(description) > 50:
-            two = _first_two_sentences(description, max_length=115)
-            if two:
-                return f'Курс ЕГЭ по информатике. {two}'
-        
-        return f"Курс ЕГЭ по информатике. {video.file_path.stem}"
-    
+        if not ctx.description:
+            return ctx.stem
+        return TOPIC_RULES.apply(ctx, self)
+
     def get_name(self) -> str:
         """Получить имя генератора."""
         return "ege_topic"
@@ -103,387 +160,208 @@ class EGETopicTitleGenerator(BaseTitleGenerator):
 
 class EGETaskTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для разбора заданий ЕГЭ.
-    
+
     Формат: "Разбираем задание №X" или "Разбираем задание №X (подтип) (ресурс)"
     """
-    
-    def _extract_resource(self, text: str) -> Optional[str]:
+
+    def _extract_resource(self, text: str, trace: Optional[list[str]] = None) -> Optional[str]:
         """Извлечь название ресурса из текста.
-        
+
         Источники заданий: РешуЕГЭ, КЕГЭ/КомпЕГЭ, Яндекс Учебник, сборник Крылова, Поляков и др.
-        
+
         Args:
             text: Текст для анализа.
-            
+            trace: Список сработавших правил (дополняется).
+
         Returns:
             Название ресурса или None.
         """
-        text_lower = text.lower()
-        # Порядок важен: более специфичные паттерны первыми
-        # Яндекс (ЕГЭ) / Яндекс Учебник
-        if re.search(r'яндекс\s*\(?\s*егэ\s*\)?|яндекс\s+учебник', text_lower):
-            return "Яндекс Учебник"
-        if re.search(r'\bяндекс\b', text_lower):
-            return "Яндекс Учебник"
-        # Сборник Крылова
-        if re.search(r'\bкрылов\b', text_lower):
-            return "Крылов"
-        # КомпЕГЭ = КЕГЭ (кириллица и латиница: CompEGE, KompEGE)
-        if re.search(r'компегэ|комп\s*егэ|кегэ|comp\s*ege|kompege', text_lower):
-            return "КЕГЭ"
-        # РешуЕГЭ (и опечатка "Рушу ЕГЭ")
-        if re.search(r'решуегэ|решу\s+егэ|рушу\s+егэ', text_lower):
-            return "Решу ЕГЭ"
-        # Паттерны в скобках
-        resource_patterns = [
-            r'\(Решу\s+ЕГЭ\)',
-            r'\(РешуЕГЭ\)',
-            r'\(КЕГЭ\)',
-            r'\(Поляков\)',
-            r'\(Комп\s+ЕГЭ\)',
-            r'\(КЕГЭ\.\w+\)',
-            r'\(Яндекс[^)]*\)',
-            r'\(Крылов[^)]*\)',
-        ]
-        for pattern in resource_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                s = match.group(0).strip('()')
-                if re.search(r'яндекс', s, re.IGNORECASE):
-                    return "Яндекс Учебник"
-                if re.search(r'крылов', s, re.IGNORECASE):
-                    return "Крылов"
-                if re.search(r'комп|кегэ', s, re.IGNORECASE):
-                    return "КЕГЭ"
-                return s
-        if re.search(r'\s+Поляков\s*$', text, re.IGNORECASE):
-            return "Поляков"
-        return None
-    
-    def generate(self, video: VideoData) -> str:
+        return RESOURCE_RULES.apply(TextView(text, trace), self)
+
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок для задания.
-        
+
         Args:
-            video: Данные видео.
-            
+            ctx: Контекст видео.
+
         Returns:
             Заголовок в формате "Разбираем задание №X" или имя файла.
         """
-        description = video.description.strip()
-        if not description:
-            return f"Курс ЕГЭ по информатике. {video.file_path.stem}"
-        
-        first_line = description.split('\n')[0].strip()
-        # Поиск номера задания по всему описанию, если в первой строке не нашли
-        full_text_for_number = description.replace("\n", " ")
-        
-        # Паттерны для номеров заданий (расширенные)
-        patterns = [
-            r'тип\s+(\d+)[_\d]',  # "Тип 13_3784"
-            r'разбор\s+(\d+)[_\d]',  # "Разбор 8_40724"
-            r'решение\s+(\d+)[_\d]',  # "Решение 13_69921", "Решение 6_58245"
-            r'^(\d+)[_\d]',  # "26_27423" в начале строки
-            r'вспомогательные\s+примеры\s+для\s+решения\s+(\d+)',  # "Вспомогательные примеры для решения 17"
-            r'разбор\s+задани[ий]\s+(\d+)$',  # "Разбор заданий 23" (в конце строки)
-            r'разбор\s+задани[ий]\s+(\d+)\s*\.',  # "Разбор заданий 23." (с точкой)
-            r'вспомогательного\s+задани[яе]\s*[№#]?\s*(\d+)',  # "вспомогательного задания №8"
-            r'в\s+задани[ии]\s+(\d+)',  # "в задании 17"
-            r'тонкости\s+решений\s+задани[ий]\s+(\d+)',  # "тонкости решений заданий 14"
-            r'теори[ия]\s+по\s+задани[ям]\s+(\d+)',  # "теории по заданиям 5"
-            r'задани[яе]\s*[№#]?\s*(\d+)',  # "задание №25"
-            r'задани[ея]\s+(\d+)',  # "задание 3"
-            r'задач[аи]\s+(\d+)',  # "задача 16"
-            r'разбор\s+решений\s+задани[ий]\s+(\d+)',  # "разбор решений заданий 3"
-            r'разбор\s+некоторых\s+задани[ий]\s+(\d+)',  # "разбор некоторых заданий 5"
-            r'разбор\s+задани[ея]\s+(\d+)',  # "разбор задания 5"
-            r'разбор\s+задач[иа]\s+(\d+)',  # "разбор задачи 16"
-            r'разбор\s+задани[ий]\s+по\s+теме\s+(\d+)',  # "разбор заданий по теме 3"
-            r'разбор\s+задани[ий]\s+(\d+)[,\s]',  # "разбор заданий 12," или "разбор заданий 12 "
-            r'разбор\s+задани[ий]\s+(\d+)[-_](\d+)',  # "разбор заданий 19-21"
-            r'разбор\s+задани[ий]\s+(\d+)\s+егэ',  # "разбор заданий 7 ЕГЭ"
-            r'решение\s+задани[яе]\s*[№#]?\s*(\d+)',  # "решение задания №25"
-            r'решение\s+задани[ий]\s+егэ\s+(\d+)',  # "решение заданий ЕГЭ 9"
-            r'решение\s+(\d+)\s+задани[ий]',  # "решение 8 заданий", "решение 4 заданий"
-            r'решения\s+задани[ий]\s+(\d+)',  # "решения заданий 13"
-            r'решение\s+задани[ея]\s+(\d+)',
-            r'решение\s+задани[ий]\s+(\d+)',  # "решение заданий 7"
-            r'решение\s+нескольких\s+задач\s+из\s+блока\s+(\d+)',  # "решение нескольких задач из блока 3"
-            r'при\s+решении\s+задани[ий]\s+(\d+)',  # "при решении заданий 3"
-            r'для\s+задани[ий]\s+(\d+)',  # "для заданий 13"
-            r'задани[яе]\s+номер\s+(\d+)',  # "заданий номер 9"
-            r'разбор\s+задани[ий]\s+номер\s+(\d+)',  # "разбор заданий номер 9"
-            r'в\s+файле\s+\w+\s+задани[яе]\s+(\d+)',  # "в файле B задания 27"
-            r'видео\s+решения?\s+задани[ея]\s+(\d+)',  # "Видео решения задания 1"
-            r'видеоразбор\s+задани[яе]\s+(\d+)',  # "Видеоразбор задания 1"
-            r'для\s+решения\s+\d+%\s+задани[ий]\s+(\d+)',  # "для решения 98% заданий 14"
-            r'при\s+решении\s+(\d+)\s+задани[ий]',  # "при решении 14 заданий"
-        ]
-        
+        if not ctx.description:
+            return f"{PREFIX}. {ctx.stem}"
+
+        first_line = ctx.first_line
         task_number = None
         task_type = None
         task_range = None
-        
+
         # Сначала проверяем диапазон заданий (19-21)
-        range_match = re.search(r'задани[ий]\s+(\d+)[-_](\d+)', first_line, re.IGNORECASE)
+        range_match = _RANGE_RX.search(first_line)
         if range_match:
             task_number = int(range_match.group(1))
             task_range = f"{range_match.group(1)}-{range_match.group(2)}"
         else:
-            for pattern in patterns:
-                match = re.search(pattern, first_line, re.IGNORECASE)
-                if match:
-                    task_number = int(match.group(1))
-                    break
-            # Если в первой строке не нашли — ищем по всему описанию (для 1057–1061 и подобных)
+            task_number = TASK_NUMBER_RULES.apply(ctx, self)
             if not task_number:
-                for pattern in patterns:
-                    match = re.search(pattern, full_text_for_number, re.IGNORECASE)
-                    if match:
-                        task_number = int(match.group(1))
-                        break
-                if not task_number and re.search(r'\b(\d+)[_](\d+)\b', full_text_for_number):
-                    m = re.search(r'\b(\d+)[_](\d+)\b', full_text_for_number)
+                task_number = TASK_NUMBER_TEXT_RULES.apply(ctx, self)
+                if not task_number:
+                    m = _UNDERSCORE_NUMBER_RX.search(ctx.full_text)
                     if m:
                         task_number = int(m.group(1))
-        
+
         if not task_number:
-            return f"Курс ЕГЭ по информатике. {video.file_path.stem}"
-        
+            return f"{PREFIX}. {ctx.stem}"
+
         # Проверяем наличие подтипа (например, 22_4708k или 16_55633 или 9_58517)
         # Сначала проверяем формат "9 - 58517" (с пробелами вокруг дефиса)
-        subtype_match = re.search(r'(\d+)\s*-\s*(\d+)', first_line)
+        subtype_match = _SUBTYPE_DASH_RX.search(first_line)
         if subtype_match and not task_range:
             num1, num2 = int(subtype_match.group(1)), int(subtype_match.group(2))
             # Если первый номер совпадает с номером задания и второй намного больше - это подтип
             if num1 == task_number and num2 > 100:
                 task_type = f"{subtype_match.group(1)}_{subtype_match.group(2)}"
-        
+
         # Если подтип не найден, проверяем формат с подчеркиванием
         if not task_type:
-            subtype_match = re.search(r'(\d+)[_](\d+)', first_line)
+            subtype_match = _SUBTYPE_UNDERSCORE_RX.search(first_line)
             if subtype_match and not task_range:
                 num1, num2 = int(subtype_match.group(1)), int(subtype_match.group(2))
                 if abs(num1 - num2) > 5:  # Если разница большая, это подтип, а не диапазон
                     task_type = f"{subtype_match.group(1)}_{subtype_match.group(2)}"
-        
+
         # Извлекаем ресурс по всему описанию (источник может быть в любом месте текста)
-        resource = self._extract_resource(description)
+        resource = self._extract_resource(ctx.description, ctx.trace)
         if not resource:
-            resource = self._extract_resource(first_line)
-        if not resource and re.search(r'решуегэ|рушу\s*егэ', first_line, re.IGNORECASE):
+            resource = self._extract_resource(first_line, ctx.trace)
+        if not resource and _RESHU_FIRST_LINE_RX.search(first_line):
             resource = "Решу ЕГЭ"
-        
+
         # Формируем заголовок
         if task_range:
-            parts = [f"Курс ЕГЭ по информатике. Разбираем задание №{task_range}"]
+            parts = [f"{PREFIX}. Разбираем задание №{task_range}"]
         else:
-            parts = [f"Курс ЕГЭ по информатике. Разбираем задание №{task_number}"]
-        
+            parts = [f"{PREFIX}. Разбираем задание №{task_number}"]
+
         if task_type:
             parts.append(f"({task_type})")
-        
+
         if resource:
             parts.append(f"({resource})")
-        
+
         return " ".join(parts)
-    
+
     def get_name(self) -> str:
         """Получить имя генератора."""
         return "ege_task"
 
 
+def _numbered_description_task(gen, ctx: TitleContext, m) -> Optional[str]:
+    """В описании есть номер задания (15_37743) и контекст — задание, если генератор заданий его распознал."""
+    mark = len(ctx.trace)
+    res = to_task(gen, ctx)
+    if ctx.stem not in res:
+        return res
+    del ctx.trace[mark:]
+    return None
+
+
+def _instruction_topic(gen, ctx: TitleContext, m) -> Optional[str]:
+    """Инструкции и темы без номеров; короткое название («Лайфхак») — в генератор тем (первые 2 предложения)."""
+    topic = ctx.first_line.split('.')[0].strip()
+    if len(topic) > 5:
+        if len(topic) < 25:
+            return to_topic(gen, ctx)
+        return topic_title(PREFIX, topic)
+    return None
+
+
+def _usage_topic(gen, ctx: TitleContext, m) -> Optional[str]:
+    topic = ctx.first_line.split('.')[0].strip()
+    if len(topic) > 5:
+        return topic_title(PREFIX, topic)
+    return None
+
+
+# Порядок важен: первое сработавшее правило побеждает, по умолчанию — генератор заданий
+AUTO_RULES = RuleSet(
+    "ege.auto",
+    [
+        # "Видео решения задания X" и "Видеоразбор задания X" - это задания (проверяем ПЕРВЫМИ)
+        *video_task_rules(PREFIX, lambda gen, ctx, m: f'{PREFIX}. Разбираем задание №{int(m.group(1))}'),
+        # "Пример X для задания Y" или "Пример X в файле B задания Y" - это тема
+        example_in_file_rule(PREFIX),
+        # Явные признаки задания (не "Разбор заданий 2. Тема")
+        *explicit_task_rules(),
+        # "Задание 24_21421 (Комп ЕГЭ)" или "Задание N_... Уровень" — это задание, не тема
+        TitleRule("task_with_resource", r'^задани[ея]\s+\d+', to_task, target="first_line_lower", keywords=("задани",),
+                  when=lambda ctx: re.search(r'компегэ|кегэ|решу\s*егэ|уровень', ctx.first_line_lower)),
+        # В описании есть номер задания (15_37743) и контекст — трактуем как задание (1057–1061)
+        TitleRule("numbered_description", r'\b\d+_\d+\b', _numbered_description_task, target="description",
+                  when=lambda ctx: re.search(r'задани|решение|разбор|егэ', ctx.description_lower)),
+        lesson_rule(),
+        *topic_section_rules(PREFIX),
+        # Инструкции и темы без номеров
+        TitleRule(
+            "instruction",
+            r'инструкция|способ[овы]|ответы\s+на\s+вопросы|карта\s+егэ|агрегатные\s+функции|лайфхак'
+            r'|несколько\s+приемов|особенности\s+и\s+тонкости|регулярные\s+выражения|заполняем\s+карту'
+            r'|теория\s+сетей|группы\s+в\s+регулярных|опережающие\s+проверки|переводим\s+число',
+            _instruction_topic,
+            target="first_line_lower",
+        ),
+        terms_rule(PREFIX),
+        # "Использование X для решения Y задач" - это тема
+        TitleRule("usage", r'использование\s+.+?\s+для\s+решения\s+\d+\s+задач', _usage_topic,
+                  target="first_line_lower", keywords=("использование",)),
+        heading_rule(PREFIX),
+        # "Задание X. Тема" (кроме "Пример X в файле B задания Y") - это тема, а не задание
+        TitleRule("task_topic_any", r'задани[ея]\s+\d+\.\s+[А-Яа-я]', to_topic, keywords=("задани",),
+                  when=lambda ctx: not is_example_in_file(ctx)),
+        razbor_po_teme_rule(),
+        TitleRule("task_number", r'задани[ея]\s+\d+|задач[аи]\s+\d+|блока\s+\d+', to_task,
+                  target="first_line_lower", when=lambda ctx: not is_example_in_file(ctx)),
+    ],
+    default=to_task,
+)
+
+# Пустое описание — информация из имени файла
+STEM_RULES = RuleSet(
+    "ege.stem",
+    [
+        # Запись встречи в Телемосте
+        TitleRule("meeting", None, f"{PREFIX}. Запись встречи", when=lambda ctx: "Встреча_в_Телемосте" in ctx.stem),
+        # Только число — возможно, номер задания из Решу ЕГЭ
+        TitleRule("digits", None, PREFIX + ". Разбираем задание №{stem} (Решу ЕГЭ)", when=lambda ctx: ctx.stem.isdigit()),
+        *stem_task_rules(PREFIX),
+    ],
+    default=lambda gen, ctx: f"{PREFIX}. {ctx.stem}",
+)
+
+
 class EGEAutoTitleGenerator(BaseTitleGenerator):
     """Автоматический генератор заголовков для ЕГЭ.
-    
+
     Определяет тип контента (тема или задание) и генерирует соответствующий заголовок.
     """
-    
+
     def __init__(self):
         """Инициализировать генератор."""
         self.topic_generator = EGETopicTitleGenerator()
         self.task_generator = EGETaskTitleGenerator()
-    
-    def generate(self, video: VideoData) -> str:
+
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок автоматически.
-        
+
         Args:
-            video: Данные видео.
-            
+            ctx: Контекст видео.
+
         Returns:
             Заголовок для темы или задания.
         """
-        description = video.description.strip()
-        if not description:
-            # Если описание пустое, пытаемся извлечь информацию из имени файла
-            filename_stem = video.file_path.stem
-            # Если имя файла содержит "Встреча_в_Телемосте", это запись встречи
-            if "Встреча_в_Телемосте" in filename_stem:
-                return f"Курс ЕГЭ по информатике. Запись встречи"
-            # Если имя файла - это только число (возможно, номер задания из Решу ЕГЭ)
-            if filename_stem.isdigit():
-                return f"Курс ЕГЭ по информатике. Разбираем задание №{filename_stem} (Решу ЕГЭ)"
-            # Если имя файла в формате "X_Y" (например, 25_2) - это задание с подтипом
-            match = re.match(r'^(\d+)[_\d]', filename_stem)
-            if match:
-                task_num = match.group(1)
-                return f"Курс ЕГЭ по информатике. Разбираем задание №{task_num}"
-            # Если имя файла в формате "X (Y)" (например, 5 (2)) - это задание
-            match = re.match(r'^(\d+)\s*\(', filename_stem)
-            if match:
-                task_num = match.group(1)
-                return f"Курс ЕГЭ по информатике. Разбираем задание №{task_num}"
-            return f"Курс ЕГЭ по информатике. {filename_stem}"
-        
-        first_line = description.split('\n')[0].strip()
-        first_line_lower = first_line.lower()
-        
-        # "Видео решения задания X" и "Видеоразбор задания X" - это задания (проверяем ПЕРВЫМИ)
-        if 'видео' in first_line_lower and 'задани' in first_line_lower:
-            # Проверяем паттерны для заданий
-            video_patterns = [
-                r'видео\s+решения?\s+задани[ея]\s+(\d+)',  # "Видео решения задания 1"
-                r'видеоразбор\s+задани[яе]\s+(\d+)',  # "Видеоразбор задания 1"
-            ]
-            for pattern in video_patterns:
-                match = re.search(pattern, first_line, re.IGNORECASE)
-                if match:
-                    task_number = int(match.group(1))
-                    return f'Курс ЕГЭ по информатике. Разбираем задание №{task_number}'
-        
-        # "Пример X для задания Y" или "Пример X в файле B задания Y" - это тема (проверяем ПЕРВОЙ)
-        if 'пример' in first_line_lower and 'задани' in first_line_lower:
-            if 'в файле' in first_line_lower or 'для задани' in first_line_lower:
-                topic = first_line.split('.')[0].strip()
-                if len(topic) > 5:
-                    return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Явные признаки задания: "Решение 13_69921", "Тип 13_...", "Разбор 8_40724" (не "Разбор заданий 2. Тема")
-        if re.search(r'^(решение|тип)\s+\d+', first_line_lower):
-            return self.task_generator.generate(video)
-        if re.search(r'^разбор\s+(\d+[_\-]|задани[ея]\s+\d+[_\-])', first_line_lower):
-            return self.task_generator.generate(video)
-        # "Задание 24_21421 (Комп ЕГЭ)" или "Задание N_... Уровень" — это задание, не тема
-        if re.search(r'^задани[ея]\s+\d+[_\-]\d+', first_line_lower) or \
-           (re.search(r'^задани[ея]\s+\d+', first_line_lower) and re.search(r'компегэ|кегэ|решу\s*егэ|уровень', first_line_lower)):
-            return self.task_generator.generate(video)
-        # В описании есть номер задания (15_37743) и контекст — трактуем как задание (1057–1061)
-        desc_lower = description.lower()
-        if re.search(r'\b\d+_\d+\b', description) and re.search(r'задани|решение|разбор|егэ', desc_lower):
-            res = self.task_generator.generate(video)
-            if video.file_path.stem not in res:
-                return res
-        
-        # Проверяем, является ли это темой
-        # Уроки с подчеркиванием или точкой
-        if re.search(r'урок\s+\d+[._]\d+\.', first_line_lower) or \
-           re.search(r'урок\s+\d+\.', first_line_lower):
-            return self.topic_generator.generate(video)
-        
-        # "Разбор заданий X. Название темы" - это тема, а не задание
-        # Проверяем наличие точки после номера и текста после точки
-        # Но исключаем "Видео решения" и "Видеоразбор" - это задания
-        if not re.search(r'видео\s+решения?\s+задани[яе]|видеоразбор\s+задани[яе]', first_line_lower):
-            topic_match = re.search(r'разбор\s+задани[ий]\s+(\d+)\.\s+(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-            if topic_match:
-                topic_text = topic_match.group(2).strip()
-                # Если после точки есть текст (не просто номер), это тема
-                if topic_text and len(topic_text) > 5:
-                    return self.topic_generator.generate(video)
-        
-        # "Разбор заданий по теме X. Название" - это тема
-        topic_theme_match = re.search(r'разбор\s+задани[ий]\s+по\s+теме\s+\d+\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if topic_theme_match:
-            topic = topic_theme_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # "Задание X. Название темы" без слов "разбор" или "решение"
-        if re.search(r'задани[ея]\s+\d+\.\s+[А-Яа-я]', first_line) and \
-           not re.search(r'разбор|решение', first_line_lower):
-            return self.topic_generator.generate(video)
-        
-        # "Пример X для задания Y" или "Пример X в файле B задания Y" - это тема
-        if 'пример' in first_line_lower and 'задани' in first_line_lower:
-            # Проверяем различные варианты - упрощаем паттерн
-            if 'в файле' in first_line_lower or 'для задани' in first_line_lower:
-                topic = first_line.split('.')[0].strip()
-                if len(topic) > 5:
-                    return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Инструкции и темы без номеров (короткие темы передаём в topic_generator — там правило «первые 2 предложения»)
-        if re.search(r'инструкция|способ[овы]|ответы\s+на\s+вопросы|карта\s+егэ|агрегатные\s+функции|лайфхак|несколько\s+приемов|особенности\s+и\s+тонкости|регулярные\s+выражения|заполняем\s+карту|теория\s+сетей|группы\s+в\s+регулярных|опережающие\s+проверки|переводим\s+число', first_line_lower):
-            topic = first_line.split('.')[0].strip()
-            if len(topic) > 5:
-                # Короткое название («Лайфхак» и т.п.) — в topic_generator вернёт первые 2 предложения
-                if len(topic) < 25:
-                    return self.topic_generator.generate(video)
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # "Термины и теория задания X" - это тема, а не задание
-        # Учитываем возможные двойные пробелы - используем более гибкий паттерн
-        if 'термин' in first_line_lower and 'теори' in first_line_lower and 'задани' in first_line_lower:
-            # Извлекаем тему из первой строки (после точки)
-            topic_match = re.search(r'термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)', first_line, re.IGNORECASE)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                if len(topic) > 5:
-                    return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-            # Или просто берем первую часть до точки
-            topic = first_line.split('.')[0].strip()
-            # Убираем лишние пробелы
-            topic = ' '.join(topic.split())
-            if len(topic) > 5:
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # "Использование X для решения Y задач" - это тема
-        if re.search(r'использование\s+.+?\s+для\s+решения\s+\d+\s+задач', first_line_lower):
-            topic = first_line.split('.')[0].strip()
-            if len(topic) > 5:
-                return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Темы, начинающиеся с "Как", "Еще", "Немного"
-        if re.search(r'^(как|еще|немного|некоторые)', first_line_lower):
-            # Извлекаем тему из первой строки (до первой точки или до конца)
-            # Но ограничиваем длину разумным значением
-            topic_match = re.search(r'^(.+?)(?:\.|$)', first_line)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                # Ограничиваем длину темы (максимум 80 символов для читаемости)
-                if len(topic) > 80:
-                    # Пытаемся обрезать по последнему пробелу до 80 символов
-                    truncated = topic[:80].rsplit(' ', 1)[0]
-                    if len(truncated) > 50:  # Если получилось достаточно длинное
-                        topic = truncated
-                    else:
-                        topic = topic[:77] + "..."
-                if len(topic) > 10:  # Минимальная длина для темы
-                    return f'Курс ЕГЭ по информатике. Разбираем тему "{topic}"'
-        
-        # Проверяем наличие номера задания (если есть - это задание)
-        # Но исключаем случаи, когда это тема (например, "Разбор заданий 2. Тема")
-        # Исключаем "Пример X в файле B задания Y" - это тема
-        if re.search(r'задани[ея]\s+\d+\.\s+[А-Яа-я]', first_line) and \
-           not (first_line_lower.startswith('пример') and 'в файле' in first_line_lower):
-            # Это тема, а не задание
-            return self.topic_generator.generate(video)
-        
-        # "Разбор заданий по теме X" - это тема, а не задание
-        if re.search(r'разбор\s+задани[ий]\s+по\s+теме\s+\d+', first_line_lower):
-            return self.topic_generator.generate(video)
-        
-        # Исключаем "Пример X в файле B задания Y" из проверки заданий
-        if re.search(r'задани[ея]\s+\d+|задач[аи]\s+\d+|блока\s+\d+', first_line_lower) and \
-           not (first_line_lower.startswith('пример') and 'в файле' in first_line_lower):
-            return self.task_generator.generate(video)
-        
-        # Иначе пробуем задание
-        result = self.task_generator.generate(video)
-        # Если получилось имя файла, значит не распозналось - возвращаем как есть
-        if video.file_path.stem in result:
-            return result
-        
-        return result
-    
+        if not ctx.description:
+            return STEM_RULES.apply(ctx, self)
+        return AUTO_RULES.apply(ctx, self)
+
     def get_name(self) -> str:
         """Получить имя генератора."""
         return "ege_auto"
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Общие таблицы правил для экзаменационных курсов (ЕГЭ, ОГЭ).
+
+Генераторы тем ЕГЭ и ОГЭ отличаются только префиксом курса, автогенераторы —
+набором и порядком правил; здесь собраны фабрики правил и обработчиков,
+параметризованные префиксом (например, "Курс ЕГЭ по информатике").
+"""
+
+import re
+from typing import Optional
+
+from .rules import RuleSet, TitleContext, TitleRule
+from .utils import first_two_sentences
+
+
+_I = re.IGNORECASE
+_VIDEO_TASK_RX = re.compile(r"видео\s+решения?\s+задани[яе]|видеоразбор\s+задани[яе]")
+_RAZBOR_RESHENIE_RX = re.compile(r"разбор|решение")
+
+
+def topic_title(prefix: str, topic: str) -> str:
+    """Заголовок «<префикс>. Разбираем тему "<тема>"»."""
+    return f'{prefix}. Разбираем тему "{topic}"'
+
+
+def is_example_in_file(ctx: TitleContext) -> bool:
+    """«Пример X в файле B задания Y» — тема, а не задание."""
+    return ctx.first_line_lower.startswith("пример") and "в файле" in ctx.first_line_lower
+
+
+def to_task(gen, ctx: TitleContext, m=None) -> str:
+    """Делегировать генератору заданий (gen.task_generator)."""
+    return gen.task_generator.generate_context(ctx)
+
+
+def to_topic(gen, ctx: TitleContext, m=None) -> str:
+    """Делегировать генератору тем (gen.topic_generator)."""
+    return gen.topic_generator.generate_context(ctx)
+
+
+def _group_topic(prefix: str, group: int, min_len: int, lesson: bool = False):
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic = m.group(group).strip()
+        if not (topic and len(topic) > min_len):
+            return None
+        if lesson:
+            lesson_num = m.group(1).replace(".", "_")
+            return f'{prefix}. Урок {lesson_num}. Разбираем тему "{topic}"'
+        return topic_title(prefix, topic)
+    return action
+
+
+def _first_sentence_topic(prefix: str, min_len: int):
+    """Тема — первая строка до точки."""
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic = ctx.first_line.split(".")[0].strip()
+        if len(topic) > min_len:
+            return topic_title(prefix, topic)
+        return None
+    return action
+
+
+def _short_topic_two_sentences(prefix: str):
+    """Короткое название темы (напр. «Лайфхак») — первые два предложения без «Разбираем тему»."""
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic_candidate = ctx.first_line.split(".")[0].strip()
+        if len(topic_candidate) < 25 and len(ctx.description) > 50:
+            two = first_two_sentences(ctx.description, max_length=115)
+            if two:
+                return f"{prefix}. {two}"
+        return None
+    return action
+
+
+def build_topic_rules(name: str, prefix: str) -> RuleSet:
+    """Таблица генератора тем: уроки, «Разбор заданий N. Тема», «Задание N. Тема», термины, короткие темы."""
+    return RuleSet(
+        name,
+        [
+            # Урок с подчеркиванием (23_1, 23_2)
+            TitleRule("lesson_sub", r"урок\s+(\d+[._]\d+)\.\s*(.+?)(?:\.|$)", _group_topic(prefix, 2, 3, lesson=True),
+                      flags=_I, keywords=("урок",)),
+            # Обычный урок (2, 11 и т.д.)
+            TitleRule("lesson", r"урок\s+(\d+)\.\s*(.+?)(?:\.|$)", _group_topic(prefix, 2, 3, lesson=True),
+                      flags=_I, keywords=("урок",)),
+            # "Разбор заданий X. Название темы"
+            TitleRule("razbor_topic", r"разбор\s+задани[ий]\s+\d+\.\s*(.+?)(?:\.|$)", _group_topic(prefix, 1, 3),
+                      flags=_I, keywords=("разбор", "задани")),
+            # Задание с темой
+            TitleRule("task_topic", r"задание\s+\d+\.\s*(.+?)(?:\.|$)", _group_topic(prefix, 1, 3),
+                      flags=_I, keywords=("задание",)),
+            # "Термины и теория задания X. Тема"
+            TitleRule("terms", r"термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)",
+                      _group_topic(prefix, 1, 3), flags=_I, keywords=("термин", "теори")),
+            TitleRule("short_topic", None, _short_topic_two_sentences(prefix)),
+        ],
+        default=lambda gen, ctx: f"{prefix}. {ctx.stem}",
+    )
+
+
+def _terms_topic(prefix: str):
+    rx = re.compile(r"термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)", re.IGNORECASE)
+
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic_match = rx.search(ctx.first_line)
+        if topic_match:
+            topic = topic_match.group(1).strip()
+            if len(topic) > 5:
+                return topic_title(prefix, topic)
+        # Или просто берем первую часть до точки (без лишних пробелов)
+        topic = " ".join(ctx.first_line.split(".")[0].strip().split())
+        if len(topic) > 5:
+            return topic_title(prefix, topic)
+        return None
+    return action
+
+
+def _heading_topic(prefix: str):
+    """Темы «Как...», «Еще...»: первая фраза, длиной не более ~80 символов."""
+    rx = re.compile(r"^(.+?)(?:\.|$)")
+
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic_match = rx.search(ctx.first_line)
+        if not topic_match:
+            return None
+        topic = topic_match.group(1).strip()
+        if len(topic) > 80:
+            truncated = topic[:80].rsplit(" ", 1)[0]
+            topic = truncated if len(truncated) > 50 else topic[:77] + "..."
+        if len(topic) > 10:
+            return topic_title(prefix, topic)
+        return None
+    return action
+
+
+def _razbor_topic_to_topic(gen, ctx: TitleContext, m) -> Optional[str]:
+    """«Разбор заданий X. Название темы» — тема, если после точки есть текст."""
+    topic_text = m.group(2).strip()
+    if topic_text and len(topic_text) > 5:
+        return to_topic(gen, ctx)
+    return None
+
+
+def explicit_task_rules() -> list[TitleRule]:
+    """Явные признаки задания: «Решение 13_69921», «Тип 13_...», «Разбор 8_40724», «Задание N_M»."""
+    return [
+        TitleRule("reshenie_tip", r"^(решение|тип)\s+\d+", to_task, target="first_line_lower"),
+        TitleRule("razbor_n", r"^разбор\s+(\d+[_\-]|задани[ея]\s+\d+[_\-])", to_task,
+                  target="first_line_lower", keywords=("разбор",)),
+        TitleRule("task_n_m", r"^задани[ея]\s+\d+[_\-]\d+", to_task,
+                  target="first_line_lower", keywords=("задани",)),
+    ]
+
+
+def video_task_rules(prefix: str, action=None) -> list[TitleRule]:
+    """«Видео решения задания X», «Видеоразбор задания X» — задания."""
+    action = action or (prefix + ". Разбираем задание №{0}")
+    return [
+        TitleRule("video_task", r"видео\s+решения?\s+задани[ея]\s+(\d+)", action,
+                  flags=_I, keywords=("видео", "задани")),
+        TitleRule("videorazbor_task", r"видеоразбор\s+задани[яе]\s+(\d+)", action,
+                  flags=_I, keywords=("видеоразбор", "задани")),
+    ]
+
+
+def example_in_file_rule(prefix: str) -> TitleRule:
+    """«Пример X для задания Y», «Пример X в файле B задания Y» — тема."""
+    return TitleRule(
+        "example_in_file", None, _first_sentence_topic(prefix, 5),
+        keywords=("пример", "задани"),
+        when=lambda ctx: "в файле" in ctx.first_line_lower or "для задани" in ctx.first_line_lower,
+    )
+
+
+def lesson_rule() -> TitleRule:
+    """Уроки с подчеркиванием или точкой — тема."""
+    return TitleRule("lesson", r"урок\s+\d+[._]\d+\.|урок\s+\d+\.", to_topic,
+                     target="first_line_lower", keywords=("урок",))
+
+
+def topic_section_rules(prefix: str) -> list[TitleRule]:
+    """«Разбор заданий X. Тема», «Разбор заданий по теме X. Название», «Задание X. Тема» без разбора/решения."""
+    return [
+        # Исключаем "Видео решения" и "Видеоразбор" — это задания
+        TitleRule("razbor_topic", r"разбор\s+задани[ий]\s+(\d+)\.\s+(.+?)(?:\.|$)", _razbor_topic_to_topic,
+                  flags=_I, keywords=("разбор", "задани"),
+                  when=lambda ctx: not _VIDEO_TASK_RX.search(ctx.first_line_lower)),
+        TitleRule("razbor_po_teme_title", r"разбор\s+задани[ий]\s+по\s+теме\s+\d+\.\s*(.+?)(?:\.|$)",
+                  _group_topic(prefix, 1, 3), flags=_I, keywords=("разбор", "теме")),
+        TitleRule("task_topic", r"задани[ея]\s+\d+\.\s+[А-Яа-я]", to_topic, keywords=("задани",),
+                  when=lambda ctx: not _RAZBOR_RESHENIE_RX.search(ctx.first_line_lower)),
+    ]
+
+
+def terms_rule(prefix: str) -> TitleRule:
+    """«Термины и теория задания X» — тема, а не задание."""
+    return TitleRule("terms", None, _terms_topic(prefix), keywords=("термин", "теори", "задани"))
+
+
+def heading_rule(prefix: str) -> TitleRule:
+    """Темы, начинающиеся с «Как», «Еще», «Немного», «Некоторые»."""
+    return TitleRule("heading", r"^(как|еще|немного|некоторые)", _heading_topic(prefix), target="first_line_lower")
+
+
+def razbor_po_teme_rule() -> TitleRule:
+    """«Разбор заданий по теме X» — тема."""
+    return TitleRule("razbor_po_teme", r"разбор\s+задани[ий]\s+по\s+теме\s+\d+", to_topic,
+                     target="first_line_lower", keywords=("разбор", "теме"))
+
+
+def stem_task_rules(prefix: str) -> list[TitleRule]:
+    """Имя файла «25_2» (задание с подтипом) или «5 (2)» — задание."""
+    return [
+        TitleRule("stem_task_sub", r"^(\d+)[_\d]", prefix + ". Разбираем задание №{0}", target="stem", method="match"),
+        TitleRule("stem_task_paren", r"^(\d+)\s*\(", prefix + ". Разбираем задание №{0}", target="stem", method="match"),
+    ]
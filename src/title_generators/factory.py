@@ -1,6 +1,7 @@
 """Фабрика генераторов заголовков."""
 
-from typing import Optional
+import functools
+from typing import Callable, Dict, Optional, Sequence, Tuple
 
 from .base import BaseTitleGenerator
 from .generators import (
@@ -100,3 +101,55 @@ class TitleGeneratorFactory:
             generator_class: Класс генератора.
         """
         cls._generators[name] = generator_class
+
+
+def generate_titles_by_channel(
+    items: Sequence[Tuple],
+    generator_for_channel: Callable[[Optional[str]], Optional[BaseTitleGenerator]],
+) -> list[Optional[str]]:
+    """Сгенерировать заголовки для записей разных каналов пакетами по генератору.
+
+    Args:
+        items: Кортежи (description, stem, date, channel).
+        generator_for_channel: channel -> генератор (None — заголовок не генерируется).
+
+    Returns:
+        Заголовки в порядке items (None для записей без генератора).
+    """
+    groups: Dict[int, Tuple[BaseTitleGenerator, list[int]]] = {}
+    for idx, item in enumerate(items):
+        gen = generator_for_channel(item[3])
+        if gen is None:
+            continue
+        groups.setdefault(id(gen), (gen, []))[1].append(idx)
+    titles: list[Optional[str]] = [None] * len(items)
+    for gen, indexes in groups.values():
+        for idx, title in zip(indexes, gen.generate_batch([items[i] for i in indexes])):
+            titles[idx] = title
+    return titles
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_generator(generator_name: str) -> Optional[BaseTitleGenerator]:
+    return TitleGeneratorFactory.create(generator_name)
+
+
+def generate_titles_by_name(generator_name: str, items: Sequence[Tuple]) -> list[str]:
+    """Сгенерировать заголовки пакета генератором из фабрики (функция для пула процессов).
+
+    Генератор создаётся один раз на процесс; в воркер передаются только имя и кортежи.
+
+    Args:
+        generator_name: Имя генератора в фабрике.
+        items: Кортежи (description, stem[, date[, channel]]).
+
+    Returns:
+        Заголовки в порядке items.
+
+    Raises:
+        ValueError: Генератор не найден.
+    """
+    gen = _cached_generator(generator_name)
+    if gen is None:
+        raise ValueError(f"Генератор заголовков не найден: {generator_name}")
+    return gen.generate_batch(items)
@@ -4,15 +4,15 @@ from datetime import datetime
 from typing import Optional
 
 from .base import BaseTitleGenerator
-from ..models.video import VideoData
+from .rules import TitleContext
 
 
 class SimpleTitleGenerator(BaseTitleGenerator):
     """Простой генератор заголовков на основе имени файла."""
 
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок из имени файла."""
-        return video.file_path.stem
+        return ctx.stem
 
     def get_name(self) -> str:
         return "simple"
@@ -29,14 +29,13 @@ class CoursePrefixTitleGenerator(BaseTitleGenerator):
             self.prefix += " "
         self.max_length = max_length
 
-    def generate(self, video: VideoData) -> str:
-        desc = (video.description or "").strip()
-        first_line = desc.split("\n")[0].strip() if desc else ""
+    def generate_context(self, ctx: TitleContext) -> str:
+        first_line = ctx.first_line
         if first_line:
             if len(first_line) > self.max_length - len(self.prefix):
                 first_line = first_line[: self.max_length - len(self.prefix) - 3].rsplit(" ", 1)[0] + "..."
             return self.prefix + first_line
-        stem = video.file_path.stem.replace("_", " ")
+        stem = ctx.stem.replace("_", " ")
         if len(stem) > self.max_length - len(self.prefix):
             stem = stem[: self.max_length - len(self.prefix) - 3].rsplit(" ", 1)[0] + "..."
         return self.prefix + stem
@@ -56,19 +55,19 @@ class DateTitleGenerator(BaseTitleGenerator):
         """
         self.date_format = date_format
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок с датой.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Заголовок с датой или имя файла, если дата отсутствует.
         """
-        if video.date:
-            date_str = video.date.strftime(self.date_format)
-            return f"{date_str} - {video.file_path.stem}"
-        return video.file_path.stem
+        if ctx.date:
+            date_str = ctx.date.strftime(self.date_format)
+            return f"{date_str} - {ctx.stem}"
+        return ctx.stem
     
     def get_name(self) -> str:
         """Получить имя генератора."""
@@ -86,21 +85,21 @@ class DescriptionTitleGenerator(BaseTitleGenerator):
         """
         self.max_length = max_length
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок из описания.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Заголовок из описания (обрезанный) или имя файла.
         """
-        if video.description:
-            title = video.description.strip()
+        if ctx.raw_description:
+            title = ctx.description
             if len(title) > self.max_length:
                 title = title[:self.max_length].rsplit(" ", 1)[0] + "..."
             return title
-        return video.file_path.stem
+        return ctx.stem
     
     def get_name(self) -> str:
         """Получить имя генератора."""
@@ -120,24 +119,24 @@ class CompositeTitleGenerator(BaseTitleGenerator):
         self.generators = generators
         self.separator = separator
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок, объединив результаты генераторов.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Объединенный заголовок.
         """
         parts = []
         for generator in self.generators:
-            part = generator.generate(video)
+            part = generator.generate_context(ctx)
             if part:
                 parts.append(part)
         
         if parts:
             return self.separator.join(parts)
-        return video.file_path.stem
+        return ctx.stem
     
     def get_name(self) -> str:
         """Получить имя генератора."""
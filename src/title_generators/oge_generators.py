@@ -4,70 +4,86 @@ import re
 from typing import Optional
 
 from .base import BaseTitleGenerator
-from .utils import first_two_sentences
-from ..models.video import VideoData
+from .exam_rules import (
+    build_topic_rules,
+    example_in_file_rule,
+    explicit_task_rules,
+    heading_rule,
+    is_example_in_file,
+    lesson_rule,
+    razbor_po_teme_rule,
+    stem_task_rules,
+    terms_rule,
+    to_task,
+    to_topic,
+    topic_section_rules,
+    topic_title,
+    video_task_rules,
+)
+from .rules import RuleSet, TextView, TitleContext, TitleRule
+
 
 PREFIX = "Курс ОГЭ по информатике"
 
+_I = re.IGNORECASE
+
+TOPIC_RULES = build_topic_rules("oge.topic", PREFIX)
+
+_TASK_NUMBER_PATTERNS = [
+    ("tip", r"тип\s+(\d+)[_\d]", ("тип",)),
+    ("razbor_n", r"разбор\s+(\d+)[_\d]", ("разбор",)),
+    ("reshenie_n", r"решение\s+(\d+)[_\d]", ("решение",)),
+    ("leading_n", r"^(\d+)[_\d]", ()),
+    ("razbor_zadaniy_end", r"разбор\s+задани[ий]\s+(\d+)$", ("разбор", "задани")),
+    ("razbor_zadaniy_dot", r"разбор\s+задани[ий]\s+(\d+)\s*\.", ("разбор", "задани")),
+    ("zadanie_no", r"задани[яе]\s*[№#]?\s*(\d+)", ("задани",)),
+    ("zadanie", r"задани[ея]\s+(\d+)", ("задани",)),
+    ("zadacha", r"задач[аи]\s+(\d+)", ("задач",)),
+    ("razbor_zadaniya", r"разбор\s+задани[яе]\s+(\d+)", ("разбор", "задани")),
+    ("razbor_zadaniy", r"разбор\s+задани[ий]\s+(\d+)", ("разбор", "задани")),
+    ("reshenie_zadaniya_no", r"решение\s+задани[яе]\s*[№#]?\s*(\d+)", ("решение", "задани")),
+    ("reshenie_zadaniy", r"решение\s+задани[ий]\s+(\d+)", ("решение", "задани")),
+    ("video_resheniya", r"видео\s+решения?\s+задани[ея]\s+(\d+)", ("видео", "задани")),
+    ("videorazbor", r"видеоразбор\s+задани[яе]\s+(\d+)", ("видеоразбор",)),
+]
+
+TASK_NUMBER_RULES = RuleSet(
+    "oge.task_number",
+    [
+        TitleRule(rule_name, pattern, lambda gen, ctx, m: int(m.group(1)), flags=_I, keywords=keywords)
+        for rule_name, pattern, keywords in _TASK_NUMBER_PATTERNS
+    ],
+)
+
+_RANGE_RX = re.compile(r"задани[ий]\s+(\d+)[-_](\d+)", re.IGNORECASE)
+_SUBTYPE_UNDERSCORE_RX = re.compile(r"(\d+)[_](\d+)")
+_RESHU_FIRST_LINE_RX = re.compile(r"решуогэ", re.IGNORECASE)
+
+
+def _bracket_resource(gen, text: TextView, m) -> str:
+    return m.group(0).strip("()")
+
+
+RESOURCE_RULES = RuleSet(
+    "oge.resource",
+    [
+        TitleRule("bracket_reshu", r"\(Решу\s+ОГЭ\)", _bracket_resource, flags=_I, target="text", keywords=("(решу",)),
+        TitleRule("bracket_reshuoge", r"\(РешуОГЭ\)", _bracket_resource, flags=_I, target="text", keywords=("(решуогэ)",)),
+        TitleRule("bracket_koge", r"\(КОГЭ\)", _bracket_resource, flags=_I, target="text", keywords=("(когэ)",)),
+        TitleRule("bracket_polyakov", r"\(Поляков\)", _bracket_resource, flags=_I, target="text", keywords=("(поляков)",)),
+        TitleRule("bracket_komp", r"\(Комп\s+ОГЭ\)", _bracket_resource, flags=_I, target="text", keywords=("(комп",)),
+        TitleRule("polyakov_tail", r"\s+Поляков\s*$", "Поляков", flags=_I, target="text", keywords=("поляков",)),
+    ],
+)
+
 
 class OGETopicTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для разбора тем ОГЭ."""
 
-    def generate(self, video: VideoData) -> str:
-        description = video.description.strip()
-        if not description:
-            return video.file_path.stem
-
-        first_line = description.split("\n")[0].strip()
-        first_line_lower = first_line.lower()
-
-        lesson_match = re.search(r"урок\s+(\d+[._]\d+)\.\s*(.+?)(?:\.|$)", first_line, re.IGNORECASE)
-        if lesson_match:
-            lesson_num = lesson_match.group(1).replace(".", "_")
-            topic = lesson_match.group(2).strip()
-            if topic and len(topic) > 3:
-                return f'{PREFIX}. Урок {lesson_num}. Разбираем тему "{topic}"'
-
-        lesson_match = re.search(r"урок\s+(\d+)\.\s*(.+?)(?:\.|$)", first_line, re.IGNORECASE)
-        if lesson_match:
-            lesson_num = lesson_match.group(1)
-            topic = lesson_match.group(2).strip()
-            if topic and len(topic) > 3:
-                return f'{PREFIX}. Урок {lesson_num}. Разбираем тему "{topic}"'
-
-        task_topic_match = re.search(
-            r"разбор\s+задани[ий]\s+\d+\.\s*(.+?)(?:\.|$)", first_line, re.IGNORECASE
-        )
-        if task_topic_match:
-            topic = task_topic_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        task_match = re.search(
-            r"задание\s+\d+\.\s*(.+?)(?:\.|$)", first_line, re.IGNORECASE
-        )
-        if task_match:
-            topic = task_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if "термин" in first_line_lower and "теори" in first_line_lower:
-            topic_match = re.search(
-                r"термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)",
-                first_line,
-                re.IGNORECASE,
-            )
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                if topic and len(topic) > 3:
-                    return f'{PREFIX}. Разбираем тему "{topic}"'
-        # Короткое название темы — первые два предложения без "Разбираем тему"
-        topic_candidate = first_line.split(".")[0].strip()
-        if len(topic_candidate) < 25 and len(description) > 50:
-            two = first_two_sentences(description, max_length=115)
-            if two:
-                return f"{PREFIX}. {two}"
-        return f"{PREFIX}. {video.file_path.stem}"
+    def generate_context(self, ctx: TitleContext) -> str:
+        if not ctx.description:
+            return ctx.stem
+        return TOPIC_RULES.apply(ctx, self)
 
     def get_name(self) -> str:
         return "oge_topic"
@@ -76,77 +92,38 @@ class OGETopicTitleGenerator(BaseTitleGenerator):
 class OGETaskTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для разбора заданий ОГЭ."""
 
-    def _extract_resource(self, text: str) -> Optional[str]:
-        resource_patterns = [
-            r"\(Решу\s+ОГЭ\)",
-            r"\(РешуОГЭ\)",
-            r"\(КОГЭ\)",
-            r"\(Поляков\)",
-            r"\(Комп\s+ОГЭ\)",
-        ]
-        for pattern in resource_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0).strip("()")
-        if re.search(r"\s+Поляков\s*$", text, re.IGNORECASE):
-            return "Поляков"
-        return None
+    def _extract_resource(self, text: str, trace: Optional[list[str]] = None) -> Optional[str]:
+        return RESOURCE_RULES.apply(TextView(text, trace), self)
 
-    def generate(self, video: VideoData) -> str:
-        description = video.description.strip()
-        if not description:
-            return f"{PREFIX}. {video.file_path.stem}"
-
-        first_line = description.split("\n")[0].strip()
-
-        patterns = [
-            r"тип\s+(\d+)[_\d]",
-            r"разбор\s+(\d+)[_\d]",
-            r"решение\s+(\d+)[_\d]",
-            r"^(\d+)[_\d]",
-            r"разбор\s+задани[ий]\s+(\d+)$",
-            r"разбор\s+задани[ий]\s+(\d+)\s*\.",
-            r"задани[яе]\s*[№#]?\s*(\d+)",
-            r"задани[ея]\s+(\d+)",
-            r"задач[аи]\s+(\d+)",
-            r"разбор\s+задани[яе]\s+(\d+)",
-            r"разбор\s+задани[ий]\s+(\d+)",
-            r"решение\s+задани[яе]\s*[№#]?\s*(\d+)",
-            r"решение\s+задани[ий]\s+(\d+)",
-            r"видео\s+решения?\s+задани[ея]\s+(\d+)",
-            r"видеоразбор\s+задани[яе]\s+(\d+)",
-        ]
+    def generate_context(self, ctx: TitleContext) -> str:
+        if not ctx.description:
+            return f"{PREFIX}. {ctx.stem}"
 
+        first_line = ctx.first_line
         task_number = None
         task_type = None
         task_range = None
 
-        range_match = re.search(
-            r"задани[ий]\s+(\d+)[-_](\d+)", first_line, re.IGNORECASE
-        )
+        range_match = _RANGE_RX.search(first_line)
         if range_match:
             task_number = int(range_match.group(1))
             task_range = f"{range_match.group(1)}-{range_match.group(2)}"
         else:
-            for pattern in patterns:
-                match = re.search(pattern, first_line, re.IGNORECASE)
-                if match:
-                    task_number = int(match.group(1))
-                    break
+            task_number = TASK_NUMBER_RULES.apply(ctx, self)
 
         if not task_number:
-            return f"{PREFIX}. {video.file_path.stem}"
+            return f"{PREFIX}. {ctx.stem}"
 
-        subtype_match = re.search(r"(\d+)[_](\d+)", first_line)
+        subtype_match = _SUBTYPE_UNDERSCORE_RX.search(first_line)
         if subtype_match and not task_range:
             num1, num2 = int(subtype_match.group(1)), int(subtype_match.group(2))
             if abs(num1 - num2) > 5:
                 task_type = f"{subtype_match.group(1)}_{subtype_match.group(2)}"
 
-        resource = self._extract_resource(description)
+        resource = self._extract_resource(ctx.description, ctx.trace)
         if not resource:
-            resource = self._extract_resource(first_line)
-        if not resource and re.search(r"решуогэ", first_line, re.IGNORECASE):
+            resource = self._extract_resource(first_line, ctx.trace)
+        if not resource and _RESHU_FIRST_LINE_RX.search(first_line):
             resource = "Решу ОГЭ"
 
         if task_range:
@@ -165,177 +142,105 @@ class OGETaskTitleGenerator(BaseTitleGenerator):
         return "oge_task"
 
 
-class OGEAutoTitleGenerator(BaseTitleGenerator):
-    """Автоматический генератор заголовков для ОГЭ по информатике."""
+def _is_video_record(ctx: TitleContext) -> bool:
+    stem = ctx.stem
+    return stem.startswith("video") and len(stem) > 5 and stem[5:].isdigit()
 
-    def __init__(self):
-        self.topic_generator = OGETopicTitleGenerator()
-        self.task_generator = OGETaskTitleGenerator()
 
-    def generate(self, video: VideoData) -> str:
-        description = video.description.strip()
-        if not description:
-            filename_stem = video.file_path.stem
-            if "Встреча" in filename_stem or "встреча" in filename_stem.lower():
-                return f"{PREFIX}. Запись встречи"
-            if filename_stem.isdigit():
-                return f"{PREFIX}. Разбираем задание №{filename_stem} (Решу ОГЭ)"
-            match = re.match(r"^(\d+)[_\d]", filename_stem)
-            if match:
-                return f"{PREFIX}. Разбираем задание №{match.group(1)}"
-            match = re.match(r"^(\d+)\s*\(", filename_stem)
-            if match:
-                return f"{PREFIX}. Разбираем задание №{match.group(1)}"
-            return f"{PREFIX}. {filename_stem}"
-
-        first_line = description.split("\n")[0].strip()
-        first_line_lower = first_line.lower()
-        filename_stem = video.file_path.stem
+def _first_line_topic(min_len: int):
+    """Тема — первая строка до точки (или вся строка), без лишних пробелов."""
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        topic = ctx.first_line.split(".")[0].strip() or ctx.first_line.strip()
+        topic = " ".join(topic.split())
+        if len(topic) > min_len:
+            return topic_title(PREFIX, topic)
+        return None
+    return action
+
+
+def _phrase_topic(gen, ctx: TitleContext, m) -> Optional[str]:
+    """Одна фраза-название темы (короткое — в генератор тем, он вернёт первые 2 предложения)."""
+    first_line = ctx.first_line
+    if first_line.endswith("."):
+        topic = first_line[:-1].strip()
+    else:
+        topic = first_line.strip()
+    if 5 < len(topic) < 85 and not re.search(
+        r"^(разбор|решение)\s+задани[яе]\s+\d+\s*\.?\s*$", ctx.first_line_lower
+    ):
+        if len(topic) < 25 and len(ctx.description) > 50:
+            return to_topic(gen, ctx)
+        return topic_title(PREFIX, topic)
+    return None
+
+
+def _task_or_topic(gen, ctx: TitleContext) -> str:
+    """По умолчанию — задание; если получили имя файла в заголовке — тема из первой строки или из имени файла."""
+    result = to_task(gen, ctx)
+    if result and ctx.stem in result:
+        topic = ctx.first_line.split(".")[0].strip() or ctx.first_line.strip()
+        topic = " ".join(topic.split())
+        if 5 < len(topic) <= 100:
+            return topic_title(PREFIX, topic)
+        # Длинная первая строка: берём тему из имени файла (подчёркивания → пробелы)
+        if "_" in ctx.stem:
+            topic = ctx.stem.replace("_", " ").strip()
+            if len(topic) > 3:
+                return topic_title(PREFIX, topic)
+    return result
+
 
+AUTO_RULES = RuleSet(
+    "oge.auto",
+    [
         # Явные признаки задания: "Решение N", "Разбор N_...", "Задание N_..."
-        if re.search(r"^(решение|тип)\s+\d+", first_line_lower):
-            return self.task_generator.generate(video)
-        if re.search(r"^разбор\s+(\d+[_\-]|задани[ея]\s+\d+[_\-])", first_line_lower):
-            return self.task_generator.generate(video)
-        if re.search(r"^задани[ея]\s+\d+[_\-]\d+", first_line_lower):
-            return self.task_generator.generate(video)
-
+        *explicit_task_rules(),
         # Запись встречи в Телемосте — только если по описанию это действительно встреча, не по имени файла
-        if re.search(r"запись\s+встречи|встреча\s+в\s+телемост", first_line_lower):
-            return f"{PREFIX}. Запись встречи"
-
+        TitleRule("meeting", r"запись\s+встречи|встреча\s+в\s+телемост", f"{PREFIX}. Запись встречи",
+                  target="first_line_lower", keywords=("встреч",)),
         # videoXXXXX.mp4 — тема из первой строки
-        if filename_stem.startswith("video") and len(filename_stem) > 5 and filename_stem[5:].isdigit():
-            topic = first_line.split(".")[0].strip() or first_line.strip()
-            topic = " ".join(topic.split())
-            if len(topic) > 3:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        # Одна фраза-название темы (короткое — в topic_generator вернёт первые 2 предложения)
-        if len(first_line) < 90 and first_line[0].isupper():
-            if first_line.endswith("."):
-                topic = first_line[:-1].strip()
-            else:
-                topic = first_line.strip()
-            if 5 < len(topic) < 85 and not re.search(
-                r"^(разбор|решение)\s+задани[яе]\s+\d+\s*\.?\s*$", first_line_lower
-            ):
-                if len(topic) < 25 and len(description) > 50:
-                    return self.topic_generator.generate(video)
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
+        TitleRule("video_record", None, _first_line_topic(3), when=_is_video_record),
+        TitleRule("phrase", None, _phrase_topic,
+                  when=lambda ctx: len(ctx.first_line) < 90 and ctx.first_line[0].isupper()),
         # "Разбор решения заданий N с помощью...", "Решение усложненных заданий N с помощью..." — тема
-        if re.search(
-            r"^(разбор\s+решения|решение\s+усложненных)\s+задани[ий]\s+\d+\s+с\s+помощью",
-            first_line_lower,
-        ):
-            topic = first_line.split(".")[0].strip() or first_line.strip()
-            topic = " ".join(topic.split())
-            if len(topic) > 10:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if "видео" in first_line_lower and "задани" in first_line_lower:
-            for pattern in [
-                r"видео\s+решения?\s+задани[ея]\s+(\d+)",
-                r"видеоразбор\s+задани[яе]\s+(\d+)",
-            ]:
-                match = re.search(pattern, first_line, re.IGNORECASE)
-                if match:
-                    return f'{PREFIX}. Разбираем задание №{match.group(1)}'
-
-        if "пример" in first_line_lower and "задани" in first_line_lower:
-            if "в файле" in first_line_lower or "для задани" in first_line_lower:
-                topic = first_line.split(".")[0].strip()
-                if len(topic) > 5:
-                    return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if re.search(r"урок\s+\d+[._]\d+\.", first_line_lower) or re.search(
-            r"урок\s+\d+\.", first_line_lower
-        ):
-            return self.topic_generator.generate(video)
-
-        if not re.search(
-            r"видео\s+решения?\s+задани[яе]|видеоразбор\s+задани[яе]",
-            first_line_lower,
-        ):
-            topic_match = re.search(
-                r"разбор\s+задани[ий]\s+(\d+)\.\s+(.+?)(?:\.|$)",
-                first_line,
-                re.IGNORECASE,
-            )
-            if topic_match:
-                topic_text = topic_match.group(2).strip()
-                if topic_text and len(topic_text) > 5:
-                    return self.topic_generator.generate(video)
-
-        topic_theme_match = re.search(
-            r"разбор\s+задани[ий]\s+по\s+теме\s+\d+\.\s*(.+?)(?:\.|$)",
-            first_line,
-            re.IGNORECASE,
-        )
-        if topic_theme_match:
-            topic = topic_theme_match.group(1).strip()
-            if topic and len(topic) > 3:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if (
-            re.search(r"задани[ея]\s+\d+\.\s+[А-Яа-я]", first_line)
-            and not re.search(r"разбор|решение", first_line_lower)
-        ):
-            return self.topic_generator.generate(video)
-
-        if "термин" in first_line_lower and "теори" in first_line_lower and "задани" in first_line_lower:
-            topic_match = re.search(
-                r"термин[ы]?\s+и\s+теори[ия]\s+задани[яе]\s+\d+\.\s*(.+?)(?:\.|$)",
-                first_line,
-                re.IGNORECASE,
-            )
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                if len(topic) > 5:
-                    return f'{PREFIX}. Разбираем тему "{topic}"'
-            topic = first_line.split(".")[0].strip()
-            topic = " ".join(topic.split())
-            if len(topic) > 5:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if re.search(
-            r"^(как|еще|немного|некоторые)", first_line_lower
-        ):
-            topic_match = re.search(r"^(.+?)(?:\.|$)", first_line)
-            if topic_match:
-                topic = topic_match.group(1).strip()
-                if len(topic) > 80:
-                    truncated = topic[:80].rsplit(" ", 1)[0]
-                    topic = truncated if len(truncated) > 50 else topic[:77] + "..."
-                if len(topic) > 10:
-                    return f'{PREFIX}. Разбираем тему "{topic}"'
-
-        if re.search(
-            r"разбор\s+задани[ий]\s+по\s+теме\s+\d+", first_line_lower
-        ):
-            return self.topic_generator.generate(video)
-
-        if re.search(
-            r"задани[ея]\s+\d+|задач[аи]\s+\d+", first_line_lower
-        ) and not (
-            first_line_lower.startswith("пример") and "в файле" in first_line_lower
-        ):
-            return self.task_generator.generate(video)
-
-        result = self.task_generator.generate(video)
-        # Если получили имя файла в заголовке — пробуем взять тему из первой строки или из имени файла
-        if result and filename_stem in result:
-            topic = first_line.split(".")[0].strip() or first_line.strip()
-            topic = " ".join(topic.split())
-            if 5 < len(topic) <= 100:
-                return f'{PREFIX}. Разбираем тему "{topic}"'
-            # Длинная первая строка: берём тему из имени файла (подчёркивания → пробелы)
-            if "_" in filename_stem:
-                topic = filename_stem.replace("_", " ").strip()
-                if len(topic) > 3:
-                    return f'{PREFIX}. Разбираем тему "{topic}"'
-        return result
+        TitleRule("with_help", r"^(разбор\s+решения|решение\s+усложненных)\s+задани[ий]\s+\d+\s+с\s+помощью",
+                  _first_line_topic(10), target="first_line_lower", keywords=("помощью",)),
+        *video_task_rules(PREFIX),
+        example_in_file_rule(PREFIX),
+        lesson_rule(),
+        *topic_section_rules(PREFIX),
+        terms_rule(PREFIX),
+        heading_rule(PREFIX),
+        razbor_po_teme_rule(),
+        TitleRule("task_number", r"задани[ея]\s+\d+|задач[аи]\s+\d+", to_task,
+                  target="first_line_lower", when=lambda ctx: not is_example_in_file(ctx)),
+    ],
+    default=_task_or_topic,
+)
+
+STEM_RULES = RuleSet(
+    "oge.stem",
+    [
+        TitleRule("meeting", None, f"{PREFIX}. Запись встречи",
+                  when=lambda ctx: "Встреча" in ctx.stem or "встреча" in ctx.stem.lower()),
+        TitleRule("digits", None, PREFIX + ". Разбираем задание №{stem} (Решу ОГЭ)", when=lambda ctx: ctx.stem.isdigit()),
+        *stem_task_rules(PREFIX),
+    ],
+    default=lambda gen, ctx: f"{PREFIX}. {ctx.stem}",
+)
+
+
+class OGEAutoTitleGenerator(BaseTitleGenerator):
+    """Автоматический генератор заголовков для ОГЭ по информатике."""
+
+    def __init__(self):
+        self.topic_generator = OGETopicTitleGenerator()
+        self.task_generator = OGETaskTitleGenerator()
+
+    def generate_context(self, ctx: TitleContext) -> str:
+        if not ctx.description:
+            return STEM_RULES.apply(ctx, self)
+        return AUTO_RULES.apply(ctx, self)
 
     def get_name(self) -> str:
         return "oge_auto"
@@ -4,11 +4,143 @@ import re
 from typing import Optional
 
 from .base import BaseTitleGenerator
+from .rules import RuleSet, TitleContext, TitleRule
 from .utils import first_two_sentences
-from ..models.video import VideoData
+
 
 PREFIX_PY = "Курс по Python базовый. "
 
+_I = re.IGNORECASE
+_TASK_NUMBER_RX = re.compile(r'задание\s+\d+|задани[ея]\s+\d+')
+_IN_PYTHON_RX = re.compile(r'\s+в\s+python\s*$', re.IGNORECASE)
+
+
+def _topic_title(topic: str) -> str:
+    return f'Курс по Python базовый. Разбираем тему "{topic}"'
+
+
+def _mini_urok(gen, ctx: TitleContext, m) -> Optional[str]:
+    """«Мини-урок по X в Python» — берем всю фразу до «в Python»."""
+    topic = m.group(1).strip()
+    # Не дублировать "работе с": тема уже может содержать "работе с срезами"
+    if "работе с" in ctx.first_line_lower and not topic.lower().startswith("работе с"):
+        topic = "работе с " + topic
+    # Привести к именительному падежу для заголовка: "созданию строк" -> "создание строк"
+    topic = re.sub(r"\bсозданию\b", "создание", topic, flags=re.IGNORECASE)
+    topic = re.sub(r"\bработе\s+с\b", "работа с", topic, flags=re.IGNORECASE)
+    if topic and len(topic) > 2:
+        return _topic_title(topic)
+    return None
+
+
+def _topic_group(min_len: int):
+    def action(gen, ctx: TitleContext, m) -> Optional[str]:
+        # Убираем "в Python" из конца, если есть
+        topic = _IN_PYTHON_RX.sub('', m.group(1).strip())
+        if topic and len(topic) > min_len:
+            return _topic_title(topic)
+        return None
+    return action
+
+
+def _plain_topic(gen, ctx: TitleContext, m) -> Optional[str]:
+    """Паттерны не сработали, но текст похож на тему (нет номера задания)."""
+    topic = ctx.first_line.split('.')[0].strip()
+    topic = re.sub(r'\s+в\s+python\s*$', '', topic, flags=re.IGNORECASE)
+    topic = re.sub(r'\s+на\s+python\s*$', '', topic, flags=re.IGNORECASE)
+    topic = re.sub(r'\s+под\s+\w+\s*$', '', topic, flags=re.IGNORECASE)
+    if len(topic) <= 10 and topic.lower() in ['циклы', 'ооп', 'числа', 'строки', 'списки']:
+        return f'{PREFIX_PY}Разбираем тему "{topic}"'
+    # Короткое название темы — первые два предложения без "Разбираем тему"
+    if topic and len(topic) < 25 and len(ctx.description) > 50:
+        two = first_two_sentences(ctx.description, max_length=115)
+        if two:
+            return f'{PREFIX_PY}{two}'
+    if topic and len(topic) > 3:
+        return f'{PREFIX_PY}Разбираем тему "{topic}"'
+    return None
+
+
+TOPIC_RULES = RuleSet(
+    "python.topic",
+    [
+        TitleRule("mini_urok_phrase", r'мини-урок\s+по\s+(.+?)(?:\s+в\s+python|\.|$)', _mini_urok,
+                  flags=_I, keywords=("мини-урок",)),
+        TitleRule("urok", r'урок\.\s*(.+?)(?:\.|$)', _topic_group(2), flags=_I, keywords=("урок.",)),
+        TitleRule("videourok", r'видеоурок\.\s*(.+?)(?:\.|$)', _topic_group(2), flags=_I, keywords=("видеоурок.",)),
+        # "Мини-урок по созданию строк"
+        TitleRule("mini_urok", r'мини-урок\s+по\s+(.+?)(?:\.|$)', _topic_group(2), flags=_I, keywords=("мини-урок",)),
+        # "Мини-урок по работе с срезами"
+        TitleRule("mini_urok_rabota", r'мини-урок\s+по\s+работе\s+с\s+(.+?)(?:\.|$)', _topic_group(2),
+                  flags=_I, keywords=("мини-урок", "работе")),
+        TitleRule("tema_quoted", r'тема\s+["\'](.+?)["\']', _topic_group(2), flags=_I, keywords=("тема",)),
+        TitleRule("tema", r'тема\s+(.+?)(?:\.|$)', _topic_group(2), flags=_I, keywords=("тема",)),
+        # "X. Как работает..." или "X. Что делает..."
+        TitleRule("numbered_topic", r'^\d+\.\s+(как\s+работает\s+.+?|что\s+делает\s+.+?)(?:\.|$)', _topic_group(5),
+                  flags=_I),
+        TitleRule("plain_topic", None, _plain_topic,
+                  when=lambda ctx: not _TASK_NUMBER_RX.search(ctx.first_line_lower)),
+    ],
+    default=lambda gen, ctx: f"{PREFIX_PY}{ctx.stem}",
+)
+
+
+def _strip_quotes(gen, ctx: TitleContext, m) -> str:
+    return m.group(1).strip().strip('"\'')
+
+
+TASK_NUMBER_RULES = RuleSet(
+    "python.task_number",
+    [
+        TitleRule("zadanie", r'задание\s+[№#]?\s*(\d+)', lambda gen, ctx, m: int(m.group(1)),
+                  flags=_I, keywords=("задание",)),
+        TitleRule("zadanie_form", r'задани[ея]\s+(\d+)', lambda gen, ctx, m: int(m.group(1)),
+                  flags=_I, keywords=("задани",)),
+    ],
+)
+
+TASK_TOPIC_RULES = RuleSet(
+    "python.task_topic",
+    [
+        TitleRule("po_teme", r'по\s+теме\s+["\'](.+?)["\']', _strip_quotes, flags=_I, keywords=("теме",)),
+        TitleRule("tema_quoted", r'тема\s+["\'](.+?)["\']', _strip_quotes, flags=_I, keywords=("тема",)),
+        TitleRule("tema", r'тема\s+(.+?)(?:\.|$)', _strip_quotes, flags=_I, keywords=("тема",)),
+        TitleRule("tema_paren_quoted", r'\(тема\s+["\'](.+?)["\']\)', _strip_quotes, flags=_I, keywords=("(тема",)),
+        TitleRule("tema_paren", r'\(тема\s+(.+?)\)', _strip_quotes, flags=_I, keywords=("(тема",)),
+    ],
+)
+
+# Тема не найдена по «тема ...» — ищем в тексте первой строки
+TASK_TOPIC_IN_TEXT_RULES = RuleSet(
+    "python.task_topic_text",
+    [
+        TitleRule("na_cikly", r'на\s+цикл[ыа]?', "Циклы", flags=_I, keywords=("цикл",)),
+        TitleRule("na_vlozhennye_cikly", r'на\s+вложенные\s+цикл[ыа]?', "Циклы", flags=_I, keywords=("вложенные",)),
+        TitleRule("po_teme", r'по\s+теме\s+["\'](.+?)["\']', _strip_quotes, flags=_I, keywords=("теме",)),
+        TitleRule("tema_paren_quoted", r'\(тема\s+["\'](.+?)["\']\)', _strip_quotes, flags=_I, keywords=("(тема",)),
+        TitleRule("tema_paren", r'\(тема\s+(.+?)\)', _strip_quotes, flags=_I, keywords=("(тема",)),
+        TitleRule("tema_quoted", r'тема\s+["\'](.+?)["\']', _strip_quotes, flags=_I, keywords=("тема",)),
+    ],
+)
+
+# Все еще не найдено — ключевые слова
+TASK_KEYWORD_RULES = RuleSet(
+    "python.task_keyword",
+    [
+        TitleRule("cikly", r'цикл[ыа]?', "Циклы", flags=_I, keywords=("цикл",)),
+        TitleRule("spiski", r'списк[иа]?', "Списки", flags=_I, keywords=("списк",)),
+        TitleRule("stroki", r'строк[иа]?', "Строки", flags=_I, keywords=("строк",)),
+        TitleRule("funkcii", r'функци[ия]?', "Функции", flags=_I, keywords=("функци",)),
+        TitleRule("rekursiya", r'рекурси[яи]?', "Рекурсия", flags=_I, keywords=("рекурси",)),
+        TitleRule("slovari", r'словар[ия]?', "Словари", flags=_I, keywords=("словар",)),
+        TitleRule("mnozhestva", r'множеств[ао]?', "Множества", flags=_I, keywords=("множеств",)),
+    ],
+)
+
+
+def _topic_accepted(topic: Optional[str]) -> bool:
+    return bool(topic) and len(topic) > 2
+
 
 class PythonTopicTitleGenerator(BaseTitleGenerator):
     """Генератор заголовков для разбора тем Python.
@@ -16,80 +148,18 @@ class PythonTopicTitleGenerator(BaseTitleGenerator):
     Формат: "Разбираем тему "Название темы""
     """
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок для темы.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Заголовок в формате "Разбираем тему "Название темы"" или имя файла.
         """
-        description = video.description.strip()
-        if not description:
-            return video.file_path.stem
-        
-        # Извлекаем первую строку
-        first_line = description.split('\n')[0].strip()
-        first_line_lower = first_line.lower()
-        
-        # Паттерны для тем
-        patterns = [
-            r'урок\.\s*(.+?)(?:\.|$)',
-            r'видеоурок\.\s*(.+?)(?:\.|$)',
-            r'мини-урок\s+по\s+(.+?)(?:\.|$)',  # "Мини-урок по созданию строк"
-            r'мини-урок\s+по\s+работе\s+с\s+(.+?)(?:\.|$)',  # "Мини-урок по работе с срезами"
-            r'тема\s+["\'](.+?)["\']',
-            r'тема\s+(.+?)(?:\.|$)',
-        ]
-        
-        # Специальная обработка для "Мини-урок по X в Python" - берем всю фразу до "в Python"
-        mini_urok_match = re.search(r'мини-урок\s+по\s+(.+?)(?:\s+в\s+python|\.|$)', first_line, re.IGNORECASE)
-        if mini_urok_match:
-            topic = mini_urok_match.group(1).strip()
-            # Не дублировать "работе с": тема уже может содержать "работе с срезами"
-            if "работе с" in first_line_lower and not topic.lower().startswith("работе с"):
-                topic = "работе с " + topic
-            # Привести к именительному падежу для заголовка: "созданию строк" -> "создание строк"
-            topic = re.sub(r"\bсозданию\b", "создание", topic, flags=re.IGNORECASE)
-            topic = re.sub(r"\bработе\s+с\b", "работа с", topic, flags=re.IGNORECASE)
-            if topic and len(topic) > 2:
-                return f'Курс по Python базовый. Разбираем тему "{topic}"'
-        
-        for pattern in patterns:
-            match = re.search(pattern, first_line, re.IGNORECASE)
-            if match:
-                topic = match.group(1).strip()
-                # Убираем "в Python" из конца, если есть
-                topic = re.sub(r'\s+в\s+python\s*$', '', topic, flags=re.IGNORECASE)
-                if topic and len(topic) > 2:
-                    return f'Курс по Python базовый. Разбираем тему "{topic}"'
-        
-        # Специальная обработка для "X. Как работает..." или "X. Что делает..."
-        numbered_topic_match = re.search(r'^\d+\.\s+(как\s+работает\s+.+?|что\s+делает\s+.+?)(?:\.|$)', first_line, re.IGNORECASE)
-        if numbered_topic_match:
-            topic = numbered_topic_match.group(1).strip()
-            # Убираем "в Python" из конца
-            topic = re.sub(r'\s+в\s+python\s*$', '', topic, flags=re.IGNORECASE)
-            if topic and len(topic) > 5:
-                return f'Курс по Python базовый. Разбираем тему "{topic}"'
-        
-        # Если паттерны не сработали, но текст похож на тему (нет номера задания)
-        if not re.search(r'задание\s+\d+|задани[ея]\s+\d+', first_line_lower):
-            topic = first_line.split('.')[0].strip()
-            topic = re.sub(r'\s+в\s+python\s*$', '', topic, flags=re.IGNORECASE)
-            topic = re.sub(r'\s+на\s+python\s*$', '', topic, flags=re.IGNORECASE)
-            topic = re.sub(r'\s+под\s+\w+\s*$', '', topic, flags=re.IGNORECASE)
-            if len(topic) <= 10 and topic.lower() in ['циклы', 'ооп', 'числа', 'строки', 'списки']:
-                return f'{PREFIX_PY}Разбираем тему "{topic}"'
-            # Короткое название темы — первые два предложения без "Разбираем тему"
-            if topic and len(topic) < 25 and len(description) > 50:
-                two = first_two_sentences(description, max_length=115)
-                if two:
-                    return f'{PREFIX_PY}{two}'
-            if topic and len(topic) > 3:
-                return f'{PREFIX_PY}Разбираем тему "{topic}"'
-        return f"{PREFIX_PY}{video.file_path.stem}"
+        if not ctx.description:
+            return ctx.stem
+        return TOPIC_RULES.apply(ctx, self)
     
     def get_name(self) -> str:
         """Получить имя генератора."""
@@ -103,101 +173,27 @@ class PythonTaskTitleGenerator(BaseTitleGenerator):
     или "Разбираем задание номер X" (если тема не найдена)
     """
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок для задания.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Заголовок в формате "Разбираем задание по теме "X" номер Y" или имя файла.
         """
-        description = video.description.strip()
-        if not description:
-            return video.file_path.stem
-        
-        # Извлекаем первую строку
-        first_line = description.split('\n')[0].strip()
-        
-        # Извлекаем номер задания
-        task_number = None
-        patterns = [
-            r'задание\s+[№#]?\s*(\d+)',
-            r'задани[ея]\s+(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, first_line, re.IGNORECASE)
-            if match:
-                task_number = int(match.group(1))
-                break
+        if not ctx.description:
+            return ctx.stem
         
+        task_number = TASK_NUMBER_RULES.apply(ctx, self)
         if not task_number:
-            return video.file_path.stem
-        
-        # Извлекаем тему
-        topic = None
-        topic_patterns = [
-            r'по\s+теме\s+["\'](.+?)["\']',
-            r'тема\s+["\'](.+?)["\']',
-            r'тема\s+(.+?)(?:\.|$)',
-            r'\(тема\s+["\'](.+?)["\']\)',
-            r'\(тема\s+(.+?)\)',
-        ]
-        
-        for pattern in topic_patterns:
-            match = re.search(pattern, first_line, re.IGNORECASE)
-            if match:
-                topic = match.group(1).strip()
-                # Убираем лишние пробелы и кавычки
-                topic = topic.strip('"\'')
-                if topic and len(topic) > 2:
-                    break
+            return ctx.stem
         
-        # Если тема не найдена, пробуем найти в тексте описания
+        topic = TASK_TOPIC_RULES.scan(ctx, _topic_accepted, self)
         if not topic:
-            # Паттерны для поиска темы в тексте
-            topic_patterns_in_text = [
-                r'на\s+цикл[ыа]?',
-                r'на\s+вложенные\s+цикл[ыа]?',
-                r'по\s+теме\s+["\'](.+?)["\']',
-                r'\(тема\s+["\'](.+?)["\']\)',
-                r'\(тема\s+(.+?)\)',
-                r'тема\s+["\'](.+?)["\']',
-            ]
-            
-            for pattern in topic_patterns_in_text:
-                match = re.search(pattern, first_line, re.IGNORECASE)
-                if match:
-                    if match.lastindex:
-                        topic = match.group(1).strip().strip('"\'')
-                    else:
-                        # Для паттернов без группы извлекаем контекст
-                        if 'цикл' in pattern:
-                            topic = "Циклы"
-                        elif 'списк' in pattern:
-                            topic = "Списки"
-                        elif 'строк' in pattern:
-                            topic = "Строки"
-                    if topic and len(topic) > 2:
-                        break
-            
-            # Если все еще не найдено, ищем ключевые слова
+            topic = TASK_TOPIC_IN_TEXT_RULES.scan(ctx, _topic_accepted, self)
             if not topic:
-                keyword_map = {
-                    r'цикл[ыа]?': "Циклы",
-                    r'списк[иа]?': "Списки",
-                    r'строк[иа]?': "Строки",
-                    r'функци[ия]?': "Функции",
-                    r'рекурси[яи]?': "Рекурсия",
-                    r'словар[ия]?': "Словари",
-                    r'множеств[ао]?': "Множества",
-                }
-                
-                for pattern, default_topic in keyword_map.items():
-                    if re.search(pattern, first_line, re.IGNORECASE):
-                        topic = default_topic
-                        break
+                topic = TASK_KEYWORD_RULES.apply(ctx, self)
         
         if topic:
             return f'Курс по Python базовый. Разбираем задание по теме "{topic}" номер {task_number}'
@@ -209,6 +205,69 @@ class PythonTaskTitleGenerator(BaseTitleGenerator):
         return "python_task"
 
 
+def _no_number_task(gen, ctx: TitleContext, m) -> str:
+    """«В задании нельзя...», «Дан список... В задании нельзя» — задание без номера."""
+    part = ctx.first_line.split(".")[0].strip()
+    if len(part) > 80:
+        part = part[:77].rsplit(" ", 1)[0] + "..."
+    if part:
+        return f'{PREFIX_PY}Разбираем задание: {part}'
+    return f'{PREFIX_PY}Разбираем задание'
+
+
+def _to_task(gen, ctx: TitleContext, m) -> str:
+    return gen.task_generator.generate_context(ctx)
+
+
+def _to_topic(gen, ctx: TitleContext, m=None) -> str:
+    return gen.topic_generator.generate_context(ctx)
+
+
+# Порядок важен: явные признаки задания, задание без номера, тема, номер задания, по умолчанию — тема
+AUTO_RULES = RuleSet(
+    "python.auto",
+    [
+        # "Решение N", "Разбор задания N_...", "Задание N_M"
+        TitleRule("reshenie", r'^(решение|разбор)\s+\d+', _to_task, target="first_line_lower"),
+        TitleRule("razbor_zadaniya", r'^разбор\s+задани[ея]\s+\d+[_\-]', _to_task,
+                  target="first_line_lower", keywords=("разбор", "задани")),
+        TitleRule("zadanie_n_m", r'^задани[ея]\s+\d+[_\-]\d+', _to_task,
+                  target="first_line_lower", keywords=("задани",)),
+        TitleRule("no_number_task", r'в задании\s+нельз|задани[ея]\s+нельз|задани[ея]\s+нужно', _no_number_task,
+                  target="first_line_lower", keywords=("задани",)),
+        TitleRule("no_number_task_text", r'в задании\s+нельз|задани[ея]\s+нельз', _no_number_task,
+                  target="description_lower", keywords=("задани",)),
+        # Тема (урок без номера задания): "Урок.", "Мини-урок", "Как...", "2. Как работает...", "Циклы..." и т.д.
+        TitleRule(
+            "topic",
+            r'^(?:урок\.|видеоурок\.|мини-урок|как\s+|понятие\s+|работа\s+с\s+|методы\s+|первая\s+программа'
+            r'|знакомство\s+|самые\s+главные|\d+\.\s+(?:как|что)\s+|циклы|ооп|числа)',
+            _to_topic,
+            target="first_line_lower",
+            when=lambda ctx: not re.search(r'задание\s+\d+', ctx.first_line_lower),
+        ),
+        TitleRule("task_number", r'задание\s+[№#]?\s*\d+|задани[ея]\s+\d+', _to_task,
+                  target="first_line_lower", keywords=("задани",)),
+    ],
+    # Нет номера задания — пробуем тему
+    default=_to_topic,
+)
+
+# Пустое описание — информация из имени файла
+STEM_RULES = RuleSet(
+    "python.stem",
+    [
+        # "video12345" — запись
+        TitleRule("record", None, f"{PREFIX_PY}Запись урока",
+                  when=lambda ctx: ctx.stem.startswith('video') and len(ctx.stem) > 5 and ctx.stem[5:].isdigit()),
+        # "X (Y)" — задание
+        TitleRule("task_paren", r'^(\d+)\s*\(', PREFIX_PY + "Разбираем задание номер {0}", target="stem", method="match"),
+        TitleRule("task_digits", None, PREFIX_PY + "Разбираем задание номер {stem}", when=lambda ctx: ctx.stem.isdigit()),
+    ],
+    default=lambda gen, ctx: f"{PREFIX_PY}{ctx.stem}",
+)
+
+
 class PythonAutoTitleGenerator(BaseTitleGenerator):
     """Автоматический генератор заголовков для Python.
     
@@ -220,89 +279,18 @@ class PythonAutoTitleGenerator(BaseTitleGenerator):
         self.topic_generator = PythonTopicTitleGenerator()
         self.task_generator = PythonTaskTitleGenerator()
     
-    def generate(self, video: VideoData) -> str:
+    def generate_context(self, ctx: TitleContext) -> str:
         """Сгенерировать заголовок автоматически.
         
         Args:
-            video: Данные видео.
+            ctx: Контекст видео.
             
         Returns:
             Заголовок для темы или задания.
         """
-        description = video.description.strip()
-        if not description:
-            # Если описание пустое, пытаемся извлечь информацию из имени файла
-            filename_stem = video.file_path.stem
-            # Если имя файла начинается с "video" и содержит только цифры - это запись
-            if filename_stem.startswith('video') and len(filename_stem) > 5 and filename_stem[5:].isdigit():
-                return f"Курс по Python базовый. Запись урока"
-            # Если имя файла в формате "X (Y)" или просто число - это задание
-            match = re.match(r'^(\d+)\s*\(', filename_stem)
-            if match:
-                task_num = match.group(1)
-                return f"Курс по Python базовый. Разбираем задание номер {task_num}"
-            # Если имя файла - это только число
-            if filename_stem.isdigit():
-                return f"Курс по Python базовый. Разбираем задание номер {filename_stem}"
-            return f"Курс по Python базовый. {filename_stem}"
-        
-        first_line = description.split('\n')[0].strip()
-        first_line_lower = first_line.lower()
-        
-        # Явные признаки задания: "Решение N", "Разбор задания N_...", "Задание N (тема)" с номером
-        if re.search(r'^(решение|разбор)\s+\d+', first_line_lower):
-            return self.task_generator.generate(video)
-        if re.search(r'^разбор\s+задани[ея]\s+\d+[_\-]', first_line_lower):
-            return self.task_generator.generate(video)
-        if re.search(r'^задани[ея]\s+\d+[_\-]\d+', first_line_lower):
-            return self.task_generator.generate(video)
-        # "В задании нельзя...", "Дан список... В задании нельзя" — задание без номера (737)
-        if re.search(r'в задании\s+нельз|задани[ея]\s+нельз|задани[ея]\s+нужно', first_line_lower) or \
-           re.search(r'в задании\s+нельз|задани[ея]\s+нельз', description.lower()):
-            part = first_line.split(".")[0].strip()
-            if len(part) > 80:
-                part = part[:77].rsplit(" ", 1)[0] + "..."
-            if part:
-                return f'{PREFIX_PY}Разбираем задание: {part}'
-            return f'{PREFIX_PY}Разбираем задание'
-        
-        # Проверяем, является ли это темой (урок без номера задания)
-        # Паттерны для тем: "Урок.", "Видеоурок.", "Мини-урок", "Как...", "Понятие...", "Работа с...", "Методы...", "Первая программа", "Знакомство...", "Самые главные..."
-        # Также "X. Как работает..." или "X. Что делает..." - это темы
-        is_topic_pattern = (
-            re.search(r'^урок\.', first_line_lower) or 
-            re.search(r'^видеоурок\.', first_line_lower) or
-            re.search(r'^мини-урок', first_line_lower) or
-            re.search(r'^как\s+', first_line_lower) or
-            re.search(r'^понятие\s+', first_line_lower) or
-            re.search(r'^работа\s+с\s+', first_line_lower) or
-            re.search(r'^методы\s+', first_line_lower) or
-            re.search(r'^первая\s+программа', first_line_lower) or
-            re.search(r'^знакомство\s+', first_line_lower) or
-            re.search(r'^самые\s+главные', first_line_lower) or
-            re.search(r'^\d+\.\s+как\s+', first_line_lower) or  # "2. Как работает цикл for"
-            re.search(r'^\d+\.\s+что\s+', first_line_lower) or  # "4. Что делает функция range()"
-            re.search(r'^\d+\.\s+как\s+работает', first_line_lower) or  # "2. Как работает цикл for"
-            re.search(r'^\d+\.\s+что\s+делает', first_line_lower) or  # "4. Что делает функция range()"
-            re.search(r'^циклы', first_line_lower) or  # "Циклы. Их назначение" или "Циклы..."
-            re.search(r'^ооп', first_line_lower) or  # "ООП..."
-            re.search(r'^числа', first_line_lower)  # "Числа ..."
-        )
-        
-        if is_topic_pattern and not re.search(r'задание\s+\d+', first_line_lower):
-            return self.topic_generator.generate(video)
-        
-        # Проверяем, есть ли номер задания
-        if re.search(r'задание\s+[№#]?\s*\d+', first_line_lower) or \
-           re.search(r'задани[ея]\s+\d+', first_line_lower):
-            return self.task_generator.generate(video)
-        
-        # По умолчанию пробуем тему (если нет номера задания)
-        if not re.search(r'задание\s+\d+|задани[ея]\s+\d+', first_line_lower):
-            return self.topic_generator.generate(video)
-        
-        # Если ничего не подошло, возвращаем имя файла
-        return f"Курс по Python базовый. {video.file_path.stem}"
+        if not ctx.description:
+            return STEM_RULES.apply(ctx, self)
+        return AUTO_RULES.apply(ctx, self)
     
     def get_name(self) -> str:
         """Получить имя генератора."""
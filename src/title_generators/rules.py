@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""Декларативные таблицы правил для генераторов заголовков.
+
+Правило описывается один раз: имя, паттерн, шаблон/обработчик, приоритет.
+RuleSet компилирует паттерны при импорте модуля генератора, сортирует правила
+по приоритету и перед запуском regex проверяет обязательные ключевые слова
+подстрокой (keyword prefilter). Порядок «первое сработавшее правило побеждает»
+сохраняется — поэтому правила не склеиваются в одну альтернацию, если от
+порядка зависит результат.
+
+Какое правило сработало, записывается в trace контекста (``RuleSet:rule``),
+см. BaseTitleGenerator.explain().
+"""
+
+import re
+import types
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, Union
+
+# Обработчик правила: (генератор, субъект, match или None) -> результат или None (правило не подошло)
+RuleAction = Callable[[Any, Any, Optional["re.Match[str]"]], Optional[Any]]
+
+
+def _contains_all(text: str, keywords: Tuple[str, ...]) -> bool:
+    for k in keywords:
+        if k not in text:
+            return False
+    return True
+
+
+def _const_key(value: Any) -> Any:
+    if isinstance(value, types.CodeType):
+        return code_key(value)
+    if isinstance(value, (tuple, list)):
+        return tuple(_const_key(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        # Порядок элементов frozenset строк зависит от PYTHONHASHSEED
+        return ("set", tuple(sorted(repr(_const_key(v)) for v in value)))
+    return repr(value)
+
+
+def code_key(code: types.CodeType, doc: Optional[str] = None) -> tuple:
+    """Байткод, имена и константы code object (вложенные функции и lambda — рекурсивно).
+
+    Номера строк, имена локальных переменных и docstring (doc) не входят: комментарии
+    и форматирование ключ не меняют, правка выражений, шаблонов и ветвлений — меняет.
+    """
+    consts = code.co_consts
+    if doc is not None and consts and consts[0] == doc:
+        consts = consts[1:]
+    return (code.co_code, code.co_exceptiontable, code.co_names, _const_key(consts))
+
+
+def function_key(func: Any) -> Optional[tuple]:
+    """Ключ кода функции (с аргументами по умолчанию); None — не функция Python."""
+    while hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+    code = getattr(func, "__code__", None)
+    if not isinstance(code, types.CodeType):
+        return None
+    return (
+        code_key(code, func.__doc__),
+        _const_key(getattr(func, "__defaults__", None)),
+        _const_key(sorted((getattr(func, "__kwdefaults__", None) or {}).items())),
+    )
+
+
+def _callable_key(value: Any) -> Any:
+    """Обработчик — по имени, коду и простым значениям замыкания (префикс, номера групп); шаблон — как есть."""
+    if value is None or isinstance(value, str):
+        return value
+    closure = tuple(
+        cell.cell_contents for cell in (getattr(value, "__closure__", None) or ())
+        if isinstance(cell.cell_contents, (str, int, float, bool, tuple, type(None)))
+    )
+    return (
+        getattr(value, "__module__", None), getattr(value, "__qualname__", type(value).__name__),
+        function_key(value), closure,
+    )
+
+
+class lazy_attr:
+    """Ленивый атрибут: вычисляется при первом обращении и кладётся в __dict__ экземпляра.
+
+    Аналог functools.cached_property без блокировки (в 3.11 она заметна на горячем пути).
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class RuleSubject:
+    """Текст(ы), к которым применяются правила: кэш casefold для prefilter и trace сработавших правил."""
+
+    def __init__(self, trace: Optional[list[str]] = None):
+        self.trace: list[str] = trace if trace is not None else []
+        self._folded: dict[str, str] = {}
+
+    def folded(self, attr: str) -> str:
+        """casefold() поля attr (кэшируется): необходимое условие совпадения regex с IGNORECASE."""
+        value = self._folded.get(attr)
+        if value is None:
+            value = getattr(self, attr).casefold()
+            self._folded[attr] = value
+        return value
+
+
+class TextView(RuleSubject):
+    """Произвольный текст как субъект правил (поиск ресурса по описанию или первой строке)."""
+
+    def __init__(self, text: str, trace: Optional[list[str]] = None):
+        super().__init__(trace)
+        self.text = text
+
+    @lazy_attr
+    def lower(self) -> str:
+        return self.text.lower()
+
+
+class TitleContext(RuleSubject):
+    """Предобработанные данные видео для генерации заголовка.
+
+    strip/split/lower выполняются один раз на запись, а не в каждом правиле:
+    описание и первая строка — сразу, остальное — при первом обращении.
+
+    Attributes:
+        raw_description: Описание как есть (None → "").
+        stem: Имя файла без расширения.
+        date: Дата видео.
+        channel: Канал (курс).
+        file_path: Путь к файлу, если контекст собран из VideoData (иначе None).
+    """
+
+    def __init__(
+        self,
+        description: Optional[str],
+        stem: str,
+        date: Optional[datetime] = None,
+        channel: Optional[str] = None,
+    ):
+        super().__init__()
+        self.raw_description = description or ""
+        self.stem = stem
+        self.date = date
+        self.channel = channel
+        self.file_path = None
+        self.description = self.raw_description.strip()
+        self.first_line = self.description.split("\n", 1)[0].strip() if self.description else ""
+        self.first_line_lower = self.first_line.lower()
+
+    @classmethod
+    def from_video(cls, video: Any) -> "TitleContext":
+        """Собрать контекст из VideoData."""
+        ctx = cls(video.description, video.file_path.stem, video.date, video.channel)
+        ctx.file_path = video.file_path
+        return ctx
+
+    @classmethod
+    def batch(
+        cls,
+        descriptions: Sequence[Optional[str]],
+        stems: Sequence[str],
+        dates: Optional[Sequence[Optional[datetime]]] = None,
+        channels: Optional[Sequence[Optional[str]]] = None,
+    ) -> list["TitleContext"]:
+        """Собрать контексты для пакета записей (колонки одинаковой длины).
+
+        Контексты создаются через __init__ (та же предобработка, что и по одной записи),
+        без VideoData и без обращений к файловой системе.
+
+        Raises:
+            ValueError: Колонки разной длины.
+        """
+        n = len(stems)
+        if len(descriptions) != n or (dates is not None and len(dates) != n) or (
+            channels is not None and len(channels) != n
+        ):
+            raise ValueError("TitleContext.batch: колонки разной длины")
+        dates = dates if dates is not None else (None,) * n
+        channels = channels if channels is not None else (None,) * n
+        return [cls(descriptions[i], stems[i], dates[i], channels[i]) for i in range(n)]
+
+    @lazy_attr
+    def description_lower(self) -> str:
+        return self.description.lower()
+
+    @lazy_attr
+    def full_text(self) -> str:
+        """Описание одной строкой (поиск номера задания по всему тексту)."""
+        return self.description.replace("\n", " ")
+
+
+@dataclass(frozen=True)
+class TitleRule:
+    """Правило таблицы.
+
+    Attributes:
+        name: Имя правила (уникально в RuleSet, попадает в trace).
+        pattern: Регулярное выражение; None — правило только по условию when.
+        action: Шаблон str.format (группы match позиционно, {stem}) или обработчик RuleAction.
+        priority: Меньше — раньше; при равенстве сохраняется порядок объявления.
+        flags: Флаги re.
+        target: Атрибут субъекта, по которому ищется паттерн.
+        method: "search" или "match".
+        keywords: Подстроки (нижний регистр, кириллица), без которых паттерн заведомо не совпадёт.
+        when: Дополнительное условие (субъект) -> bool, проверяется до regex.
+    """
+
+    name: str
+    pattern: Optional[str]
+    action: Union[str, RuleAction]
+    priority: int = 0
+    flags: int = 0
+    target: str = "first_line"
+    method: str = "search"
+    keywords: Tuple[str, ...] = ()
+    when: Optional[Callable[[Any], bool]] = None
+
+
+class RuleSet:
+    """Упорядоченная таблица правил, скомпилированная один раз."""
+
+    def __init__(
+        self,
+        name: str,
+        rules: list[TitleRule],
+        default: Optional[Callable[[Any, Any], Any]] = None,
+    ):
+        """Скомпилировать таблицу.
+
+        Args:
+            name: Имя таблицы (префикс в trace).
+            rules: Правила.
+            default: Обработчик (генератор, субъект), если ни одно правило не дало результат.
+
+        Raises:
+            ValueError: Повтор имени правила или неизвестный method.
+        """
+        names = [r.name for r in rules]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Повторяющиеся имена правил в {name}: {names}")
+        self.name = name
+        self.default = default
+        self.rules = tuple(sorted(rules, key=lambda r: r.priority))
+        compiled = []
+        for rule in self.rules:
+            if rule.method not in ("search", "match"):
+                raise ValueError(f"{name}.{rule.name}: неизвестный method {rule.method!r}")
+            matcher = None
+            if rule.pattern is not None:
+                rx = re.compile(rule.pattern, rule.flags)
+                matcher = rx.search if rule.method == "search" else rx.match
+            compiled.append((rule, matcher, rule.target, rule.keywords, rule.when))
+        self._compiled = tuple(compiled)
+        self._labels = {rule.name: f"{name}:{rule.name}" for rule in self.rules}
+        self._default_label = f"{name}:default"
+
+    def fingerprint(self) -> tuple:
+        """Данные таблицы для версии генератора: паттерны, флаги, шаблоны, приоритеты, код обработчиков."""
+        return (
+            self.name,
+            _callable_key(self.default),
+            tuple(
+                (
+                    rule.name, rule.pattern, _callable_key(rule.action), rule.priority, rule.flags,
+                    rule.target, rule.method, rule.keywords, _callable_key(rule.when),
+                )
+                for rule in self.rules
+            ),
+        )
+
+    def iter_matches(self, subject: RuleSubject) -> Iterator[Tuple[TitleRule, Optional["re.Match[str]"]]]:
+        """Правила, совпавшие с субъектом, в порядке приоритета (с match или None для правил без паттерна)."""
+        for rule, matcher, target, keywords, when in self._compiled:
+            if keywords and not _contains_all(subject.folded(target), keywords):
+                continue
+            if when is not None and not when(subject):
+                continue
+            if matcher is None:
+                yield rule, None
+                continue
+            m = matcher(getattr(subject, target))
+            if m:
+                yield rule, m
+
+    def apply(self, subject: RuleSubject, owner: Any = None) -> Any:
+        """Вернуть результат первого сработавшего правила (или default).
+
+        Args:
+            subject: TitleContext или TextView.
+            owner: Генератор, передаётся в обработчики первым аргументом.
+
+        Returns:
+            Результат обработчика/шаблона; None, если ничего не подошло и default не задан.
+        """
+        for rule, m in self.iter_matches(subject):
+            result = self.render(rule, owner, subject, m)
+            if result is not None:
+                subject.trace.append(self._labels[rule.name])
+                return result
+        if self.default is not None:
+            subject.trace.append(self._default_label)
+            return self.default(owner, subject)
+        return None
+
+    def scan(self, subject: RuleSubject, accept: Callable[[Any], bool], owner: Any = None) -> Any:
+        """Перебрать совпавшие правила до первого результата, прошедшего accept.
+
+        В отличие от apply(), если ни один результат не принят, возвращается
+        последний полученный (поведение циклов «присвоить и проверить» в старых генераторах).
+
+        Returns:
+            Принятый или последний результат; None, если совпадений не было.
+        """
+        result = None
+        for rule, m in self.iter_matches(subject):
+            result = self.render(rule, owner, subject, m)
+            if accept(result):
+                subject.trace.append(self._labels[rule.name])
+                break
+        return result
+
+    @staticmethod
+    def render(rule: TitleRule, owner: Any, subject: Any, m: Optional["re.Match[str]"]) -> Any:
+        """Выполнить действие правила (шаблон или обработчик) для найденного совпадения."""
+        if isinstance(rule.action, str):
+            groups = m.groups() if m else ()
+            return rule.action.format(*groups, stem=getattr(subject, "stem", ""))
+        return rule.action(owner, subject, m)
@@ -1,6 +1,6 @@
 """Вспомогательные утилиты."""
 
 from .file_utils import validate_video_file, find_video_files
-from .env_utils import load_env_file, get_env_var
+from .env_utils import load_env_file, load_config_file, get_env_var, reload_env
 
-__all__ = ["validate_video_file", "find_video_files", "load_env_file", "get_env_var"]
+__all__ = ["validate_video_file", "find_video_files", "load_env_file", "load_config_file", "get_env_var", "reload_env"]
@@ -1,62 +1,172 @@
-"""Утилиты для работы с переменными окружения из .env файла."""
+"""Утилиты для работы с переменными окружения из .env файла и config/config.yaml.
+
+Порядок источников: переменные окружения процесса → .env → config/config.yaml → default.
+Файлы читаются один раз и кешируются; кеш файла сбрасывается, когда меняются его mtime
+или размер (долгоживущий worker видит правки .env), и явно — reload_env().
+"""
 
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+import logging
 
-def load_env_file(env_path: Optional[Path] = None) -> dict[str, str]:
-    """Загрузить переменные окружения из .env файла.
-    
-    Args:
-        env_path: Путь к .env файлу. Если None, ищет .env в корне проекта.
-        
-    Returns:
-        Словарь с переменными окружения.
-    """
-    if env_path is None:
-        # Ищем .env в корне проекта (на уровень выше src)
-        project_root = Path(__file__).parent.parent.parent
-        env_path = project_root / ".env"
-    
+logger = logging.getLogger(__name__)
+
+try:
+    import yaml
+    _YAML_AVAILABLE = True
+except ImportError:
+    yaml = None  # type: ignore
+    _YAML_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Путь к YAML-конфигу можно переопределить переменной окружения процесса
+CONFIG_PATH_ENV = "VK_IMPORTER_CONFIG"
+DEFAULT_CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+
+# Секции config.yaml → префикс имён переменных (vk.upload_bandwidth → VK_UPLOAD_BANDWIDTH)
+CONFIG_SECTIONS = {
+    "vk": "VK",
+    "content_hub": "CONTENT_HUB",
+    "tg_parser": "TG_PARSER",
+    "logging": "LOG",
+}
+# Секция с переменными под их собственными именами (VK_EGE_GROUP_ID: 111)
+CONFIG_RAW_SECTION = "env"
+
+# Кеш разобранных файлов: путь → (mtime_ns, размер, значения)
+_file_cache: dict[Path, tuple[int, int, dict[str, str]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_signature(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _cached(path: Path, parse) -> dict[str, str]:
+    signature = _file_signature(path)
+    if signature is None:
+        return {}
+    with _cache_lock:
+        cached = _file_cache.get(path)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+    values = parse(path)
+    with _cache_lock:
+        _file_cache[path] = (*signature, values)
+    return values
+
+
+def reload_env() -> None:
+    """Сбросить кеш .env и config.yaml (после записи в .env, например обновления токена)."""
+    with _cache_lock:
+        _file_cache.clear()
+
+
+def _parse_env_file(env_path: Path) -> dict[str, str]:
     env_vars = {}
-    
-    if not env_path.exists():
-        return env_vars
-    
     with open(env_path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
-            
+
             # Пропускаем пустые строки и комментарии
             if not line or line.startswith("#"):
                 continue
-            
+
             # Парсим KEY=VALUE
             if "=" in line:
                 key, value = line.split("=", 1)
                 key = key.strip()
                 value = value.strip()
-                
+
                 # Убираем кавычки если есть
                 if value.startswith('"') and value.endswith('"'):
                     value = value[1:-1]
                 elif value.startswith("'") and value.endswith("'"):
                     value = value[1:-1]
-                
+
                 env_vars[key] = value
-    
+
     return env_vars
 
 
+def load_env_file(env_path: Optional[Path] = None) -> dict[str, str]:
+    """Загрузить переменные окружения из .env файла (кешируется до изменения файла).
+
+    Args:
+        env_path: Путь к .env файлу. Если None, ищет .env в корне проекта.
+
+    Returns:
+        Словарь с переменными окружения (не изменять: общий для вызовов).
+    """
+    if env_path is None:
+        # Ищем .env в корне проекта (на уровень выше src)
+        env_path = PROJECT_ROOT / ".env"
+    return _cached(Path(env_path), _parse_env_file)
+
+
+def _config_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+
+def _parse_config_file(config_path: Path) -> dict[str, str]:
+    if not _YAML_AVAILABLE:
+        logger.warning("%s не прочитан: модуль yaml не установлен (pip install pyyaml)", config_path)
+        return {}
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except Exception as e:
+        logger.warning("Ошибка чтения %s: %s", config_path, e)
+        return {}
+    if not isinstance(data, dict):
+        logger.warning("%s: ожидался словарь секций", config_path)
+        return {}
+    values: dict[str, str] = {}
+    for section, prefix in CONFIG_SECTIONS.items():
+        for key, value in (data.get(section) or {}).items():
+            text = _config_value(value)
+            if text is not None:
+                values[f"{prefix}_{str(key).upper()}"] = text
+    for key, value in (data.get(CONFIG_RAW_SECTION) or {}).items():
+        text = _config_value(value)
+        if text is not None:
+            values[str(key)] = text
+    return values
+
+
+def load_config_file(config_path: Optional[Path] = None) -> dict[str, str]:
+    """Переменные из config/config.yaml (или VK_IMPORTER_CONFIG) под именами переменных окружения.
+
+    Returns:
+        Словарь имя → значение (bool → "1"/"0", список → через запятую); нет файла — пустой.
+    """
+    if config_path is None:
+        config_path = Path(os.getenv(CONFIG_PATH_ENV) or DEFAULT_CONFIG_PATH)
+    return _cached(Path(config_path), _parse_config_file)
+
+
 def get_env_var(key: str, default: Optional[str] = None, env_path: Optional[Path] = None) -> Optional[str]:
-    """Получить переменную окружения из .env файла или системных переменных.
-    
+    """Получить переменную из окружения процесса, .env или config.yaml.
+
     Args:
         key: Имя переменной.
         default: Значение по умолчанию.
         env_path: Путь к .env файлу.
-        
+
     Returns:
         Значение переменной или default.
     """
@@ -64,7 +174,9 @@ def get_env_var(key: str, default: Optional[str] = None, env_path: Optional[Path
     value = os.getenv(key)
     if value:
         return value
-    
+
     # Затем проверяем .env файл
     env_vars = load_env_file(env_path)
-    return env_vars.get(key, default)
+    if key in env_vars:
+        return env_vars[key]
+    return load_config_file().get(key, default)
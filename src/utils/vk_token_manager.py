@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""Токен пользователя VK (VK_ACCESS_TOKEN) внутри процесса: обновление заранее и single-flight по ошибке 5.
+
+Обновление по refresh_token (vk_token_refresh.refresh_token_request) выполняется прямо в
+процессе. Одновременно обновляет только один поток процесса (threading.Lock) и один процесс
+проекта (lock-файл .vk_refresh.lock, тот же у scripts/refresh_vk_token.py). Остальные ждут
+lock и, если токен в .env уже сменился, берут новый без своего запроса к VK ID.
+
+Нужны в .env: VK_CLIENT_ID, VK_CLIENT_SECRET, VK_REFRESH_TOKEN, VK_DEVICE_ID
+(см. docs/VK-TOKEN-REFRESH.md); без них токен только читается из .env.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.error import HTTPError
+
+from .env_utils import get_env_var, reload_env
+from .vk_token_refresh import refresh_token_request
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ENV_PATH = PROJECT_ROOT / ".env"
+LOCK_PATH = PROJECT_ROOT / ".vk_refresh.lock"
+
+DEFAULT_LOCK_WAIT_SECONDS = 30
+LOCK_POLL_INTERVAL_SECONDS = 0.2
+
+# Обновлять заранее, если до истечения токена меньше N секунд
+REFRESH_AHEAD_SECONDS = 10 * 60
+
+REFRESH_CREDENTIALS = ("VK_CLIENT_ID", "VK_CLIENT_SECRET", "VK_REFRESH_TOKEN", "VK_DEVICE_ID")
+
+
+class TokenRefreshError(Exception):
+    """Обновление токена не выполнено (нет параметров в .env, ошибка VK ID)."""
+
+
+def load_env(env_path: Path = ENV_PATH) -> dict[str, str]:
+    """Загрузить .env в словарь (без изменений значений)."""
+    env = {}
+    if not env_path.exists():
+        return env
+    with open(env_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.strip().startswith("#"):
+                continue
+            if "=" in line:
+                key, _, value = line.partition("=")
+                env[key.strip()] = value.rstrip("\n")
+    return env
+
+
+def save_env(env: dict[str, str], env_path: Path = ENV_PATH) -> None:
+    """Обновить значения в .env по словарю env, дописать ключи, которых нет в файле."""
+    written = set()
+    new_lines = []
+    if env_path.exists():
+        with open(env_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if "=" in line:
+                    key = line.split("=", 1)[0].strip()
+                    if key in env:
+                        val = env[key]
+                        if "\n" in val or "\r" in val:
+                            val = val.replace("\r", "").replace("\n", " ")
+                        new_lines.append(f"{key}={val}\n")
+                        written.add(key)
+                        continue
+                new_lines.append(line)
+    append_order = [
+        "VK_REFRESH_TOKEN", "VK_USER_TOKEN_EXPIRES_AT", "VK_USER_ID",
+        "VK_ACCESS_TOKEN", "VK_GROUP_ID", "VK_DEVICE_ID",
+    ]
+    for key in append_order:
+        if key in env and key not in written:
+            val = env[key]
+            if "\n" in val or "\r" in val:
+                val = val.replace("\r", "").replace("\n", " ")
+            new_lines.append(f"{key}={val}\n")
+            written.add(key)
+    with open(env_path, "w", encoding="utf-8") as f:
+        f.writelines(new_lines)
+
+
+def get_stripped(env: dict[str, str], key: str) -> str:
+    v = env.get(key, "").strip()
+    if v.startswith('"') and v.endswith('"'):
+        v = v[1:-1]
+    elif v.startswith("'") and v.endswith("'"):
+        v = v[1:-1]
+    return v
+
+
+def get_int_env(env: dict[str, str], key: str, default: int) -> int:
+    raw = get_stripped(env, key)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def acquire_lock(lock_path: Path, wait_seconds: int) -> int:
+    """Взять lock на файл (flock, на Windows — msvcrt.locking).
+
+    Lock держит открытый дескриптор, и ОС снимает его при завершении процесса: lock упавшего
+    процесса не остаётся, и файл не нужно удалять по возрасту (без гонки «проверить и удалить»).
+    """
+    deadline = time.time() + max(0, wait_seconds)
+    fd = os.open(str(lock_path), os.O_CREAT | os.O_RDWR)
+    while not _try_lock(fd):
+        if time.time() >= deadline:
+            os.close(fd)
+            raise TimeoutError(f"Не удалось взять lock {lock_path} за {wait_seconds} сек.")
+        time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+    os.ftruncate(fd, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, str(os.getpid()).encode("utf-8"))
+    return fd
+
+
+def release_lock(fd: int, lock_path: Path) -> None:
+    """Снять lock. Файл lock_path остаётся: его удаление открыло бы гонку с процессом, ждущим lock."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def is_token_expiring_soon(expires_at_str: str, within_seconds: int) -> bool:
+    """True, если токен истекает в течение within_seconds секунд или уже истёк."""
+    if not expires_at_str or not expires_at_str.strip():
+        return True  # неизвестно — считаем, что пора обновить
+    try:
+        ts = int(expires_at_str.strip())
+    except ValueError:
+        return True
+    return time.time() >= ts - within_seconds
+
+
+def refresh_env_tokens(env: dict[str, str]) -> str:
+    """Обменять VK_REFRESH_TOKEN из env на новую пару и записать её в env (без сохранения в файл).
+
+    Returns:
+        Новый access_token.
+
+    Raises:
+        TokenRefreshError: Нет параметров обновления или ошибка VK ID.
+    """
+    client_id = get_stripped(env, "VK_CLIENT_ID")
+    client_secret = get_stripped(env, "VK_CLIENT_SECRET")
+    refresh_tok = get_stripped(env, "VK_REFRESH_TOKEN")
+    device_id = get_stripped(env, "VK_DEVICE_ID")
+    if not client_id or not client_secret:
+        raise TokenRefreshError("в .env должны быть заданы VK_CLIENT_ID и VK_CLIENT_SECRET")
+    if not refresh_tok:
+        raise TokenRefreshError("VK_REFRESH_TOKEN не задан")
+    if not device_id:
+        raise TokenRefreshError("VK_DEVICE_ID не задан")
+    if "VK_SSL_VERIFY" in env:
+        os.environ["VK_SSL_VERIFY"] = get_stripped(env, "VK_SSL_VERIFY")
+    try:
+        data = refresh_token_request(client_id, client_secret, refresh_tok, device_id)
+    except HTTPError as e:
+        body = e.read().decode("utf-8", errors="replace")
+        raise TokenRefreshError(f"Ошибка VK ID: {e.code} — {body}")
+    except Exception as e:
+        raise TokenRefreshError(f"Ошибка запроса: {e}")
+
+    access_token = data.get("access_token")
+    if not access_token:
+        raise TokenRefreshError("В ответе VK нет access_token")
+    user_id = data.get("user_id", "")
+    env["VK_ACCESS_TOKEN"] = access_token
+    env["VK_USER_TOKEN_EXPIRES_AT"] = str(int(time.time()) + int(data.get("expires_in", 3600)))
+    env["VK_USER_ID"] = str(user_id) if user_id else env.get("VK_USER_ID", "")
+    if data.get("refresh_token"):
+        env["VK_REFRESH_TOKEN"] = data["refresh_token"]
+    return access_token
+
+
+class VkTokenManager:
+    """VK_ACCESS_TOKEN процесса: token() — действующий (заранее обновлённый), refresh() — после ошибки 5."""
+
+    def __init__(
+        self,
+        env_path: Path = ENV_PATH,
+        lock_path: Path = LOCK_PATH,
+        refresh_ahead: int = REFRESH_AHEAD_SECONDS,
+    ):
+        self.env_path = Path(env_path)
+        self.lock_path = Path(lock_path)
+        self.refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[str]:
+        return get_env_var("VK_ACCESS_TOKEN", env_path=self.env_path)
+
+    def _can_refresh(self) -> bool:
+        return all(get_env_var(key, env_path=self.env_path) for key in REFRESH_CREDENTIALS)
+
+    def token(self) -> Optional[str]:
+        """Действующий токен; если до истечения меньше refresh_ahead — сначала обновить."""
+        token = self._current()
+        expires_at = get_env_var("VK_USER_TOKEN_EXPIRES_AT", env_path=self.env_path) or ""
+        if not token or not self._can_refresh() or not is_token_expiring_soon(expires_at, self.refresh_ahead):
+            return token
+        try:
+            return self._refresh(token, proactive=True) or token
+        except TokenRefreshError as e:
+            logger.warning("Не удалось обновить токен заранее: %s", e)
+            return token
+
+    def refresh(self, stale_token: Optional[str]) -> Optional[str]:
+        """Новый токен взамен stale_token (ошибка 5). Если его уже обновил другой поток или процесс — без запроса к VK ID.
+
+        Returns:
+            Новый токен или None (обновить не удалось).
+        """
+        try:
+            return self._refresh(stale_token, proactive=False)
+        except TokenRefreshError as e:
+            logger.warning("Ошибка при обновлении токена: %s", e)
+            return None
+
+    def _refresh(self, stale_token: Optional[str], proactive: bool) -> Optional[str]:
+        with self._lock:
+            token = self._current()
+            if token and token != stale_token:
+                return token
+            env = load_env(self.env_path)
+            wait = get_int_env(env, "VK_REFRESH_LOCK_WAIT_SEC", DEFAULT_LOCK_WAIT_SECONDS)
+            try:
+                fd = acquire_lock(self.lock_path, wait)
+            except TimeoutError as e:
+                raise TokenRefreshError(str(e))
+            try:
+                # Пока ждали lock, токен мог обновить другой процесс
+                env = load_env(self.env_path)
+                token = get_stripped(env, "VK_ACCESS_TOKEN")
+                if token and token != stale_token:
+                    return token
+                expires_at = get_stripped(env, "VK_USER_TOKEN_EXPIRES_AT")
+                if proactive and not is_token_expiring_soon(expires_at, self.refresh_ahead):
+                    return token
+                new_token = refresh_env_tokens(env)
+                save_env(env, self.env_path)
+                reload_env()
+                logger.info("VK_ACCESS_TOKEN обновлён%s", " заранее" if proactive else " по ошибке 5")
+                return new_token
+            finally:
+                release_lock(fd, self.lock_path)
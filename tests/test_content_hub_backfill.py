@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Backfill Content Hub (run_backfill) против поддельного клиента: с пакетными upsert_publications /
+upsert_link_maps и только с построчными upsert_publication / upsert_link_map.
+Проверяются payload'ы, остановка на ошибке пачки, продолжение с checkpoint и неизменный checkpoint
+в dry-run (client=None) и при write_dry_run (save_checkpoint=False).
+content_hub_client не нужен: контракты payload'ов подменяются в модуле backfill.
+Запуск: python tests/test_content_hub_backfill.py  (или pytest tests/test_content_hub_backfill.py)
+"""
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.integrations.content_hub import backfill
+from src.integrations.content_hub.backfill import BACKFILL_DESTINATION, run_backfill
+from src.storage.canonical_backfill import BackfillCheckpoint
+from src.storage.database import VideoRecord, VideoStorage
+
+# id записи -> URL загрузки (None — не загружена, в backfill не попадает)
+VIDEO_URLS = {
+    1: "https://vk.com/video-100_1",
+    2: None,
+    3: "https://vk.com/video-100_3",
+    4: "https://example.com/not-vk",
+    5: "https://vk.com/video-100_5",
+    6: "https://vk.com/video-100_6",
+}
+UPLOADED_IDS = [video_id for video_id, url in VIDEO_URLS.items() if url]
+
+
+def _uid(video_id: int) -> str:
+    return f"vk_importer:video_record:{video_id}"
+
+
+class BatchClient:
+    """Клиент с пакетными upsert; пачка с uid из fail_uids не записывается."""
+
+    def __init__(self, fail_uids=()):
+        self.fail_uids = set(fail_uids)
+        self.publications = []
+        self.link_maps = []
+        self.calls = []
+
+    def upsert_publications(self, payloads):
+        self.calls.append([p.global_uid for p in payloads])
+        if self.fail_uids & {p.global_uid for p in payloads}:
+            return SimpleNamespace(ok=False, error_message="db down")
+        self.publications.extend(payloads)
+        return SimpleNamespace(ok=True, error_message=None)
+
+    def upsert_link_maps(self, payloads):
+        self.link_maps.extend(payloads)
+        return SimpleNamespace(ok=True, error_message=None)
+
+
+class RowClient:
+    """Клиент только с построчными upsert (без upsert_publications)."""
+
+    def __init__(self, fail_uids=()):
+        self.fail_uids = set(fail_uids)
+        self.publications = []
+        self.link_maps = []
+
+    def upsert_publication(self, payload):
+        if payload.global_uid in self.fail_uids:
+            return SimpleNamespace(ok=False, error_message="db down")
+        self.publications.append(payload)
+        return SimpleNamespace(ok=True, error_message=None)
+
+    def upsert_link_map(self, payload):
+        self.link_maps.append(payload)
+        return SimpleNamespace(ok=True, error_message=None)
+
+
+@contextmanager
+def _backfill_db():
+    """(storage, checkpoint) на временной videos.db с записями VIDEO_URLS."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "videos.db"
+        storage = VideoStorage(db_path)
+        for video_id, url in VIDEO_URLS.items():
+            record_id = storage.add_video(
+                VideoRecord(file_path=f"/videos/{video_id}.mp4", title=f"Видео {video_id}", source_folder="videos")
+            )
+            assert record_id == video_id
+            if url:
+                storage.mark_uploaded(record_id, url)
+        with mock.patch.object(backfill, "PublicationPayload", SimpleNamespace), \
+                mock.patch.object(backfill, "LinkMapPayload", SimpleNamespace):
+            yield storage, BackfillCheckpoint(db_path)
+
+
+def _check_payloads(client) -> None:
+    assert [p.global_uid for p in client.publications] == [_uid(i) for i in UPLOADED_IDS]
+    assert [p.remote_id for p in client.publications] == ["-100_1", "-100_3", None, "-100_5", "-100_6"]
+    assert all(p.destination == BACKFILL_DESTINATION and p.status == "published" for p in client.publications)
+    assert all(p.published_at for p in client.publications)
+    assert [(link.source_global_uid, link.remote_url) for link in client.link_maps] == [
+        (_uid(i), VIDEO_URLS[i]) for i in UPLOADED_IDS
+    ]
+
+
+def test_batch_client_payloads():
+    with _backfill_db() as (storage, checkpoint):
+        client = BatchClient()
+        stats = run_backfill(storage, checkpoint, client=client, batch_size=2)
+
+        assert client.calls == [[_uid(1), _uid(3)], [_uid(4), _uid(5)], [_uid(6)]]
+        _check_payloads(client)
+        assert stats["error"] is None
+        assert (stats["batches"], stats["records"], stats["without_remote_id"]) == (3, 5, 1)
+        assert checkpoint.last_id(BACKFILL_DESTINATION) == 6
+
+
+def test_row_client_payloads():
+    with _backfill_db() as (storage, checkpoint):
+        client = RowClient()
+        stats = run_backfill(storage, checkpoint, client=client, batch_size=2)
+
+        _check_payloads(client)
+        assert stats["error"] is None
+        assert checkpoint.last_id(BACKFILL_DESTINATION) == 6
+
+
+def test_failed_batch_stops_and_resumes():
+    for client_class in (BatchClient, RowClient):
+        with _backfill_db() as (storage, checkpoint):
+            failing = client_class(fail_uids={_uid(5)})
+            stats = run_backfill(storage, checkpoint, client=failing, batch_size=2)
+
+            assert stats["error"] and "db down" in stats["error"]
+            assert (stats["batches"], stats["last_id"]) == (1, 3)
+            assert checkpoint.last_id(BACKFILL_DESTINATION) == 3
+            assert _uid(6) not in [p.global_uid for p in failing.publications]
+
+            client = client_class()
+            stats = run_backfill(storage, checkpoint, client=client, batch_size=2)
+
+            assert stats["error"] is None
+            assert stats["resumed_from"] == 3
+            assert [p.global_uid for p in client.publications] == [_uid(4), _uid(5), _uid(6)]
+            assert checkpoint.last_id(BACKFILL_DESTINATION) == 6
+
+
+def test_dry_run_keeps_checkpoint():
+    with _backfill_db() as (storage, checkpoint):
+        checkpoint.save(BACKFILL_DESTINATION, 1, 1)
+
+        stats = run_backfill(storage, checkpoint, client=None, batch_size=2)
+        assert (stats["resumed_from"], stats["records"], stats["last_id"]) == (1, 4, 6)
+        assert checkpoint.last_id(BACKFILL_DESTINATION) == 1
+
+        for client_class in (BatchClient, RowClient):
+            client = client_class()
+            stats = run_backfill(storage, checkpoint, client=client, batch_size=2, save_checkpoint=False)
+            assert stats["error"] is None and stats["records"] == 4
+            assert len(client.publications) == 4
+            assert checkpoint.last_id(BACKFILL_DESTINATION) == 1
+
+
+if __name__ == "__main__":
+    test_batch_client_payloads()
+    test_row_client_payloads()
+    test_failed_batch_stops_and_resumes()
+    test_dry_run_keeps_checkpoint()
+    print("OK")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Регрессия генераторов заголовков по эталонному корпусу tests/fixtures/title_golden.jsonl.
+Не требует videos.db и файлов на диске; одиночная и пакетная генерация должны совпадать с эталоном,
+пропускная способность генераторов — не ниже tests/fixtures/title_bench_baseline.json (только при TITLE_BENCH=1:
+замер по времени мигает на загруженной машине).
+Запуск: python tests/test_title_golden.py  (или pytest tests/test_title_golden.py)
+Бенчмарк по тому же корпусу: python scripts/title_bench.py
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from src.config.registry import title_generator_name
+from src.title_generators.factory import TitleGeneratorFactory
+from src.title_generators.rules import TitleContext
+from title_bench import DEFAULT_BASELINE, bench, find_regressions, load_baseline
+
+CORPUS_PATH = Path(__file__).resolve().parent / "fixtures" / "title_golden.jsonl"
+
+# Проверка заг/с включается явно; регрессию в обычном порядке ловит scripts/title_bench.py
+BENCH_ENABLED = os.environ.get("TITLE_BENCH") == "1"
+
+# Допуск падения заг/с в тесте шире, чем в scripts/title_bench.py: тест не должен мигать на загруженной машине
+MAX_REGRESSION = 0.3
+
+
+def _load_cases() -> list[dict]:
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _generator(channel: str):
+    return TitleGeneratorFactory.create(title_generator_name(channel))
+
+
+def test_golden_titles():
+    """Заголовок каждой записи корпуса совпадает с эталоном."""
+    diffs = []
+    for case in _load_cases():
+        ctx = TitleContext(case["description"], case["stem"], None, case["channel"] or None)
+        actual = _generator(case["channel"]).generate_context(ctx)
+        if actual != case["expected"]:
+            diffs.append((case["channel"], case["stem"], case["expected"], actual))
+    assert not diffs, f"Расхождений: {len(diffs)}, первое: {diffs[0]}"
+
+
+def test_golden_titles_batch():
+    """Пакетная генерация (как в recalc-titles) даёт те же заголовки."""
+    by_channel: dict[str, list[dict]] = {}
+    for case in _load_cases():
+        by_channel.setdefault(case["channel"], []).append(case)
+    for channel, cases in by_channel.items():
+        titles = _generator(channel).generate_batch(
+            [(c["description"], c["stem"], None, c["channel"] or None) for c in cases]
+        )
+        assert titles == [c["expected"] for c in cases], f"Канал {channel!r}: пакетная генерация расходится с эталоном"
+
+
+@pytest.mark.skipif(not BENCH_ENABLED, reason="замер производительности: TITLE_BENCH=1")
+def test_title_throughput_baseline():
+    """Заг/с каждого генератора не ниже baseline (с поправкой на скорость машины)."""
+    report = bench(_load_cases(), repeat=20)
+    regressions = find_regressions(report, load_baseline(DEFAULT_BASELINE), MAX_REGRESSION)
+    assert not regressions, "Регрессия производительности: " + "; ".join(regressions)
+
+
+def main():
+    print("Тест: эталонный корпус заголовков")
+    print("=" * 60)
+    failed = 0
+    tests = [test_golden_titles, test_golden_titles_batch]
+    if BENCH_ENABLED:
+        tests.append(test_title_throughput_baseline)
+    for test in tests:
+        try:
+            test()
+            print(f"OK   {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Ошибка VK API 6 (слишком много запросов) доходит до лимитера публикатора и снижает скорость семейства.
+Сеть не используется: ответы api.vk.com подменяются в HTTP-сессии публикатора.
+Запуск: python tests/test_vk_rate_limit.py  (или pytest tests/test_vk_rate_limit.py)
+"""
+import sys
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.publisher.rate_limiter import FAMILY_GET, AdaptiveRateLimiter
+from src.publisher.vk_publisher import VKPublisher
+
+TOO_MANY_REQUESTS = {"error": {"error_code": 6, "error_msg": "Too many requests per second", "request_params": []}}
+VIDEO_GET_OK = {"response": {"count": 0, "items": []}}
+
+
+def _response(payload: dict) -> mock.Mock:
+    response = mock.Mock(ok=True)
+    response.json.return_value = payload
+    return response
+
+
+def test_error_6_lowers_get_rate():
+    limiter = AdaptiveRateLimiter(sleep=lambda seconds: None)
+    publisher = VKPublisher("token", group_id=1, retry_delay=0, rate_limiter=limiter)
+    publisher.vk_session.RPS_DELAY = 0
+    initial_rate = limiter.rate(FAMILY_GET)
+
+    with mock.patch.object(
+        publisher.vk_session.http, "post", side_effect=[_response(TOO_MANY_REQUESTS), _response(VIDEO_GET_OK)]
+    ) as post:
+        assert publisher.list_group_videos() == VIDEO_GET_OK["response"]
+
+    assert post.call_count == 2
+    assert limiter.rate(FAMILY_GET) < initial_rate
+
+
+if __name__ == "__main__":
+    test_error_6_lowers_get_rate()
+    print("OK")